@@ -63,7 +63,8 @@ class Agent:
         name: str,
         description: str,
         parameters: Dict[str, Any],
-        function: callable
+        function: callable,
+        timeout: Optional[float] = None
     ) -> None:
         """
         注册工具到智能体
@@ -72,9 +73,10 @@ class Agent:
             name: 工具名称
             description: 工具描述
             parameters: 参数定义（JSON Schema格式）
-            function: 工具执行函数
+            function: 工具执行函数（普通函数或 async 函数）
+            timeout: 延迟预算（秒），None表示不限制
         """
-        self.tool_registry.register(name, description, parameters, function)
+        self.tool_registry.register(name, description, parameters, function, timeout)
     
     def chat_stream(
         self,
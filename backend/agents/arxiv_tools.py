@@ -0,0 +1,273 @@
+"""
+ArXiv工具集成
+
+将ArXiv论文检索集成为智能体工具：关键词检索、按ID获取、分类最新论文
+- 检索经过本地SQLite缓存，重复的研究查询直接从磁盘返回，不占用ArXiv限速配额
+- 工具函数是异步的，阻塞的网络请求在线程中执行，注册时可设置延迟预算
+- 结果只保留标题、ID、作者和截断的摘要，控制发给大模型的token
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.arxiv_fetcher import ARXIV_CACHE_PATH, ArxivCache, ArxivFetcher, ArxivPaper
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RESULTS = 10
+MAX_RESULTS_LIMIT = 50
+MAX_IDS = 10  # 单次按ID获取的最大论文数
+SUMMARY_MAX_CHARS = 300  # 列表结果中每篇论文摘要的最大字符数
+DETAIL_SUMMARY_MAX_CHARS = 2000  # 按ID获取时摘要的最大字符数
+MAX_AUTHORS = 3  # 结果中列出的作者数
+
+_CATEGORY_RE = re.compile(r"^[a-z\-]+(\.[A-Za-z\-]+)?$")
+_ID_PREFIX_RE = re.compile(r"^(?:arxiv:|https?://(?:www\.)?arxiv\.org/(?:abs|pdf)/)", re.IGNORECASE)
+
+_fetcher: Optional[ArxivFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def _get_fetcher() -> ArxivFetcher:
+    """
+    获取共享的带缓存检索器
+
+    环境变量 ARXIV_OFFLINE=1 时只从缓存回放，不访问网络。
+    """
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            offline = os.getenv("ARXIV_OFFLINE", "").lower() in ("1", "true", "yes")
+            _fetcher = ArxivFetcher(cache=ArxivCache(ARXIV_CACHE_PATH), offline=offline)
+        return _fetcher
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+def _to_tool_paper(paper: ArxivPaper, summary_chars: int = SUMMARY_MAX_CHARS) -> Dict[str, Any]:
+    """精简工具结果中的论文"""
+    authors = paper.authors[:MAX_AUTHORS]
+    if len(paper.authors) > MAX_AUTHORS:
+        authors.append(f"等{len(paper.authors)}人")
+    return {
+        "arxiv_id": paper.arxiv_id,
+        "title": " ".join(paper.title.split()),
+        "authors": authors,
+        "published": (paper.published or "")[:10],
+        "primary_category": paper.primary_category,
+        "summary": _truncate(paper.summary, summary_chars),
+        "link": paper.arxiv_url
+    }
+
+
+def _normalize_id(arxiv_id: str) -> str:
+    """去掉 arXiv: 前缀或论文页面URL，只保留ID"""
+    arxiv_id = _ID_PREFIX_RE.sub("", arxiv_id.strip())
+    return arxiv_id[:-4] if arxiv_id.endswith(".pdf") else arxiv_id
+
+
+async def _search(query: str, max_results: int, sort_by: str) -> Dict[str, Any]:
+    max_results = max(1, min(int(max_results), MAX_RESULTS_LIMIT))
+    result = await asyncio.to_thread(_get_fetcher().search, query, max_results=max_results, sort_by=sort_by)
+    return {
+        "success": True,
+        "query": query,
+        "count": len(result.papers),
+        "from_cache": result.from_cache,
+        "papers": [_to_tool_paper(paper) for paper in result.papers]
+    }
+
+
+async def tool_search_arxiv_papers(
+    query: str,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    sort_by: str = "relevance",
+    title_only: bool = False
+) -> Dict[str, Any]:
+    """
+    检索ArXiv论文（优先读取本地缓存）
+
+    Args:
+        query: 检索关键词，或ArXiv查询语法（如 "cat:cs.CL AND ti:transformer"）
+        max_results: 返回的论文数
+        sort_by: 排序方式（relevance, lastUpdatedDate, submittedDate）
+        title_only: 是否只在标题中检索（query不含字段前缀时生效）
+
+    Returns:
+        包含论文列表的字典
+    """
+    try:
+        # 没有字段前缀的关键词默认在所有字段中检索
+        if ":" not in query:
+            query = f"{'ti' if title_only else 'all'}:{query}"
+        logger.info(f"开始检索ArXiv论文, query={query}, max_results={max_results}, sort_by={sort_by}")
+        return await _search(query, max_results, sort_by)
+
+    except Exception as e:
+        logger.error(f"检索ArXiv论文失败: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "query": query,
+            "papers": []
+        }
+
+
+async def tool_recent_arxiv_papers(
+    category: str,
+    max_results: int = DEFAULT_MAX_RESULTS
+) -> Dict[str, Any]:
+    """
+    获取某个ArXiv分类下最新提交的论文
+
+    Args:
+        category: ArXiv分类，如 cs.CL、cs.LG、stat.ML
+        max_results: 返回的论文数
+
+    Returns:
+        包含论文列表的字典
+    """
+    try:
+        category = category.strip()
+        if not _CATEGORY_RE.match(category):
+            raise ValueError(f"无效的ArXiv分类: {category}，示例: cs.CL、cs.LG、stat.ML")
+        logger.info(f"获取ArXiv分类最新论文, category={category}, max_results={max_results}")
+        result = await _search(f"cat:{category}", max_results, "submittedDate")
+        result["category"] = category
+        return result
+
+    except Exception as e:
+        logger.error(f"获取ArXiv分类最新论文失败: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "category": category,
+            "papers": []
+        }
+
+
+async def tool_get_arxiv_papers(arxiv_ids: List[str]) -> Dict[str, Any]:
+    """
+    按ArXiv ID获取论文详情（优先读取本地缓存）
+
+    Args:
+        arxiv_ids: ArXiv ID列表，如 ["1706.03762", "arXiv:2301.12345v2"]
+
+    Returns:
+        包含论文详情的字典，摘要比列表结果更完整
+    """
+    try:
+        ids = list(dict.fromkeys(_normalize_id(i) for i in arxiv_ids if i and i.strip()))
+        if not ids:
+            raise ValueError("至少需要提供一个ArXiv ID")
+        if len(ids) > MAX_IDS:
+            raise ValueError(f"单次最多获取{MAX_IDS}篇论文")
+        logger.info(f"按ID获取ArXiv论文, ids={ids}")
+
+        papers = await asyncio.to_thread(_get_fetcher().fetch_by_ids, ids)
+        found = {p.arxiv_id for p in papers}
+        return {
+            "success": True,
+            "count": len(papers),
+            "papers": [_to_tool_paper(paper, DETAIL_SUMMARY_MAX_CHARS) for paper in papers],
+            "not_found": [i for i in ids if i not in found and not any(f.startswith(f"{i}v") for f in found)]
+        }
+
+    except Exception as e:
+        logger.error(f"按ID获取ArXiv论文失败: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "arxiv_ids": arxiv_ids,
+            "papers": []
+        }
+
+
+# OpenAI格式的工具定义
+ARXIV_TOOLS_DEFINITIONS = [
+    {
+        "name": "search_arxiv_papers",
+        "description": "检索ArXiv学术论文，返回标题、ID、作者、发布日期和截断的摘要。相同查询的结果会被缓存，无需重复调用。支持ArXiv查询语法，如 'cat:cs.CL AND ti:transformer'。",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "检索关键词（建议使用英文），例如: 'large language model', 'ti:diffusion'"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "返回的论文数，默认10",
+                    "default": DEFAULT_MAX_RESULTS,
+                    "minimum": 1,
+                    "maximum": MAX_RESULTS_LIMIT
+                },
+                "sort_by": {
+                    "type": "string",
+                    "description": "排序方式：relevance（相关性，默认）、submittedDate（最新提交）、lastUpdatedDate（最近更新）",
+                    "enum": ["relevance", "submittedDate", "lastUpdatedDate"],
+                    "default": "relevance"
+                },
+                "title_only": {
+                    "type": "boolean",
+                    "description": "是否只在标题中检索，默认false",
+                    "default": False
+                }
+            },
+            "required": ["query"]
+        },
+        "function": tool_search_arxiv_papers
+    },
+    {
+        "name": "get_arxiv_papers",
+        "description": "按ArXiv ID获取论文详情（更完整的摘要）。适用于用户给出论文ID或链接，或需要进一步了解检索结果中的某几篇论文。",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "arxiv_ids": {
+                    "type": "array",
+                    "items": {
+                        "type": "string"
+                    },
+                    "description": "ArXiv ID列表，例如: ['1706.03762', '2301.12345v2']",
+                    "maxItems": MAX_IDS
+                }
+            },
+            "required": ["arxiv_ids"]
+        },
+        "function": tool_get_arxiv_papers
+    },
+    {
+        "name": "recent_arxiv_papers",
+        "description": "获取某个ArXiv分类下最新提交的论文，适用于“最近有什么新论文”类问题。",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "category": {
+                    "type": "string",
+                    "description": "ArXiv分类，例如: 'cs.CL'（计算语言学）、'cs.LG'（机器学习）、'cs.CV'（计算机视觉）、'stat.ML'"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "返回的论文数，默认10",
+                    "default": DEFAULT_MAX_RESULTS,
+                    "minimum": 1,
+                    "maximum": MAX_RESULTS_LIMIT
+                }
+            },
+            "required": ["category"]
+        },
+        "function": tool_recent_arxiv_papers
+    }
+]
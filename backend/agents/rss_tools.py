@@ -4,31 +4,45 @@ RSS工具集成
 将RSS获取和筛选功能集成为智能体工具
 从JSON缓存文件读取数据，避免实时抓取耗时
 """
-import json
+import asyncio
 import logging
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from tools.rss_fetcher import RSSArticle, parse_published_ts
+from tools.rss_fetcher.cache_store import cache_file_name, get_cache_format, load_cache_file
+
 logger = logging.getLogger(__name__)
 
 # 缓存文件路径
 # 优先使用环境变量指定的路径，否则使用相对路径
 # Docker环境下使用 /app/data，本地开发使用 backend/data
+# 缓存格式由环境变量 RSS_CACHE_FORMAT 指定（json 或 msgpack），需与定时任务一致
 import os
 if os.getenv("DOCKER_ENV") or os.path.exists("/app"):
     # Docker环境
-    CACHE_FILE_PATH = Path("/app/data/rss_cache.json")
+    CACHE_FILE_PATH = Path("/app/data") / cache_file_name(get_cache_format())
 else:
     # 本地开发环境
-    CACHE_FILE_PATH = Path(__file__).parent.parent / "data" / "rss_cache.json"
+    CACHE_FILE_PATH = Path(__file__).parent.parent / "data" / cache_file_name(get_cache_format())
 
 # 确保目录存在
 CACHE_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# 智能筛选的延迟预算（秒）：超时后返回已完成批次的结果，尚未完成的批次被取消
+RSS_FILTER_LATENCY_BUDGET = 40.0
+RSS_FILTER_MIN_RELEVANCE = 6
+
+# 筛选服务在进程内共享：多个并发的工具调用共同遵守限流器，并复用评分缓存
+_filter_service = None
+_filter_service_lock = threading.Lock()
+
 
 def _load_cached_articles() -> Dict[str, Any]:
     """
@@ -39,7 +53,7 @@ def _load_cached_articles() -> Dict[str, Any]:
         
     Raises:
         FileNotFoundError: 缓存文件不存在
-        json.JSONDecodeError: JSON解析失败
+        ValueError: 缓存文件解析失败或格式错误
     """
     if not CACHE_FILE_PATH.exists():
         raise FileNotFoundError(
@@ -47,28 +61,57 @@ def _load_cached_articles() -> Dict[str, Any]:
             f"请先运行定时任务生成缓存: python backend/tools/rss_cache_job.py"
         )
     
-    try:
-        with open(CACHE_FILE_PATH, 'r', encoding='utf-8') as f:
-            cache_data = json.load(f)
-        
-        # 验证数据结构
-        if "articles" not in cache_data or "summary" not in cache_data:
-            raise ValueError("缓存文件格式错误：缺少必要字段")
-        
-        logger.info(
-            f"成功加载缓存: {len(cache_data.get('articles', []))} 篇文章, "
-            f"生成时间: {cache_data.get('summary', {}).get('generated_at', 'unknown')}"
-        )
-        
-        return cache_data
-        
-    except json.JSONDecodeError as e:
-        raise ValueError(f"缓存文件JSON解析失败: {e}")
+    cache_data = load_cache_file(CACHE_FILE_PATH)
+    
+    # 验证数据结构
+    if "articles" not in cache_data or "summary" not in cache_data:
+        raise ValueError("缓存文件格式错误：缺少必要字段")
+    
+    logger.info(
+        f"成功加载缓存: {len(cache_data.get('articles', []))} 篇文章, "
+        f"生成时间: {cache_data.get('summary', {}).get('generated_at', 'unknown')}"
+    )
+    
+    return cache_data
+
+
+def _filter_by_time_window(articles: List[Dict[str, Any]], since_hours: float) -> List[Dict[str, Any]]:
+    """
+    保留最近 since_hours 小时内发布的文章
+
+    使用缓存中预先计算的UTC时间戳比较，旧缓存缺少时间戳时才解析日期字符串；
+    没有发布日期的文章无法判断时间，不予保留。
+    """
+    cutoff = time.time() - since_hours * 3600
+    recent = []
+    for article in articles:
+        published_ts = article.get("published_ts")
+        if published_ts is None:
+            published_ts = parse_published_ts(article.get("pub_date"))
+        if published_ts is not None and published_ts >= cutoff:
+            recent.append(article)
+    return recent
+
+
+def _to_tool_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    精简工具结果中的文章
+
+    用截断的纯文本摘要代替完整描述，减少发给大模型的token和文本筛选的扫描量；
+    旧缓存中没有 summary_text 的文章保持原样。
+    """
+    summary_text = article.get("summary_text")
+    if not summary_text:
+        return article
+    compact = {k: v for k, v in article.items() if k not in ("summary_text", "token_estimate")}
+    compact["description"] = summary_text
+    return compact
 
 
 def tool_fetch_rss_news(
     max_articles: Optional[int] = None,
-    sources_limit: Optional[int] = None
+    sources_limit: Optional[int] = None,
+    since_hours: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     从缓存获取RSS新闻
@@ -76,21 +119,27 @@ def tool_fetch_rss_news(
     Args:
         max_articles: 最大文章数限制（可选）
         sources_limit: 限制RSS源数量（可选，已废弃，保留以兼容接口）
+        since_hours: 只返回最近多少小时内发布的文章（可选）
     
     Returns:
         包含新闻摘要和文章列表的字典
     """
     try:
-        logger.info(f"从缓存读取RSS新闻, max_articles={max_articles}")
+        logger.info(f"从缓存读取RSS新闻, max_articles={max_articles}, since_hours={since_hours}")
         
         # 从缓存加载数据
         cache_data = _load_cached_articles()
         articles_list = cache_data.get("articles", [])
         summary = cache_data.get("summary", {})
         
+        # 按发布时间窗口筛选
+        if since_hours and since_hours > 0:
+            articles_list = _filter_by_time_window(articles_list, since_hours)
+        
         # 限制文章数量
         if max_articles and max_articles > 0:
             articles_list = articles_list[:max_articles]
+        articles_list = [_to_tool_article(article) for article in articles_list]
         
         return {
             "success": True,
@@ -167,13 +216,71 @@ def _simple_text_filter(
     return scored_articles[:top_k]
 
 
-def tool_filter_rss_news(
+def _get_filter_service():
+    """获取（必要时创建）共享的大模型筛选服务"""
+    global _filter_service
+    with _filter_service_lock:
+        if _filter_service is None:
+            from tools.rss_filter_service import RSSFilterService
+            _filter_service = RSSFilterService(max_workers=5)
+        return _filter_service
+
+
+async def _llm_filter(
+    articles: List[Dict[str, Any]],
+    query: str,
+    top_k: int
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    使用大模型流式筛选文章（并发批次、令牌桶限流、自适应并发）
+
+    在 RSS_FILTER_LATENCY_BUDGET 内收集已完成批次的匹配结果，超时后取消其余批次。
+
+    Returns:
+        按相关度排序的前 top_k 篇文章；超时且没有任何结果时返回 None
+    """
+    by_link = {article["link"]: article for article in articles if article.get("link")}
+    rss_articles = [RSSArticle.from_dict(article) for article in by_link.values()]
+    stream = _get_filter_service().filter_articles_stream(query, rss_articles, RSS_FILTER_MIN_RELEVANCE)
+    deadline = time.monotonic() + RSS_FILTER_LATENCY_BUDGET
+    matches = []
+    timed_out = False
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            try:
+                matches.append(await asyncio.wait_for(stream.__anext__(), remaining))
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                timed_out = True
+                break
+    finally:
+        await stream.aclose()
+    
+    if timed_out:
+        logger.warning(f"RSS智能筛选超过延迟预算，返回已完成批次的 {len(matches)} 篇结果")
+        if not matches:
+            return None
+    matches.sort(key=lambda x: x.relevance_score or 0, reverse=True)
+    return [
+        {**by_link[match.link], "relevance_score": match.relevance_score, "relevance_reason": match.relevance_reason}
+        for match in matches[:top_k]
+    ]
+
+
+async def tool_filter_rss_news(
     query: str,
     max_articles: int = 50,
     top_k: int = 10
 ) -> Dict[str, Any]:
     """
-    根据查询关键词筛选和排序RSS新闻（从缓存读取）
+    根据查询关键词筛选和排序RSS新闻（从缓存读取，大模型评分）
+    
+    大模型筛选失败或超过延迟预算且没有结果时，退回简单文本匹配。
     
     Args:
         query: 查询关键词或问题
@@ -186,8 +293,8 @@ def tool_filter_rss_news(
     try:
         logger.info(f"开始筛选RSS新闻, query={query}, max_articles={max_articles}, top_k={top_k}")
         
-        # 从缓存获取RSS新闻
-        rss_result = tool_fetch_rss_news(max_articles=max_articles)
+        # 从缓存获取RSS新闻（读文件不阻塞事件循环）
+        rss_result = await asyncio.to_thread(tool_fetch_rss_news, max_articles=max_articles)
         
         if not rss_result["success"]:
             return rss_result
@@ -202,14 +309,22 @@ def tool_filter_rss_news(
                 "filtered_articles": []
             }
         
-        # 使用简单文本匹配筛选
-        filtered_articles = _simple_text_filter(articles, query, top_k)
+        try:
+            filtered_articles = await _llm_filter(articles, query, top_k)
+        except Exception as e:
+            logger.warning(f"RSS智能筛选失败，使用文本匹配: {e}")
+            filtered_articles = None
+        filter_method = "llm"
+        if filtered_articles is None:
+            filtered_articles = _simple_text_filter(articles, query, top_k)
+            filter_method = "text"
         
         return {
             "success": True,
             "query": query,
             "total_articles": len(articles),
             "filtered_count": len(filtered_articles),
+            "filter_method": filter_method,
             "filtered_articles": filtered_articles,
             "note": f"已从缓存中的{len(articles)}篇文章筛选出最相关的{len(filtered_articles)}篇，无需重复调用。"
         }
@@ -297,6 +412,11 @@ RSS_TOOLS_DEFINITIONS = [
                     "description": "限制RSS源数量（可选）",
                     "minimum": 1,
                     "maximum": 20
+                },
+                "since_hours": {
+                    "type": "number",
+                    "description": "只返回最近多少小时内发布的文章（可选），例如 24 表示最近一天",
+                    "minimum": 1
                 }
             },
             "required": []
@@ -330,7 +450,9 @@ RSS_TOOLS_DEFINITIONS = [
             },
             "required": ["query"]
         },
-        "function": tool_filter_rss_news
+        "function": tool_filter_rss_news,
+        # 工具内部按 RSS_FILTER_LATENCY_BUDGET 返回部分结果，这里只作兜底
+        "timeout": RSS_FILTER_LATENCY_BUDGET + 10
     },
     {
         "name": "search_rss_by_keywords",
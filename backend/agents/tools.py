@@ -2,15 +2,35 @@
 工具注册和管理模块
 
 提供工具的注册、管理和OpenAI格式转换功能
+支持异步工具函数和按工具设置的延迟预算
 """
+import asyncio
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Callable, Dict, Any, List, Optional
 from dataclasses import dataclass, field
-from inspect import signature, Parameter
+from inspect import iscoroutinefunction, signature, Parameter
 
 logger = logging.getLogger(__name__)
 
+# 异步工具在独立线程的事件循环中执行，智能体循环（同步生成器）无论是否运行在事件循环中都可以调用
+_tool_loop: Optional[asyncio.AbstractEventLoop] = None
+_tool_loop_lock = threading.Lock()
+# 有延迟预算的同步工具在线程池中执行，超时后智能体不再等待
+_tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent-tool")
+
+
+def _get_tool_loop() -> asyncio.AbstractEventLoop:
+    """获取（必要时启动）执行异步工具的后台事件循环"""
+    global _tool_loop
+    with _tool_loop_lock:
+        if _tool_loop is None:
+            _tool_loop = asyncio.new_event_loop()
+            threading.Thread(target=_tool_loop.run_forever, name="agent-tool-loop", daemon=True).start()
+        return _tool_loop
+
 
 @dataclass
 class ToolDefinition:
@@ -19,6 +39,7 @@ class ToolDefinition:
     description: str
     parameters: Dict[str, Any]
     function: Callable
+    timeout: Optional[float] = None  # 延迟预算（秒），超过后放弃等待结果
     
     def to_openai_format(self) -> Dict[str, Any]:
         """转换为OpenAI工具格式"""
@@ -43,7 +64,8 @@ class ToolRegistry:
         name: str,
         description: str,
         parameters: Dict[str, Any],
-        function: Callable
+        function: Callable,
+        timeout: Optional[float] = None
     ) -> None:
         """
         注册工具
@@ -52,7 +74,8 @@ class ToolRegistry:
             name: 工具名称
             description: 工具描述
             parameters: 参数定义（JSON Schema格式）
-            function: 工具执行函数
+            function: 工具执行函数（普通函数或 async 函数）
+            timeout: 延迟预算（秒），None表示不限制
         """
         if name in self._tools:
             logger.warning(f"工具 '{name}' 已存在，将被覆盖")
@@ -61,7 +84,8 @@ class ToolRegistry:
             name=name,
             description=description,
             parameters=parameters,
-            function=function
+            function=function,
+            timeout=timeout
         )
         self._tools[name] = tool_def
         logger.info(f"工具已注册: {name}")
@@ -80,6 +104,9 @@ class ToolRegistry:
             
         Returns:
             工具执行结果
+            
+        Raises:
+            TimeoutError: 超过工具的延迟预算
         """
         tool = self.get_tool(name)
         if not tool:
@@ -87,7 +114,21 @@ class ToolRegistry:
         
         try:
             logger.info(f"执行工具: {name}, 参数: {arguments}")
-            result = tool.function(**arguments)
+            if iscoroutinefunction(tool.function):
+                future = asyncio.run_coroutine_threadsafe(tool.function(**arguments), _get_tool_loop())
+            elif tool.timeout is not None:
+                future = _tool_executor.submit(tool.function, **arguments)
+            else:
+                future = None
+            
+            if future is None:
+                result = tool.function(**arguments)
+            else:
+                try:
+                    result = future.result(timeout=tool.timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    raise TimeoutError(f"工具 '{name}' 超过延迟预算（{tool.timeout}秒），请基于已有信息回答或稍后重试")
             logger.info(f"工具 '{name}' 执行成功")
             return result
         except Exception as e:
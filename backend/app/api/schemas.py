@@ -31,6 +31,8 @@ class ConversationResponse(BaseModel):
 class ConversationList(BaseModel):
     """会话列表响应模型"""
     conversations: List[ConversationResponse]
+    has_more: bool = Field(default=False, description="是否还有更早的会话")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标（作为 cursor 参数传入）")
 
 
 # ==================== 消息相关模型 ====================
@@ -42,6 +44,7 @@ class MessageResponse(BaseModel):
     role: str
     content: str
     thinking_mode: bool
+    thinking: Optional[str] = None
     timestamp: datetime
     
     class Config:
@@ -49,8 +52,31 @@ class MessageResponse(BaseModel):
 
 
 class MessageList(BaseModel):
-    """消息列表响应模型"""
+    """消息列表响应模型（按时间顺序）"""
     messages: List[MessageResponse]
+    has_more: bool = Field(default=False, description="翻页方向上是否还有更多消息")
+    before_cursor: Optional[str] = Field(default=None, description="本页最早一条消息的游标（作为 before 参数加载更早的消息）")
+    after_cursor: Optional[str] = Field(default=None, description="本页最新一条消息的游标（作为 after 参数加载更新的消息）")
+
+
+# ==================== 搜索相关模型 ====================
+
+class MessageSearchResult(BaseModel):
+    """消息搜索结果"""
+    id: int
+    conversation_id: int
+    conversation_title: str
+    conversation_type: str
+    role: str
+    timestamp: datetime
+    snippet: str = Field(..., description="命中位置附近的片段（已转义 HTML，命中处用 <mark> 标记）")
+
+
+class MessageSearchList(BaseModel):
+    """消息搜索结果列表（从新到旧）"""
+    results: List[MessageSearchResult]
+    has_more: bool = Field(default=False, description="是否还有更早的结果")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标（作为 cursor 参数传入）")
 
 
 # ==================== 聊天相关模型 ====================
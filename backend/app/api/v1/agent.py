@@ -197,3 +197,26 @@ async def generate_rss_cache():
             status_code=500,
             detail=f"缓存生成失败: {str(e)}"
         )
+
+
+@router.get("/rss-sources/health")
+async def get_rss_sources_health():
+    """
+    获取各RSS源的健康状态
+    包括成功率、p50/p95延迟、最近错误和隔离状态，尚未获取过的源统计值为空
+    """
+    from tools.rss_fetcher import FeedHealthTracker, get_rss_sources
+    from tools.rss_fetcher import health as rss_health
+
+    try:
+        tracker = FeedHealthTracker(rss_health.HEALTH_FILE_PATH)
+        return JSONResponse({
+            "success": True,
+            "data": tracker.snapshot(get_rss_sources())
+        })
+    except Exception as e:
+        logger.error(f"读取RSS源健康状态失败: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"读取RSS源健康状态失败: {str(e)}"
+        )
@@ -1,9 +1,9 @@
 """
 会话管理 API 端点
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.api.schemas import (
     ConversationCreate,
     ConversationResponse,
@@ -12,10 +12,18 @@ from app.api.schemas import (
     TitleGenerationRequest,
     SuccessResponse
 )
+from app.config import settings
 from app.infrastructure.database.connection import get_db
+from app.infrastructure.database.pagination import encode_cursor
 from app.infrastructure.database.repositories import ConversationRepository
+from app.infrastructure.database.async_repositories import AsyncConversationRepository
 from app.services.chat_service import ChatService
-from app.dependencies import get_conversation_repository, get_chat_service, get_or_create_user_id
+from app.dependencies import (
+    get_async_conversation_repository,
+    get_conversation_repository,
+    get_chat_service,
+    get_or_create_user_id
+)
 from app.infrastructure.logging.setup import get_logger
 
 logger = get_logger(__name__)
@@ -23,16 +31,16 @@ router = APIRouter(prefix="/conversations", tags=["conversations"])
 
 
 @router.post("", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
-def create_conversation(
+async def create_conversation(
     conversation: ConversationCreate,
     request: Request,
     response: Response,
-    repo: ConversationRepository = Depends(get_conversation_repository)
+    repo: AsyncConversationRepository = Depends(get_async_conversation_repository)
 ):
     """创建新的对话会话（每个游客都有独立的会话空间）"""
     try:
         user_id = get_or_create_user_id(request, response)
-        db_conversation = repo.create(
+        db_conversation = await repo.create(
             title=conversation.title, 
             user_id=user_id,
             conversation_type=conversation.conversation_type or "chat"
@@ -51,20 +59,41 @@ def get_conversations(
     request: Request,
     response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(default=100, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     conversation_type: str = None,
     repo: ConversationRepository = Depends(get_conversation_repository)
 ):
-    """获取当前游客的所有对话会话列表（按更新时间倒序）"""
+    """
+    获取当前游客的对话会话列表（按更新时间倒序）
+    
+    使用 cursor 游标分页；skip 仅为兼容旧客户端保留
+    """
     try:
         user_id = get_or_create_user_id(request, response)
-        conversations = repo.get_all(
-            skip=skip, 
-            limit=limit, 
+        if skip:
+            conversations = repo.get_all(
+                skip=skip, 
+                limit=limit, 
+                user_id=user_id,
+                conversation_type=conversation_type
+            )
+            return {"conversations": conversations}
+        
+        page = repo.list_page(
             user_id=user_id,
+            limit=limit,
+            cursor=cursor,
             conversation_type=conversation_type
         )
-        return {"conversations": conversations}
+        last = page.items[-1] if page.items else None
+        return {
+            "conversations": page.items,
+            "has_more": page.has_more,
+            "next_cursor": encode_cursor(last.updated_at, last.id) if last and page.has_more else None
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error("conversations_list_failed", error=str(e))
         raise HTTPException(
@@ -89,31 +118,31 @@ def get_conversation(
 
 
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_conversation(
+async def delete_conversation(
     conversation_id: int,
     request: Request,
     response: Response,
-    repo: ConversationRepository = Depends(get_conversation_repository)
+    repo: AsyncConversationRepository = Depends(get_async_conversation_repository)
 ):
     """删除指定的对话会话及其所有消息（只能删除属于当前游客的会话）"""
     user_id = get_or_create_user_id(request, response)
-    success = repo.delete(conversation_id, user_id=user_id)
+    success = await repo.delete(conversation_id, user_id=user_id)
     if not success:
         raise HTTPException(status_code=404, detail="会话不存在或无权访问")
     return None
 
 
 @router.put("/{conversation_id}/title", response_model=SuccessResponse)
-def update_conversation_title(
+async def update_conversation_title(
     conversation_id: int,
     request: TitleUpdateRequest,
     http_request: Request,
     response: Response,
-    repo: ConversationRepository = Depends(get_conversation_repository)
+    repo: AsyncConversationRepository = Depends(get_async_conversation_repository)
 ):
     """更新会话标题（只能更新属于当前游客的会话）"""
     user_id = get_or_create_user_id(http_request, response)
-    conversation = repo.update_title(conversation_id, request.title, user_id=user_id)
+    conversation = await repo.update_title(conversation_id, request.title, user_id=user_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="会话不存在或无权访问")
     
@@ -1,13 +1,20 @@
 """
 消息管理 API 端点
 """
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from app.api.schemas import MessageList
-from app.infrastructure.database.repositories import (
-    ConversationRepository,
-    MessageRepository
+from app.config import settings
+from app.infrastructure.database.pagination import encode_cursor
+from app.infrastructure.database.async_repositories import AsyncConversationRepository, AsyncMessageRepository
+from app.dependencies import (
+    get_async_conversation_repository,
+    get_async_message_repository,
+    get_or_create_user_id
 )
-from app.dependencies import get_conversation_repository, get_message_repository, get_or_create_user_id
 from app.infrastructure.logging.setup import get_logger
 
 logger = get_logger(__name__)
@@ -15,21 +22,74 @@ router = APIRouter(prefix="/conversations", tags=["messages"])
 
 
 @router.get("/{conversation_id}/messages", response_model=MessageList)
-def get_conversation_messages(
+async def get_conversation_messages(
     conversation_id: int,
     request: Request,
     response: Response,
-    conversation_repo: ConversationRepository = Depends(get_conversation_repository),
-    message_repo: MessageRepository = Depends(get_message_repository)
+    limit: int = Query(default=settings.MESSAGE_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    conversation_repo: AsyncConversationRepository = Depends(get_async_conversation_repository),
+    message_repo: AsyncMessageRepository = Depends(get_async_message_repository)
 ):
-    """获取指定对话的所有消息历史（只能获取属于当前游客的会话消息）"""
+    """
+    分页获取指定对话的消息历史（只能获取属于当前游客的会话消息）
+    
+    不带游标时返回最新的一页；before 加载更早的消息，after 加载更新的消息
+    """
     user_id = get_or_create_user_id(request, response)
     # 检查会话是否存在且属于当前用户
-    conversation = conversation_repo.get_by_id(conversation_id, user_id=user_id)
+    conversation = await conversation_repo.lookup(conversation_id, user_id=user_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="会话不存在或无权访问")
     
-    # 获取消息列表
-    messages = message_repo.get_by_conversation(conversation_id)
+    # 长期未访问的会话消息已归档，先恢复到消息表（写入走唯一的写连接）
+    if conversation.archived:
+        await conversation_repo.restore_archive(conversation_id)
+    
+    # 获取一页消息
+    try:
+        page = await message_repo.list_page(conversation_id, limit=limit, before=before, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    messages = page.items
+    return {
+        "messages": messages,
+        "has_more": page.has_more,
+        "before_cursor": encode_cursor(messages[0].timestamp, messages[0].id) if messages else before,
+        "after_cursor": encode_cursor(messages[-1].timestamp, messages[-1].id) if messages else after
+    }
+
+
+@router.get("/{conversation_id}/export")
+async def export_conversation_messages(
+    conversation_id: int,
+    request: Request,
+    response: Response,
+    conversation_repo: AsyncConversationRepository = Depends(get_async_conversation_repository),
+    message_repo: AsyncMessageRepository = Depends(get_async_message_repository)
+):
+    """
+    导出对话的全部消息（JSON Lines，每行一条消息，按时间顺序）
+    
+    消息通过服务端游标分批读取并流式返回，长对话导出不会一次载入内存
+    """
+    user_id = get_or_create_user_id(request, response)
+    conversation = await conversation_repo.lookup(conversation_id, user_id=user_id)
+    if not conversation:
+        raise HTTPException(status_code=404, detail="会话不存在或无权访问")
+    
+    if conversation.archived:
+        await conversation_repo.restore_archive(conversation_id)
+    
+    async def line_generator():
+        """逐条输出消息"""
+        async for row in message_repo.stream_by_conversation(conversation_id):
+            yield json.dumps(jsonable_encoder(row._asdict()), ensure_ascii=False) + "\n"
     
-    return {"messages": messages}
+    return StreamingResponse(
+        line_generator(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="conversation-{conversation_id}.jsonl"'}
+    )
@@ -0,0 +1,42 @@
+"""
+搜索 API 端点
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from app.api.schemas import MessageSearchList
+from app.config import settings
+from app.infrastructure.database.pagination import encode_cursor
+from app.infrastructure.database.repositories import MessageRepository
+from app.dependencies import get_message_repository, get_or_create_user_id
+from app.infrastructure.logging.setup import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/messages", response_model=MessageSearchList)
+def search_messages(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="搜索关键词，空格分隔的多个关键词需全部命中"),
+    limit: int = Query(default=20, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    message_repo: MessageRepository = Depends(get_message_repository)
+):
+    """
+    全文搜索当前游客的历史消息（从新到旧，游标分页）
+    """
+    user_id = get_or_create_user_id(request, response)
+    try:
+        page = message_repo.search(user_id, q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except NotImplementedError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    
+    last = page.items[-1] if page.items else None
+    return {
+        "results": page.items,
+        "has_more": page.has_more,
+        "next_cursor": encode_cursor(last["timestamp"], last["id"]) if last and page.has_more else None
+    }
@@ -36,12 +36,40 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 10
     DB_ECHO: bool = False  # 是否输出 SQL 语句
     
+    # PostgreSQL 生产配置（仅对 PostgreSQL 生效）
+    DB_POOL_TIMEOUT: int = 30  # 等待连接池空闲连接的最长时间（秒）
+    DB_POOL_RECYCLE: int = 1800  # 连接最长复用时间（秒），避免被服务端或中间代理断开
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 单条语句超时（毫秒），0 表示不限制；迁移不受此限制
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256  # 每个连接缓存的预编译语句数（asyncpg，流式聊天路径）
+    DB_EXPORT_BATCH_SIZE: int = 500  # 导出和数据导入时每批读取的行数（服务端游标）
+    
+    # SQLite 生产配置（仅对 SQLite 文件数据库生效）
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL 模式下读不阻塞写
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 下 NORMAL 不会损坏数据库，仅断电时可能丢失最后的事务
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 等待其他进程释放锁的时间（毫秒）
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取大小（字节，256MB）
+    SQLITE_CACHE_SIZE: int = -65536  # 每个连接的页缓存，负数表示 KiB（64MB）
+    SQLITE_TEMP_STORE: str = "MEMORY"  # 临时表和索引放在内存中
+    SQLITE_WRITE_QUEUE_TIMEOUT: int = 30  # 等待写连接的最长时间（秒）
+    MIGRATION_LOCK_TIMEOUT: int = 600  # 等待其他 worker 完成迁移的最长时间（秒）
+    MIGRATION_BATCH_SIZE: int = 5000  # 数据回填每批处理的行数
+    
+    # 消息保留配置
+    RETENTION_ENABLED: bool = True  # 是否定期归档不活跃会话并回收空间
+    RETENTION_ARCHIVE_AFTER_DAYS: int = 90  # 会话多少天未更新后归档其消息
+    RETENTION_INTERVAL_HOURS: int = 24  # 保留任务执行间隔（小时）
+    RETENTION_BATCH_SIZE: int = 100  # 每批扫描的会话数
+    RETENTION_VACUUM_PAGES: int = 0  # 每次增量回收的最大页数，0 表示回收全部空闲页
+    
     # ==================== 缓存配置 ====================
     CACHE_ENABLED: bool = True
     CACHE_TYPE: str = "memory"  # memory, redis
     REDIS_URL: Optional[str] = None
     CACHE_TTL: int = 3600  # 缓存过期时间（秒）
     CACHE_MAX_SIZE: int = 1000  # 内存缓存最大条目数
+    CONVERSATION_CACHE_ENABLED: bool = True  # 进程内缓存会话归属和最近消息
+    CONVERSATION_CACHE_SIZE: int = 1000  # 最多缓存的会话数（LRU）
+    CONVERSATION_CACHE_TTL: int = 600  # 条目过期时间（秒），多进程部署时限制其他进程写入的可见延迟
     
     # ==================== API 配置 ====================
     API_V1_PREFIX: str = "/api"
@@ -62,6 +90,8 @@ class Settings(BaseSettings):
     # ==================== 会话配置 ====================
     MAX_CONVERSATION_HISTORY: int = 20  # 最多保留多少条历史消息
     DEFAULT_CONVERSATION_TITLE: str = "新对话"
+    MESSAGE_PAGE_SIZE: int = 50  # 消息列表默认每页条数
+    MAX_PAGE_SIZE: int = 200  # 列表接口单页最大条数
     
     # ==================== 安全配置 ====================
     SECRET_KEY: str = "your-secret-key-change-in-production"
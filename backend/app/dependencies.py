@@ -4,12 +4,17 @@
 """
 from fastapi import Depends, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
-from app.infrastructure.database.connection import get_db
+from app.infrastructure.database.connection import get_db, get_async_db
 from app.infrastructure.database.repositories import (
     ConversationRepository,
     MessageRepository
 )
+from app.infrastructure.database.async_repositories import (
+    AsyncConversationRepository,
+    AsyncMessageRepository
+)
 from app.services.chat_service import ChatService
 from app.services.agent_service import AgentService
 from app.config import get_settings, Settings
@@ -72,13 +77,24 @@ def get_message_repository(db: Session = Depends(get_db)) -> MessageRepository:
     return MessageRepository(db)
 
 
+def get_async_conversation_repository(db: AsyncSession = Depends(get_async_db)) -> AsyncConversationRepository:
+    """获取会话仓库（异步）"""
+    return AsyncConversationRepository(db)
+
+
+def get_async_message_repository(db: AsyncSession = Depends(get_async_db)) -> AsyncMessageRepository:
+    """获取消息仓库（异步，用于流式导出）"""
+    return AsyncMessageRepository(db)
+
+
 # ==================== Service 依赖 ====================
+# 流式服务使用异步会话，数据库访问不阻塞事件循环
 
-def get_chat_service(db: Session = Depends(get_db)) -> ChatService:
+def get_chat_service(db: AsyncSession = Depends(get_async_db)) -> ChatService:
     """获取聊天服务"""
     return ChatService(db)
 
 
-def get_agent_service(db: Session = Depends(get_db)) -> AgentService:
+def get_agent_service(db: AsyncSession = Depends(get_async_db)) -> AgentService:
     """获取智能体服务"""
     return AgentService(db)
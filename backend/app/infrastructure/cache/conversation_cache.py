@@ -0,0 +1,189 @@
+"""
+会话读穿缓存（进程内）
+
+缓存会话归属（用户ID、类型、是否已归档）和最近消息的环形缓冲区，
+稳定对话中的所有权校验和历史读取不再访问数据库：
+- 由 Repository 在读取未命中时填充；新消息写入提交后追加到缓冲区（写穿）
+- 创建会话时直接写入（新会话没有历史消息），删除、改标题、归档和恢复时失效
+- 按会话数 LRU 淘汰；条目设置过期时间，多进程部署时其他进程的写入最多延迟一个 TTL 可见
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from app.config import settings
+from app.infrastructure.logging.setup import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedMessage:
+    """缓冲区中的消息（构建对话历史只需要角色和内容）"""
+    id: int
+    role: str
+    content: str
+
+
+@dataclass
+class CachedConversation:
+    """
+    缓存的会话
+
+    Attributes:
+        user_id: 会话所属用户
+        conversation_type: 会话类型
+        archived: 消息是否已移入归档表
+        expires_at: 过期时间（time.monotonic）
+        recent: 最近的消息（从旧到新），None 表示尚未加载
+        version: 缓冲区版本，每次追加消息时递增，用于丢弃与并发写入交错的加载结果
+    """
+    user_id: str
+    conversation_type: str
+    archived: bool
+    expires_at: float
+    recent: Optional[Deque[CachedMessage]] = None
+    version: int = 0
+
+
+class ConversationCache:
+    """会话读穿缓存（LRU，线程安全：同步端点在线程池中执行，保留任务在后台线程中执行）"""
+
+    def __init__(self, max_size: int = None, ttl: int = None, history_size: int = None):
+        """
+        Args:
+            max_size: 最多缓存的会话数
+            ttl: 条目过期时间（秒）
+            history_size: 每个会话缓存的最近消息数
+        """
+        self.max_size = max_size or settings.CONVERSATION_CACHE_SIZE
+        self.ttl = ttl or settings.CONVERSATION_CACHE_TTL
+        self.history_size = history_size or settings.MAX_CONVERSATION_HISTORY
+        self._entries: "OrderedDict[int, CachedConversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, conversation_id: int) -> Optional[CachedConversation]:
+        """取出未过期的条目并移到末尾（调用方持有锁）"""
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            return None
+        if time.monotonic() > entry.expires_at:
+            del self._entries[conversation_id]
+            return None
+        self._entries.move_to_end(conversation_id)
+        return entry
+
+    def get(self, conversation_id: int) -> Optional[CachedConversation]:
+        """获取会话归属，未命中返回 None"""
+        with self._lock:
+            entry = self._get(conversation_id)
+        logger.debug("conversation_cache_hit" if entry else "conversation_cache_miss", conversation_id=conversation_id)
+        return entry
+
+    def put(
+        self,
+        conversation_id: int,
+        user_id: str,
+        conversation_type: str,
+        archived: bool = False,
+        recent: Optional[List[CachedMessage]] = None
+    ) -> CachedConversation:
+        """
+        写入会话归属
+
+        Args:
+            recent: 已知的完整最近消息（新建会话传空列表），None 表示需要时再从数据库加载
+
+        Returns:
+            写入的条目
+        """
+        entry = CachedConversation(
+            user_id=user_id,
+            conversation_type=conversation_type,
+            archived=archived,
+            expires_at=time.monotonic() + self.ttl,
+            recent=deque(recent, maxlen=self.history_size) if recent is not None else None
+        )
+        self._store(conversation_id, entry)
+        return entry
+
+    def _store(self, conversation_id: int, entry: CachedConversation) -> None:
+        with self._lock:
+            self._entries.pop(conversation_id, None)
+            self._entries[conversation_id] = entry
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.debug("conversation_cache_evicted", conversation_id=evicted)
+
+    def recent(self, conversation_id: int, limit: int) -> Optional[List[CachedMessage]]:
+        """最近的 limit 条消息（从旧到新）；缓冲区未加载或容量不足时返回 None"""
+        if limit > self.history_size:
+            return None
+        with self._lock:
+            entry = self._get(conversation_id)
+            if entry is None or entry.recent is None:
+                return None
+            messages = list(entry.recent)
+        return messages[-limit:]
+
+    def load_token(self, conversation_id: int) -> Optional[int]:
+        """从数据库加载缓冲区前取得版本号；会话不在缓存中时返回 None（不缓存加载结果）"""
+        with self._lock:
+            entry = self._get(conversation_id)
+            return entry.version if entry is not None else None
+
+    def fill_recent(self, conversation_id: int, messages: List[CachedMessage], token: Optional[int]) -> None:
+        """用数据库加载的最近消息填充缓冲区；加载期间有新消息写入（版本已变）时放弃"""
+        if token is None:
+            return
+        with self._lock:
+            entry = self._get(conversation_id)
+            if entry is not None and entry.version == token:
+                entry.recent = deque(messages, maxlen=self.history_size)
+
+    def append(self, conversation_id: int, message: CachedMessage) -> None:
+        """新消息提交后追加到缓冲区（已在缓冲区中的消息跳过）"""
+        with self._lock:
+            entry = self._get(conversation_id)
+            if entry is None:
+                return
+            entry.version += 1
+            if entry.recent is not None and (not entry.recent or entry.recent[-1].id < message.id):
+                entry.recent.append(message)
+
+    def invalidate(self, conversation_id: int) -> None:
+        """删除会话的缓存"""
+        with self._lock:
+            self._entries.pop(conversation_id, None)
+        logger.debug("conversation_cache_invalidated", conversation_id=conversation_id)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        """当前缓存的会话数"""
+        return len(self._entries)
+
+
+class _DisabledConversationCache(ConversationCache):
+    """关闭缓存时使用：不保存任何条目，所有读取都访问数据库"""
+
+    def _store(self, conversation_id: int, entry: CachedConversation) -> None:
+        return None
+
+
+# 全局缓存实例
+_conversation_cache: Optional[ConversationCache] = None
+
+
+def get_conversation_cache() -> ConversationCache:
+    """获取会话缓存实例（单例）"""
+    global _conversation_cache
+    if _conversation_cache is None:
+        cache_class = ConversationCache if settings.CONVERSATION_CACHE_ENABLED else _DisabledConversationCache
+        _conversation_cache = cache_class()
+    return _conversation_cache
@@ -0,0 +1,413 @@
+"""
+异步 Repository 实现
+基于 AsyncSession，供流式聊天等运行在事件循环中的路径使用；
+接口与同步 Repository 一致，方法均为协程
+
+AsyncUnitOfWork 把一轮对话中的多次写入合并为一个事务：
+块内的 Repository 只 flush 不提交，退出时一次提交；会话缓存的更新也推迟到提交之后。
+写方法和工作单元开始时把事务固定到写连接，写入前的读取也在写连接上执行
+"""
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from app.infrastructure.cache.conversation_cache import CachedConversation, CachedMessage, get_conversation_cache
+from app.infrastructure.database.connection import pin_writer
+from app.infrastructure.database.models import Conversation, Message
+from app.infrastructure.database.pagination import Page
+from app.infrastructure.database.repositories import (
+    MessageRepository, cache_ownership, export_messages_query, ownership_query, recent_messages_query
+)
+from app.infrastructure.database.retention import restore_conversation
+from app.infrastructure.logging.setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class _AsyncRepository:
+    """异步仓库基类：控制写入后是立即提交还是交给工作单元"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        auto_commit: bool = True,
+        after_commit: Optional[List[Tuple[int, Callable[[], None]]]] = None
+    ):
+        """
+        Args:
+            db: 异步数据库会话
+            auto_commit: 每次写入后是否立即提交；为 False 时只 flush，由工作单元统一提交
+            after_commit: 工作单元提交后执行的缓存更新（会话ID, 更新函数）
+        """
+        self.db = db
+        self.auto_commit = auto_commit
+        self.after_commit = after_commit if after_commit is not None else []
+
+    def _begin_write(self) -> None:
+        """写方法开始时调用：本事务之后的读取和写入都走写连接"""
+        pin_writer(self.db)
+
+    async def _save(self, instance) -> None:
+        """写入对象；工作单元中只 flush，自增主键和 Python 端默认值此时已就绪，无需 refresh"""
+        if self.auto_commit:
+            await self.db.commit()
+            await self.db.refresh(instance)
+        else:
+            await self.db.flush()
+
+    def _update_cache(self, conversation_id: int, update: Callable[[], None]) -> None:
+        """写入提交后更新会话缓存：立即提交时直接执行，工作单元中等到提交后执行"""
+        if self.auto_commit:
+            update()
+        else:
+            self.after_commit.append((conversation_id, update))
+
+
+class AsyncConversationRepository(_AsyncRepository):
+    """会话数据仓库（异步）"""
+
+    async def create(self, title: str = "新对话", user_id: str = None, conversation_type: str = "chat") -> Conversation:
+        """
+        创建新会话
+
+        Args:
+            title: 会话标题
+            user_id: 用户ID（必需）
+            conversation_type: 会话类型（"chat" 或 "agent"），默认为 "chat"
+
+        Returns:
+            创建的会话对象
+        """
+        if not user_id:
+            raise ValueError("user_id is required")
+
+        if conversation_type not in ["chat", "agent"]:
+            raise ValueError("conversation_type must be 'chat' or 'agent'")
+
+        self._begin_write()
+        conversation = Conversation(title=title, user_id=user_id, conversation_type=conversation_type)
+        self.db.add(conversation)
+        await self._save(conversation)
+        # 新会话没有历史消息，直接写入缓存
+        conversation_id = conversation.id
+        self._update_cache(
+            conversation_id,
+            lambda: get_conversation_cache().put(conversation_id, user_id, conversation_type, recent=[])
+        )
+
+        logger.info("conversation_created", conversation_id=conversation.id, user_id=user_id, title=title, conversation_type=conversation_type)
+        return conversation
+
+    async def get_by_id(self, conversation_id: int, user_id: str = None) -> Optional[Conversation]:
+        """
+        根据 ID 获取会话
+
+        Args:
+            conversation_id: 会话 ID
+            user_id: 用户ID（可选，如果提供则验证所有权）
+
+        Returns:
+            会话对象，如果不存在或不属于该用户返回 None
+        """
+        stmt = select(Conversation).where(Conversation.id == conversation_id)
+
+        # 如果提供了user_id，添加过滤条件
+        if user_id:
+            stmt = stmt.where(Conversation.user_id == user_id)
+
+        conversation = (await self.db.execute(stmt.limit(1))).scalars().first()
+        if conversation:
+            logger.debug("conversation_retrieved", conversation_id=conversation_id, user_id=user_id)
+        else:
+            logger.warning("conversation_not_found", conversation_id=conversation_id, user_id=user_id)
+        return conversation
+
+    async def lookup(self, conversation_id: int, user_id: str) -> Optional[CachedConversation]:
+        """
+        校验会话归属（读穿缓存，命中时不访问数据库）
+
+        Args:
+            conversation_id: 会话 ID
+            user_id: 用户ID
+
+        Returns:
+            缓存的会话信息（含是否已归档），如果不存在或不属于该用户返回 None
+        """
+        entry = get_conversation_cache().get(conversation_id)
+        if entry is not None:
+            return entry if entry.user_id == user_id else None
+        row = (await self.db.execute(ownership_query(conversation_id))).first()
+        return cache_ownership(conversation_id, row, user_id)
+
+    async def update_title(self, conversation_id: int, title: str, user_id: str = None) -> Optional[Conversation]:
+        """
+        更新会话标题
+
+        Args:
+            conversation_id: 会话 ID
+            title: 新标题
+            user_id: 用户ID（可选，如果提供则验证所有权）
+
+        Returns:
+            更新后的会话对象，如果不存在或不属于该用户返回 None
+        """
+        self._begin_write()
+        conversation = await self.get_by_id(conversation_id, user_id=user_id)
+        if not conversation:
+            return None
+
+        conversation.title = title
+        conversation.updated_at = datetime.utcnow()
+        await self._save(conversation)
+        self._update_cache(conversation_id, lambda: get_conversation_cache().invalidate(conversation_id))
+
+        logger.info("conversation_title_updated", conversation_id=conversation_id, user_id=user_id, title=title)
+        return conversation
+
+    async def delete(self, conversation_id: int, user_id: str = None) -> bool:
+        """
+        删除会话及其所有消息
+
+        Args:
+            conversation_id: 会话 ID
+            user_id: 用户ID（可选，如果提供则验证所有权）
+
+        Returns:
+            是否删除成功
+        """
+        self._begin_write()
+        conversation = await self.get_by_id(conversation_id, user_id=user_id)
+        if not conversation:
+            return False
+
+        await self.db.delete(conversation)
+        if self.auto_commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
+        self._update_cache(conversation_id, lambda: get_conversation_cache().invalidate(conversation_id))
+
+        logger.info("conversation_deleted", conversation_id=conversation_id, user_id=user_id)
+        return True
+
+    async def update_timestamp(self, conversation_id: int) -> None:
+        """
+        更新会话的最后更新时间
+
+        Args:
+            conversation_id: 会话 ID
+        """
+        # 直接 UPDATE，不必先查询会话
+        self._begin_write()
+        await self.db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(updated_at=datetime.utcnow())
+        )
+        if self.auto_commit:
+            await self.db.commit()
+
+    async def restore_archive(self, conversation_id: int) -> int:
+        """
+        把已归档会话的消息恢复到消息表
+
+        Args:
+            conversation_id: 会话 ID
+
+        Returns:
+            恢复的消息数
+        """
+        self._begin_write()
+        count = await self.db.run_sync(restore_conversation, conversation_id)
+        if self.auto_commit:
+            await self.db.commit()
+        self._update_cache(conversation_id, lambda: get_conversation_cache().invalidate(conversation_id))
+        return count
+
+
+class AsyncMessageRepository(_AsyncRepository):
+    """消息数据仓库（异步）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 工作单元中已写入、尚未提交（未进入缓存）的消息
+        self._uncommitted: List[Tuple[int, CachedMessage]] = []
+
+    async def create(
+        self,
+        conversation_id: int,
+        role: str,
+        content: str,
+        thinking_mode: bool = False,
+        thinking: Optional[str] = None
+    ) -> Message:
+        """
+        创建新消息
+
+        Args:
+            conversation_id: 会话 ID
+            role: 消息角色（user 或 assistant）
+            content: 消息内容
+            thinking_mode: 是否启用思考模式
+            thinking: 思考过程（单独存列，读取消息时按需加载）
+
+        Returns:
+            创建的消息对象
+        """
+        self._begin_write()
+        message = Message(
+            conversation_id=conversation_id,
+            role=role,
+            content=content,
+            thinking_mode=thinking_mode,
+            thinking=thinking
+        )
+        self.db.add(message)
+        await self._save(message)
+        cached = CachedMessage(message.id, role, content)
+        if not self.auto_commit:
+            self._uncommitted.append((conversation_id, cached))
+        self._update_cache(conversation_id, lambda: get_conversation_cache().append(conversation_id, cached))
+
+        logger.info(
+            "message_created",
+            message_id=message.id,
+            conversation_id=conversation_id,
+            role=role,
+            content_length=len(content)
+        )
+        return message
+
+    async def get_by_conversation(
+        self,
+        conversation_id: int,
+        limit: Optional[int] = None
+    ) -> List[Message]:
+        """
+        获取会话的所有消息
+
+        Args:
+            conversation_id: 会话 ID
+            limit: 限制返回的消息数量（从最新开始）
+
+        Returns:
+            消息列表（按时间顺序）
+        """
+        stmt = select(Message).where(Message.conversation_id == conversation_id)
+
+        if limit:
+            # 获取最新的 N 条消息，然后反转顺序
+            result = await self.db.execute(stmt.order_by(Message.timestamp.desc()).limit(limit))
+            messages = list(result.scalars())
+            messages.reverse()
+        else:
+            # 获取所有消息，按时间顺序
+            result = await self.db.execute(stmt.order_by(Message.timestamp.asc()))
+            messages = list(result.scalars())
+
+        logger.debug(
+            "messages_retrieved",
+            conversation_id=conversation_id,
+            count=len(messages)
+        )
+        return messages
+
+    async def stream_by_conversation(self, conversation_id: int, batch_size: int = None) -> AsyncIterator[Row]:
+        """
+        逐行读取会话的全部消息（按时间顺序，服务端游标分批读取，用于导出）
+
+        Args:
+            conversation_id: 会话 ID
+            batch_size: 每批读取的行数，默认 DB_EXPORT_BATCH_SIZE
+
+        Returns:
+            消息行异步迭代器（id、role、content、thinking_mode、thinking、timestamp）
+        """
+        result = await self.db.stream(export_messages_query(conversation_id, batch_size))
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    async def list_page(
+        self,
+        conversation_id: int,
+        limit: int = 50,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Page[Row]:
+        """
+        游标分页获取消息（按时间顺序返回），参数和结果与同步 Repository 的 list_page 相同
+
+        Raises:
+            ValueError: 同时指定 before 和 after，或游标无效
+        """
+        return await self.db.run_sync(
+            lambda db: MessageRepository(db).list_page(conversation_id, limit=limit, before=before, after=after)
+        )
+
+    async def get_recent_messages(
+        self,
+        conversation_id: int,
+        limit: int = 20
+    ) -> List[CachedMessage]:
+        """
+        获取最近的消息（用于构建对话历史），优先读取会话缓存的消息缓冲区
+
+        Args:
+            conversation_id: 会话 ID
+            limit: 返回的最大消息数
+
+        Returns:
+            消息列表（按时间顺序，从旧到新），只包含 id、role、content
+        """
+        cache = get_conversation_cache()
+        messages = cache.recent(conversation_id, limit)
+        if messages is not None:
+            # 补上本工作单元中写入、提交后才会进入缓冲区的消息
+            last_id = messages[-1].id if messages else 0
+            messages += [m for c, m in self._uncommitted if c == conversation_id and m.id > last_id]
+            return messages[-limit:]
+
+        token = cache.load_token(conversation_id)
+        result = await self.db.execute(recent_messages_query(conversation_id, max(limit, cache.history_size)))
+        messages = [CachedMessage(*row) for row in reversed(result.all())]
+        cache.fill_recent(conversation_id, messages, token)
+        return messages[-limit:]
+
+
+class AsyncUnitOfWork:
+    """
+    异步工作单元
+
+    块内通过 conversations / messages 的写入只 flush，正常退出时一次提交，异常时回滚。
+    不要在块内等待模型输出等耗时操作：SQLite 下写事务会占用唯一的写连接。
+
+    用法:
+        async with AsyncUnitOfWork(db) as uow:
+            await uow.messages.create(...)
+            await uow.conversations.update_timestamp(...)
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._after_commit: List[Tuple[int, Callable[[], None]]] = []
+        self.conversations = AsyncConversationRepository(db, auto_commit=False, after_commit=self._after_commit)
+        self.messages = AsyncMessageRepository(db, auto_commit=False, after_commit=self._after_commit)
+
+    async def __aenter__(self) -> "AsyncUnitOfWork":
+        pin_writer(self.db)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.db.commit()
+            for _, callback in self._after_commit:
+                callback()
+        else:
+            await self.db.rollback()
+            # 缓冲区可能读入了本事务未提交的消息
+            for conversation_id, _ in self._after_commit:
+                get_conversation_cache().invalidate(conversation_id)
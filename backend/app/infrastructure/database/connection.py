@@ -1,20 +1,269 @@
 """
 数据库配置模块
 配置 SQLAlchemy 引擎和会话管理
+
+SQLite 文件数据库使用生产配置：
+- 每个连接建立时设置 WAL、synchronous=NORMAL、busy_timeout、mmap、页缓存等 PRAGMA
+- 读取走连接池；写入走进程内唯一的写连接（async_writer_engine），
+  并发请求的写事务在写连接上排队，不再互相抢锁出现 "database is locked"
+- 打算写入的事务（工作单元、Repository 的写方法）开始时固定到写连接，写入前的读取也在写连接上，
+  读到的就是要修改的数据
+- 迁移、回填、归档等同步写入代码通过 run_sync_writes 在同一个写连接上执行
+
+PostgreSQL 使用生产配置：
+- 连接池取出连接前检测连接是否可用（pool_pre_ping），并定期回收长时间复用的连接
+- 每个连接设置语句超时和 UTC 会话时区；asyncpg 连接缓存预编译语句
+
+流式聊天等异步路径使用 AsyncSession（aiosqlite / asyncpg），数据库访问不阻塞事件循环；
+同步会话 SessionLocal 只用于只读端点和独立进程中运行的脚本。
 """
-from sqlalchemy import create_engine
+from typing import AsyncGenerator, Callable, Optional, TypeVar
+
+from sqlalchemy import create_engine, event, Delete, Insert, Update
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import greenlet_spawn
 from app.config import settings
 
+T = TypeVar("T")
+
+
+def _is_sqlite_file(url: str) -> bool:
+    """是否为 SQLite 文件数据库（内存数据库每个连接各自独立，不能读写分离）"""
+    return url.startswith("sqlite") and ":memory:" not in url and not url.endswith("://")
+
+
+def _sqlite_pragmas() -> dict:
+    """连接建立时设置的 PRAGMA"""
+    return {
+        # 只对新建的数据库生效（须在建表之前设置）；旧数据库需执行一次完整 VACUUM 才能切换
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def to_async_url(url: str) -> str:
+    """
+    把同步数据库 URL 转换为异步驱动的 URL
+
+    sqlite -> sqlite+aiosqlite，postgresql -> postgresql+asyncpg；
+    已指定异步驱动或其他数据库时原样返回。
+    """
+    parsed = make_url(url)
+    async_drivers = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+    backend = parsed.get_backend_name()
+    if backend in async_drivers and parsed.get_driver_name() != async_drivers[backend]:
+        parsed = parsed.set(drivername=f"{backend}+{async_drivers[backend]}")
+    return parsed.render_as_string(hide_password=False)
+
+
+def _sqlite_engine_options(writer: bool) -> dict:
+    """SQLite 引擎的连接池参数；写引擎只有一个连接，写事务在连接池上排队"""
+    if writer:
+        pool_options = {"pool_size": 1, "max_overflow": 0, "pool_timeout": settings.SQLITE_WRITE_QUEUE_TIMEOUT}
+    else:
+        pool_options = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    return {
+        "connect_args": {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        "echo": settings.DB_ECHO,
+        **pool_options,
+    }
+
+
+def _register_sqlite_pragmas(sqlite_engine: Engine) -> None:
+    """在每个新连接上设置 PRAGMA"""
+    pragmas = _sqlite_pragmas()
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engine(url: str, writer: bool = False) -> Engine:
+    """
+    创建 SQLite 引擎，并在每个新连接上设置 PRAGMA
+
+    Args:
+        url: 数据库 URL
+        writer: 是否为写引擎（只有一个连接，写事务在连接池上排队）
+
+    Returns:
+        SQLAlchemy 引擎
+    """
+    sqlite_engine = create_engine(url, **_sqlite_engine_options(writer))
+    _register_sqlite_pragmas(sqlite_engine)
+    return sqlite_engine
+
+
+def create_async_sqlite_engine(url: str, writer: bool = False) -> AsyncEngine:
+    """
+    创建 aiosqlite 异步引擎，PRAGMA 与连接池配置与同步引擎相同
+
+    Args:
+        url: 数据库 URL（同步或异步形式均可）
+        writer: 是否为写引擎
+
+    Returns:
+        SQLAlchemy 异步引擎
+    """
+    # aiosqlite 默认不使用连接池，显式指定才能复用连接并让写事务排队
+    async_engine = create_async_engine(
+        to_async_url(url),
+        poolclass=AsyncAdaptedQueuePool,
+        **_sqlite_engine_options(writer),
+    )
+    _register_sqlite_pragmas(async_engine.sync_engine)
+    return async_engine
+
+
+def _is_postgres(url: str) -> bool:
+    return make_url(url).get_backend_name() == "postgresql"
+
+
+def _postgres_connect_args(url: str) -> dict:
+    """
+    按驱动设置 PostgreSQL 连接参数：语句超时、应用名、UTC 时区，asyncpg 另设预编译语句缓存
+
+    Args:
+        url: 数据库 URL（已确定驱动）
+
+    Returns:
+        传给驱动 connect 的参数
+    """
+    # 应用写入的是不带时区的 UTC 时间（datetime.utcnow），会话时区固定为 UTC，不受服务端默认时区影响
+    server_settings = {"application_name": settings.APP_NAME, "timezone": "UTC"}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if make_url(url).get_driver_name() == "asyncpg":
+        return {
+            "server_settings": server_settings,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    # psycopg2 / psycopg 通过启动参数设置；应用名中的空格需要转义
+    escaped = {name: value.replace(" ", "\\ ") for name, value in server_settings.items()}
+    return {"options": " ".join(f"-c {name}={value}" for name, value in escaped.items())}
+
+
+def _postgres_engine_options(url: str) -> dict:
+    """PostgreSQL 引擎的连接池参数"""
+    return {
+        "connect_args": _postgres_connect_args(url),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "echo": settings.DB_ECHO,
+    }
+
+
+def create_postgres_engine(url: str) -> Engine:
+    """
+    创建 PostgreSQL 引擎（psycopg2 / psycopg）
+
+    Args:
+        url: 数据库 URL
+
+    Returns:
+        SQLAlchemy 引擎
+    """
+    return create_engine(url, **_postgres_engine_options(url))
+
+
+def create_async_postgres_engine(url: str) -> AsyncEngine:
+    """
+    创建 asyncpg 异步引擎，连接池配置与同步引擎相同
+
+    Args:
+        url: 数据库 URL（同步或异步形式均可）
+
+    Returns:
+        SQLAlchemy 异步引擎
+    """
+    async_url = to_async_url(url)
+    return create_async_engine(async_url, **_postgres_engine_options(async_url))
+
+
+class RoutingSession(Session):
+    """
+    读写分离的会话
+
+    flush、INSERT/UPDATE/DELETE 语句以及同一事务中写入之后的所有语句使用写引擎，
+    其余读取使用默认引擎；事务结束后恢复读取路由。
+    打算写入的事务应先调用 pin_writer，写入前的读取也走写连接。
+    """
+
+    def __init__(self, *args, writer_bind: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer_bind = writer_bind
+        self._writing = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.writer_bind is not None and (
+            self._writing or self._flushing or isinstance(clause, (Insert, Update, Delete))
+        ):
+            # 写入之后本事务的读取也走写连接，才能读到尚未提交的数据
+            self._writing = True
+            return self.writer_bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def pin_writer(self) -> None:
+        """当前事务从现在起（包括写入前的读取）都使用写引擎，直到事务结束"""
+        if self.writer_bind is not None:
+            self._writing = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_write_routing(session, transaction):
+    if transaction.parent is None:
+        session._writing = False
+
+
+def pin_writer(db) -> None:
+    """
+    把会话的当前事务固定到写引擎（同步或异步会话均可；不做读写分离的会话不受影响）
+
+    先读后写的事务若读取走读连接，读到的可能是写事务排队期间已被改掉的旧数据
+    """
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    if isinstance(session, RoutingSession):
+        session.pin_writer()
+
+
 # 创建数据库引擎
-# SQLite 不支持连接池，需要特殊处理
-if "sqlite" in settings.DATABASE_URL:
+if _is_sqlite_file(settings.DATABASE_URL):
+    engine = create_sqlite_engine(settings.DATABASE_URL)
+    async_engine = create_async_sqlite_engine(settings.DATABASE_URL)
+    async_writer_engine = create_async_sqlite_engine(settings.DATABASE_URL, writer=True)
+elif "sqlite" in settings.DATABASE_URL:
     engine = create_engine(
         settings.DATABASE_URL,
         connect_args={"check_same_thread": False},
         echo=settings.DB_ECHO,
     )
+    async_engine = create_async_engine(
+        to_async_url(settings.DATABASE_URL),
+        connect_args={"check_same_thread": False},
+        echo=settings.DB_ECHO,
+    )
+    async_writer_engine = None
+elif _is_postgres(settings.DATABASE_URL):
+    engine = create_postgres_engine(settings.DATABASE_URL)
+    async_engine = create_async_postgres_engine(settings.DATABASE_URL)
+    async_writer_engine = None
 else:
     engine = create_engine(
         settings.DATABASE_URL,
@@ -22,9 +271,45 @@ else:
         max_overflow=settings.DB_MAX_OVERFLOW,
         echo=settings.DB_ECHO,
     )
+    async_engine = create_async_engine(
+        to_async_url(settings.DATABASE_URL),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        echo=settings.DB_ECHO,
+    )
+    async_writer_engine = None
+
+# 创建会话工厂（应用进程内只用于读取；写入走 AsyncSessionLocal 或 run_sync_writes）
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+)
+
+# 创建异步会话工厂
+# 提交后不过期对象：异步会话中访问过期属性会触发隐式 IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    autoflush=False,
+    writer_bind=async_writer_engine.sync_engine if async_writer_engine is not None else None,
+)
+
+
+
+async def run_sync_writes(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    在事件循环中执行使用同步引擎的写入代码（迁移、回填、归档），fn 的第一个参数为写引擎
+
+    同步代码经 greenlet 在异步写引擎上执行，与异步会话共用进程内唯一的写连接：
+    每个事务从连接池取出这个连接、结束即归还，其他请求的写事务在事务之间排队。
+    fn 在事件循环线程中运行，应按小批次提交，单批的计算不宜过长。
+    """
+    writer = async_writer_engine if async_writer_engine is not None else async_engine
+    return await greenlet_spawn(fn, writer.sync_engine, *args, **kwargs)
 
-# 创建会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # 创建基础模型类
 Base = declarative_base()
@@ -40,3 +325,12 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    依赖注入：获取异步数据库会话
+    用于流式聊天等在事件循环中访问数据库的路径
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,599 @@
+"""
+数据库版本化迁移
+
+- schema_version 表记录已执行的迁移版本；启动时版本已是最新就只有一次查询
+- 结构迁移按版本顺序执行，执行前获取迁移锁（SQLite: BEGIN IMMEDIATE，PostgreSQL: advisory lock），
+  多个 worker 同时启动时只有一个执行，其余等待后发现已是最新版本
+- 每个迁移写死自己的表、列和索引定义，不引用当前模型：模型之后再变化，旧迁移建出的结构也不变
+- 需要改写大量数据的迁移拆成「结构变更」和「回填」两步：结构变更只做 O(1) 的 ADD COLUMN，
+  回填按批次提交、可中断续跑，在后台任务中执行，不阻塞启动
+
+使用方法：
+    python -m app.infrastructure.database.migrations          # 执行迁移（含回填）
+    python -m app.infrastructure.database.migrations status   # 查看版本
+"""
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, MetaData, String, Table, Text, inspect, text
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+from app.infrastructure.database.search import TRIGRAM_SUPPORTED
+from app.infrastructure.logging.setup import get_logger
+
+logger = get_logger(__name__)
+
+# 旧版本会话统一归属的用户ID（固定值，回填中断后续跑时保持一致）
+LEGACY_USER_ID = str(uuid.uuid5(uuid.NAMESPACE_URL, "ai-agent-platform/legacy-conversations"))
+
+# 旧版本把思考过程拼在消息内容前面保存
+THINKING_START = "[THINKING]"
+THINKING_END = "[/THINKING]"
+
+# PostgreSQL advisory lock 的键
+PG_MIGRATION_LOCK_KEY = 7_316_004_601
+
+_SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP NOT NULL,
+    completed_at TIMESTAMP
+)
+"""
+
+
+@dataclass
+class Migration:
+    """
+    一个迁移版本
+
+    Attributes:
+        version: 版本号（递增）
+        name: 迁移名称
+        upgrade: 结构变更，在迁移锁内执行，应当可重复执行且足够快
+        backfill: 数据回填（可选），接收引擎和批大小，分批提交，可中断续跑
+    """
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    backfill: Optional[Callable[[Engine, int], int]] = None
+
+
+# ==================== 迁移定义 ====================
+
+def _columns(conn: Connection, table: str) -> List[str]:
+    return [col["name"] for col in inspect(conn).get_columns(table)]
+
+
+def _create_tables(conn: Connection) -> None:
+    """建立版本 1 的表结构（含索引）；已存在的表及其索引不受影响，缺少的列由后续迁移补上"""
+    metadata = MetaData()
+    Table(
+        "conversations", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("user_id", String(36), nullable=False),
+        Column("title", String(255), nullable=False),
+        Column("conversation_type", String(20), nullable=False),
+        Column("created_at", DateTime(timezone=True), nullable=False),
+        Column("updated_at", DateTime(timezone=True), nullable=False),
+        Index("ix_conversations_id", "id"),
+        Index("ix_conversations_user_id", "user_id"),
+        Index("ix_conversations_conversation_type", "conversation_type"),
+    )
+    Table(
+        "messages", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("conversation_id", Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False),
+        Column("role", String(20), nullable=False),
+        Column("content", Text, nullable=False),
+        Column("thinking_mode", Boolean),
+        Column("timestamp", DateTime(timezone=True), nullable=False),
+        Index("ix_messages_id", "id"),
+        Index("ix_messages_conversation_id", "conversation_id"),
+    )
+    metadata.create_all(bind=conn)
+
+
+def _add_user_id(conn: Connection) -> None:
+    """旧版本会话表没有 user_id：先加列，已有数据由回填补上"""
+    if "user_id" not in _columns(conn, "conversations"):
+        conn.execute(text("ALTER TABLE conversations ADD COLUMN user_id VARCHAR(36) NOT NULL DEFAULT ''"))
+
+
+def _backfill_user_id(engine: Engine, batch_size: int) -> int:
+    """为没有归属的旧会话分配固定的 legacy 用户ID"""
+    return batched_update(
+        engine,
+        "UPDATE conversations SET user_id = :user_id WHERE id IN "
+        "(SELECT id FROM conversations WHERE user_id = '' LIMIT :batch_size)",
+        {"user_id": LEGACY_USER_ID},
+        batch_size
+    )
+
+
+def _add_conversation_type(conn: Connection) -> None:
+    """带常量默认值的 ADD COLUMN 不改写已有行，旧会话即为 chat 类型"""
+    if "conversation_type" not in _columns(conn, "conversations"):
+        conn.execute(text(
+            "ALTER TABLE conversations ADD COLUMN conversation_type VARCHAR(20) NOT NULL DEFAULT 'chat'"
+        ))
+
+
+def _composite_indexes(conn: Connection) -> None:
+    """创建热点查询的复合索引，删除被取代的单列索引"""
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS ix_conversations_user_updated ON conversations (user_id, updated_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_user_type_updated "
+        "ON conversations (user_id, conversation_type, updated_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_messages_conversation_timestamp ON messages (conversation_id, timestamp, id)",
+    ):
+        conn.execute(text(ddl))
+    for name in ("ix_conversations_user_id", "ix_conversations_conversation_type", "ix_messages_conversation_id"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _message_retention(conn: Connection) -> None:
+    """消息归档表、会话归档时间，以及从消息内容中拆出的思考过程列"""
+    metadata = MetaData()
+    # 只为外键声明被引用的列，不会建表
+    Table("conversations", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "message_archives", metadata,
+        Column("conversation_id", Integer, ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True),
+        Column("codec", String(10), nullable=False),
+        Column("message_count", Integer, nullable=False),
+        Column("raw_size", Integer, nullable=False),
+        Column("payload", LargeBinary, nullable=False),
+        Column("archived_at", DateTime(timezone=True), nullable=False),
+    ).create(bind=conn, checkfirst=True)
+    if "thinking" not in _columns(conn, "messages"):
+        conn.execute(text("ALTER TABLE messages ADD COLUMN thinking TEXT"))
+    if "archived_at" not in _columns(conn, "conversations"):
+        conn.execute(text("ALTER TABLE conversations ADD COLUMN archived_at TIMESTAMP WITH TIME ZONE"))
+
+
+def _backfill_thinking(engine: Engine, batch_size: int) -> int:
+    """
+    把旧消息内容中的 [THINKING]...[/THINKING] 前缀移到 thinking 列
+
+    按消息ID顺序分批推进（同 _backfill_search_index），每批只检查 batch_size 条消息，
+    带前缀的消息再稀疏，总代价也只是一次顺序扫描
+    """
+    total = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            upper_id = conn.execute(
+                text("SELECT max(id) FROM (SELECT id FROM messages WHERE id > :last_id ORDER BY id LIMIT :batch_size)"),
+                {"last_id": last_id, "batch_size": batch_size}
+            ).scalar()
+            if upper_id is None:
+                return total
+            rows = conn.execute(
+                text(
+                    "SELECT id, content FROM messages WHERE id > :last_id AND id <= :upper_id "
+                    "AND thinking IS NULL AND content LIKE '[THINKING]%'"
+                ),
+                {"last_id": last_id, "upper_id": upper_id}
+            ).all()
+            updates = []
+            for message_id, content in rows:
+                thinking, closed, answer = content[len(THINKING_START):].partition(THINKING_END)
+                # 没有结束标记的内容保持原样，thinking 置为空串，不再重复处理
+                updates.append(
+                    {"id": message_id, "thinking": thinking, "content": answer}
+                    if closed else {"id": message_id, "thinking": "", "content": content}
+                )
+            if updates:
+                conn.execute(
+                    text("UPDATE messages SET thinking = :thinking, content = :content WHERE id = :id"),
+                    updates
+                )
+        total += len(rows)
+        last_id = upper_id
+
+
+_FTS_TRIGGERS = ("messages_fts_insert", "messages_fts_delete", "messages_fts_update", "conversations_fts_owner")
+
+# 版本 6 的全文索引：unicode61 分词器，触发器调用自定义函数 cjk_segment 切分中日韩文字（已由版本 7 取代）
+_MESSAGE_SEARCH_V6_DDL: List[str] = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        content, owner, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts (rowid, content, owner) VALUES (
+            new.id,
+            cjk_segment(new.content),
+            (SELECT user_id FROM conversations WHERE id = new.conversation_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        DELETE FROM messages_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+        UPDATE messages_fts SET content = cjk_segment(new.content) WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_owner AFTER UPDATE OF user_id ON conversations BEGIN
+        UPDATE messages_fts SET owner = new.user_id
+        WHERE rowid IN (SELECT id FROM messages WHERE conversation_id = new.id);
+    END
+    """,
+]
+
+# 版本 7 的全文索引：trigram 分词器，触发器是纯 SQL；owner 列为 '<' || user_id || '>'
+_MESSAGE_SEARCH_TRIGRAM_DDL: List[str] = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        content, owner, tokenize = 'trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts (rowid, content, owner) VALUES (
+            new.id,
+            new.content,
+            (SELECT '<' || user_id || '>' FROM conversations WHERE id = new.conversation_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        DELETE FROM messages_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+        UPDATE messages_fts SET content = new.content WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_owner AFTER UPDATE OF user_id ON conversations BEGIN
+        UPDATE messages_fts SET owner = '<' || new.user_id || '>'
+        WHERE rowid IN (SELECT id FROM messages WHERE conversation_id = new.id);
+    END
+    """,
+]
+
+
+def _message_search(conn: Connection) -> None:
+    """消息全文索引（FTS5 虚拟表和同步触发器）；其他数据库暂不支持全文搜索"""
+    if conn.dialect.name == "sqlite":
+        for ddl in _MESSAGE_SEARCH_V6_DDL:
+            conn.execute(text(ddl))
+
+
+def _backfill_search_index(engine: Engine, batch_size: int) -> int:
+    """
+    按消息ID顺序分批把已有消息写入全文索引；触发器已写入的消息跳过
+
+    回填在全部结构迁移之后执行，写入的是当前版本的索引格式（版本 6、7 共用；内容末尾的填充见版本 9）
+    """
+    if not _is_sqlite(engine) or not TRIGRAM_SUPPORTED:
+        return 0
+    total = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            upper_id = conn.execute(
+                text("SELECT max(id) FROM (SELECT id FROM messages WHERE id > :last_id ORDER BY id LIMIT :batch_size)"),
+                {"last_id": last_id, "batch_size": batch_size}
+            ).scalar()
+            if upper_id is None:
+                return total
+            total += conn.execute(
+                text(
+                    "INSERT INTO messages_fts (rowid, content, owner) "
+                    "SELECT m.id, m.content || char(31, 31), '<' || c.user_id || '>' FROM messages m "
+                    "JOIN conversations c ON c.id = m.conversation_id "
+                    "WHERE m.id > :last_id AND m.id <= :upper_id "
+                    "AND NOT EXISTS (SELECT 1 FROM messages_fts WHERE rowid = m.id)"
+                ),
+                {"last_id": last_id, "upper_id": upper_id}
+            ).rowcount
+        last_id = upper_id
+
+
+def _message_search_trigram(conn: Connection) -> None:
+    """
+    全文索引改用 trigram 分词器：版本 6 曾用 unicode61 分词器，触发器调用自定义函数 cjk_segment，
+    未注册该函数的连接（如 sqlite3 命令行）写 messages 表会失败。删除旧的索引和触发器后重建，
+    由回填重新编入已有消息；已是 trigram 索引时不做任何事。
+    3.34 之前的 SQLite 没有 trigram 分词器，只删除旧的索引，搜索接口返回 501
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    fts_sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'messages_fts'")).scalar()
+    if fts_sql is not None and "trigram" in fts_sql:
+        return
+    for trigger in _FTS_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    conn.execute(text("DROP TABLE IF EXISTS messages_fts"))
+    if TRIGRAM_SUPPORTED:
+        for ddl in _MESSAGE_SEARCH_TRIGRAM_DDL:
+            conn.execute(text(ddl))
+
+
+# 版本 9：索引内容末尾补两个填充字符（每个字都是某个三元组的开头），并建立索引词表，
+# 一两个字的关键词在词表中按前缀展开为三元组
+_MESSAGE_SEARCH_SHORT_TERMS_DDL: List[str] = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts_vocab USING fts5vocab(messages_fts, 'row')",
+    "DROP TRIGGER IF EXISTS messages_fts_insert",
+    """
+    CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts (rowid, content, owner) VALUES (
+            new.id,
+            new.content || char(31, 31),
+            (SELECT '<' || user_id || '>' FROM conversations WHERE id = new.conversation_id)
+        );
+    END
+    """,
+    "DROP TRIGGER IF EXISTS messages_fts_update",
+    """
+    CREATE TRIGGER messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+        UPDATE messages_fts SET content = new.content || char(31, 31) WHERE rowid = new.id;
+    END
+    """,
+]
+
+
+def _message_search_short_terms(conn: Connection) -> None:
+    """短关键词的索引支持（版本 7 的 trigram 索引不存在时跳过）"""
+    if conn.dialect.name != "sqlite":
+        return
+    if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'")).first() is None:
+        return
+    for ddl in _MESSAGE_SEARCH_SHORT_TERMS_DDL:
+        conn.execute(text(ddl))
+
+
+def _backfill_search_padding(engine: Engine, batch_size: int) -> int:
+    """按消息ID顺序分批给已编入索引的内容补上末尾的填充字符"""
+    if not _is_sqlite(engine) or not TRIGRAM_SUPPORTED:
+        return 0
+    total = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            upper_id = conn.execute(
+                text(
+                    "SELECT max(rowid) FROM (SELECT rowid FROM messages_fts WHERE rowid > :last_id "
+                    "ORDER BY rowid LIMIT :batch_size)"
+                ),
+                {"last_id": last_id, "batch_size": batch_size}
+            ).scalar()
+            if upper_id is None:
+                return total
+            total += conn.execute(
+                text(
+                    "UPDATE messages_fts SET content = content || char(31, 31) "
+                    "WHERE rowid > :last_id AND rowid <= :upper_id AND substr(content, -2) <> char(31, 31)"
+                ),
+                {"last_id": last_id, "upper_id": upper_id}
+            ).rowcount
+        last_id = upper_id
+
+
+def _conversation_accessed_at(conn: Connection) -> None:
+    """会话最近一次访问恢复归档的时间"""
+    if "accessed_at" not in _columns(conn, "conversations"):
+        conn.execute(text("ALTER TABLE conversations ADD COLUMN accessed_at TIMESTAMP WITH TIME ZONE"))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create_tables", _create_tables),
+    Migration(2, "add_user_id", _add_user_id, backfill=_backfill_user_id),
+    Migration(3, "add_conversation_type", _add_conversation_type),
+    Migration(4, "composite_indexes", _composite_indexes),
+    Migration(5, "message_retention", _message_retention, backfill=_backfill_thinking),
+    Migration(6, "message_search", _message_search, backfill=_backfill_search_index),
+    Migration(7, "message_search_trigram", _message_search_trigram, backfill=_backfill_search_index),
+    Migration(8, "conversation_accessed_at", _conversation_accessed_at),
+    Migration(9, "message_search_short_terms", _message_search_short_terms, backfill=_backfill_search_padding),
+]
+
+
+# ==================== 执行器 ====================
+
+def batched_update(engine: Engine, sql: str, params: Dict, batch_size: int) -> int:
+    """
+    分批执行 UPDATE/DELETE，每批单独提交
+
+    sql 必须用 :batch_size 限制每批行数，且已处理的行不再满足条件，
+    这样中断后重新执行会从剩余的行继续。
+
+    Returns:
+        处理的总行数
+    """
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            count = conn.execute(text(sql), {**params, "batch_size": batch_size}).rowcount
+        total += count
+        if count < batch_size:
+            return total
+
+
+def _is_sqlite(engine: Engine) -> bool:
+    return engine.dialect.name == "sqlite"
+
+
+@contextmanager
+def migration_lock(engine: Engine) -> Iterator[Connection]:
+    """
+    获取迁移锁，返回处于事务中的连接；正常退出时提交，异常时回滚
+
+    SQLite 的 DDL 是事务性的，BEGIN IMMEDIATE 取得写锁后其他 worker 在此等待；
+    PostgreSQL 使用事务级 advisory lock，并取消本事务的语句超时（等锁和建索引可能超过 DB_STATEMENT_TIMEOUT_MS）。
+    """
+    if _is_sqlite(engine):
+        with engine.connect() as conn:
+            # 自己管理事务：驱动默认不会在 DDL 前开启事务
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {settings.MIGRATION_LOCK_TIMEOUT * 1000}")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            else:
+                conn.exec_driver_sql("COMMIT")
+            finally:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("SET LOCAL statement_timeout = 0"))
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PG_MIGRATION_LOCK_KEY})
+            yield conn
+
+
+def _applied_versions(conn: Connection) -> Dict[int, Optional[datetime]]:
+    """已执行的版本 -> 回填完成时间"""
+    if "schema_version" not in inspect(conn).get_table_names():
+        return {}
+    rows = conn.execute(text("SELECT version, completed_at FROM schema_version")).all()
+    return {version: completed_at for version, completed_at in rows}
+
+
+def current_version(engine: Engine) -> int:
+    """当前数据库的版本号，未初始化时为 0"""
+    with engine.connect() as conn:
+        applied = _applied_versions(conn)
+    return max(applied, default=0)
+
+
+def pending_backfills(engine: Engine) -> List[Migration]:
+    """结构迁移已执行但回填尚未完成的迁移"""
+    with engine.connect() as conn:
+        applied = _applied_versions(conn)
+    return [m for m in MIGRATIONS if m.backfill and m.version in applied and applied[m.version] is None]
+
+
+def run_migrations(engine: Engine, migrations: List[Migration] = None) -> List[int]:
+    """
+    执行待执行的结构迁移
+
+    Returns:
+        本次执行的版本号列表
+    """
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+    latest = migrations[-1].version
+
+    # 快速路径：版本已是最新，不获取锁
+    if current_version(engine) >= latest:
+        logger.debug("database_schema_up_to_date", version=latest)
+        return []
+
+    executed = []
+    with migration_lock(engine) as conn:
+        conn.execute(text(_SCHEMA_VERSION_DDL))
+        # 拿到锁后重新读取：等待期间其他 worker 可能已经迁移完成
+        applied = _applied_versions(conn)
+        for migration in migrations:
+            if migration.version in applied:
+                continue
+            start = time.monotonic()
+            migration.upgrade(conn)
+            now = datetime.utcnow()
+            conn.execute(
+                text(
+                    "INSERT INTO schema_version (version, name, applied_at, completed_at) "
+                    "VALUES (:version, :name, :applied_at, :completed_at)"
+                ),
+                {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "applied_at": now,
+                    "completed_at": None if migration.backfill else now
+                }
+            )
+            executed.append(migration.version)
+            logger.info(
+                "database_migration_applied",
+                version=migration.version,
+                migration=migration.name,
+                duration_ms=round((time.monotonic() - start) * 1000, 2)
+            )
+    return executed
+
+
+def run_backfills(engine: Engine, batch_size: int = None) -> Dict[int, int]:
+    """
+    执行未完成的数据回填，每批单独提交；中断后再次调用会从剩余数据继续
+
+    Returns:
+        版本号 -> 回填的行数
+    """
+    batch_size = batch_size or settings.MIGRATION_BATCH_SIZE
+    results = {}
+    for migration in pending_backfills(engine):
+        start = time.monotonic()
+        results[migration.version] = migration.backfill(engine, batch_size)
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE schema_version SET completed_at = :now WHERE version = :version"),
+                {"now": datetime.utcnow(), "version": migration.version}
+            )
+        logger.info(
+            "database_backfill_completed",
+            version=migration.version,
+            migration=migration.name,
+            rows=results[migration.version],
+            duration_ms=round((time.monotonic() - start) * 1000, 2)
+        )
+    return results
+
+
+async def backfill_in_background() -> None:
+    """
+    执行未完成的回填（应用启动后作为后台任务运行）
+
+    经 run_sync_writes 在应用唯一的写连接上执行，每批提交后归还连接，请求的写入在批次之间穿插；
+    失败时下次启动从剩余数据继续
+    """
+    from app.infrastructure.database.connection import run_sync_writes
+
+    try:
+        await run_sync_writes(run_backfills)
+    except Exception as e:
+        logger.error("database_backfill_failed", error=str(e), error_type=type(e).__name__)
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口"""
+    from app.infrastructure.database.connection import engine
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["status"]:
+        print(f"当前版本: {current_version(engine)}，最新版本: {MIGRATIONS[-1].version}")
+        for migration in pending_backfills(engine):
+            print(f"未完成的回填: {migration.version} {migration.name}")
+        return 0
+
+    executed = run_migrations(engine)
+    print(f"已执行迁移: {executed or '无'}")
+    backfilled = run_backfills(engine)
+    print(f"已完成回填: {backfilled or '无'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
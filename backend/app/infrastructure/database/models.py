@@ -2,8 +2,8 @@
 数据库模型定义
 定义 Conversation 和 Message ORM 模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.infrastructure.database.connection import Base
 
@@ -14,16 +14,25 @@ class Conversation(Base):
     存储用户的聊天会话信息
     """
     __tablename__ = "conversations"
+    __table_args__ = (
+        # 会话列表按用户（和类型）过滤、按 (updated_at, id) 倒序
+        # tests/test_query_plans.py 检查热点查询是否命中这些索引
+        Index("ix_conversations_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_conversations_user_type_updated", "user_id", "conversation_type", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    user_id = Column(String(36), nullable=False, index=True)  # 游客唯一ID（UUID格式）
+    user_id = Column(String(36), nullable=False)  # 游客唯一ID（UUID格式）
     title = Column(String(255), nullable=False, default="新对话")
-    conversation_type = Column(String(20), nullable=False, default="chat", index=True)  # "chat" 或 "agent"
+    conversation_type = Column(String(20), nullable=False, default="chat")  # "chat" 或 "agent"
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=True)  # 消息已移入归档表的时间，访问时恢复
+    accessed_at = Column(DateTime(timezone=True), nullable=True)  # 最近一次访问恢复归档的时间，保留期也从此起算
     
     # 关联关系：一个会话包含多条消息
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+    archive = relationship("MessageArchive", uselist=False, cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Conversation(id={self.id}, user_id='{self.user_id}', title='{self.title}', type='{self.conversation_type}')>"
@@ -35,12 +44,17 @@ class Message(Base):
     存储会话中的每条消息
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        # 消息按会话过滤、按 (timestamp, id) 排序
+        Index("ix_messages_conversation_timestamp", "conversation_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False, index=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
     role = Column(String(20), nullable=False)  # "user" 或 "assistant"
     content = Column(Text, nullable=False)
     thinking_mode = Column(Boolean, default=False)  # 是否启用 thinking 模式
+    thinking = deferred(Column(Text, nullable=True))  # 思考过程，体积大且构建对话历史时用不到，按需加载
     timestamp = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     
     # 关联关系：消息属于某个会话
@@ -48,3 +62,21 @@ class Message(Base):
     
     def __repr__(self):
         return f"<Message(id={self.id}, role='{self.role}', conversation_id={self.conversation_id})>"
+
+
+class MessageArchive(Base):
+    """
+    消息归档表模型
+    长期不活跃会话的全部消息压缩为一个数据块，会话再次被访问时恢复到消息表
+    """
+    __tablename__ = "message_archives"
+    
+    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String(10), nullable=False)  # 压缩算法："zstd" 或 "zlib"
+    message_count = Column(Integer, nullable=False)
+    raw_size = Column(Integer, nullable=False)  # 压缩前的字节数
+    payload = deferred(Column(LargeBinary, nullable=False))
+    archived_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<MessageArchive(conversation_id={self.conversation_id}, messages={self.message_count}, codec='{self.codec}')>"
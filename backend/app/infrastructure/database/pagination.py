@@ -0,0 +1,46 @@
+"""
+游标（keyset）分页
+游标编码排序键 (时间, id)，下一页用 (时间, id) < 游标 的范围查询代替 OFFSET，
+在复合索引上直接定位，翻到第几页的代价都相同
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def encode_cursor(sort_time: datetime, row_id: int) -> str:
+    """把排序键编码为不透明的游标字符串"""
+    raw = json.dumps([sort_time.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解析游标
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_time, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_time), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+@dataclass
+class Page(Generic[T]):
+    """
+    一页结果
+
+    Attributes:
+        items: 本页记录（按展示顺序）
+        has_more: 按翻页方向是否还有更多记录
+    """
+    items: List[T]
+    has_more: bool
@@ -2,14 +2,72 @@
 Repository 模式实现
 封装数据访问逻辑，提供清晰的数据操作接口
 """
-from typing import List, Optional
+from typing import Iterator, List, Optional
+from sqlalchemy import column, literal_column, select, table, tuple_
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from datetime import datetime
+from app.config import settings
+from app.infrastructure.cache.conversation_cache import CachedConversation, CachedMessage, get_conversation_cache
 from app.infrastructure.database.models import Conversation, Message
+from app.infrastructure.database.pagination import Page, decode_cursor
+from app.infrastructure.database.retention import restore_conversation
+from app.infrastructure.database.search import (
+    MAX_TERM_EXPANSIONS, TRIGRAM_SUPPORTED, build_match_query, parse_terms, prefix_range, render_snippet,
+    short_terms
+)
 from app.infrastructure.logging.setup import get_logger
 
 logger = get_logger(__name__)
 
+# 全文索引虚拟表及其词表（由迁移创建，不在 ORM 模型中）
+messages_fts = table("messages_fts", column("rowid"))
+messages_fts_vocab = table("messages_fts_vocab", column("term"))
+
+
+def ownership_query(conversation_id: int):
+    """会话归属查询（填充会话缓存）"""
+    return select(Conversation.user_id, Conversation.conversation_type, Conversation.archived_at)\
+        .where(Conversation.id == conversation_id)
+
+
+def recent_messages_query(conversation_id: int, limit: int):
+    """最近消息查询（从新到旧，填充会话缓存的消息缓冲区）"""
+    return select(Message.id, Message.role, Message.content)\
+        .where(Message.conversation_id == conversation_id)\
+        .order_by(Message.timestamp.desc(), Message.id.desc())\
+        .limit(limit)
+
+
+def export_messages_query(conversation_id: int, batch_size: int = None):
+    """
+    导出会话全部消息的查询（按时间顺序）
+
+    yield_per 使结果通过服务端游标分批读取（PostgreSQL 上为命名游标），
+    长会话导出时内存占用只与批大小相关
+    """
+    return select(
+        Message.id,
+        Message.role,
+        Message.content,
+        Message.thinking_mode,
+        Message.thinking,
+        Message.timestamp
+    ).where(Message.conversation_id == conversation_id)\
+        .order_by(Message.timestamp.asc(), Message.id.asc())\
+        .execution_options(yield_per=batch_size or settings.DB_EXPORT_BATCH_SIZE)
+
+
+def cache_ownership(conversation_id: int, row: Optional[Row], user_id: str) -> Optional[CachedConversation]:
+    """把归属查询结果写入缓存，返回属于该用户的会话信息"""
+    if row is None:
+        logger.warning("conversation_not_found", conversation_id=conversation_id, user_id=user_id)
+        return None
+    entry = get_conversation_cache().put(
+        conversation_id, row.user_id, row.conversation_type, archived=row.archived_at is not None
+    )
+    return entry if entry.user_id == user_id else None
+
 
 class ConversationRepository:
     """会话数据仓库"""
@@ -39,6 +97,8 @@ class ConversationRepository:
         self.db.add(conversation)
         self.db.commit()
         self.db.refresh(conversation)
+        # 新会话没有历史消息，直接写入缓存
+        get_conversation_cache().put(conversation.id, user_id, conversation_type, recent=[])
         
         logger.info("conversation_created", conversation_id=conversation.id, user_id=user_id, title=title, conversation_type=conversation_type)
         return conversation
@@ -67,6 +127,22 @@ class ConversationRepository:
             logger.warning("conversation_not_found", conversation_id=conversation_id, user_id=user_id)
         return conversation
     
+    def lookup(self, conversation_id: int, user_id: str) -> Optional[CachedConversation]:
+        """
+        校验会话归属（读穿缓存，命中时不访问数据库）
+        
+        Args:
+            conversation_id: 会话 ID
+            user_id: 用户ID
+            
+        Returns:
+            缓存的会话信息（含是否已归档），如果不存在或不属于该用户返回 None
+        """
+        entry = get_conversation_cache().get(conversation_id)
+        if entry is not None:
+            return entry if entry.user_id == user_id else None
+        return cache_ownership(conversation_id, self.db.execute(ownership_query(conversation_id)).first(), user_id)
+    
     def get_all(self, skip: int = 0, limit: int = 100, user_id: str = None, conversation_type: str = None) -> List[Conversation]:
         """
         获取会话列表（按更新时间倒序）
@@ -100,6 +176,55 @@ class ConversationRepository:
         logger.debug("conversations_listed", count=len(conversations), user_id=user_id, conversation_type=conversation_type)
         return conversations
     
+    def list_page(
+        self,
+        user_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        conversation_type: str = None
+    ) -> Page[Row]:
+        """
+        游标分页获取会话列表（按更新时间倒序）
+        
+        按 (updated_at, id) 做 keyset 分页，只查询列不构造 ORM 对象
+        
+        Args:
+            user_id: 用户ID（必需）
+            limit: 每页记录数
+            cursor: 上一页最后一条记录的游标，为空时从最新的会话开始
+            conversation_type: 会话类型过滤（可选）
+            
+        Returns:
+            一页会话行（字段与 Conversation 相同）
+        """
+        if not user_id:
+            raise ValueError("user_id is required")
+        
+        stmt = select(
+            Conversation.id,
+            Conversation.user_id,
+            Conversation.title,
+            Conversation.conversation_type,
+            Conversation.created_at,
+            Conversation.updated_at
+        ).where(Conversation.user_id == user_id)
+        
+        if conversation_type:
+            if conversation_type not in ["chat", "agent"]:
+                raise ValueError("conversation_type must be 'chat' or 'agent'")
+            stmt = stmt.where(Conversation.conversation_type == conversation_type)
+        
+        if cursor:
+            stmt = stmt.where(tuple_(Conversation.updated_at, Conversation.id) < decode_cursor(cursor))
+        
+        # 多取一条判断是否还有下一页
+        rows = self.db.execute(
+            stmt.order_by(Conversation.updated_at.desc(), Conversation.id.desc()).limit(limit + 1)
+        ).all()
+        
+        logger.debug("conversations_page_listed", count=min(len(rows), limit), user_id=user_id, conversation_type=conversation_type)
+        return Page(items=rows[:limit], has_more=len(rows) > limit)
+    
     def update_title(self, conversation_id: int, title: str, user_id: str = None) -> Optional[Conversation]:
         """
         更新会话标题
@@ -120,6 +245,7 @@ class ConversationRepository:
         conversation.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(conversation)
+        get_conversation_cache().invalidate(conversation_id)
         
         logger.info("conversation_title_updated", conversation_id=conversation_id, user_id=user_id, title=title)
         return conversation
@@ -141,6 +267,7 @@ class ConversationRepository:
         
         self.db.delete(conversation)
         self.db.commit()
+        get_conversation_cache().invalidate(conversation_id)
         
         logger.info("conversation_deleted", conversation_id=conversation_id, user_id=user_id)
         return True
@@ -156,6 +283,21 @@ class ConversationRepository:
         if conversation:
             conversation.updated_at = datetime.utcnow()
             self.db.commit()
+    
+    def restore_archive(self, conversation_id: int) -> int:
+        """
+        把已归档会话的消息恢复到消息表
+        
+        Args:
+            conversation_id: 会话 ID
+            
+        Returns:
+            恢复的消息数
+        """
+        count = restore_conversation(self.db, conversation_id)
+        self.db.commit()
+        get_conversation_cache().invalidate(conversation_id)
+        return count
 
 
 class MessageRepository:
@@ -169,7 +311,8 @@ class MessageRepository:
         conversation_id: int,
         role: str,
         content: str,
-        thinking_mode: bool = False
+        thinking_mode: bool = False,
+        thinking: Optional[str] = None
     ) -> Message:
         """
         创建新消息
@@ -179,6 +322,7 @@ class MessageRepository:
             role: 消息角色（user 或 assistant）
             content: 消息内容
             thinking_mode: 是否启用思考模式
+            thinking: 思考过程（单独存列，读取消息时按需加载）
             
         Returns:
             创建的消息对象
@@ -187,11 +331,13 @@ class MessageRepository:
             conversation_id=conversation_id,
             role=role,
             content=content,
-            thinking_mode=thinking_mode
+            thinking_mode=thinking_mode,
+            thinking=thinking
         )
         self.db.add(message)
         self.db.commit()
         self.db.refresh(message)
+        get_conversation_cache().append(conversation_id, CachedMessage(message.id, role, content))
         
         logger.info(
             "message_created",
@@ -237,22 +383,195 @@ class MessageRepository:
         )
         return messages
     
+    def list_page(
+        self,
+        conversation_id: int,
+        limit: int = 50,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Page[Row]:
+        """
+        游标分页获取消息（按时间顺序返回）
+        
+        按 (timestamp, id) 做 keyset 分页，只查询列不构造 ORM 对象：
+        - 不带游标：最新的 limit 条
+        - before：早于游标的 limit 条（向上加载更多历史）
+        - after：晚于游标的 limit 条（补齐新消息）
+        
+        Args:
+            conversation_id: 会话 ID
+            limit: 每页记录数
+            before: 向前翻页的游标
+            after: 向后翻页的游标
+            
+        Returns:
+            一页消息行（字段与 Message 相同），has_more 表示翻页方向上是否还有消息
+        """
+        if before and after:
+            raise ValueError("before and after cannot be used together")
+        
+        stmt = select(
+            Message.id,
+            Message.conversation_id,
+            Message.role,
+            Message.content,
+            Message.thinking_mode,
+            Message.thinking,
+            Message.timestamp
+        ).where(Message.conversation_id == conversation_id)
+        sort_key = tuple_(Message.timestamp, Message.id)
+        
+        if after:
+            stmt = stmt.where(sort_key > decode_cursor(after))\
+                .order_by(Message.timestamp.asc(), Message.id.asc())
+        else:
+            if before:
+                stmt = stmt.where(sort_key < decode_cursor(before))
+            stmt = stmt.order_by(Message.timestamp.desc(), Message.id.desc())
+        
+        # 多取一条判断是否还有更多
+        rows = self.db.execute(stmt.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not after:
+            rows.reverse()
+        
+        logger.debug(
+            "messages_page_retrieved",
+            conversation_id=conversation_id,
+            count=len(rows),
+            has_more=has_more
+        )
+        return Page(items=rows, has_more=has_more)
+    
     def get_recent_messages(
         self,
         conversation_id: int,
         limit: int = 20
-    ) -> List[Message]:
+    ) -> List[CachedMessage]:
         """
-        获取最近的消息（用于构建对话历史）
+        获取最近的消息（用于构建对话历史），优先读取会话缓存的消息缓冲区
         
         Args:
             conversation_id: 会话 ID
             limit: 返回的最大消息数
             
         Returns:
-            消息列表（按时间顺序，从旧到新）
+            消息列表（按时间顺序，从旧到新），只包含 id、role、content
+        """
+        cache = get_conversation_cache()
+        messages = cache.recent(conversation_id, limit)
+        if messages is not None:
+            return messages
+        
+        token = cache.load_token(conversation_id)
+        rows = self.db.execute(recent_messages_query(conversation_id, max(limit, cache.history_size))).all()
+        messages = [CachedMessage(*row) for row in reversed(rows)]
+        cache.fill_recent(conversation_id, messages, token)
+        return messages[-limit:]
+    
+    def iter_by_conversation(self, conversation_id: int, batch_size: int = None) -> Iterator[Row]:
+        """
+        逐行读取会话的全部消息（按时间顺序，服务端游标分批读取）
+        
+        Args:
+            conversation_id: 会话 ID
+            batch_size: 每批读取的行数，默认 DB_EXPORT_BATCH_SIZE
+            
+        Returns:
+            消息行迭代器（id、role、content、thinking_mode、thinking、timestamp）
+        """
+        result = self.db.execute(export_messages_query(conversation_id, batch_size))
+        try:
+            yield from result
+        finally:
+            result.close()
+    
+    def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Page[dict]:
+        """
+        全文搜索用户的消息（从新到旧）
+        
+        在 FTS5 索引上按 rowid（即消息ID）倒序取匹配项，用户过滤也在索引中完成，
+        耗时只与返回的条数相关，不随消息总量增长；不足三个字符的关键词先在词表中按前缀展开为三元组
+        
+        Args:
+            user_id: 用户ID
+            query: 搜索关键词，空格分隔的多个关键词需全部命中
+            limit: 每页记录数
+            cursor: 上一页返回的游标
+            
+        Returns:
+            一页搜索结果，snippet 为 HTML 转义后用 <mark> 标记命中位置的片段
+            
+        Raises:
+            ValueError: 关键词为空、短关键词过于常见或游标无效
+            NotImplementedError: 当前数据库不支持全文搜索
+        """
+        if self.db.get_bind().dialect.name != "sqlite" or not TRIGRAM_SUPPORTED:
+            raise NotImplementedError("当前数据库不支持全文搜索")
+        
+        terms = parse_terms(query)
+        before_id = decode_cursor(cursor)[1] if cursor else None
+        expansions = {}
+        for term in short_terms(terms):
+            expansions[term] = self._expand_term(term)
+            if not expansions[term]:
+                # 索引中没有以该关键词开头的三元组，不会有匹配
+                return Page(items=[], has_more=False)
+        
+        fts = literal_column("messages_fts")
+        stmt = select(
+            Message.id,
+            Message.conversation_id,
+            Conversation.title.label("conversation_title"),
+            Conversation.conversation_type,
+            Message.role,
+            Message.timestamp,
+            Message.content
+        ).select_from(messages_fts)\
+            .join(Message, Message.id == messages_fts.c.rowid)\
+            .join(Conversation, Conversation.id == Message.conversation_id)\
+            .where(fts.op("MATCH")(build_match_query(terms, user_id, expansions)))\
+            .where(Conversation.user_id == user_id)\
+            .order_by(messages_fts.c.rowid.desc())
+        
+        if before_id is not None:
+            stmt = stmt.where(messages_fts.c.rowid < before_id)
+        
+        # 多取一条判断是否还有更多
+        rows = self.db.execute(stmt.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        results = []
+        for row in rows[:limit]:
+            result = row._asdict()
+            result["snippet"] = render_snippet(result.pop("content"), terms)
+            results.append(result)
+        
+        logger.debug("messages_searched", user_id=user_id, count=len(results), has_more=has_more)
+        return Page(items=results, has_more=has_more)
+    
+    def _expand_term(self, term: str) -> List[str]:
+        """
+        在索引词表中按前缀范围查出以短关键词开头的三元组
+        
+        Raises:
+            ValueError: 展开的三元组超过 MAX_TERM_EXPANSIONS 个
         """
-        return self.get_by_conversation(conversation_id, limit=limit)
+        low, high = prefix_range(term)
+        trigrams = self.db.execute(
+            select(messages_fts_vocab.c.term)
+            .where(messages_fts_vocab.c.term >= low, messages_fts_vocab.c.term < high)
+            .limit(MAX_TERM_EXPANSIONS + 1)
+        ).scalars().all()
+        if len(trigrams) > MAX_TERM_EXPANSIONS:
+            raise ValueError(f"关键词“{term}”过于常见，请输入更长的关键词")
+        return trigrams
 
 
 def get_conversation_repository(db: Session) -> ConversationRepository:
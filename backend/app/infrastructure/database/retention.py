@@ -0,0 +1,311 @@
+"""
+消息保留与归档
+
+- 超过保留期未更新的会话，其全部消息压缩（zstd，未安装时用 zlib）为 message_archives 中的一个数据块，
+  从 messages 表删除；会话再次被访问时原样恢复（保留消息ID，分页游标仍然有效）
+- 恢复时记录访问时间 accessed_at（不改变 updated_at，会话列表顺序不变），保留期从最后一次更新或访问起算，
+  只被查看的会话不会在下一轮又被归档
+- SQLite 数据库使用 auto_vacuum=INCREMENTAL，定期执行 incremental_vacuum 归还空闲页，
+  热表保持紧凑；旧数据库需手动执行一次完整 VACUUM 才能切换到增量模式
+
+使用方法：
+    python -m app.infrastructure.database.retention                # 归档过期会话并回收空间
+    python -m app.infrastructure.database.retention vacuum --full  # 完整 VACUUM（会锁库，停机时执行）
+"""
+import asyncio
+import inspect
+import json
+import sys
+import zlib
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import await_only
+
+from app.config import settings
+from app.infrastructure.cache.conversation_cache import get_conversation_cache
+from app.infrastructure.database.connection import pin_writer, run_sync_writes
+from app.infrastructure.database.models import Conversation, Message, MessageArchive
+from app.infrastructure.logging.setup import get_logger
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 未安装zstandard时使用zlib
+    zstandard = None
+
+logger = get_logger(__name__)
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+# 按ID删除已归档消息时每条语句的ID数（低于 SQLite 的参数个数上限）
+DELETE_CHUNK_SIZE = 500
+
+_ARCHIVED_COLUMNS = (
+    Message.id, Message.role, Message.content, Message.thinking_mode, Message.thinking, Message.timestamp
+)
+
+
+# ==================== 压缩 ====================
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """压缩数据，返回 (压缩算法, 压缩后的数据)"""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(codec: str, payload: bytes) -> bytes:
+    """
+    按记录的压缩算法解压
+
+    Raises:
+        RuntimeError: 归档使用 zstd 压缩但当前环境未安装 zstandard
+    """
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("归档使用zstd压缩，需要安装zstandard: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"未知的压缩算法: {codec}")
+
+
+# ==================== 归档与恢复 ====================
+
+def _set_archived_at(db: Session, conversation_id: int, archived_at, **values) -> None:
+    # 归档状态变化不算会话更新，显式保留 updated_at（否则会触发 onupdate）
+    db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(archived_at=archived_at, updated_at=Conversation.updated_at, **values)
+    )
+
+
+def _is_stale(cutoff: datetime):
+    """尚未归档、保留期内既没有更新也没有被访问过的会话"""
+    return and_(
+        Conversation.archived_at.is_(None),
+        Conversation.updated_at < cutoff,
+        or_(Conversation.accessed_at.is_(None), Conversation.accessed_at < cutoff)
+    )
+
+
+def archive_conversation(db: Session, conversation_id: int) -> int:
+    """
+    把会话的全部消息压缩进归档表并从消息表删除（不提交）
+
+    只删除读出并写入归档的消息：读取之后才写入的消息留在消息表中
+
+    Returns:
+        归档的消息数
+    """
+    pin_writer(db)
+    rows = db.execute(
+        select(*_ARCHIVED_COLUMNS)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.timestamp, Message.id)
+    ).all()
+    if not rows:
+        return 0
+
+    raw = json.dumps(
+        [{**row._asdict(), "timestamp": row.timestamp.isoformat()} for row in rows],
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+    codec, payload = compress(raw)
+
+    db.add(MessageArchive(
+        conversation_id=conversation_id,
+        codec=codec,
+        message_count=len(rows),
+        raw_size=len(raw),
+        payload=payload
+    ))
+    message_ids = [row.id for row in rows]
+    for start in range(0, len(message_ids), DELETE_CHUNK_SIZE):
+        db.execute(delete(Message).where(Message.id.in_(message_ids[start:start + DELETE_CHUNK_SIZE])))
+    _set_archived_at(db, conversation_id, datetime.utcnow())
+    db.flush()
+
+    logger.info(
+        "conversation_archived",
+        conversation_id=conversation_id,
+        message_count=len(rows),
+        raw_size=len(raw),
+        archived_size=len(payload),
+        codec=codec
+    )
+    return len(rows)
+
+
+def restore_conversation(db: Session, conversation_id: int) -> int:
+    """
+    把归档的消息恢复到消息表（不提交）
+
+    Returns:
+        恢复的消息数
+    """
+    archive = db.get(MessageArchive, conversation_id)
+    count = 0
+    if archive is not None:
+        messages = json.loads(decompress(archive.codec, archive.payload))
+        for message in messages:
+            message["conversation_id"] = conversation_id
+            message["timestamp"] = datetime.fromisoformat(message["timestamp"])
+        if messages:
+            db.execute(insert(Message), messages)
+        db.delete(archive)
+        count = len(messages)
+    _set_archived_at(db, conversation_id, None, accessed_at=datetime.utcnow())
+    db.flush()
+
+    logger.info("conversation_restored", conversation_id=conversation_id, message_count=count)
+    return count
+
+
+def _stale_conversation_ids(db: Session, cutoff: datetime, limit: int) -> List[int]:
+    """扫描一批超过保留期未更新也未被访问、尚未归档的会话"""
+    return db.execute(
+        select(Conversation.id)
+        .where(_is_stale(cutoff))
+        .order_by(Conversation.id)
+        .limit(limit)
+    ).scalars().all()
+
+
+def _claim_stale(db: Session, conversation_id: int, cutoff: datetime) -> bool:
+    """
+    在写事务中重新检查会话是否仍然过期未归档，是则先标记为已归档
+
+    条件写入是事务的第一条语句：SQLite 上就此取得写锁，PostgreSQL 上锁住会话行，
+    扫描之后有新消息（updated_at 已更新）、被访问过（accessed_at 已更新）或已被归档的会话不再满足条件
+    """
+    pin_writer(db)
+    return db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id, _is_stale(cutoff))
+        .values(archived_at=datetime.utcnow(), updated_at=Conversation.updated_at)
+    ).rowcount == 1
+
+
+def archive_stale_conversations(
+    session_factory: Callable[[], Session],
+    older_than_days: int = None,
+    batch_size: int = None,
+    now: datetime = None
+) -> int:
+    """
+    归档超过保留期未更新的会话；每个会话单独提交，写事务保持短小
+
+    扫描在写事务之外进行，归档前在写事务中重新检查，扫描之后被访问过的会话跳过
+
+    Returns:
+        归档的会话数
+    """
+    older_than_days = older_than_days or settings.RETENTION_ARCHIVE_AFTER_DAYS
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+
+    archived = 0
+    with session_factory() as db:
+        while True:
+            conversation_ids = _stale_conversation_ids(db, cutoff, batch_size)
+            db.commit()
+            if not conversation_ids:
+                return archived
+            for conversation_id in conversation_ids:
+                if not _claim_stale(db, conversation_id, cutoff):
+                    db.rollback()
+                    logger.info("conversation_archive_skipped", conversation_id=conversation_id)
+                    continue
+                # 没有消息的会话也已标记，下次不再扫描
+                archive_conversation(db, conversation_id)
+                db.commit()
+                get_conversation_cache().invalidate(conversation_id)
+                archived += 1
+
+
+# ==================== 空间回收 ====================
+
+def vacuum(engine: Engine, full: bool = False, pages: int = None) -> Dict[str, int]:
+    """
+    回收 SQLite 数据库的空闲页
+
+    Args:
+        full: 是否执行完整 VACUUM（重写整个数据库，期间锁库；旧数据库借此切换到增量模式）
+        pages: 增量回收的最大页数，默认回收全部空闲页
+
+    Returns:
+        回收前后的空闲页数
+    """
+    if engine.dialect.name != "sqlite":
+        # PostgreSQL 由 autovacuum 负责
+        return {}
+
+    with engine.connect() as conn:
+        # VACUUM 不能在事务中执行
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if full:
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+        elif conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            # sqlite3 的 execute 只执行一步（释放一页）就结束，executescript 才会执行完
+            result = conn.connection.driver_connection.executescript(
+                f"PRAGMA incremental_vacuum({pages or settings.RETENTION_VACUUM_PAGES})"
+            )
+            if inspect.isawaitable(result):
+                # aiosqlite（经 run_sync_writes 执行时）
+                await_only(result)
+        else:
+            logger.warning("database_incremental_vacuum_unavailable", hint="执行一次 retention vacuum --full 切换到增量模式")
+        after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+    logger.info("database_vacuumed", full=full, free_pages_before=before, free_pages_after=after)
+    return {"free_pages_before": before, "free_pages_after": after}
+
+
+# ==================== 定时执行 ====================
+
+def run_retention(engine: Engine) -> Dict[str, int]:
+    """执行一轮归档和空间回收"""
+    archived = archive_stale_conversations(sessionmaker(bind=engine))
+    result = {"archived_conversations": archived, **vacuum(engine)}
+    logger.info("retention_completed", **result)
+    return result
+
+
+async def retention_loop() -> None:
+    """
+    按 RETENTION_INTERVAL_HOURS 定期执行保留任务
+
+    经 run_sync_writes 在应用唯一的写连接上执行：每个会话的归档是一个短事务，
+    聊天请求的写入在会话之间排队，不会与保留任务抢锁
+    """
+    while True:
+        try:
+            await run_sync_writes(run_retention)
+        except Exception as e:
+            logger.error("retention_failed", error=str(e), error_type=type(e).__name__)
+        await asyncio.sleep(settings.RETENTION_INTERVAL_HOURS * 3600)
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口"""
+    from app.infrastructure.database.connection import engine
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["vacuum"]:
+        print(vacuum(engine, full="--full" in argv))
+    else:
+        print(run_retention(engine))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
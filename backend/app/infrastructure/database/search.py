@@ -0,0 +1,101 @@
+"""
+消息全文搜索（SQLite FTS5）
+
+- messages_fts 虚拟表按消息ID（rowid）索引消息内容和会话所属用户，由触发器与 messages 表保持同步
+  （表和触发器的定义见 migrations.py 中的版本 7、9）
+- 使用 trigram 分词器（SQLite 3.34+）：每三个连续字符为一个词，中文等不以空格分词的文字也能按任意子串查询；
+  触发器是纯 SQL，用 sqlite3 命令行等外部工具写 messages 表时索引同样保持同步
+- 三个字符及以上的关键词直接作为短语匹配。一两个字的关键词（中文最常见的情况）无法切出三元组：
+  索引内容末尾补两个填充字符，使每个字都是某个三元组的开头，再从 messages_fts_vocab（索引的词表）
+  按前缀范围查出以该关键词开头的三元组，展开为 OR 查询，同样在索引中完成
+- 展开的三元组超过 MAX_TERM_EXPANSIONS 个（常见的单字）时拒绝查询，提示输入更长的关键词
+- 用户ID也写入索引（两侧加定界符，短ID也不少于三个字符），按用户过滤在 MATCH 中完成，
+  不需要先取出所有用户的匹配结果再过滤
+- 片段和高亮在 Python 中生成：截取第一个命中位置附近的内容，标记所有关键词
+
+已归档会话的消息不在索引中，会话恢复后重新可搜索。
+"""
+import html
+import re
+import sqlite3
+from typing import Dict, List, Tuple
+
+# trigram 分词器从 SQLite 3.34 开始提供；更早的版本不创建全文索引，搜索接口返回 501
+TRIGRAM_SUPPORTED = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+# trigram 索引能直接匹配的最短关键词，更短的关键词按前缀展开
+MIN_INDEXED_LENGTH = 3
+
+# 一个短关键词最多展开的三元组数
+MAX_TERM_EXPANSIONS = 5000
+
+SNIPPET_CHARS = 64  # 片段的字符数
+SNIPPET_LEAD = 16  # 片段中第一个命中位置之前保留的字符数
+
+
+def owner_token(user_id: str) -> str:
+    """索引中 owner 列的值（与迁移中触发器和回填的 '<' || user_id || '>' 一致）"""
+    return f"<{user_id}>"
+
+
+def _quote(value: str) -> str:
+    """FTS5 字符串字面量（短语）"""
+    return '"' + value.replace('"', '""') + '"'
+
+
+def parse_terms(query: str) -> List[str]:
+    """
+    按空格切分关键词
+
+    Raises:
+        ValueError: 关键词为空
+    """
+    terms = query.split()
+    if not terms:
+        raise ValueError("搜索关键词不能为空")
+    return terms
+
+
+def short_terms(terms: List[str]) -> List[str]:
+    """需要按前缀展开的短关键词"""
+    return [term for term in terms if len(term) < MIN_INDEXED_LENGTH]
+
+
+def prefix_range(term: str) -> Tuple[str, str]:
+    """词表中以 term 开头的三元组的范围 [low, high)；trigram 分词器不区分大小写，词表中是小写"""
+    low = term.lower()
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+def build_match_query(terms: List[str], user_id: str, expansions: Dict[str, List[str]]) -> str:
+    """
+    FTS5 查询：只匹配该用户的消息，关键词全部命中才匹配
+
+    Args:
+        terms: 关键词
+        user_id: 用户ID
+        expansions: 短关键词 -> 以其开头的三元组（不能为空列表）
+    """
+    groups = [
+        f"({' OR '.join(_quote(trigram) for trigram in expansions[term])})"
+        if len(term) < MIN_INDEXED_LENGTH else _quote(term)
+        for term in terms
+    ]
+    return f"owner : {_quote(owner_token(user_id))} AND content : ({' AND '.join(groups)})"
+
+
+def render_snippet(content: str, terms: List[str]) -> str:
+    """截取第一个命中位置附近的片段，转义 HTML，把所有关键词标记为 <mark>"""
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(content)
+    start = max(0, first.start() - SNIPPET_LEAD) if first else 0
+    end = min(len(content), start + SNIPPET_CHARS)
+    window = content[start:end]
+
+    parts, last = [], 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[last:match.start()], quote=False))
+        parts.append(f"<mark>{html.escape(match.group(), quote=False)}</mark>")
+        last = match.end()
+    parts.append(html.escape(window[last:], quote=False))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(content) else "")
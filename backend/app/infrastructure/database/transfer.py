@@ -0,0 +1,174 @@
+"""
+把已有数据库（通常是 SQLite）的数据导入另一个数据库（通常是 PostgreSQL），用于切换数据库
+
+- 源库先补完结构迁移和回填，导入的数据已是最新格式；目标库先执行结构迁移，且必须为空
+- 按外键顺序逐表导入：源库通过服务端游标分批读取，目标为 PostgreSQL 时每批用 COPY 写入，
+  其他数据库退化为批量 INSERT；全部数据在一个事务中导入，失败时目标库保持为空，可直接重试
+- 导入后把自增序列推进到最大ID，之后新建的记录不会主键冲突
+- 全文索引等 SQLite 专用结构不导入
+
+使用方法：
+    python -m app.infrastructure.database.transfer sqlite:///./data/chat_history.db
+    # 导入到 DATABASE_URL 指定的数据库
+"""
+import io
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Table, create_engine, func, select, text
+from sqlalchemy.engine import Connection, Engine, Row
+
+from app.config import settings
+from app.infrastructure.database.migrations import run_backfills, run_migrations
+from app.infrastructure.database.models import Base, Conversation
+from app.infrastructure.logging.setup import get_logger
+
+logger = get_logger(__name__)
+
+# COPY 文本格式需要转义的字符
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value: Any) -> str:
+    """把一个值编码为 COPY 文本格式的字段"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, bytes):
+        # bytea 十六进制格式，反斜杠在转义后成对出现
+        value = "\\x" + value.hex()
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return value.translate(_COPY_ESCAPES)
+
+
+def copy_rows(conn: Connection, table: Table, rows: Sequence[Row]) -> int:
+    """
+    把一批行写入目标表：PostgreSQL 使用 COPY，其他数据库使用批量 INSERT
+
+    Args:
+        conn: 目标库连接（处于事务中）
+        table: 目标表
+        rows: 与表的列顺序一致的行
+
+    Returns:
+        写入的行数
+    """
+    if not rows:
+        return 0
+    if conn.dialect.name != "postgresql":
+        conn.execute(table.insert(), [dict(row._mapping) for row in rows])
+        return len(rows)
+
+    columns = ", ".join(column.name for column in table.columns)
+    sql = f"COPY {table.name} ({columns}) FROM STDIN"
+    data = "".join("\t".join(_copy_value(value) for value in row) + "\n" for row in rows)
+    # 直接使用驱动连接执行 COPY，与 SQLAlchemy 处于同一个事务
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(sql, io.StringIO(data))
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(data)
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def _reset_sequences(conn: Connection, tables: List[Table]) -> None:
+    """把 PostgreSQL 自增序列推进到表中的最大ID"""
+    for table in tables:
+        column = table.autoincrement_column
+        if column is None:
+            continue
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence(:table, :column), "
+                f"coalesce(max({column.name}), 1), max({column.name}) IS NOT NULL) FROM {table.name}"
+            ),
+            {"table": table.name, "column": column.name}
+        )
+
+
+def import_database(source: Engine, target: Engine, batch_size: int = None) -> Dict[str, int]:
+    """
+    把源库的全部数据导入目标库
+
+    Args:
+        source: 源库引擎
+        target: 目标库引擎（导入前必须为空）
+        batch_size: 每批读取和写入的行数，默认 DB_EXPORT_BATCH_SIZE
+
+    Returns:
+        表名 -> 导入的行数
+
+    Raises:
+        ValueError: 目标库已有数据
+    """
+    batch_size = batch_size or settings.DB_EXPORT_BATCH_SIZE
+    run_migrations(source)
+    run_backfills(source)
+    run_migrations(target)
+
+    tables = Base.metadata.sorted_tables
+    counts = {}
+    with target.begin() as target_conn, source.connect() as source_conn:
+        if target_conn.execute(select(func.count()).select_from(Conversation.__table__)).scalar():
+            raise ValueError("目标数据库已有数据，只能导入到空数据库")
+        if target_conn.dialect.name == "postgresql":
+            # 源库保存的是不带时区的 UTC 时间；批量导入不受语句超时限制
+            target_conn.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+            target_conn.execute(text("SET LOCAL statement_timeout = 0"))
+
+        for table in tables:
+            start = time.monotonic()
+            result = source_conn.execution_options(yield_per=batch_size)\
+                .execute(select(table).order_by(*table.primary_key.columns))
+            counts[table.name] = sum(copy_rows(target_conn, table, rows) for rows in result.partitions())
+            logger.info(
+                "database_table_imported",
+                table=table.name,
+                rows=counts[table.name],
+                duration_ms=round((time.monotonic() - start) * 1000, 2)
+            )
+
+        if target_conn.dialect.name == "postgresql":
+            _reset_sequences(target_conn, tables)
+
+    # 目标库的回填在导入的数据上执行（数据已是最新格式时只做检查）
+    run_backfills(target)
+    return counts
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口"""
+    from app.infrastructure.database.connection import engine
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("用法: python -m app.infrastructure.database.transfer <源数据库URL>")
+        return 2
+
+    source = create_engine(argv[0])
+    try:
+        counts = import_database(source, engine)
+    except ValueError as e:
+        print(f"导入失败: {e}")
+        return 1
+    finally:
+        source.dispose()
+    for name, count in counts.items():
+        print(f"{name}: {count} 行")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,12 +7,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import uuid
 from app.config import settings
 from app.infrastructure.logging.setup import get_logger
-from app.infrastructure.database.connection import engine, Base
-from app.api.v1 import conversations, messages, chat, agent
+from app.infrastructure.database.connection import async_engine, async_writer_engine, run_sync_writes
+from app.infrastructure.database.migrations import backfill_in_background, run_migrations
+from app.infrastructure.database.retention import retention_loop
+from app.api.v1 import conversations, messages, chat, agent, search
 
 logger = get_logger(__name__)
 
@@ -30,133 +33,29 @@ async def lifespan(app: FastAPI):
         environment=settings.ENVIRONMENT
     )
     
-    # 创建数据库表（如果不存在）
-    Base.metadata.create_all(bind=engine)
-    logger.info("database_tables_created")
+    # 数据库迁移：版本已是最新时只有一次版本查询；大表回填在后台分批执行
+    # 迁移、回填和归档都在进程内唯一的写连接上执行
+    await run_sync_writes(run_migrations)
+    backfill_task = asyncio.create_task(backfill_in_background())
     
-    # 检查并迁移数据库（添加user_id字段）
-    try:
-        from sqlalchemy import inspect, text
-        import uuid
-        
-        inspector = inspect(engine)
-        if 'conversations' in inspector.get_table_names():
-            columns = [col['name'] for col in inspector.get_columns('conversations')]
-            
-            if 'user_id' not in columns:
-                logger.info("database_migration_starting", migration="add_user_id")
-                
-                # 执行迁移（SQLite需要autocommit模式执行DDL）
-                with engine.begin() as conn:
-                    # 获取现有会话数量
-                    result = conn.execute(text("SELECT COUNT(*) FROM conversations"))
-                    count = result.scalar()
-                    logger.info("migration_existing_conversations", count=count)
-                    
-                    if count > 0:
-                        # 为所有旧会话分配默认用户ID
-                        default_user_id = str(uuid.uuid4())
-                        logger.info("migration_default_user_id", user_id=default_user_id)
-                        
-                        # 创建新表
-                        conn.execute(text("""
-                            CREATE TABLE conversations_new (
-                                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                user_id VARCHAR(36) NOT NULL,
-                                title VARCHAR(255) NOT NULL DEFAULT '新对话',
-                                created_at DATETIME NOT NULL,
-                                updated_at DATETIME NOT NULL
-                            )
-                        """))
-                        
-                        # 迁移数据
-                        conn.execute(text(f"""
-                            INSERT INTO conversations_new (id, user_id, title, created_at, updated_at)
-                            SELECT id, '{default_user_id}', title, created_at, updated_at
-                            FROM conversations
-                        """))
-                        
-                        # 删除旧表，重命名新表
-                        conn.execute(text("DROP TABLE conversations"))
-                        conn.execute(text("ALTER TABLE conversations_new RENAME TO conversations"))
-                        
-                        # 创建索引
-                        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_conversations_user_id ON conversations(user_id)"))
-                        
-                        logger.info("database_migration_completed", migrated_conversations=count)
-                    else:
-                        # 没有数据，直接添加字段
-                        conn.execute(text("ALTER TABLE conversations ADD COLUMN user_id VARCHAR(36)"))
-                        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_conversations_user_id ON conversations(user_id)"))
-                        logger.info("database_migration_completed", migrated_conversations=0)
-            else:
-                logger.debug("database_migration_not_needed", reason="user_id_column_exists")
-    except Exception as e:
-        logger.error("database_migration_failed", error=str(e), error_type=type(e).__name__)
-        # 不阻止应用启动，但记录错误
-    
-    # 检查并迁移数据库（添加conversation_type字段）
-    try:
-        from sqlalchemy import inspect, text
-        
-        inspector = inspect(engine)
-        if 'conversations' in inspector.get_table_names():
-            columns = [col['name'] for col in inspector.get_columns('conversations')]
-            
-            if 'conversation_type' not in columns:
-                logger.info("database_migration_starting", migration="add_conversation_type")
-                
-                # 执行迁移（SQLite需要autocommit模式执行DDL）
-                with engine.begin() as conn:
-                    # 获取现有会话数量
-                    result = conn.execute(text("SELECT COUNT(*) FROM conversations"))
-                    count = result.scalar()
-                    logger.info("migration_existing_conversations", count=count)
-                    
-                    if count > 0:
-                        # 创建新表结构（包含conversation_type字段）
-                        conn.execute(text("""
-                            CREATE TABLE conversations_new (
-                                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                user_id VARCHAR(36) NOT NULL,
-                                title VARCHAR(255) NOT NULL DEFAULT '新对话',
-                                conversation_type VARCHAR(20) NOT NULL DEFAULT 'chat',
-                                created_at DATETIME NOT NULL,
-                                updated_at DATETIME NOT NULL
-                            )
-                        """))
-                        
-                        # 迁移数据：为所有现有会话设置默认类型为 'chat'
-                        conn.execute(text("""
-                            INSERT INTO conversations_new (id, user_id, title, conversation_type, created_at, updated_at)
-                            SELECT id, user_id, title, 'chat', created_at, updated_at
-                            FROM conversations
-                        """))
-                        
-                        # 删除旧表，重命名新表
-                        conn.execute(text("DROP TABLE conversations"))
-                        conn.execute(text("ALTER TABLE conversations_new RENAME TO conversations"))
-                        
-                        # 创建索引
-                        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_conversations_user_id ON conversations(user_id)"))
-                        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_conversations_conversation_type ON conversations(conversation_type)"))
-                        
-                        logger.info("database_migration_completed", migrated_conversations=count, migration="add_conversation_type")
-                    else:
-                        # 没有数据，直接添加字段
-                        conn.execute(text("ALTER TABLE conversations ADD COLUMN conversation_type VARCHAR(20) NOT NULL DEFAULT 'chat'"))
-                        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_conversations_conversation_type ON conversations(conversation_type)"))
-                        logger.info("database_migration_completed", migrated_conversations=0, migration="add_conversation_type")
-            else:
-                logger.debug("database_migration_not_needed", reason="conversation_type_column_exists")
-    except Exception as e:
-        logger.error("database_migration_failed", error=str(e), error_type=type(e).__name__, migration="add_conversation_type")
-        # 不阻止应用启动，但记录错误
+    # 定期归档不活跃会话的消息并回收数据库空间
+    retention_task = asyncio.create_task(retention_loop()) if settings.RETENTION_ENABLED else None
     
     yield
     
     # 关闭时执行
     logger.info("application_shutting_down")
+    
+    # 等后台任务回滚并归还写连接后再关闭连接池，否则回滚会卡在已关闭的连接上
+    background_tasks = [task for task in (backfill_task, retention_task) if task is not None]
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    
+    # 关闭异步连接池（aiosqlite 连接在后台线程中运行）
+    for pool_engine in (async_engine, async_writer_engine):
+        if pool_engine is not None:
+            await pool_engine.dispose()
 
 
 # ==================== 创建 FastAPI 应用 ====================
@@ -274,6 +173,7 @@ app.include_router(conversations.router, prefix=settings.API_V1_PREFIX)
 app.include_router(messages.router, prefix=settings.API_V1_PREFIX)
 app.include_router(chat.router, prefix=settings.API_V1_PREFIX)
 app.include_router(agent.router, prefix=settings.API_V1_PREFIX)
+app.include_router(search.router, prefix=settings.API_V1_PREFIX)
 
 
 # ==================== 基础端点 ====================
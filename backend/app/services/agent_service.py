@@ -2,18 +2,20 @@
 智能体服务层
 集成Agent工具调用功能，支持多模型选择
 """
+import asyncio
 import os
 import sys
 from pathlib import Path
 from textwrap import dedent
 from typing import AsyncGenerator, Dict, Generator, List, Any, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.infrastructure.database.repositories import (
-    ConversationRepository,
-    MessageRepository
+from app.infrastructure.database.async_repositories import (
+    AsyncConversationRepository,
+    AsyncMessageRepository,
+    AsyncUnitOfWork
 )
 from app.infrastructure.logging.setup import get_logger
 
@@ -21,6 +23,8 @@ from app.infrastructure.logging.setup import get_logger
 # Agent 默认配置
 AGENT_MAX_TOOL_ITERATIONS = 10
 AGENT_TEMPERATURE = 0.7
+# ArXiv工具的延迟预算（秒）：超时后智能体不再等待，后台请求完成后结果仍会写入缓存
+ARXIV_TOOL_LATENCY_BUDGET = 20.0
 
 # Agent系统提示词
 AGENT_SYSTEM_PROMPT = dedent("""
@@ -33,6 +37,7 @@ AGENT_SYSTEM_PROMPT = dedent("""
     4. 提取用户上传PDF的文本并进行摘要/要点整理（使用 extract_pdf_text）
     5. 分析CSV表格结构并输出关键统计（使用 analyze_csv_file）
     6. 从会议纪要中提取行动项和截止时间（使用 extract_action_items）
+    7. 检索ArXiv学术论文（search_arxiv_papers 关键词检索，get_arxiv_papers 按ID获取详情，recent_arxiv_papers 获取分类最新论文）
 
     重要原则：
     1. 工具调用结果说明：当你调用RSS获取工具时，由于网络原因部分RSS源可能失败，这是正常现象。只要成功获取了部分文章（如6/11个源成功），就应该基于这些结果进行分析和回答，而不是重复调用。
@@ -118,6 +123,7 @@ try:
     from agents import Agent, AgentConfig
     from agents.rss_tools import RSS_TOOLS_DEFINITIONS
     from agents.document_tools import DOCUMENT_TOOLS_DEFINITIONS
+    from agents.arxiv_tools import ARXIV_TOOLS_DEFINITIONS
 except ImportError as e:
     # Docker环境下可能需要不同的路径
     agents_path = backend_path / "agents"
@@ -126,6 +132,7 @@ except ImportError as e:
         from agents import Agent, AgentConfig
         from agents.rss_tools import RSS_TOOLS_DEFINITIONS
         from agents.document_tools import DOCUMENT_TOOLS_DEFINITIONS
+        from agents.arxiv_tools import ARXIV_TOOLS_DEFINITIONS
     else:
         raise ImportError(f"无法导入agents模块: {e}\n路径: {backend_path}")
 
@@ -135,10 +142,10 @@ logger = get_logger(__name__)
 class AgentService:
     """智能体服务 - 支持工具调用和多模型选择"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.conversation_repo = ConversationRepository(db)
-        self.message_repo = MessageRepository(db)
+        self.conversation_repo = AsyncConversationRepository(db)
+        self.message_repo = AsyncMessageRepository(db)
         # 使用字典缓存不同模型的 Agent 实例
         self._agents: Dict[str, Agent] = {}
     
@@ -220,13 +227,17 @@ class AgentService:
         self._register_rss_tools(agent)
         # 注册文档工具
         self._register_document_tools(agent)
+        # 注册ArXiv工具
+        self._register_arxiv_tools(agent)
         
         logger.info(
             "智能体已初始化",
             model_provider=model_provider,
             model_name=model_config["model_name"],
             api_base=api_base,
-            tools_count=len(RSS_TOOLS_DEFINITIONS) + len(DOCUMENT_TOOLS_DEFINITIONS)
+            tools_count=(
+                len(RSS_TOOLS_DEFINITIONS) + len(DOCUMENT_TOOLS_DEFINITIONS) + len(ARXIV_TOOLS_DEFINITIONS)
+            )
         )
         
         return agent
@@ -243,7 +254,8 @@ class AgentService:
                 name=tool_def["name"],
                 description=tool_def["description"],
                 parameters=tool_def["parameters"],
-                function=tool_def["function"]
+                function=tool_def["function"],
+                timeout=tool_def.get("timeout")
             )
 
     def _register_document_tools(self, agent: Agent) -> None:
@@ -260,6 +272,22 @@ class AgentService:
                 parameters=tool_def["parameters"],
                 function=tool_def["function"]
             )
+
+    def _register_arxiv_tools(self, agent: Agent) -> None:
+        """
+        注册ArXiv工具到智能体（异步执行，带延迟预算）
+
+        Args:
+            agent: 智能体实例
+        """
+        for tool_def in ARXIV_TOOLS_DEFINITIONS:
+            agent.register_tool(
+                name=tool_def["name"],
+                description=tool_def["description"],
+                parameters=tool_def["parameters"],
+                function=tool_def["function"],
+                timeout=ARXIV_TOOL_LATENCY_BUDGET
+            )
     
     async def chat_stream(
         self,
@@ -285,20 +313,28 @@ class AgentService:
         # 使用默认模型如果未指定
         model_provider = model_provider or DEFAULT_AGENT_MODEL
         
-        # 验证会话是否存在且属于当前用户
-        conversation = self.conversation_repo.get_by_id(conversation_id, user_id=user_id)
+        # 保存用户消息并读取对话历史（同一事务，一次提交）
+        async with AsyncUnitOfWork(self.db) as uow:
+            # 验证会话是否存在且属于当前用户
+            conversation = await uow.conversations.lookup(conversation_id, user_id=user_id)
+            if conversation:
+                if conversation.archived:
+                    await uow.conversations.restore_archive(conversation_id)
+                await uow.messages.create(
+                    conversation_id=conversation_id,
+                    role="user",
+                    content=user_message,
+                    thinking_mode=False
+                )
+                recent_messages = await uow.messages.get_recent_messages(
+                    conversation_id=conversation_id,
+                    limit=settings.MAX_CONVERSATION_HISTORY
+                )
+        
         if not conversation:
             yield {"type": "error", "content": "会话不存在或无权访问"}
             return
         
-        # 保存用户消息
-        self.message_repo.create(
-            conversation_id=conversation_id,
-            role="user",
-            content=user_message,
-            thinking_mode=False
-        )
-        
         logger.info(
             "agent_chat_started",
             conversation_id=conversation_id,
@@ -306,12 +342,6 @@ class AgentService:
             message_length=len(user_message)
         )
         
-        # 获取对话历史
-        recent_messages = self.message_repo.get_recent_messages(
-            conversation_id=conversation_id,
-            limit=settings.MAX_CONVERSATION_HISTORY
-        )
-        
         # 构建对话历史（Agent格式）
         messages = [
             {"role": msg.role, "content": msg.content}
@@ -324,11 +354,17 @@ class AgentService:
         
         try:
             agent = self._get_agent(model_provider)
-            
-            for chunk in self._process_agent_stream(
+            stream = self._process_agent_stream(
                 agent.chat_stream(messages, thinking_enabled=thinking_enabled),
                 tool_calls_info
-            ):
+            )
+            
+            while True:
+                # 模型调用和工具执行（包括等待 ArXiv 等慢工具）都是同步阻塞的，
+                # 在线程中逐块推进，事件循环上的其他流式请求不受影响
+                chunk = await asyncio.to_thread(next, stream, None)
+                if chunk is None:
+                    break
                 if chunk.get("type") == "error":
                     yield chunk
                     return
@@ -340,7 +376,7 @@ class AgentService:
                 yield chunk
             
             # 保存助手回复和更新会话
-            self._save_conversation_response(
+            await self._save_conversation_response(
                 conversation_id=conversation_id,
                 response=full_response
             )
@@ -427,26 +463,26 @@ class AgentService:
                 yield {"type": "error", "content": chunk_content}
                 return
     
-    def _save_conversation_response(
+    async def _save_conversation_response(
         self,
         conversation_id: int,
         response: str
     ) -> None:
         """
-        保存助手回复并更新会话时间戳
+        保存助手回复并更新会话时间戳（一次提交）
         
         Args:
             conversation_id: 会话ID
             response: 助手回复内容
         """
-        self.message_repo.create(
-            conversation_id=conversation_id,
-            role="assistant",
-            content=response,
-            thinking_mode=False
-        )
-        
-        self.conversation_repo.update_timestamp(conversation_id)
+        async with AsyncUnitOfWork(self.db) as uow:
+            await uow.messages.create(
+                conversation_id=conversation_id,
+                role="assistant",
+                content=response,
+                thinking_mode=False
+            )
+            await uow.conversations.update_timestamp(conversation_id)
     
     async def generate_title(
         self,
@@ -468,7 +504,7 @@ class AgentService:
         try:
             title = self._extract_title_from_message(first_message)
             
-            self.conversation_repo.update_title(
+            await self.conversation_repo.update_title(
                 conversation_id,
                 title,
                 user_id=user_id
@@ -489,7 +525,7 @@ class AgentService:
                 error=str(e)
             )
             # 失败时使用默认标题
-            self.conversation_repo.update_title(
+            await self.conversation_repo.update_title(
                 conversation_id,
                 DEFAULT_CONVERSATION_TITLE,
                 user_id=user_id
@@ -3,10 +3,11 @@
 封装聊天相关的业务逻辑
 """
 from typing import AsyncGenerator, Dict
-from sqlalchemy.orm import Session
-from app.infrastructure.database.repositories import (
-    ConversationRepository,
-    MessageRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.async_repositories import (
+    AsyncConversationRepository,
+    AsyncMessageRepository,
+    AsyncUnitOfWork
 )
 from app.infrastructure.llm.llm_factory import LLMFactory
 from app.config import settings
@@ -18,10 +19,10 @@ logger = get_logger(__name__)
 class ChatService:
     """聊天服务"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.conversation_repo = ConversationRepository(db)
-        self.message_repo = MessageRepository(db)
+        self.conversation_repo = AsyncConversationRepository(db)
+        self.message_repo = AsyncMessageRepository(db)
     
     async def chat_stream(
         self,
@@ -44,20 +45,28 @@ class ChatService:
         Yields:
             流式响应数据
         """
-        # 验证会话是否存在且属于当前用户
-        conversation = self.conversation_repo.get_by_id(conversation_id, user_id=user_id)
+        # 保存用户消息并读取对话历史（同一事务，一次提交）
+        async with AsyncUnitOfWork(self.db) as uow:
+            # 验证会话是否存在且属于当前用户
+            conversation = await uow.conversations.lookup(conversation_id, user_id=user_id)
+            if conversation:
+                if conversation.archived:
+                    await uow.conversations.restore_archive(conversation_id)
+                await uow.messages.create(
+                    conversation_id=conversation_id,
+                    role="user",
+                    content=user_message,
+                    thinking_mode=thinking_enabled
+                )
+                recent_messages = await uow.messages.get_recent_messages(
+                    conversation_id=conversation_id,
+                    limit=settings.MAX_CONVERSATION_HISTORY
+                )
+        
         if not conversation:
             yield {"type": "error", "content": "会话不存在或无权访问"}
             return
         
-        # 保存用户消息
-        self.message_repo.create(
-            conversation_id=conversation_id,
-            role="user",
-            content=user_message,
-            thinking_mode=thinking_enabled
-        )
-        
         logger.info(
             "chat_started",
             conversation_id=conversation_id,
@@ -66,12 +75,6 @@ class ChatService:
             message_length=len(user_message)
         )
         
-        # 获取对话历史
-        recent_messages = self.message_repo.get_recent_messages(
-            conversation_id=conversation_id,
-            limit=settings.MAX_CONVERSATION_HISTORY
-        )
-        
         # 构建对话历史
         conversations = [
             {"role": msg.role, "content": msg.content}
@@ -103,20 +106,16 @@ class ChatService:
                     yield {"type": "error", "content": chunk_content}
                     return
             
-            # 保存助手回复
-            final_content = full_response
-            if full_thinking and thinking_enabled:
-                final_content = f"[THINKING]{full_thinking}[/THINKING]{full_response}"
-            
-            self.message_repo.create(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=final_content,
-                thinking_mode=thinking_enabled
-            )
-            
-            # 更新会话时间戳
-            self.conversation_repo.update_timestamp(conversation_id)
+            # 保存助手回复并更新会话时间戳（一次提交）；思考过程单独存列，不混入回复内容
+            async with AsyncUnitOfWork(self.db) as uow:
+                await uow.messages.create(
+                    conversation_id=conversation_id,
+                    role="assistant",
+                    content=full_response,
+                    thinking_mode=thinking_enabled,
+                    thinking=full_thinking if thinking_enabled and full_thinking else None
+                )
+                await uow.conversations.update_timestamp(conversation_id)
             
             # 发送完成信号
             yield {"type": "done"}
@@ -157,7 +156,7 @@ class ChatService:
             title = await llm_client.generate_title(first_message)
             
             # 更新会话标题
-            self.conversation_repo.update_title(conversation_id, title, user_id=user_id)
+            await self.conversation_repo.update_title(conversation_id, title, user_id=user_id)
             
             logger.info(
                 "title_generated",
@@ -175,5 +174,5 @@ class ChatService:
             )
             # 失败时使用消息前缀
             fallback_title = first_message[:15]
-            self.conversation_repo.update_title(conversation_id, fallback_title, user_id=user_id)
+            await self.conversation_repo.update_title(conversation_id, fallback_title, user_id=user_id)
             return fallback_title
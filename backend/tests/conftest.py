@@ -2,12 +2,14 @@
 Pytest 配置文件
 定义测试 fixtures 和配置
 """
+import asyncio
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from app.main import app
-from app.infrastructure.database.connection import Base, get_db
+from app.infrastructure.database.connection import Base, get_async_db, get_db, to_async_url
 from app.config import Settings, get_settings
 
 
@@ -25,16 +27,25 @@ def get_test_settings():
     )
 
 
+@pytest.fixture(autouse=True)
+def clear_conversation_cache():
+    """会话缓存是进程级单例，每个测试使用独立的数据库，测试前清空"""
+    from app.infrastructure.cache.conversation_cache import get_conversation_cache
+    get_conversation_cache().clear()
+
+
 # ==================== 数据库 Fixtures ====================
 
 @pytest.fixture(scope="function")
-def test_db():
+def test_db_url(tmp_path):
+    """测试数据库 URL（临时文件，同步会话和异步会话访问同一份数据）"""
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture(scope="function")
+def test_db(test_db_url):
     """创建测试数据库"""
-    # 使用内存数据库
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False}
-    )
+    engine = create_engine(test_db_url, connect_args={"check_same_thread": False})
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
     # 创建表
@@ -45,11 +56,11 @@ def test_db():
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def client(test_db):
+def client(test_db, test_db_url):
     """创建测试客户端"""
     def override_get_db():
         try:
@@ -57,16 +68,26 @@ def client(test_db):
         finally:
             pass
     
+    # 写入和流式路径使用异步会话
+    async_engine = create_async_engine(to_async_url(test_db_url))
+    async_session_factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+    
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
+    
     def override_get_settings():
         return get_test_settings()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     app.dependency_overrides[get_settings] = override_get_settings
     
     with TestClient(app) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()
+    asyncio.run(async_engine.dispose())
 
 
 # ==================== 数据 Fixtures ====================
@@ -76,7 +97,7 @@ def sample_conversation(test_db):
     """创建示例会话"""
     from app.infrastructure.database.repositories import ConversationRepository
     repo = ConversationRepository(test_db)
-    return repo.create(title="测试会话")
+    return repo.create(title="测试会话", user_id="test-user")
 
 
 @pytest.fixture
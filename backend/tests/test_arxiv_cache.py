@@ -0,0 +1,101 @@
+"""
+测试ArXiv本地缓存与离线回放
+"""
+import pytest
+import requests
+
+from tools.arxiv_fetcher import ArxivCache, ArxivFetcher, ArxivPaper, RateLimiter
+
+
+def _papers(count: int):
+    return [
+        ArxivPaper(arxiv_id=f"2501.{i:05d}v1", title=f"论文{i}", summary=f"摘要{i}", authors=["作者"])
+        for i in range(count)
+    ]
+
+
+class CountingFetcher(ArxivFetcher):
+    """记录网络请求次数，可模拟网络故障"""
+
+    def __init__(self, cache, offline=False):
+        super().__init__(rate_limiter=RateLimiter(min_interval=0), cache=cache, offline=offline)
+        self.papers = _papers(20)
+        self.network_calls = 0
+        self.fail = False
+
+    def fetch_page(self, query, start, max_results, sort_by="relevance", sort_order="descending"):
+        self.network_calls += 1
+        if self.fail:
+            raise requests.exceptions.ConnectionError("网络不可用")
+        return self.papers[start:start + max_results], len(self.papers)
+
+
+def test_cache_roundtrip_and_prefix(tmp_path):
+    cache = ArxivCache(tmp_path / "arxiv.db")
+    papers = _papers(5)
+    cache.put_query("all:llm", 5, "relevance", "descending", papers)
+
+    assert cache.get_query("all:llm", 5, "relevance", "descending") == papers
+    assert cache.get_query("  all:llm ", 3, "relevance", "descending") == papers[:3]
+    assert cache.get_query("all:llm", 10, "relevance", "descending") is None
+    assert cache.get_query("all:llm", 5, "submittedDate", "descending") is None
+    assert cache.get_paper("2501.00002v1") == papers[2]
+
+
+def test_short_result_list_satisfies_larger_request(tmp_path):
+    cache = ArxivCache(tmp_path / "arxiv.db")
+    cache.put_query("ti:rare", 10, "relevance", "descending", _papers(2))
+
+    assert len(cache.get_query("ti:rare", 20, "relevance", "descending")) == 2
+
+
+def test_ttl_expiry(tmp_path):
+    cache = ArxivCache(tmp_path / "arxiv.db", ttl=60)
+    cache.put_query("all:llm", 5, "relevance", "descending", _papers(5), now=1000)
+
+    assert cache.get_query("all:llm", 5, "relevance", "descending", now=1059) is not None
+    assert cache.get_query("all:llm", 5, "relevance", "descending", now=1061) is None
+    assert cache.get_query("all:llm", 5, "relevance", "descending", allow_stale=True, now=1061) is not None
+
+
+def test_repeated_search_served_from_cache(tmp_path):
+    fetcher = CountingFetcher(ArxivCache(tmp_path / "arxiv.db"))
+
+    first = fetcher.search("all:llm", max_results=10)
+    second = fetcher.search("all:llm", max_results=10)
+
+    assert fetcher.network_calls == 1
+    assert not first.from_cache and second.from_cache
+    assert [p.arxiv_id for p in second.papers] == [p.arxiv_id for p in first.papers]
+
+
+def test_offline_replay_and_network_fallback(tmp_path):
+    cache = ArxivCache(tmp_path / "arxiv.db", ttl=0)
+    CountingFetcher(cache).search("all:llm", max_results=5)
+
+    offline = CountingFetcher(cache, offline=True)
+    assert len(offline.search("all:llm", max_results=5).papers) == 5
+    with pytest.raises(LookupError):
+        offline.search("all:other", max_results=5)
+    assert offline.network_calls == 0
+
+    # 过期结果在网络失败时回放
+    online = CountingFetcher(cache)
+    online.fail = True
+    assert online.search("all:llm", max_results=5).from_cache
+    with pytest.raises(requests.RequestException):
+        online.search("all:other", max_results=5)
+
+
+
+def test_paginated_search_falls_back_to_stale_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr("tools.arxiv_fetcher.fetcher.MAX_SINGLE_REQUEST", 5)
+    monkeypatch.setattr("tools.arxiv_fetcher.harvester.time.sleep", lambda seconds: None)
+    cache = ArxivCache(tmp_path / "arxiv.db", ttl=0)
+    CountingFetcher(cache).search("all:llm", max_results=12)
+
+    online = CountingFetcher(cache)
+    online.fail = True
+    result = online.search("all:llm", max_results=12)
+
+    assert result.from_cache and len(result.papers) == 12
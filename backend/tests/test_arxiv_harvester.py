@@ -0,0 +1,140 @@
+"""
+测试ArXiv分页采集、请求限速与检查点续采
+"""
+import pytest
+import requests
+
+from tools.arxiv_fetcher import ArxivFetcher, ArxivHarvester, RateLimiter
+
+TOTAL = 23
+
+
+def _feed(start: int, size: int, total: int = TOTAL) -> str:
+    entries = "".join(
+        f"<entry><id>http://arxiv.org/abs/2501.{i:05d}v1</id><title>论文{i}</title>"
+        f"<summary>摘要{i}</summary><author><name>作者{i}</name></author>"
+        f'<category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/></entry>'
+        for i in range(start, min(start + size, total))
+    )
+    return (
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        f"<opensearch:totalResults>{total}</opensearch:totalResults>{entries}</feed>"
+    )
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.body = text.encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        return iter([self.body[i:i + 100] for i in range(0, len(self.body), 100)])
+
+
+class FakeSession:
+    """按 start/max_results 返回分页结果，可指定某次请求失败"""
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.requests = []
+        self.count = 0
+
+    def get(self, url, params, timeout, stream=False):
+        self.count += 1
+        self.requests.append((params["start"], params["max_results"]))
+        if self.count in self.fail_on:
+            raise requests.exceptions.ConnectionError("连接被重置")
+        return FakeResponse(_feed(params["start"], params["max_results"]))
+
+    def close(self):
+        pass
+
+
+def _harvester(session, **kwargs):
+    fetcher = ArxivFetcher(rate_limiter=RateLimiter(min_interval=0))
+    fetcher.session = session
+    kwargs.setdefault("retry_backoff", 0)
+    return ArxivHarvester(fetcher, page_size=10, **kwargs)
+
+
+def test_rate_limiter_spaces_requests():
+    now = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(min_interval=3, clock=lambda: now[0], sleep=sleep)
+    limiter.wait()
+    now[0] += 1
+    limiter.wait()
+    limiter.wait()
+
+    assert sleeps == [2, 3]
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_harvest_paginates_in_order(prefetch):
+    session = FakeSession()
+    papers = list(_harvester(session, prefetch=prefetch).harvest("cat:cs.CL"))
+
+    assert [p.title for p in papers] == [f"论文{i}" for i in range(TOTAL)]
+    assert sorted(session.requests) == [(0, 10), (10, 10), (20, 3)]
+
+
+def test_harvest_respects_max_results():
+    session = FakeSession()
+    papers = list(_harvester(session).harvest("cat:cs.CL", max_results=15))
+
+    assert len(papers) == 15
+    assert session.requests == [(0, 10), (10, 5)]
+
+
+def test_harvest_retries_failed_page():
+    session = FakeSession(fail_on={2})
+    papers = list(_harvester(session, prefetch=0).harvest("cat:cs.CL"))
+
+    assert len(papers) == TOTAL
+    assert session.requests == [(0, 10), (10, 10), (10, 10), (20, 3)]
+
+
+def test_resume_from_checkpoint(tmp_path):
+    checkpoint = tmp_path / "harvest.json"
+    session = FakeSession(fail_on={2, 3})
+    harvester = _harvester(session, prefetch=0, checkpoint_path=checkpoint, max_retries=1)
+
+    harvested = []
+    with pytest.raises(requests.exceptions.ConnectionError):
+        for paper in harvester.harvest("cat:cs.CL"):
+            harvested.append(paper)
+    assert len(harvested) == 10
+    assert checkpoint.exists()
+
+    session.requests.clear()
+    resumed = list(harvester.harvest("cat:cs.CL"))
+
+    assert [p.title for p in resumed] == [f"论文{i}" for i in range(10, TOTAL)]
+    assert session.requests[0] == (10, 10)
+    assert not checkpoint.exists()
+
+
+def test_large_search_is_paginated(monkeypatch):
+    monkeypatch.setattr("tools.arxiv_fetcher.fetcher.MAX_SINGLE_REQUEST", 10)
+    session = FakeSession()
+    fetcher = ArxivFetcher(rate_limiter=RateLimiter(min_interval=0))
+    fetcher.session = session
+
+    result = fetcher.search("cat:cs.CL", max_results=20)
+
+    assert len(result.papers) == 20
+    assert session.requests == [(0, 10), (10, 10)]
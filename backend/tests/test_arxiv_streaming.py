@@ -0,0 +1,70 @@
+"""
+测试ArXiv Atom流式解析
+"""
+import pytest
+import xml.etree.ElementTree as ET
+
+from tools.arxiv_fetcher import ArxivFetcher
+from tools.arxiv_fetcher.streaming import ArxivStreamParser, parse_atom_stream
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"
+      xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title>ArXiv Query</title>
+  <opensearch:totalResults>1234</opensearch:totalResults>
+  <entry>
+    <id>http://arxiv.org/abs/2501.00001v2</id>
+    <updated>2025-01-02T00:00:00Z</updated>
+    <published>2025-01-01T00:00:00Z</published>
+    <title>Attention
+      Is All You Need</title>
+    <summary>  摘要内容  </summary>
+    <author><name>Ashish Vaswani</name></author>
+    <author><name> Noam Shazeer </name><arxiv:affiliation>Google</arxiv:affiliation></author>
+    <link href="http://arxiv.org/abs/2501.00001v2" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2501.00001v2" rel="related" type="application/pdf"/>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom#primary"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2501.00002v1</id>
+    <title>第二篇</title>
+    <summary>摘要</summary>
+    <author><name>Noam Shazeer</name></author>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+  <entry><title>没有ID的条目</title></entry>
+</feed>""".encode("utf-8")
+
+
+def test_matches_tree_parser():
+    expected = ArxivFetcher()._parse_xml_response(FEED.decode("utf-8"))
+    parser = parse_atom_stream([FEED])
+
+    assert [p.to_dict() for p in parser.papers] == [p.to_dict() for p in expected]
+    assert parser.total_results == 1234
+    first = parser.papers[0]
+    assert first.authors == ["Ashish Vaswani", "Noam Shazeer"]
+    assert first.primary_category == "cs.LG"
+    assert first.pdf_url == "http://arxiv.org/pdf/2501.00001v2"
+    assert parser.papers[1].arxiv_url == "http://arxiv.org/abs/2501.00002v1"
+
+
+def test_chunk_boundaries_and_memory_release():
+    parser = ArxivStreamParser()
+    for i in range(0, len(FEED), 13):
+        parser.feed(FEED[i:i + 13])
+        # 已闭合的条目不留在文档树中
+        if parser._root is not None:
+            assert len(parser._root.findall("{http://www.w3.org/2005/Atom}entry")) <= 1
+    parser.close()
+
+    assert [p.arxiv_id for p in parser.papers] == ["2501.00001v2", "2501.00002v1"]
+    # 重复出现的作者名和分类共享同一个字符串对象
+    assert parser.papers[0].authors[1] is parser.papers[1].authors[0]
+    assert parser.papers[0].categories[0] is parser.papers[1].categories[0]
+
+
+def test_truncated_feed_raises_parse_error():
+    with pytest.raises(ET.ParseError):
+        parse_atom_stream([FEED[:len(FEED) // 2]])
@@ -0,0 +1,124 @@
+"""
+测试ArXiv智能体工具、异步工具执行与延迟预算
+"""
+import asyncio
+import time
+
+import pytest
+
+from agents import arxiv_tools
+from agents.tools import ToolRegistry
+from tools.arxiv_fetcher import ArxivCache, ArxivFetcher, ArxivPaper, RateLimiter
+
+
+def _paper(arxiv_id: str, summary: str = "摘要") -> ArxivPaper:
+    return ArxivPaper(
+        arxiv_id=arxiv_id,
+        title="Attention  Is\n All You Need",
+        summary=summary,
+        authors=["A", "B", "C", "D"],
+        published="2017-06-12T17:57:34Z",
+        arxiv_url=f"http://arxiv.org/abs/{arxiv_id}"
+    )
+
+
+class FakeFetcher(ArxivFetcher):
+    """记录网络请求，不访问ArXiv"""
+
+    def __init__(self, cache):
+        super().__init__(rate_limiter=RateLimiter(min_interval=0), cache=cache)
+        self.queries = []
+        self.id_requests = []
+
+    def fetch_page(self, query, start, max_results, sort_by="relevance", sort_order="descending"):
+        self.queries.append((query, sort_by))
+        return [_paper("2501.00001v1", "长" * 1000)], 1
+
+    def _request_feed(self, params):
+        self.id_requests.append(params["id_list"])
+        parser = type("Parser", (), {})()
+        parser.papers = [_paper(f"{i}v2") for i in params["id_list"].split(",") if i != "0000.00000"]
+        return parser
+
+
+@pytest.fixture
+def fetcher(tmp_path, monkeypatch):
+    fetcher = FakeFetcher(ArxivCache(tmp_path / "arxiv.db"))
+    monkeypatch.setattr(arxiv_tools, "_get_fetcher", lambda: fetcher)
+    return fetcher
+
+
+def test_search_projection_and_cache(fetcher):
+    first = asyncio.run(arxiv_tools.tool_search_arxiv_papers("diffusion models", max_results=100))
+    second = asyncio.run(arxiv_tools.tool_search_arxiv_papers("diffusion models", max_results=100))
+
+    assert first["success"] and first["query"] == "all:diffusion models"
+    paper = first["papers"][0]
+    assert paper["title"] == "Attention Is All You Need"
+    assert paper["authors"] == ["A", "B", "C", "等4人"]
+    assert paper["published"] == "2017-06-12"
+    assert len(paper["summary"]) == arxiv_tools.SUMMARY_MAX_CHARS
+    assert second["from_cache"]
+    assert len(fetcher.queries) == 1
+
+
+def test_recent_papers_by_category(fetcher):
+    result = asyncio.run(arxiv_tools.tool_recent_arxiv_papers("cs.CL", max_results=5))
+    assert result["success"] and result["category"] == "cs.CL"
+    assert fetcher.queries == [("cat:cs.CL", "submittedDate")]
+
+    invalid = asyncio.run(arxiv_tools.tool_recent_arxiv_papers("cs.CL OR all:x"))
+    assert not invalid["success"]
+
+
+def test_get_papers_by_id_uses_cache(fetcher):
+    ids = ["arXiv:1706.03762", "https://arxiv.org/abs/2301.12345", "0000.00000"]
+    first = asyncio.run(arxiv_tools.tool_get_arxiv_papers(ids))
+    second = asyncio.run(arxiv_tools.tool_get_arxiv_papers(["1706.03762"]))
+
+    assert [p["arxiv_id"] for p in first["papers"]] == ["1706.03762v2", "2301.12345v2"]
+    assert first["not_found"] == ["0000.00000"]
+    assert second["papers"][0]["arxiv_id"] == "1706.03762v2"
+    assert fetcher.id_requests == ["1706.03762,2301.12345,0000.00000"]
+
+
+def test_registry_runs_async_tools_within_budget():
+    async def slow_tool(delay: float):
+        await asyncio.sleep(delay)
+        return {"delay": delay}
+
+    registry = ToolRegistry()
+    registry.register("slow", "慢工具", {"type": "object", "properties": {}}, slow_tool, timeout=0.2)
+
+    assert registry.execute_tool("slow", {"delay": 0}) == {"delay": 0}
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        registry.execute_tool("slow", {"delay": 5})
+    assert time.monotonic() - start < 2
+
+
+def test_registry_budget_applies_to_sync_tools():
+    def blocking_tool(delay: float):
+        time.sleep(delay)
+        return "done"
+
+    registry = ToolRegistry()
+    registry.register("blocking", "同步工具", {"type": "object", "properties": {}}, blocking_tool, timeout=0.1)
+
+    assert registry.execute_tool("blocking", {"delay": 0}) == "done"
+    with pytest.raises(TimeoutError):
+        registry.execute_tool("blocking", {"delay": 0.5})
+
+
+def test_async_tool_callable_from_running_event_loop():
+    async def tool():
+        return "ok"
+
+    registry = ToolRegistry()
+    registry.register("tool", "异步工具", {"type": "object", "properties": {}}, tool)
+
+    async def agent_loop():
+        # 智能体循环是同步生成器，可能在事件循环线程中被迭代
+        return registry.execute_tool("tool", {})
+
+    assert asyncio.run(agent_loop()) == "ok"
@@ -0,0 +1,301 @@
+"""
+测试异步Repository与流式聊天路径的异步会话
+"""
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.infrastructure.cache.conversation_cache import get_conversation_cache
+from app.infrastructure.database import connection, retention
+from app.infrastructure.database.async_repositories import (
+    AsyncConversationRepository, AsyncMessageRepository, AsyncUnitOfWork
+)
+from app.infrastructure.database.connection import (
+    Base, RoutingSession, create_async_sqlite_engine, create_sqlite_engine, to_async_url
+)
+from app.infrastructure.database.repositories import MessageRepository
+from agents.tools import ToolRegistry
+from app.services import chat_service
+from app.services.agent_service import AgentService
+from app.services.chat_service import ChatService
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'chat.db'}"
+    sync_engine = create_sqlite_engine(url, writer=True)
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    return url
+
+
+def _run(db_url, scenario, stats=None):
+    """
+    在独立的异步引擎上运行场景，结束后释放连接
+
+    传入 stats 字典时统计写连接的提交次数和所有连接执行的语句数
+    """
+    async def main():
+        reader = create_async_sqlite_engine(db_url)
+        writer = create_async_sqlite_engine(db_url, writer=True)
+        if stats is not None:
+            stats.update(commits=0, statements=0)
+            event.listen(writer.sync_engine, "commit", lambda conn: stats.update(commits=stats["commits"] + 1))
+            for engine in (reader, writer):
+                event.listen(
+                    engine.sync_engine, "before_cursor_execute",
+                    lambda *args: stats.update(statements=stats["statements"] + 1)
+                )
+        factory = async_sessionmaker(
+            bind=reader, class_=AsyncSession, sync_session_class=RoutingSession,
+            expire_on_commit=False, autoflush=False, writer_bind=writer.sync_engine
+        )
+        try:
+            return await scenario(factory)
+        finally:
+            await reader.dispose()
+            await writer.dispose()
+    return asyncio.run(main())
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./chat_history.db") == "sqlite+aiosqlite:///./chat_history.db"
+    assert to_async_url("postgresql://u:p@db:5432/chat") == "postgresql+asyncpg://u:p@db:5432/chat"
+    assert to_async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_async_repositories_roundtrip(db_url):
+    async def scenario(factory):
+        async with factory() as db:
+            conversations = AsyncConversationRepository(db)
+            messages = AsyncMessageRepository(db)
+            conversation = await conversations.create(title="会话", user_id="u1")
+            for i in range(5):
+                await messages.create(conversation.id, "user" if i % 2 == 0 else "assistant", f"消息{i}")
+            recent = await messages.get_recent_messages(conversation.id, limit=3)
+            other_user = await conversations.get_by_id(conversation.id, user_id="u2")
+            updated = await conversations.update_title(conversation.id, "新标题", user_id="u1")
+            return conversation.id, [m.content for m in recent], other_user, updated.title
+
+    conversation_id, recent, other_user, title = _run(db_url, scenario)
+    assert recent == ["消息2", "消息3", "消息4"]
+    assert other_user is None and title == "新标题"
+
+    # 同步Repository读取同一个数据库
+    engine = create_sqlite_engine(db_url)
+    db = sessionmaker(bind=engine)()
+    try:
+        assert len(MessageRepository(db).get_by_conversation(conversation_id)) == 5
+    finally:
+        db.close()
+        engine.dispose()
+
+
+class FakeLLMClient:
+    """流式输出时让出事件循环，模拟等待模型响应"""
+
+    async def chat_stream(self, conversations, thinking_mode, model=None):
+        for word in ["你", "好"]:
+            await asyncio.sleep(0.01)
+            yield {"type": "content", "content": word}
+
+
+def test_concurrent_chat_streams(db_url, monkeypatch):
+    _patch_llm(monkeypatch)
+    streams = 10
+
+    async def scenario(factory):
+        async def one_stream(index):
+            async with factory() as db:
+                conversation = await AsyncConversationRepository(db).create(user_id=f"user-{index}")
+                chunks = [
+                    chunk async for chunk in ChatService(db).chat_stream(
+                        conversation.id, "你好", user_id=f"user-{index}"
+                    )
+                ]
+                history = await AsyncMessageRepository(db).get_by_conversation(conversation.id)
+                return chunks, [m.content for m in history]
+
+        return await asyncio.gather(*(one_stream(i) for i in range(streams)))
+
+    for chunks, history in _run(db_url, scenario):
+        assert chunks[-1] == {"type": "done"}
+        assert history == ["你好", "你好"]
+
+
+class FakeAgent:
+    """可选先调用一个耗时的 async 工具（与 ArXiv 工具相同，经 ToolRegistry 在工具事件循环中执行）"""
+
+    def __init__(self, tool_delay=0.0):
+        self.tool_started = threading.Event()
+        self.tools = ToolRegistry()
+
+        async def slow_tool():
+            self.tool_started.set()
+            await asyncio.sleep(tool_delay)
+            return "工具结果"
+
+        self.tools.register("slow_tool", "耗时工具", {"type": "object", "properties": {}}, slow_tool, timeout=5)
+        self.tool_delay = tool_delay
+
+    def chat_stream(self, messages, thinking_enabled=False):
+        if self.tool_delay:
+            yield {"type": "tool_call", "tool_name": "slow_tool", "tool_arguments": {}}
+            result = self.tools.execute_tool("slow_tool", {})
+            yield {"type": "tool_result", "tool_name": "slow_tool", "content": result}
+        yield {"type": "text", "content": "好"}
+        yield {"type": "done"}
+
+
+def test_agent_stream_progresses_while_tool_pending(db_url, monkeypatch):
+    agents = {"slow": FakeAgent(tool_delay=0.5), "fast": FakeAgent()}
+    monkeypatch.setattr(AgentService, "_get_agent", lambda self, model_provider=None: agents[model_provider])
+    finished = []
+
+    async def scenario(factory):
+        async def one_stream(provider):
+            async with factory() as db:
+                conversation = await AsyncConversationRepository(db).create(user_id=provider)
+                if provider == "fast":
+                    while not agents["slow"].tool_started.is_set():
+                        await asyncio.sleep(0.01)
+                chunks = [
+                    chunk async for chunk in AgentService(db).chat_stream(
+                        conversation.id, "你好", user_id=provider, model_provider=provider
+                    )
+                ]
+                finished.append(provider)
+                return chunks
+
+        return await asyncio.gather(one_stream("slow"), one_stream("fast"))
+
+    slow_chunks, fast_chunks = _run(db_url, scenario)
+
+    # 慢工具执行期间，另一个流照常完成
+    assert finished == ["fast", "slow"]
+    assert slow_chunks[-1] == fast_chunks[-1] == {"type": "done"}
+    assert any(chunk["type"] == "tool_result" for chunk in slow_chunks)
+
+
+def _patch_llm(monkeypatch):
+    monkeypatch.setattr(chat_service.LLMFactory, "get_client", staticmethod(lambda provider: FakeLLMClient()))
+    monkeypatch.setattr(chat_service.LLMFactory, "get_model_name", staticmethod(lambda provider: "fake"))
+
+
+def test_chat_turn_commits_once_per_phase(db_url, monkeypatch):
+    """一轮对话：逐条提交需要3次提交、8条语句；工作单元合并为2次提交、5条语句"""
+    _patch_llm(monkeypatch)
+
+    async def create_conversation(factory):
+        async with factory() as db:
+            return (await AsyncConversationRepository(db).create(user_id="u1")).id
+
+    conversation_id = _run(db_url, create_conversation)
+
+    async def per_call_commits(factory):
+        # 改造前的写入路径：每次写入各自提交并 refresh
+        async with factory() as db:
+            conversations, messages = AsyncConversationRepository(db), AsyncMessageRepository(db)
+            await conversations.get_by_id(conversation_id, user_id="u1")
+            await messages.create(conversation_id, "user", "你好")
+            await messages.get_recent_messages(conversation_id)
+            await messages.create(conversation_id, "assistant", "你好")
+            conversation = await conversations.get_by_id(conversation_id)
+            conversation.updated_at = datetime.utcnow()
+            await db.commit()
+
+    async def unit_of_work(factory):
+        async with factory() as db:
+            async for _ in ChatService(db).chat_stream(conversation_id, "你好", user_id="u1"):
+                pass
+
+    # 清空会话缓存，两条路径都从数据库读取归属和历史
+    before, after = {}, {}
+    get_conversation_cache().clear()
+    _run(db_url, per_call_commits, before)
+    get_conversation_cache().clear()
+    _run(db_url, unit_of_work, after)
+
+    assert before == {"commits": 3, "statements": 8}
+    assert after == {"commits": 2, "statements": 5}
+
+
+def test_unit_of_work_rolls_back_on_error(db_url):
+    async def scenario(factory):
+        async with factory() as db:
+            conversation_id = (await AsyncConversationRepository(db).create(user_id="u1")).id
+            with pytest.raises(RuntimeError):
+                async with AsyncUnitOfWork(db) as uow:
+                    await uow.messages.create(conversation_id, "assistant", "半条回复")
+                    raise RuntimeError("模型输出中断")
+            return await AsyncMessageRepository(db).get_by_conversation(conversation_id)
+
+    assert _run(db_url, scenario) == []
+
+
+def test_default_async_session_routes_writes():
+    session = connection.AsyncSessionLocal()
+    assert isinstance(session.sync_session, RoutingSession)
+    if connection.async_writer_engine is not None:
+        assert session.sync_session.writer_bind is connection.async_writer_engine.sync_engine
+
+
+def test_update_title_reads_on_writer(db_url):
+    async def scenario(factory):
+        reader, writer = factory.kw["bind"].sync_engine, factory.kw["writer_bind"]
+        selects = []
+        for engine in (reader, writer):
+            event.listen(
+                engine, "before_cursor_execute",
+                lambda conn, cursor, statement, *args: selects.append(conn.engine)
+                if statement.startswith("SELECT") else None
+            )
+        async with factory() as db:
+            conversation_id = (await AsyncConversationRepository(db).create(user_id="u1")).id
+            selects.clear()
+            await AsyncConversationRepository(db).update_title(conversation_id, "新标题", user_id="u1")
+        return selects, writer
+
+    selects, writer = _run(db_url, scenario)
+    # 写入前按ID读取会话也在写连接上（之后是提交后的 refresh）
+    assert selects[0] is writer
+
+
+def test_sync_writes_share_the_async_writer(db_url, monkeypatch):
+    stale = datetime(2020, 1, 1)
+    sync_engine = create_sqlite_engine(db_url, writer=True)
+    with sync_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO conversations (id, user_id, title, conversation_type, created_at, updated_at) "
+            "VALUES (1, 'u1', '旧会话', 'chat', ?, ?)", (stale, stale)
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO messages (conversation_id, role, content, thinking_mode, timestamp) "
+            "VALUES (1, 'user', '你好', 0, ?)", (stale,)
+        )
+    sync_engine.dispose()
+
+    async def main():
+        writer = create_async_sqlite_engine(db_url, writer=True)
+        monkeypatch.setattr(connection, "async_writer_engine", writer)
+        used = []
+
+        def run(engine):
+            used.append(engine)
+            return retention.run_retention(engine)
+
+        try:
+            return await connection.run_sync_writes(run), used, writer
+        finally:
+            await writer.dispose()
+
+    result, used, writer = asyncio.run(main())
+    # 归档和空间回收在异步写引擎的连接上执行（aiosqlite 驱动）
+    assert used == [writer.sync_engine]
+    assert result["archived_conversations"] == 1
+    assert "free_pages_after" in result
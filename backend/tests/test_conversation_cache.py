@@ -0,0 +1,182 @@
+"""
+测试会话读穿缓存：LRU与过期、缓冲区追加与并发加载、稳定对话不读数据库、写入后失效
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.cache import conversation_cache
+from app.infrastructure.cache.conversation_cache import CachedMessage, ConversationCache, get_conversation_cache
+from app.infrastructure.database.async_repositories import (
+    AsyncConversationRepository, AsyncMessageRepository, AsyncUnitOfWork
+)
+from app.infrastructure.database.connection import Base, create_sqlite_engine
+from app.infrastructure.database.repositories import ConversationRepository, MessageRepository
+from app.services import chat_service
+from app.services.chat_service import ChatService
+from tests.test_async_repositories import _run
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'chat.db'}"
+    engine = create_sqlite_engine(url, writer=True)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return url
+
+
+def _message(i):
+    return CachedMessage(i, "user", f"消息{i}")
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = ConversationCache(max_size=2, ttl=60, history_size=3)
+    cache.put(1, "u1", "chat")
+    cache.put(2, "u1", "chat")
+    cache.get(1)
+    cache.put(3, "u1", "chat")
+    assert cache.get(2) is None  # 最久未使用的被淘汰
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+    now = conversation_cache.time.monotonic()
+    monkeypatch.setattr(conversation_cache.time, "monotonic", lambda: now + 61)
+    assert cache.get(1) is None and cache.size() == 1
+
+
+def test_ring_buffer_and_concurrent_load():
+    cache = ConversationCache(max_size=10, ttl=60, history_size=3)
+    cache.put(1, "u1", "chat", recent=[])
+    for i in range(1, 5):
+        cache.append(1, _message(i))
+    cache.append(1, _message(4))  # 已在缓冲区中的消息跳过
+    assert [m.id for m in cache.recent(1, 3)] == [2, 3, 4]
+    assert [m.id for m in cache.recent(1, 2)] == [3, 4]
+    assert cache.recent(1, 4) is None  # 超出缓冲区容量需要读数据库
+
+    # 加载期间有新消息提交：放弃加载结果，下次重新读取
+    cache.put(2, "u1", "chat")
+    token = cache.load_token(2)
+    cache.append(2, _message(9))
+    cache.fill_recent(2, [_message(8)], token)
+    assert cache.recent(2, 3) is None
+    cache.fill_recent(2, [_message(8), _message(9)], cache.load_token(2))
+    assert [m.id for m in cache.recent(2, 3)] == [8, 9]
+
+    # 不在缓存中的会话不缓存加载结果
+    cache.fill_recent(3, [_message(1)], cache.load_token(3))
+    assert cache.get(3) is None
+
+
+def test_disabled_cache(monkeypatch):
+    monkeypatch.setattr(conversation_cache.settings, "CONVERSATION_CACHE_ENABLED", False)
+    monkeypatch.setattr(conversation_cache, "_conversation_cache", None)
+    cache = get_conversation_cache()
+    assert cache.put(1, "u1", "chat", recent=[]).user_id == "u1"
+    assert cache.get(1) is None and cache.recent(1, 1) is None
+
+
+class RecordingLLMClient:
+    """记录每轮收到的对话历史长度"""
+
+    def __init__(self):
+        self.history_lengths = []
+
+    async def chat_stream(self, conversations, thinking_mode, model=None):
+        self.history_lengths.append(len(conversations))
+        await asyncio.sleep(0)
+        yield {"type": "content", "content": "好的"}
+
+
+def test_steady_state_chat_turn_reads_nothing(db_url, monkeypatch):
+    """首轮之后，每轮对话只有写入语句：归属校验和历史读取全部命中缓存"""
+    llm = RecordingLLMClient()
+    monkeypatch.setattr(chat_service.LLMFactory, "get_client", staticmethod(lambda provider: llm))
+    monkeypatch.setattr(chat_service.LLMFactory, "get_model_name", staticmethod(lambda provider: "fake"))
+
+    async def scenario(factory):
+        async with factory() as db:
+            conversation_id = (await AsyncConversationRepository(db).create(user_id="u1")).id
+        selects = []
+        listener = lambda conn, cursor, statement, *args: selects.append(statement)
+        for turn in range(12):
+            async with factory() as db:
+                engine = db.bind.sync_engine
+                event.listen(engine, "before_cursor_execute", listener)
+                try:
+                    async for _ in ChatService(db).chat_stream(conversation_id, f"第{turn}轮", user_id="u1"):
+                        pass
+                finally:
+                    event.remove(engine, "before_cursor_execute", listener)
+        async with factory() as db:
+            history = await AsyncMessageRepository(db).get_by_conversation(conversation_id)
+        return selects, history
+
+    selects, history = _run(db_url, scenario)
+    assert [s for s in selects if s.lstrip().upper().startswith("SELECT")] == []
+    assert len(history) == 24
+    # 历史窗口与数据库一致：每轮多两条，直到 MAX_CONVERSATION_HISTORY
+    assert llm.history_lengths == [min(2 * turn + 1, 20) for turn in range(12)]
+
+
+def test_cache_miss_reloads_same_history(db_url):
+    engine = create_sqlite_engine(db_url, writer=True)
+    db = sessionmaker(bind=engine)()
+    try:
+        conversation_id = ConversationRepository(db).create(user_id="u1").id
+        for i in range(25):
+            MessageRepository(db).create(conversation_id, "user", f"消息{i}")
+        cached = MessageRepository(db).get_recent_messages(conversation_id, limit=20)
+
+        get_conversation_cache().clear()
+        assert ConversationRepository(db).lookup(conversation_id, "u1").archived is False
+        assert MessageRepository(db).get_recent_messages(conversation_id, limit=20) == cached
+        assert cached[0].content == "消息5" and cached[-1].content == "消息24"
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_ownership_and_invalidation(db_url):
+    engine = create_sqlite_engine(db_url, writer=True)
+    db = sessionmaker(bind=engine)()
+    try:
+        repo = ConversationRepository(db)
+        conversation_id = repo.create(user_id="u1").id
+        assert repo.lookup(conversation_id, "u2") is None
+        assert repo.lookup(conversation_id, "u1").user_id == "u1"
+
+        repo.update_title(conversation_id, "新标题", user_id="u1")
+        assert get_conversation_cache().get(conversation_id) is None
+        assert repo.lookup(conversation_id, "u1") is not None
+
+        repo.delete(conversation_id, user_id="u1")
+        assert repo.lookup(conversation_id, "u1") is None
+        assert repo.lookup(12345, "u1") is None
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_unit_of_work_updates_cache_only_after_commit(db_url):
+    async def scenario(factory):
+        async with factory() as db:
+            conversation_id = (await AsyncConversationRepository(db).create(user_id="u1")).id
+            async with AsyncUnitOfWork(db) as uow:
+                await uow.messages.create(conversation_id, "user", "你好")
+                # 未提交的消息已计入本工作单元读取的历史，但还没有进入缓存
+                assert [m.content for m in await uow.messages.get_recent_messages(conversation_id)] == ["你好"]
+                assert get_conversation_cache().recent(conversation_id, 20) == []
+            committed = get_conversation_cache().recent(conversation_id, 20)
+
+            with pytest.raises(RuntimeError):
+                async with AsyncUnitOfWork(db) as uow:
+                    await uow.messages.create(conversation_id, "assistant", "半条回复")
+                    raise RuntimeError("模型输出中断")
+            return [m.content for m in committed], get_conversation_cache().get(conversation_id)
+
+    committed, after_rollback = _run(db_url, scenario)
+    assert committed == ["你好"]
+    assert after_rollback is None  # 回滚后失效，下次从数据库重新加载
@@ -0,0 +1,158 @@
+"""
+测试版本化迁移：版本记录、迁移锁、旧数据库升级与分批回填
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.infrastructure.database import migrations
+from app.infrastructure.database.migrations import (
+    LEGACY_USER_ID, MIGRATIONS, current_version, pending_backfills, run_backfills, run_migrations
+)
+from app.infrastructure.database.models import Base
+
+LATEST = MIGRATIONS[-1].version
+
+# 添加 user_id 之前的表结构
+LEGACY_SCHEMA = """
+CREATE TABLE conversations (id INTEGER PRIMARY KEY AUTOINCREMENT, title VARCHAR(255) NOT NULL,
+    created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL);
+CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, conversation_id INTEGER NOT NULL,
+    role VARCHAR(20) NOT NULL, content TEXT NOT NULL, thinking_mode BOOLEAN, timestamp DATETIME NOT NULL);
+CREATE INDEX ix_messages_conversation_id ON messages (conversation_id);
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "chat.db"
+
+
+@pytest.fixture
+def engine(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    yield engine
+    engine.dispose()
+
+
+def _legacy_db(db_path, conversations=7):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO conversations (title, created_at, updated_at) VALUES (?, '2025-01-01', '2025-01-01')",
+        [(f"旧会话{i}",) for i in range(conversations)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _indexes(engine):
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"))}
+
+
+def test_fresh_database(engine):
+    assert run_migrations(engine) == [m.version for m in MIGRATIONS]
+    assert current_version(engine) == LATEST
+    assert {"conversations", "messages", "schema_version"} <= set(inspect(engine).get_table_names())
+    assert run_backfills(engine) == {2: 0, 5: 0, 6: 0, 7: 0, 9: 0}
+    assert pending_backfills(engine) == []
+
+
+def test_migrations_build_the_model_schema(engine):
+    # 迁移写死了各自的 DDL：依次执行后的结构必须与当前模型一致，模型变化时需要新增迁移
+    run_migrations(engine)
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        assert {col["name"] for col in inspector.get_columns(table.name)} == {col.name for col in table.columns}
+        assert {index["name"] for index in inspector.get_indexes(table.name)} == {index.name for index in table.indexes}
+
+
+def test_up_to_date_startup_skips_lock(engine, monkeypatch):
+    run_migrations(engine)
+
+    def no_lock(engine):
+        raise AssertionError("版本已是最新时不应获取迁移锁")
+
+    monkeypatch.setattr(migrations, "migration_lock", no_lock)
+    assert run_migrations(engine) == []
+
+
+def test_legacy_database_upgrade(db_path, engine):
+    _legacy_db(db_path)
+
+    run_migrations(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT user_id, conversation_type FROM conversations")).all()
+    assert rows == [("", "chat")] * 7  # 结构迁移不改写数据
+    indexes = _indexes(engine)
+    assert {
+        "ix_conversations_user_updated", "ix_conversations_user_type_updated", "ix_messages_conversation_timestamp"
+    } <= indexes
+    assert "ix_messages_conversation_id" not in indexes
+
+    assert run_backfills(engine, batch_size=3) == {2: 7, 5: 0, 6: 0, 7: 0, 9: 0}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT DISTINCT user_id FROM conversations")).scalars().all() == [LEGACY_USER_ID]
+
+
+def test_backfill_resumes_after_interruption(db_path, engine, monkeypatch):
+    _legacy_db(db_path)
+    run_migrations(engine)
+
+    batches = []
+    original = migrations.batched_update
+
+    def interrupted(engine, sql, params, batch_size):
+        # 处理完第一批后中断
+        with engine.begin() as conn:
+            batches.append(conn.execute(text(sql), {**params, "batch_size": batch_size}).rowcount)
+        raise RuntimeError("进程被终止")
+
+    monkeypatch.setattr(migrations, "batched_update", interrupted)
+    with pytest.raises(RuntimeError):
+        run_backfills(engine, batch_size=2)
+    assert batches == [2]
+    assert [m.version for m in pending_backfills(engine)] == [2, 5, 6, 7, 9]
+
+    monkeypatch.setattr(migrations, "batched_update", original)
+    assert run_backfills(engine, batch_size=2) == {2: 5, 5: 0, 6: 0, 7: 0, 9: 0}
+    assert pending_backfills(engine) == []
+
+
+def test_concurrent_workers_migrate_once(db_path, monkeypatch):
+    _legacy_db(db_path)
+    applied = []
+    original_upgrade = migrations._add_user_id
+
+    def slow_upgrade(conn):
+        applied.append(threading.current_thread().name)
+        time.sleep(0.2)  # 持有迁移锁期间其他 worker 启动
+        original_upgrade(conn)
+
+    monkeypatch.setattr(MIGRATIONS[1], "upgrade", slow_upgrade)
+    engines = [create_engine(f"sqlite:///{db_path}") for _ in range(4)]
+    errors = []
+
+    def worker(engine):
+        try:
+            run_migrations(engine)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(e,), name=f"worker-{i}") for i, e in enumerate(engines)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(applied) == 1
+    with engines[0].connect() as conn:
+        versions = conn.execute(text("SELECT version FROM schema_version ORDER BY version")).scalars().all()
+    assert versions == [m.version for m in MIGRATIONS]
+    for engine in engines:
+        engine.dispose()
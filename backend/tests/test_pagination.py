@@ -0,0 +1,98 @@
+"""
+测试会话与消息的游标（keyset）分页
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.infrastructure.database.models import Conversation, Message
+from app.infrastructure.database.pagination import decode_cursor, encode_cursor
+from app.infrastructure.database.repositories import ConversationRepository, MessageRepository
+
+BASE_TIME = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def long_conversation(test_db):
+    conversation = Conversation(title="长会话", user_id="u1")
+    test_db.add(conversation)
+    test_db.flush()
+    # 每两条消息共用一个时间戳，验证 id 作为并列排序键
+    test_db.add_all([
+        Message(conversation_id=conversation.id, role="user", content=f"消息{i}", timestamp=BASE_TIME + timedelta(seconds=i // 2))
+        for i in range(25)
+    ])
+    test_db.commit()
+    return conversation
+
+
+def _cursor(row):
+    return encode_cursor(row.timestamp, row.id)
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(BASE_TIME, 42)) == (BASE_TIME, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("不是游标")
+
+
+def test_message_pages_walk_backwards(test_db, long_conversation):
+    repo = MessageRepository(test_db)
+
+    page = repo.list_page(long_conversation.id, limit=10)
+    assert [m.content for m in page.items] == [f"消息{i}" for i in range(15, 25)]
+    assert page.has_more
+
+    seen = [m.content for m in page.items]
+    while page.has_more:
+        page = repo.list_page(long_conversation.id, limit=10, before=_cursor(page.items[0]))
+        seen = [m.content for m in page.items] + seen
+    assert seen == [f"消息{i}" for i in range(25)]
+
+
+def test_message_pages_after_cursor(test_db, long_conversation):
+    repo = MessageRepository(test_db)
+    oldest = repo.list_page(long_conversation.id, limit=25).items[0]
+
+    page = repo.list_page(long_conversation.id, limit=10, after=_cursor(oldest))
+    assert [m.content for m in page.items] == [f"消息{i}" for i in range(1, 11)]
+    assert page.has_more
+
+    newest = repo.list_page(long_conversation.id, limit=1).items[0]
+    assert repo.list_page(long_conversation.id, after=_cursor(newest)).items == []
+    with pytest.raises(ValueError):
+        repo.list_page(long_conversation.id, before=_cursor(newest), after=_cursor(oldest))
+
+
+def test_conversation_pages(test_db):
+    test_db.add_all([
+        Conversation(title=f"会话{i}", user_id="u1", conversation_type="agent" if i % 3 == 0 else "chat",
+                     updated_at=BASE_TIME + timedelta(minutes=i))
+        for i in range(10)
+    ] + [Conversation(title="其他用户", user_id="u2", updated_at=BASE_TIME)])
+    test_db.commit()
+    repo = ConversationRepository(test_db)
+
+    first = repo.list_page("u1", limit=4)
+    second = repo.list_page("u1", limit=4, cursor=encode_cursor(first.items[-1].updated_at, first.items[-1].id))
+    third = repo.list_page("u1", limit=4, cursor=encode_cursor(second.items[-1].updated_at, second.items[-1].id))
+    titles = [c.title for page in (first, second, third) for c in page.items]
+    assert titles == [f"会话{i}" for i in range(9, -1, -1)]
+    assert first.has_more and second.has_more and not third.has_more
+
+    agents = repo.list_page("u1", conversation_type="agent")
+    assert [c.title for c in agents.items] == ["会话9", "会话6", "会话3", "会话0"]
+
+
+def test_messages_endpoint_returns_cursors(client, test_db, long_conversation):
+    client.cookies.set("visitor_id", "u1")
+    url = f"/api/conversations/{long_conversation.id}/messages"
+
+    latest = client.get(url, params={"limit": 5}).json()
+    assert [m["content"] for m in latest["messages"]] == [f"消息{i}" for i in range(20, 25)]
+    assert latest["has_more"]
+
+    older = client.get(url, params={"limit": 5, "before": latest["before_cursor"]}).json()
+    assert [m["content"] for m in older["messages"]] == [f"消息{i}" for i in range(15, 20)]
+
+    assert client.get(url, params={"before": "无效"}).status_code == 400
@@ -0,0 +1,85 @@
+"""
+测试热点查询的执行计划：必须命中索引，不能全表扫描或使用临时B树排序
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.database.connection import Base
+from app.infrastructure.database.models import Conversation, Message
+from app.infrastructure.database.pagination import encode_cursor
+from app.infrastructure.database.repositories import ConversationRepository, MessageRepository
+
+CURSOR = encode_cursor(datetime(2026, 1, 1), 10)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Conversation(id=1, title="会话", user_id="u1"))
+    session.add(Message(conversation_id=1, role="user", content="消息"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _captured_plans(db, run_query):
+    """执行仓库方法，返回其中每条 SELECT 语句的执行计划"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run_query()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert statements
+    connection = db.connection()
+    return [
+        [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()]
+        for sql, params in statements
+    ]
+
+
+HOT_QUERIES = {
+    "conversations_all": (lambda db: ConversationRepository(db).get_all(user_id="u1"), "ix_conversations_user_updated"),
+    "conversations_by_type": (
+        lambda db: ConversationRepository(db).get_all(user_id="u1", conversation_type="chat"),
+        "ix_conversations_user_type_updated"
+    ),
+    "conversations_page": (
+        lambda db: ConversationRepository(db).list_page("u1", cursor=CURSOR, conversation_type="agent"),
+        "ix_conversations_user_type_updated"
+    ),
+    "messages_all": (lambda db: MessageRepository(db).get_by_conversation(1), "ix_messages_conversation_timestamp"),
+    "messages_recent": (lambda db: MessageRepository(db).get_recent_messages(1), "ix_messages_conversation_timestamp"),
+    "messages_before": (lambda db: MessageRepository(db).list_page(1, before=CURSOR), "ix_messages_conversation_timestamp"),
+    "messages_after": (lambda db: MessageRepository(db).list_page(1, after=CURSOR), "ix_messages_conversation_timestamp"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_composite_index(db, name):
+    run_query, index_name = HOT_QUERIES[name]
+    plans = _captured_plans(db, lambda: run_query(db))
+
+    for plan in plans:
+        detail = " | ".join(plan)
+        assert "SCAN" not in detail, detail
+        assert "TEMP B-TREE" not in detail, detail
+    assert any(index_name in " | ".join(plan) for plan in plans), plans
+
+
+def test_lookup_by_id_uses_primary_key(db):
+    plans = _captured_plans(db, lambda: ConversationRepository(db).get_by_id(1, user_id="u1"))
+    assert all("PRIMARY KEY" in " | ".join(plan) for plan in plans), plans
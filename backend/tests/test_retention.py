@@ -0,0 +1,247 @@
+"""
+测试消息保留：归档与恢复、思考过程拆列、增量空间回收
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.database import retention
+from app.infrastructure.database.connection import Base, create_sqlite_engine
+from app.infrastructure.database.migrations import run_backfills, run_migrations
+from app.infrastructure.database.models import Conversation, Message, MessageArchive
+from app.infrastructure.database.repositories import ConversationRepository, MessageRepository
+from app.services import chat_service
+from app.services.chat_service import ChatService
+from tests.test_async_repositories import _run
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'chat.db'}"
+    engine = create_sqlite_engine(url, writer=True)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def engine(db_url):
+    engine = create_sqlite_engine(db_url, writer=True)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def _conversation(db, title, updated_at, messages=3):
+    conversation = ConversationRepository(db).create(title=title, user_id="u1")
+    for i in range(messages):
+        MessageRepository(db).create(
+            conversation.id, "assistant", f"{title}-回复{i}", thinking_mode=True, thinking=f"思考{i}" * 100
+        )
+    db.execute(
+        text("UPDATE conversations SET updated_at = :updated_at WHERE id = :id"),
+        {"updated_at": updated_at, "id": conversation.id}
+    )
+    db.commit()
+    return conversation.id
+
+
+def test_compress_roundtrip(monkeypatch):
+    data = "消息内容".encode("utf-8") * 100
+    codec, payload = retention.compress(data)
+    assert codec == ("zstd" if retention.zstandard else "zlib") and len(payload) < len(data)
+    assert retention.decompress(codec, payload) == data
+
+    monkeypatch.setattr(retention, "zstandard", None)
+    codec, payload = retention.compress(data)
+    assert codec == "zlib" and retention.decompress(codec, payload) == data
+    with pytest.raises(RuntimeError):
+        retention.decompress("zstd", b"")
+
+
+def test_archive_and_restore_roundtrip(session_factory):
+    old = datetime.utcnow() - timedelta(days=200)
+    with session_factory() as db:
+        stale_id = _conversation(db, "旧会话", old)
+        active_id = _conversation(db, "新会话", datetime.utcnow())
+        before = MessageRepository(db).list_page(stale_id).items
+
+    assert retention.archive_stale_conversations(session_factory, older_than_days=90) == 1
+    assert retention.archive_stale_conversations(session_factory, older_than_days=90) == 0
+
+    with session_factory() as db:
+        stale = db.get(Conversation, stale_id)
+        assert stale.archived_at is not None
+        assert stale.updated_at.replace(tzinfo=None) == old  # 归档不改变会话的更新时间
+        assert db.query(Message).filter(Message.conversation_id == stale_id).count() == 0
+        assert db.query(Message).filter(Message.conversation_id == active_id).count() == 3
+        archive = db.get(MessageArchive, stale_id)
+        assert archive.message_count == 3 and len(archive.payload) < archive.raw_size
+
+        assert ConversationRepository(db).restore_archive(stale_id) == 3
+        assert stale.archived_at is None
+        assert db.get(MessageArchive, stale_id) is None
+        # 恢复后消息ID、时间和思考过程不变，之前的分页游标仍然有效
+        assert MessageRepository(db).list_page(stale_id).items == before
+        assert before[0].thinking == "思考0" * 100
+
+
+def test_viewed_conversation_is_not_archived_again(session_factory):
+    old = datetime.utcnow() - timedelta(days=200)
+    with session_factory() as db:
+        stale_id = _conversation(db, "旧会话", old)
+    assert retention.archive_stale_conversations(session_factory, older_than_days=90) == 1
+
+    # 只查看不写入：恢复时记录访问时间，updated_at 不变
+    with session_factory() as db:
+        ConversationRepository(db).restore_archive(stale_id)
+        conversation = db.get(Conversation, stale_id)
+        assert conversation.updated_at.replace(tzinfo=None) == old
+        assert conversation.accessed_at is not None
+    assert retention.archive_stale_conversations(session_factory, older_than_days=90) == 0
+
+    # 访问之后再过一个保留期才重新归档
+    later = datetime.utcnow() + timedelta(days=91)
+    assert retention.archive_stale_conversations(session_factory, older_than_days=90, now=later) == 1
+
+
+def test_archive_keeps_messages_written_after_read(session_factory, db_url, monkeypatch):
+    old = datetime.utcnow() - timedelta(days=200)
+    with session_factory() as db:
+        stale_id = _conversation(db, "旧会话", old)
+    original = retention.compress
+
+    def compress_with_concurrent_write(data):
+        # 读出消息之后、删除之前，另一个连接写入新消息
+        conn = sqlite3.connect(db_url.removeprefix("sqlite:///"))
+        conn.execute(
+            "INSERT INTO messages (conversation_id, role, content, thinking_mode, timestamp) VALUES (?, 'user', '新消息', 0, ?)",
+            (stale_id, datetime.utcnow().isoformat(sep=" "))
+        )
+        conn.commit()
+        conn.close()
+        return original(data)
+
+    monkeypatch.setattr(retention, "compress", compress_with_concurrent_write)
+    with session_factory() as db:
+        assert retention.archive_conversation(db, stale_id) == 3
+        db.commit()
+        remaining = db.query(Message).filter(Message.conversation_id == stale_id).all()
+        assert [m.content for m in remaining] == ["新消息"]
+        assert db.get(MessageArchive, stale_id).message_count == 3
+
+
+def test_conversation_touched_after_scan_is_skipped(session_factory, monkeypatch):
+    old = datetime.utcnow() - timedelta(days=200)
+    with session_factory() as db:
+        stale_id = _conversation(db, "旧会话", old)
+        touched_id = _conversation(db, "刚被访问的会话", datetime.utcnow())
+    scans = iter([[stale_id, touched_id], []])
+    # 扫描结果中的会话在归档前已有新消息（updated_at 已更新）
+    monkeypatch.setattr(retention, "_stale_conversation_ids", lambda db, cutoff, limit: next(scans))
+
+    assert retention.archive_stale_conversations(session_factory, older_than_days=90) == 1
+    with session_factory() as db:
+        assert db.get(Conversation, touched_id).archived_at is None
+        assert db.get(MessageArchive, touched_id) is None
+        assert db.query(Message).filter(Message.conversation_id == touched_id).count() == 3
+        assert db.get(Conversation, stale_id).archived_at is not None
+
+
+def test_thinking_column_is_deferred(session_factory):
+    with session_factory() as db:
+        conversation_id = _conversation(db, "会话", datetime.utcnow(), messages=1)
+        db.expunge_all()
+        message = MessageRepository(db).get_by_conversation(conversation_id)[0]
+        assert "thinking" not in message.__dict__
+        assert message.thinking == "思考0" * 100
+
+
+def test_chat_stream_restores_archived_conversation(db_url, session_factory, monkeypatch):
+    class ThinkingLLMClient:
+        async def chat_stream(self, conversations, thinking_mode, model=None):
+            yield {"type": "thinking", "content": "先想一想"}
+            yield {"type": "content", "content": f"收到{len(conversations)}条"}
+
+    monkeypatch.setattr(chat_service.LLMFactory, "get_client", staticmethod(lambda provider: ThinkingLLMClient()))
+    monkeypatch.setattr(chat_service.LLMFactory, "get_model_name", staticmethod(lambda provider: "fake"))
+
+    with session_factory() as db:
+        conversation_id = _conversation(db, "旧会话", datetime.utcnow() - timedelta(days=200), messages=2)
+    retention.archive_stale_conversations(session_factory, older_than_days=90)
+
+    async def scenario(factory):
+        async with factory() as db:
+            return [
+                chunk async for chunk in ChatService(db).chat_stream(
+                    conversation_id, "你好", thinking_enabled=True, user_id="u1"
+                )
+            ]
+
+    chunks = _run(db_url, scenario)
+    assert {"type": "delta", "content": "收到3条"} in chunks  # 历史包含恢复的2条消息
+
+    with session_factory() as db:
+        assert db.get(Conversation, conversation_id).archived_at is None
+        last = MessageRepository(db).list_page(conversation_id).items[-1]
+        assert (last.content, last.thinking) == ("收到3条", "先想一想")
+
+
+def test_thinking_backfill_splits_legacy_content(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        run_migrations(engine)
+        run_backfills(engine)
+        conn = sqlite3.connect(db_path)
+        conn.execute("DROP TABLE message_archives")
+        conn.execute("ALTER TABLE messages DROP COLUMN thinking")
+        conn.execute("ALTER TABLE conversations DROP COLUMN archived_at")
+        conn.execute("DELETE FROM schema_version WHERE version >= 5")
+        conn.execute(
+            "INSERT INTO conversations (id, title, user_id, conversation_type, created_at, updated_at) "
+            "VALUES (1, '旧会话', 'u1', 'chat', '2025-01-01', '2025-01-01')"
+        )
+        conn.executemany(
+            "INSERT INTO messages (conversation_id, role, content, thinking_mode, timestamp) "
+            "VALUES (1, 'assistant', ?, 1, '2025-01-01')",
+            [("[THINKING]想法[/THINKING]回答",), ("[THINKING]没有结束标记",), ("普通回答",)] * 3
+        )
+        conn.commit()
+        conn.close()
+
+        assert run_migrations(engine) == [5, 6, 7, 8, 9]
+        windows = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, params, *args: (
+            windows.append(params) if "LIKE '[THINKING]%'" in statement else None
+        ))
+        assert run_backfills(engine, batch_size=2) == {5: 6, 6: 0, 7: 0, 9: 0}  # 消息写入时已由触发器编入全文索引
+        # 按ID分段推进，每批只检查两条消息，不从头重新扫描
+        assert [tuple(params) for params in windows] == [(0, 2), (2, 4), (4, 6), (6, 8), (8, 9)]
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT content, thinking FROM messages ORDER BY id LIMIT 3")).all()
+        assert [tuple(row) for row in rows] == [
+            ("回答", "想法"), ("[THINKING]没有结束标记", ""), ("普通回答", None)
+        ]
+    finally:
+        engine.dispose()
+
+
+def test_incremental_vacuum_reclaims_free_pages(session_factory, engine):
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2  # 新数据库为增量模式
+
+    with session_factory() as db:
+        _conversation(db, "旧会话", datetime.utcnow() - timedelta(days=200), messages=200)
+    retention.archive_stale_conversations(session_factory, older_than_days=90)
+
+    result = retention.vacuum(engine)
+    assert result["free_pages_before"] > 0
+    assert result["free_pages_after"] == 0
@@ -0,0 +1,62 @@
+"""
+测试RSS缓存文件的原子写入与多格式读取
+"""
+import pytest
+
+from tools.rss_fetcher import cache_store
+from tools.rss_fetcher.cache_store import get_cache_format, load_cache_file, save_cache_file
+
+CACHE_DATA = {
+    "summary": {"cached_articles": 1, "generated_at": "2025-06-03T12:00:00"},
+    "articles": [{"title": "新闻", "link": "https://example.com/1", "published_ts": 1748912400, "categories": []}]
+}
+
+needs_msgpack = pytest.mark.skipif(cache_store.msgpack is None, reason="未安装msgpack")
+
+
+def test_json_is_compact_and_roundtrips(tmp_path):
+    path = tmp_path / "rss_cache.json"
+    save_cache_file(CACHE_DATA, path)
+
+    assert load_cache_file(path) == CACHE_DATA
+    assert "\n" not in path.read_text(encoding="utf-8")
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@needs_msgpack
+def test_msgpack_roundtrips(tmp_path):
+    path = tmp_path / "rss_cache.msgpack"
+    save_cache_file(CACHE_DATA, path)
+
+    assert load_cache_file(path) == CACHE_DATA
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "rss_cache.json"
+    save_cache_file(CACHE_DATA, path)
+
+    with pytest.raises(TypeError):
+        save_cache_file({"articles": [object()]}, path)
+
+    assert load_cache_file(path) == CACHE_DATA
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_corrupt_file_raises_value_error(tmp_path):
+    path = tmp_path / "rss_cache.json"
+    path.write_text('{"articles": [', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_cache_file(path)
+
+
+def test_cache_format_from_env(monkeypatch):
+    monkeypatch.delenv("RSS_CACHE_FORMAT", raising=False)
+    assert get_cache_format() == "json"
+
+    monkeypatch.setenv("RSS_CACHE_FORMAT", "MsgPack")
+    assert get_cache_format() == ("msgpack" if cache_store.msgpack else "json")
+
+    monkeypatch.setenv("RSS_CACHE_FORMAT", "xml")
+    with pytest.raises(ValueError):
+        get_cache_format()
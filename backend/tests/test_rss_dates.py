@@ -0,0 +1,63 @@
+"""
+测试RSS发布日期的解析与排序
+"""
+import time
+
+from agents import rss_tools
+from tools.rss_cache_job import sort_articles_by_date
+from tools.rss_fetcher import RSSArticle, RSSParser, parse_published_ts
+
+RSS_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>测试源</title>
+<item><title>北京早报</title><link>https://example.com/1</link>
+<pubDate>Tue, 03 Jun 2025 09:00:00 +0800</pubDate></item>
+<item><title>伦敦晚报</title><link>https://example.com/2</link>
+<pubDate>Tue, 03 Jun 2025 02:30:00 +0000</pubDate></item>
+<item><title>没有日期</title><link>https://example.com/3</link></item>
+</channel></rss>"""
+
+
+def test_parse_published_ts_converts_to_utc():
+    utc = parse_published_ts("Tue, 03 Jun 2025 01:00:00 +0000")
+    assert parse_published_ts("Tue, 03 Jun 2025 09:00:00 +0800") == utc
+    assert parse_published_ts("2025-06-03T01:00:00Z") == utc
+    assert parse_published_ts("2025-06-03T01:00:00") == utc
+    assert parse_published_ts("不是日期") is None
+    assert parse_published_ts(None) is None
+
+
+def test_parser_precomputes_timestamp():
+    articles = RSSParser.parse(RSS_FEED, "测试源")
+
+    assert articles[0].published_ts == parse_published_ts("Tue, 03 Jun 2025 01:00:00 +0000")
+    assert articles[2].published_ts is None
+
+
+def test_sort_orders_across_timezones():
+    articles = RSSParser.parse(RSS_FEED, "测试源")
+    # 旧缓存中的文章没有时间戳，排序时按日期字符串兜底
+    articles.append(RSSArticle(title="旧数据", link="https://example.com/4", description="",
+                               pub_date="2025-06-03T03:00:00+00:00"))
+
+    titles = [a.title for a in sort_articles_by_date(articles)]
+
+    assert titles == ["旧数据", "伦敦晚报", "北京早报", "没有日期"]
+    # 排序不修改文章
+    assert articles[-1].published_ts is None
+
+
+def test_fetch_tool_time_window(monkeypatch):
+    now = int(time.time())
+    cached = {
+        "summary": {},
+        "articles": [
+            {"title": "新", "published_ts": now - 3600},
+            {"title": "旧", "published_ts": now - 3 * 86400},
+            {"title": "无日期", "published_ts": None},
+        ]
+    }
+    monkeypatch.setattr(rss_tools, "_load_cached_articles", lambda: cached)
+
+    result = rss_tools.tool_fetch_rss_news(since_hours=24)
+
+    assert [a["title"] for a in result["articles"]] == ["新"]
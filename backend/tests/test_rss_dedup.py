@@ -0,0 +1,75 @@
+"""
+测试RSS文章去重
+"""
+from tools.rss_fetcher import RSSArticle, canonicalize_url, deduplicate_articles
+
+
+def _make_article(link: str, title: str, description: str = "", source: str = "测试源") -> RSSArticle:
+    return RSSArticle(title=title, link=link, description=description, source=source)
+
+
+def test_canonicalize_url_ignores_tracking_and_formatting():
+    assert canonicalize_url("https://www.example.com/news/1/?utm_source=rss&id=2&a=1#top") == \
+        canonicalize_url("http://example.com/news/1?a=1&id=2")
+    assert canonicalize_url("https://example.com/news/1?id=2") != \
+        canonicalize_url("https://example.com/news/1?id=3")
+    assert canonicalize_url("") == canonicalize_url("  ") == canonicalize_url(None) == ""
+
+
+def test_articles_without_link_not_merged():
+    articles = [
+        _make_article("", "AI芯片出货量创新高", "芯片厂商公布季度数据。", "源A"),
+        _make_article("", "春运首日全国铁路发送旅客超千万人次", "铁路部门加开列车。", "源B"),
+    ]
+
+    result = deduplicate_articles(articles)
+
+    assert [a.title for a in result] == [a.title for a in articles]
+    assert [a.sources for a in result] == [["源A"], ["源B"]]
+
+
+def test_same_url_merged_with_sources():
+    articles = [
+        _make_article("https://example.com/a?utm_medium=feed", "AI芯片出货量创新高", "短摘要", "源A"),
+        _make_article("http://www.example.com/a", "AI芯片出货量创新高", "更完整的摘要内容", "源B"),
+    ]
+
+    result = deduplicate_articles(articles)
+
+    assert len(result) == 1
+    assert result[0].description == "更完整的摘要内容"
+    assert result[0].sources == ["源A", "源B"]
+
+
+def test_near_duplicate_reprints_merged():
+    description = "新华社北京6月3日电 国务院总理李强日前签署国务院令，公布《政务数据共享条例》，自2025年8月1日起施行。"
+    articles = [
+        _make_article("https://a.com/1", "李强签署国务院令 公布《政务数据共享条例》", description, "源A"),
+        _make_article("https://b.com/2", "公布《政务数据共享条例》", "<p>" + description + "</p>", "源B"),
+        _make_article("https://c.com/3", "春运首日全国铁路发送旅客超千万人次", "铁路部门加开列车。", "源C"),
+    ]
+
+    result = deduplicate_articles(articles)
+
+    assert [a.sources for a in result] == [["源A", "源B"], ["源C"]]
+
+
+def test_shared_boilerplate_not_merged():
+    boilerplate = "<p>Matrix 首页推荐</p><p>Matrix 是少数派的写作社区，我们主张分享真实的产品体验。</p>"
+    articles = [
+        _make_article("https://sspai.com/post/1", "让背单词像抽卡一样快乐", boilerplate),
+        _make_article("https://sspai.com/post/2", "纯代码从零复刻片头动画", boilerplate),
+    ]
+
+    assert len(deduplicate_articles(articles)) == 2
+
+
+def test_order_preserved():
+    articles = [_make_article(f"https://example.com/{i}", title) for i, title in enumerate(
+        ["央行宣布降准", "新能源汽车销量增长", "央行宣布降准", "量子计算取得突破"]
+    )]
+
+    result = deduplicate_articles(articles)
+
+    assert [a.title for a in result] == ["央行宣布降准", "新能源汽车销量增长", "量子计算取得突破"]
+    assert deduplicate_articles([]) == []
@@ -0,0 +1,231 @@
+"""
+测试RSS筛选服务的异步流式筛选
+"""
+import asyncio
+import json
+
+import pytest
+
+from tools import rss_filter_service
+from tools.rss_filter_service import (
+    AdaptiveConcurrencyLimiter,
+    RSSArticle,
+    RSSFilterService,
+    RelevanceScoreCache,
+    TokenBucket,
+    estimate_tokens
+)
+
+
+def _make_article(index: int, title: str, description: str = "") -> RSSArticle:
+    return RSSArticle(
+        title=title,
+        link=f"https://example.com/{index}",
+        description=description,
+        source="测试源"
+    )
+
+
+def _chunks(text: str, size: int = 16):
+    """模拟流式输出：把完整回复切成小块"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _match_all(conversations, thinking="disabled", response_format=None):
+    prompt = conversations[-1]["content"]
+    articles_info = json.loads(prompt.split("新闻列表：")[1].split("筛选要求：")[0])
+    matched = [
+        {"index": info["index"], "relevance_score": 7, "relevance_reason": "相关"}
+        for info in articles_info
+    ]
+    return _chunks(json.dumps({"matched_articles": matched}, ensure_ascii=False))
+
+
+def _make_service(**kwargs) -> RSSFilterService:
+    kwargs.setdefault("use_score_cache", False)
+    kwargs.setdefault("lexical_prefilter", False)
+    return RSSFilterService(**kwargs)
+
+
+async def _collect(stream):
+    return [article async for article in stream]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("人工智能") == 4
+    assert estimate_tokens("abcdefgh") == 2
+
+
+def test_pack_batches_respects_token_budget():
+    service = _make_service()
+    short = [_make_article(i, f"短标题{i}") for i in range(30)]
+    long = [_make_article(i, f"长文{i}", "很长的描述" * 60) for i in range(30)]
+
+    short_batches = service._pack_batches_by_tokens("AI", short, 6, token_budget=2000)
+    long_batches = service._pack_batches_by_tokens("AI", long, 6, token_budget=2000)
+
+    assert len(short_batches) < len(long_batches)
+    assert sum(len(batch) for batch, _ in long_batches) == 30
+    assert all(tokens <= 2000 for batch, tokens in long_batches if len(batch) > 1)
+
+
+def test_token_bucket_reports_wait_time():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+    bucket.pause(1.0)
+    assert bucket.try_acquire() >= 1.0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_adapts():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8, target_latency=1.0)
+
+    await limiter.acquire()
+    await limiter.release(latency=0.1)
+    assert limiter.limit == 5
+
+    await limiter.acquire()
+    await limiter.release(latency=5.0)
+    assert limiter.limit == 4
+
+    await limiter.acquire()
+    await limiter.release(latency=0.1, throttled=True)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_all_matches(monkeypatch):
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", _match_all)
+    service = _make_service(max_workers=3, requests_per_minute=6000)
+    articles = [_make_article(i, f"新闻{i}", "描述" * 100) for i in range(25)]
+
+    results = await _collect(
+        service.filter_articles_stream("AI", articles, token_budget=1500)
+    )
+
+    assert sorted(a.link for a in results) == sorted(a.link for a in articles)
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_after_rate_limit(monkeypatch):
+    responses = [RuntimeError("Error code: 429 - rate limit exceeded")]
+
+    def flaky(conversations, thinking="disabled", response_format=None):
+        if responses:
+            raise responses.pop()
+        return _match_all(conversations, thinking)
+
+    monkeypatch.setattr(rss_filter_service, "RATE_LIMIT_BACKOFF", 0.01)
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", flaky)
+    service = _make_service(max_workers=4, requests_per_minute=6000)
+
+    results = await _collect(
+        service.filter_articles_stream("AI", [_make_article(0, "AI新闻")])
+    )
+
+    assert len(results) == 1
+    assert service._concurrency_hint < 4
+
+
+@pytest.mark.asyncio
+async def test_stream_can_stop_early(monkeypatch):
+    calls = []
+
+    def slow(conversations, thinking="disabled", response_format=None):
+        calls.append(1)
+        return _match_all(conversations, thinking)
+
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", slow)
+    service = _make_service(max_workers=1, requests_per_minute=6000)
+    articles = [_make_article(i, f"新闻{i}") for i in range(10)]
+
+    stream = service.filter_articles_stream("AI", articles, token_budget=300)
+    first = await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(0.05)
+
+    assert first.link.startswith("https://example.com/")
+    assert len(calls) < 10
+
+
+def test_rate_limit_detection_is_narrow():
+    assert rss_filter_service.is_rate_limited("[ERROR] Error code: 429 - rate limit exceeded")
+    assert rss_filter_service.is_rate_limited("[ERROR] {'code': '1302', 'message': '您当前使用该API的并发数过高'}")
+    assert not rss_filter_service.is_rate_limited("[ERROR] 并发处理失败")
+    assert not rss_filter_service.is_rate_limited("[ERROR] prompt too long: 1302 tokens")
+    assert not rss_filter_service.is_rate_limited("[ERROR] read timeout after 429ms")
+    assert not rss_filter_service.is_rate_limited('{"matched_articles": []}')
+
+
+def _cached_articles():
+    return [
+        {"title": "大模型发布", "link": "https://example.com/1", "description": "新模型", "source": "测试源", "legacy": 1},
+        {"title": "足球比赛", "link": "https://example.com/2", "description": "比分", "source": "测试源"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_agent_filter_tool_uses_streaming_filter(monkeypatch):
+    from agents import rss_tools
+
+    def fake_llm(conversations, thinking="disabled", response_format=None):
+        return _chunks(json.dumps(
+            {"matched_articles": [{"index": 0, "relevance_score": 9, "relevance_reason": "直接相关"}]},
+            ensure_ascii=False
+        ))
+
+    monkeypatch.setattr(rss_tools, "_load_cached_articles", lambda: {"articles": _cached_articles()})
+    monkeypatch.setattr(rss_tools, "_filter_service", _make_service())
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", fake_llm)
+
+    result = await rss_tools.tool_filter_rss_news("AI", top_k=5)
+
+    assert result["filter_method"] == "llm"
+    assert [a["link"] for a in result["filtered_articles"]] == ["https://example.com/1"]
+    assert result["filtered_articles"][0]["relevance_score"] == 9
+
+
+@pytest.mark.asyncio
+async def test_agent_filter_tool_falls_back_after_budget(monkeypatch):
+    from agents import rss_tools
+
+    def slow_llm(conversations, thinking="disabled", response_format=None):
+        import time
+        time.sleep(0.5)
+        return _match_all(conversations, thinking)
+
+    monkeypatch.setattr(rss_tools, "_load_cached_articles", lambda: {"articles": _cached_articles()})
+    monkeypatch.setattr(rss_tools, "_filter_service", _make_service())
+    monkeypatch.setattr(rss_tools, "RSS_FILTER_LATENCY_BUDGET", 0.05)
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", slow_llm)
+
+    result = await rss_tools.tool_filter_rss_news("足球", top_k=5)
+
+    assert result["filter_method"] == "text"
+    assert result["filtered_articles"][0]["link"] == "https://example.com/2"
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_valid_rows_and_skips_invalid_scores(monkeypatch, tmp_path):
+    responses = [["0|0|零分\n", "1|8|相关\n"], ["0|", "|无法识别\n"]]
+    calls = []
+
+    def flaky(conversations, thinking="disabled", response_format=None):
+        calls.append(1)
+        return responses.pop()
+
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", flaky)
+    cache = RelevanceScoreCache(cache_path=tmp_path / "scores.json")
+    service = _make_service(requests_per_minute=6000, use_score_cache=True, score_cache=cache)
+    articles = [_make_article(0, "AI新闻"), _make_article(1, "AI芯片")]
+
+    results = await _collect(service.filter_articles_stream("AI", articles))
+
+    # 无法识别的输出重新请求；评分无效的条目跳过，不写入评分缓存，其余结果保留
+    assert len(calls) == 2
+    assert [(a.link, a.relevance_score) for a in results] == [("https://example.com/1", 8)]
+    assert set(cache.lookup("AI", [a.link for a in articles], 6)) == {"https://example.com/1"}
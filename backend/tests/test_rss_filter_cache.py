@@ -0,0 +1,138 @@
+"""
+测试RSS筛选服务的评分缓存与词法预筛选
+"""
+import json
+
+import pytest
+
+from tools import rss_filter_service
+from tools.rss_filter_service import (
+    RSSArticle,
+    RSSFilterService,
+    RelevanceScoreCache,
+    extract_query_terms,
+    normalize_query
+)
+
+
+def _make_article(index: int, title: str, description: str = "") -> RSSArticle:
+    return RSSArticle(
+        title=title,
+        link=f"https://example.com/{index}",
+        description=description,
+        source="测试源"
+    )
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """记录大模型调用次数，并把标题含"AI"的文章评为8分"""
+    calls = []
+
+    def fake_response(conversations, thinking="disabled", response_format=None):
+        prompt = conversations[-1]["content"]
+        articles_text = prompt.split("新闻列表：")[1].split("筛选要求：")[0]
+        articles_info = json.loads(articles_text)
+        calls.append(len(articles_info))
+        matched = [
+            {"index": info["index"], "relevance_score": 8, "relevance_reason": "AI相关"}
+            for info in articles_info if "AI" in info["title"]
+        ]
+        yield json.dumps({"matched_articles": matched}, ensure_ascii=False)
+
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", fake_response)
+    return calls
+
+
+def test_normalize_query():
+    assert normalize_query("  AI   最新进展 ") == normalize_query("ai 最新进展")
+    assert normalize_query("ＡＩ") == "ai"
+
+
+def test_extract_query_terms_mixes_words_and_cjk_bigrams():
+    terms = extract_query_terms("OpenAI 发布大模型")
+    assert "openai" in terms
+    assert {"发布", "大模", "模型"} <= terms
+
+
+def test_repeated_query_served_from_cache(tmp_path, fake_llm):
+    articles = [_make_article(i, f"AI新闻{i}" if i % 2 else f"AI无关{i}") for i in range(20)]
+    cache = RelevanceScoreCache(cache_path=tmp_path / "scores.json")
+    service = RSSFilterService(batch_size=10, max_workers=2, score_cache=cache, lexical_prefilter=False)
+
+    first = service.filter_articles("AI 新闻", articles, show_progress=False)
+    assert sum(fake_llm) == 20
+
+    # 新实例从磁盘加载缓存，措辞差异不影响命中
+    service = RSSFilterService(
+        batch_size=10,
+        max_workers=2,
+        score_cache=RelevanceScoreCache(cache_path=tmp_path / "scores.json"),
+        lexical_prefilter=False
+    )
+    second = service.filter_articles("ai   新闻", articles, show_progress=False)
+    assert sum(fake_llm) == 20
+    assert {a.link for a in second.filtered_articles} == {a.link for a in first.filtered_articles}
+
+
+def test_overlapping_query_scores_only_new_articles(tmp_path, fake_llm):
+    cache = RelevanceScoreCache(cache_path=tmp_path / "scores.json")
+    service = RSSFilterService(batch_size=10, score_cache=cache, lexical_prefilter=False)
+    articles = [_make_article(i, f"AI新闻{i}") for i in range(10)]
+
+    service.filter_articles("AI", articles, show_progress=False)
+    more_articles = articles + [_make_article(i, f"AI新闻{i}") for i in range(10, 13)]
+    result = service.filter_articles("AI", more_articles + articles[:3], show_progress=False)
+
+    assert fake_llm == [10, 3]
+    assert result.matched_articles == 13
+
+
+def test_non_match_reused_only_for_stricter_threshold(tmp_path, fake_llm):
+    cache = RelevanceScoreCache(cache_path=tmp_path / "scores.json")
+    service = RSSFilterService(score_cache=cache, lexical_prefilter=False)
+    articles = [_make_article(0, "天气预报")]
+
+    service.filter_articles("AI", articles, min_relevance=6, show_progress=False)
+    service.filter_articles("AI", articles, min_relevance=8, show_progress=False)
+    assert fake_llm == [1]
+
+    service.filter_articles("AI", articles, min_relevance=3, show_progress=False)
+    assert fake_llm == [1, 1]
+
+
+def test_failed_batch_is_not_cached(tmp_path, monkeypatch):
+    def failing(conversations, thinking="disabled", response_format=None):
+        raise RuntimeError("rate limited")
+
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", failing)
+    cache = RelevanceScoreCache(cache_path=tmp_path / "scores.json")
+    service = RSSFilterService(score_cache=cache, lexical_prefilter=False)
+    articles = [_make_article(0, "AI新闻")]
+
+    service.filter_articles("AI", articles, show_progress=False)
+    assert cache.lookup("AI", [articles[0].link], 6) == {}
+
+
+def test_lexical_prefilter_skips_unrelated_articles(tmp_path, fake_llm):
+    service = RSSFilterService(
+        score_cache=RelevanceScoreCache(cache_path=tmp_path / "scores.json"),
+        lexical_prefilter=True
+    )
+    articles = [
+        _make_article(0, "AI芯片出货量创新高"),
+        _make_article(1, "春运首日铁路客流"),
+        _make_article(2, "新能源汽车", description="车载芯片短缺缓解"),
+    ]
+
+    service.filter_articles("关于芯片的最新新闻", articles, show_progress=False)
+    assert fake_llm == [2]
+
+
+def test_lexical_prefilter_is_opt_in(tmp_path, fake_llm):
+    """默认不做词法预筛选：只命中同义词或译名的文章也交给大模型判断"""
+    service = RSSFilterService(score_cache=RelevanceScoreCache(cache_path=tmp_path / "scores.json"))
+    articles = [_make_article(0, "AI芯片出货量创新高"), _make_article(1, "人工智能公司发布新模型")]
+
+    service.filter_articles("AI", articles, show_progress=False)
+    assert fake_llm == [2]
@@ -0,0 +1,105 @@
+"""
+测试RSS筛选结果的容错解析
+"""
+import pytest
+
+from tools import rss_filter_service
+from tools.rss_filter_service import FilterResponseParser, RSSArticle, RSSFilterService
+
+
+def _parse(text: str, batch_size: int = 5):
+    parser = FilterResponseParser(batch_size)
+    parser.feed(text)
+    return parser.close(), parser.is_recognized
+
+
+def test_line_protocol():
+    matches, recognized = _parse("0|8|AI芯片\n3 | 6.6 | 大模型落地\n")
+    assert recognized
+    assert matches == [(0, 8, "AI芯片"), (3, 7, "大模型落地")]
+
+
+def test_no_match_marker_is_a_valid_empty_result():
+    assert _parse("NONE") == ([], True)
+
+
+def test_garbage_is_not_recognized():
+    assert _parse("抱歉，我无法完成这个任务。") == ([], False)
+
+
+def test_bad_lines_do_not_lose_the_batch():
+    text = "```\n序号|评分|原因\n1|9|相关\n这一行格式错误\n9|7|越界序号\n1|5|重复序号\n2|7"
+    matches, recognized = _parse(text)
+    assert recognized
+    assert matches == [(1, 9, "相关"), (2, 7, None)]
+
+
+def test_streaming_feed_emits_complete_lines():
+    parser = FilterResponseParser(5)
+    assert parser.feed("0|8|第一") == []
+    assert parser.feed("篇\n1|") == [(0, 8, "第一篇")]
+    assert parser.feed("7|第二篇\n") == [(1, 7, "第二篇")]
+
+
+def test_truncated_json_recovers_complete_items():
+    text = (
+        '```json\n{"matched_articles": [\n'
+        '  {"index": 0, "relevance_score": 8, "relevance_reason": "相关"},\n'
+        '  {"index": 2, "relevance_score": 7, "relevance_reason": "部分相关"},\n'
+        '  {"index": 4, "relevance_sc'
+    )
+    matches, recognized = _parse(text)
+    assert recognized
+    assert matches == [(0, 8, "相关"), (2, 7, "部分相关")]
+
+
+def test_missing_or_zero_scores_are_invalid():
+    parser = FilterResponseParser(5)
+    parser.feed("0|0|零分\n2|8|相关")
+    assert parser.close() == [(2, 8, "相关")]
+    assert parser.invalid_count == 1
+
+    parser = FilterResponseParser(5)
+    parser.feed('[{"index": 1, "relevance_reason": "缺少评分"}, {"index": 2, "relevance_score": 7}]')
+    assert parser.close() == [(2, 7, None)]
+    assert parser.invalid_count == 1
+
+
+def test_invalid_scores_are_skipped():
+    service = RSSFilterService(use_score_cache=False, lexical_prefilter=False)
+    articles = [RSSArticle(title="AI", link=f"https://example.com/{i}", description="") for i in range(3)]
+    assert service._parse_filter_response('{"index": 0, "relevance_score": null}', articles) == []
+    parser = FilterResponseParser(3)
+    parser.feed("0|零|无效\n1|9|相关\n2|11|越界评分")
+    results = service._finish_parse(parser, "", articles)
+    assert [a.link for a in results] == ["https://example.com/1"]
+    assert parser.invalid_indexes == {2}
+    assert service._scored_articles(parser, articles) == articles[:2]
+
+
+def test_empty_json_result_is_recognized():
+    assert _parse('{"matched_articles": []}') == ([], True)
+
+
+def test_json_mode_requests_response_format(monkeypatch):
+    received = {}
+
+    def fake_response(conversations, thinking="disabled", response_format=None):
+        received["response_format"] = response_format
+        received["prompt"] = conversations[-1]["content"]
+        return ['{"matched_articles": [', '{"index": 0, "relevance_score": 9}]}']
+
+    monkeypatch.setattr(rss_filter_service, "iter_zhipu_response_sync", fake_response)
+    service = RSSFilterService(use_score_cache=False, lexical_prefilter=False, output_format="json")
+    article = RSSArticle(title="AI", link="https://example.com/0", description="")
+
+    result = service.filter_articles("AI", [article], show_progress=False)
+
+    assert received["response_format"] == {"type": "json_object"}
+    assert "matched_articles" in received["prompt"]
+    assert result.filtered_articles[0].relevance_score == 9
+
+
+def test_invalid_output_format():
+    with pytest.raises(ValueError):
+        RSSFilterService(use_score_cache=False, output_format="xml")
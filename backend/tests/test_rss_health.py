@@ -0,0 +1,195 @@
+"""
+测试RSS源健康统计、失效源隔离与健康状态接口
+"""
+import requests
+
+from tools.rss_fetcher import FeedHealthTracker, FetchConfig, RSSFetcher
+from tools.rss_fetcher import health as rss_health
+from tools.rss_fetcher.health import PROBE_TIMEOUT, QUARANTINE_AFTER, QUARANTINE_BASE
+
+URL = "https://example.com/feed"
+FEED = (
+    '<rss version="2.0"><channel><item><title>新闻</title>'
+    '<link>https://example.com/1</link></item></channel></rss>'
+).encode("utf-8")
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        return iter([FEED])
+
+
+class FakeSession:
+    """按URL返回成功或连接失败，并记录每次请求的超时"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def get(self, url, timeout, headers=None, stream=False):
+        self.calls.append((url, timeout))
+        if url in self.failing:
+            raise requests.exceptions.ConnectionError("连接被拒绝")
+        return FakeResponse()
+
+    def close(self):
+        pass
+
+
+def _fetcher(tracker, session):
+    fetcher = RSSFetcher(FetchConfig(max_retries=2, retry_delay=0, timeout=10), health=tracker)
+    fetcher.session = session
+    return fetcher
+
+
+def test_stats_and_latency_percentiles():
+    tracker = FeedHealthTracker()
+    for latency in [0.1, 0.2, 0.3, 0.4, 1.0]:
+        tracker.record_success(URL, latency)
+    tracker.record_failure(URL, "请求超时")
+
+    health = tracker.get(URL).to_dict()
+    assert health["attempts"] == 6
+    assert health["success_rate"] == round(5 / 6, 3)
+    assert health["p50_latency"] == 0.3
+    assert health["p95_latency"] == 1.0
+    assert health["last_error"] == "请求超时"
+    assert not health["quarantined"]
+
+
+def test_quarantine_after_consecutive_failures_and_probe_recovery():
+    tracker = FeedHealthTracker()
+    for _ in range(QUARANTINE_AFTER):
+        tracker.record_failure(URL, "网络请求失败", now=1000)
+
+    assert not tracker.should_fetch(URL, now=1000 + QUARANTINE_BASE - 1)
+    assert tracker.should_fetch(URL, now=1000 + QUARANTINE_BASE)
+    assert tracker.request_policy(URL, 10, 2) == (PROBE_TIMEOUT, 0)
+
+    # 探测失败时隔离期翻倍
+    tracker.record_failure(URL, "网络请求失败", now=5000)
+    assert tracker.get(URL).quarantined_until == 5000 + QUARANTINE_BASE * 2
+
+    tracker.record_success(URL, 0.5)
+    assert tracker.get(URL).consecutive_failures == 0
+    assert tracker.should_fetch(URL)
+
+
+def test_latency_aware_timeout():
+    tracker = FeedHealthTracker()
+    assert tracker.request_policy(URL, 10, 2) == (10, 2)
+
+    for _ in range(5):
+        tracker.record_success(URL, 1.5)
+    assert tracker.request_policy(URL, 10, 2) == (4.5, 2)
+
+
+def test_state_persists(tmp_path):
+    path = tmp_path / "rss_health.json"
+    tracker = FeedHealthTracker(path)
+    tracker.record_success(URL, 0.2)
+    tracker.save()
+
+    restored = FeedHealthTracker(path).get(URL)
+    assert (restored.successes, restored.latencies) == (1, [0.2])
+
+
+def test_fetch_all_skips_quarantined_sources():
+    bad_url = "https://bad.example.com/feed"
+    tracker = FeedHealthTracker()
+    session = FakeSession(failing={bad_url})
+    sources = [{"name": "正常源", "url": URL}, {"name": "失效源", "url": bad_url}]
+
+    with _fetcher(tracker, session) as fetcher:
+        for _ in range(QUARANTINE_AFTER):
+            fetcher.fetch_all(sources)
+        # 每轮失效源重试2次，共3次请求
+        assert len([c for c in session.calls if c[0] == bad_url]) == QUARANTINE_AFTER * 3
+
+        session.calls.clear()
+        result = fetcher.fetch_all(sources)
+
+    assert session.calls == [(URL, 10)]
+    assert (result.total_sources, result.successful_sources, result.skipped_sources) == (2, 1, 1)
+    assert tracker.get(bad_url).name == "失效源"
+
+
+def test_quarantined_source_gets_single_probe():
+    tracker = FeedHealthTracker()
+    for _ in range(QUARANTINE_AFTER):
+        tracker.record_failure(URL, "网络请求失败", now=0)
+    session = FakeSession(failing={URL})
+
+    with _fetcher(tracker, session) as fetcher:
+        result = fetcher.fetch_single(URL, "失效源")
+
+    assert not result.success
+    assert session.calls == [(URL, PROBE_TIMEOUT)]
+
+
+def test_health_endpoint_lists_configured_sources(client, tmp_path, monkeypatch):
+    path = tmp_path / "rss_health.json"
+    monkeypatch.setattr(rss_health, "HEALTH_FILE_PATH", path)
+    monkeypatch.setattr(
+        "tools.rss_fetcher.get_rss_sources",
+        lambda: [{"name": "正常源", "url": URL}, {"name": "新源", "url": "https://new.example.com/feed"}]
+    )
+    tracker = FeedHealthTracker(path)
+    tracker.record_success(URL, 0.3)
+    tracker.save()
+
+    response = client.get("/api/agent/rss-sources/health")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [item["name"] for item in data] == ["正常源", "新源"]
+    assert data[0]["success_rate"] == 1.0
+    assert data[1]["attempts"] == 0 and data[1]["p95_latency"] is None
+
+
+class FlakySession(FakeSession):
+    """第一次请求失败，之后成功"""
+
+    def get(self, url, timeout, headers=None, stream=False):
+        self.calls.append((url, timeout))
+        if len(self.calls) == 1:
+            raise requests.exceptions.ConnectionError("连接被重置")
+        return FakeResponse()
+
+
+def test_latency_excludes_retries_and_backoff():
+    tracker = FeedHealthTracker()
+    fetcher = RSSFetcher(FetchConfig(max_retries=1, retry_delay=0.3, timeout=10), health=tracker)
+    fetcher.session = FlakySession()
+
+    assert fetcher.fetch_single(URL, "测试源").success
+    assert tracker.get(URL).latencies[0] < 0.3
+
+
+def test_save_merges_updates_from_other_processes(tmp_path):
+    path = tmp_path / "rss_health.json"
+    other_url = "https://other.example.com/feed"
+    cron, daemon = FeedHealthTracker(path), FeedHealthTracker(path)
+
+    cron.record_success(URL, 0.2)
+    daemon.record_failure(other_url, "请求超时")
+    cron.save()
+    daemon.save()
+
+    restored = FeedHealthTracker(path)
+    assert restored.get(URL).successes == 1
+    assert restored.get(other_url).consecutive_failures == 1
+    # 保存后本进程也看到其他进程的更新
+    assert daemon.get(URL).successes == 1
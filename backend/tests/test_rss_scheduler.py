@@ -0,0 +1,131 @@
+"""
+测试RSS源自适应轮询调度
+"""
+import calendar
+import time
+
+from tools.rss_fetcher import FeedHealthTracker, FetchConfig, RSSArticle, RSSParser, RSSPollingScheduler
+from tools.rss_fetcher.health import QUARANTINE_AFTER, QUARANTINE_BASE
+from tools.rss_fetcher.models import RSSFetchResult
+
+NOW = calendar.timegm((2025, 6, 3, 12, 0, 0))
+
+
+class FakeFetcher:
+    """按顺序返回预设结果，并记录条件请求头"""
+
+    def __init__(self, *results):
+        self.config = FetchConfig(max_workers=2)
+        self.results = list(results)
+        self.calls = []
+
+    def fetch_single(self, url, source_name=None, etag=None, last_modified=None, **kwargs):
+        self.calls.append({"url": url, "etag": etag, "last_modified": last_modified, **kwargs})
+        return self.results.pop(0)
+
+
+def _articles(count: int, gap: float, prefix: str = "a"):
+    return [
+        RSSArticle(title=f"{prefix}{i}", link=f"https://example.com/{prefix}{i}",
+                   description="", published_ts=int(NOW - i * gap))
+        for i in range(count)
+    ]
+
+
+def _ok(articles, **kwargs):
+    return RSSFetchResult(url="u", success=True, articles=articles, **kwargs)
+
+
+def _scheduler(fetcher, **kwargs):
+    return RSSPollingScheduler(fetcher=fetcher, sources=[{"name": "测试源", "url": "u"}], **kwargs)
+
+
+def _poll(scheduler, now=NOW):
+    return scheduler.poll(scheduler.schedules["u"], now)
+
+
+def test_interval_follows_update_frequency():
+    fast = _scheduler(FakeFetcher(_ok(_articles(20, gap=600))))
+    slow = _scheduler(FakeFetcher(_ok(_articles(20, gap=6 * 3600))))
+    _poll(fast)
+    _poll(slow)
+
+    assert fast.schedules["u"].interval == 300
+    assert slow.schedules["u"].interval > 2 * 3600
+
+
+def test_not_modified_uses_conditional_request_and_slows_down():
+    fetcher = FakeFetcher(
+        _ok(_articles(20, gap=1800), etag='"v1"', last_modified="Tue, 03 Jun 2025 11:00:00 GMT"),
+        RSSFetchResult(url="u", success=True, not_modified=True)
+    )
+    scheduler = _scheduler(fetcher)
+    _poll(scheduler)
+    interval = scheduler.schedules["u"].interval
+    _poll(scheduler, NOW + interval)
+
+    assert fetcher.calls[1]["etag"] == '"v1"'
+    assert fetcher.calls[1]["last_modified"] == "Tue, 03 Jun 2025 11:00:00 GMT"
+    assert scheduler.schedules["u"].interval == interval * 1.5
+
+
+def test_failures_back_off_exponentially():
+    failed = RSSFetchResult(url="u", success=False, error="超时")
+    scheduler = _scheduler(FakeFetcher(failed, failed, _ok(_articles(3, gap=600))))
+    schedule = scheduler.schedules["u"]
+
+    _poll(scheduler)
+    first_delay = schedule.next_poll_at - NOW
+    _poll(scheduler)
+    assert schedule.next_poll_at - NOW == 2 * first_delay
+    assert schedule.consecutive_failures == 2
+
+    _poll(scheduler)
+    assert schedule.consecutive_failures == 0
+
+
+def test_ttl_and_skip_hours_are_respected():
+    # 12:00 UTC轮询，ttl要求至少间隔2小时；14点和15点被跳过，顺延到16:00
+    scheduler = _scheduler(FakeFetcher(_ok(_articles(20, gap=600), ttl=120, skip_hours=[14, 15])))
+    _poll(scheduler)
+    schedule = scheduler.schedules["u"]
+
+    assert schedule.interval == 7200
+    assert time.gmtime(schedule.next_poll_at).tm_hour == 16
+
+
+def test_only_new_articles_reported_and_state_persisted(tmp_path):
+    updates = []
+    first = _articles(3, gap=600)
+    second = _articles(1, gap=600, prefix="b") + first
+    state_path = tmp_path / "schedule.json"
+
+    scheduler = _scheduler(FakeFetcher(_ok(first)), state_path=state_path,
+                           on_update=lambda name, articles: updates.append(len(articles)))
+    scheduler.run_pending(NOW)
+    assert scheduler.due_sources(NOW) == []
+
+    restored = _scheduler(FakeFetcher(_ok(second)), state_path=state_path,
+                          on_update=lambda name, articles: updates.append(len(articles)))
+    assert restored.schedules["u"].next_poll_at == scheduler.schedules["u"].next_poll_at
+    _poll(restored)
+
+    assert updates == [3, 1]
+
+
+def test_parse_hints():
+    content = "<rss><channel><ttl>30</ttl><skipHours><hour>1</hour><hour>24</hour></skipHours></channel></rss>"
+    assert RSSParser.parse_hints(content) == (30, [0, 1])
+    assert RSSParser.parse_hints("<rss></rss>") == (None, [])
+
+
+def test_quarantined_sources_are_not_due():
+    fetcher = FakeFetcher()
+    fetcher.health = FeedHealthTracker()
+    for _ in range(QUARANTINE_AFTER):
+        fetcher.health.record_failure("u", "网络请求失败", now=NOW)
+    scheduler = _scheduler(fetcher)
+
+    assert scheduler.due_sources(NOW) == []
+    assert scheduler.seconds_until_next(NOW) == QUARANTINE_BASE
+    assert [s.url for s in scheduler.due_sources(NOW + QUARANTINE_BASE)] == ["u"]
@@ -0,0 +1,144 @@
+"""
+测试RSS流式解析与feedparser兜底
+"""
+import pytest
+from xml.etree.ElementTree import ParseError
+
+from tools.rss_fetcher import FetchConfig, RSSArticle, RSSFetcher
+from tools.rss_fetcher.streaming import parse_feed_stream
+
+
+def _rss(count: int, extra: str = "") -> bytes:
+    items = "".join(
+        f"<item><title>新闻{i}</title><link>https://example.com/{i}</link>"
+        f"<guid>g{i}</guid><description><![CDATA[<p>摘要{i}</p>]]></description>"
+        f"<pubDate>Tue, 03 Jun 2025 {12 - i % 12:02d}:00:00 +0800</pubDate>"
+        f"<dc:creator>作者{i}</dc:creator><category>科技</category></item>"
+        for i in range(count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        f"<title>测试源</title><ttl>30</ttl><skipHours><hour>2</hour></skipHours>{extra}{items}"
+        "</channel></rss>"
+    ).encode("utf-8")
+
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom源</title>
+<entry><title>第一篇</title><id>tag:1</id>
+<link rel="alternate" href="https://example.com/atom/1"/><link rel="edit" href="https://example.com/edit/1"/>
+<updated>2025-06-03T01:00:00Z</updated><published>2025-06-03T00:00:00Z</published>
+<author><name>张三</name></author><category term="AI"/><summary>摘要</summary></entry>
+</feed>""".encode("utf-8")
+
+
+def _chunks(data: bytes, size: int = 7):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        return iter(_chunks(self.body, chunk_size))
+
+
+def test_stream_parses_rss_across_chunk_boundaries():
+    parser = parse_feed_stream(_chunks(_rss(3)), "测试源")
+
+    assert [a.title for a in parser.articles] == ["新闻0", "新闻1", "新闻2"]
+    first = parser.articles[0]
+    assert first.description == "摘要0"
+    assert first.summary_text == "摘要0"
+    assert first.author == "作者0"
+    assert first.categories == ["科技"]
+    assert first.published_ts is not None
+    assert (parser.ttl, parser.skip_hours) == (30, [2])
+
+
+def test_stream_parses_atom():
+    article = parse_feed_stream([ATOM]).articles[0]
+
+    assert article.link == "https://example.com/atom/1"
+    assert article.pub_date == "2025-06-03T00:00:00Z"
+    assert (article.author, article.categories, article.description) == ("张三", ["AI"], "摘要")
+
+
+def test_stream_stops_at_seen_entries():
+    parser = parse_feed_stream(
+        _chunks(_rss(50)),
+        seen_links={f"https://example.com/{i}" for i in range(2, 50)}
+    )
+
+    assert parser.stopped_early
+    assert [a.title for a in parser.articles] == ["新闻0", "新闻1"]
+
+
+def test_malformed_feed_falls_back_to_feedparser():
+    body = _rss(2, extra="<copyright>&copy; 2025</copyright>")
+    with pytest.raises(ParseError):
+        parse_feed_stream([body])
+
+    articles, ttl, skip_hours = RSSFetcher()._parse_response(FakeResponse(body), "测试源")
+
+    assert [a.title for a in articles] == ["新闻0", "新闻1"]
+    assert (ttl, skip_hours) == (30, [2])
+
+
+def test_body_size_limit():
+    body = _rss(200)
+    limit = len(body) // 2
+
+    streaming = RSSFetcher(FetchConfig(max_body_bytes=limit, chunk_size=1024))
+    articles, _, _ = streaming._parse_response(FakeResponse(body), "测试源")
+    assert 0 < len(articles) < 200
+
+    buffered = RSSFetcher(FetchConfig(streaming=False, max_body_bytes=limit))
+    with pytest.raises(ValueError):
+        buffered._parse_response(FakeResponse(body), "测试源")
+
+
+def test_article_tuple_roundtrip():
+    article = parse_feed_stream([_rss(1)]).articles[0]
+    assert RSSArticle.from_tuple(article.to_tuple()) == article
+
+
+def test_process_pool_matches_in_thread_parsing():
+    bodies = [_rss(20), _rss(2, extra="<copyright>&copy; 2025</copyright>")]
+    in_thread = RSSFetcher(FetchConfig(streaming=False))
+
+    with RSSFetcher(FetchConfig(parse_processes=2)) as pooled:
+        for body in bodies:
+            expected, _, _ = in_thread._parse_response(FakeResponse(body), "测试源")
+            articles, ttl, skip_hours = pooled._parse_response(FakeResponse(body), "测试源")
+            assert [a.link for a in articles] == [a.link for a in expected]
+            assert articles[0].published_ts == expected[0].published_ts
+            assert (ttl, skip_hours) == (30, [2])
+    assert pooled.parse_pool is None
+
+
+class CountingResponse(FakeResponse):
+    def __init__(self, body: bytes):
+        super().__init__(body)
+        self.chunks_read = 0
+
+    def iter_content(self, chunk_size):
+        for chunk in _chunks(self.body, chunk_size):
+            self.chunks_read += 1
+            yield chunk
+
+
+def test_process_pool_is_not_forked_and_keeps_early_stop():
+    body = _rss(50)
+    with RSSFetcher(FetchConfig(parse_processes=1, chunk_size=256)) as pooled:
+        assert pooled.parse_pool._executor._mp_context.get_start_method() != "fork"
+
+        response = CountingResponse(body)
+        articles, _, _ = pooled._parse_response(
+            response, "测试源", seen_links={f"https://example.com/{i}" for i in range(2, 50)}
+        )
+
+    assert [a.title for a in articles] == ["新闻0", "新闻1"]
+    assert response.chunks_read < len(_chunks(body, 256))
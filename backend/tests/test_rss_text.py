@@ -0,0 +1,101 @@
+"""
+测试RSS文章的HTML清洗与摘要生成
+"""
+import json
+import threading
+
+from agents import rss_tools
+from tools.rss_cache_job import merge_into_cache
+from tools.rss_fetcher import RSSArticle, RSSParser, estimate_tokens, html_to_text, normalize_article
+from tools.rss_fetcher.text import SUMMARY_MAX_CHARS
+
+
+def test_html_to_text():
+    content = (
+        '<p style="x">第一段&nbsp;内容</p><p>第二段<br/>换行</p>'
+        '<script>alert(1)</script><style>p{}</style><!-- 注释 -->'
+        '<a href="https://example.com">链接 &amp; 文字</a>'
+    )
+    assert html_to_text(content) == "第一段 内容 第二段 换行 链接 & 文字"
+    assert html_to_text("  纯文本\n\n多行  ") == "纯文本 多行"
+    assert html_to_text("") == ""
+
+
+def test_normalize_article_truncates_summary():
+    article = RSSArticle(title="标题", link="https://example.com", description="<p>" + "很长" * 400 + "</p>")
+    normalize_article(article)
+
+    assert "<p>" not in article.description
+    assert len(article.summary_text) == SUMMARY_MAX_CHARS
+    assert article.summary_text.endswith("…")
+    assert article.token_estimate == estimate_tokens("标题") + estimate_tokens(article.summary_text)
+
+
+def test_raw_html_kept_only_when_requested():
+    feed = (
+        '<rss version="2.0"><channel><item><title>标题</title><link>https://example.com/1</link>'
+        '<description>&lt;p&gt;正文&lt;/p&gt;</description></item></channel></rss>'
+    )
+    plain = RSSParser.parse(feed, "测试源")[0]
+    raw = RSSParser.parse(feed, "测试源", keep_raw_html=True)[0]
+
+    assert plain.description == plain.summary_text == "正文"
+    assert raw.description == "<p>正文</p>"
+    assert raw.summary_text == "正文"
+
+
+def test_tool_results_use_summary(monkeypatch):
+    cached = {
+        "summary": {},
+        "articles": [
+            {"title": "新", "description": "完整描述" * 100, "summary_text": "摘要", "token_estimate": 3},
+            {"title": "旧缓存", "description": "旧描述"},
+        ]
+    }
+    monkeypatch.setattr(rss_tools, "_load_cached_articles", lambda: cached)
+
+    articles = rss_tools.tool_fetch_rss_news()["articles"]
+
+    assert articles[0] == {"title": "新", "description": "摘要"}
+    assert articles[1] == {"title": "旧缓存", "description": "旧描述"}
+
+
+def test_cache_stores_summary_instead_of_html(tmp_path):
+    cache_path = tmp_path / "rss_cache.json"
+    old_article = {"title": "旧文章", "link": "https://example.com/old", "description": "<p>旧的<b>HTML</b>描述</p>"}
+    cache_path.write_text(json.dumps({"summary": {}, "articles": [old_article]}), encoding="utf-8")
+    new_article = normalize_article(RSSArticle(title="新文章", link="https://example.com/new", description="<p>新描述</p>"))
+
+    merge_into_cache([new_article], cache_path)
+
+    articles = json.loads(cache_path.read_text(encoding="utf-8"))["articles"]
+    assert {a["summary_text"] for a in articles} == {"旧的HTML描述", "新描述"}
+    assert all("description" not in a for a in articles)
+
+
+def test_merge_ignores_unknown_cache_fields(tmp_path):
+    cache_path = tmp_path / "rss_cache.json"
+    legacy = {"title": "旧文章", "link": "https://example.com/old", "summary_text": "摘要", "score": 3}
+    cache_path.write_text(json.dumps({"summary": {}, "articles": [legacy]}), encoding="utf-8")
+
+    merged = merge_into_cache([], cache_path)
+
+    assert [a["link"] for a in merged["articles"]] == ["https://example.com/old"]
+    assert "score" not in merged["articles"][0]
+
+
+def test_concurrent_merges_keep_every_article(tmp_path):
+    cache_path = tmp_path / "rss_cache.json"
+
+    def merge(index):
+        article = normalize_article(RSSArticle(title=f"文章{index}", link=f"https://example.com/{index}"))
+        merge_into_cache([article], cache_path)
+
+    threads = [threading.Thread(target=merge, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    articles = json.loads(cache_path.read_text(encoding="utf-8"))["articles"]
+    assert len(articles) == 8
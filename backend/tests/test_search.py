@@ -0,0 +1,267 @@
+"""
+测试消息全文搜索：关键词解析、触发器同步、用户隔离、高亮片段、分页和执行计划
+"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.database import repositories, retention
+from app.infrastructure.database.migrations import MIGRATIONS, run_backfills, run_migrations
+from app.infrastructure.database.models import Message
+from app.infrastructure.database.pagination import encode_cursor
+from app.infrastructure.database.repositories import ConversationRepository, MessageRepository
+from app.infrastructure.database.search import build_match_query, parse_terms, prefix_range, render_snippet, short_terms
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    run_migrations(engine)
+    run_backfills(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _conversation(db, user_id, *contents):
+    conversation = ConversationRepository(db).create(title=f"{user_id}的会话", user_id=user_id)
+    for content in contents:
+        MessageRepository(db).create(conversation.id, "user", content)
+    return conversation.id
+
+
+def _search(db, user_id, query, **kwargs):
+    return MessageRepository(db).search(user_id, query, **kwargs)
+
+
+def test_terms_and_query():
+    assert parse_terms(' 天气预报  好 "引号" ') == ["天气预报", "好", '"引号"']
+    with pytest.raises(ValueError):
+        parse_terms("   ")
+    # 三个字符及以上的关键词作为短语匹配，更短的展开为以其开头的三元组
+    assert short_terms(["天气预报", "好", '"引号"']) == ["好"]
+    assert prefix_range("Ab") == ("ab", "ac")
+    assert build_match_query(["天气预报", "好", '"引号"'], "u1", {"好": ["好天气", "好的"]}) == (
+        'owner : "<u1>" AND content : ("天气预报" AND ("好天气" OR "好的") AND """引号""")'
+    )
+
+
+def test_render_snippet():
+    assert render_snippet("<今天气>", ["天气"]) == "&lt;今<mark>天气</mark>&gt;"
+    assert render_snippet("Python python", ["PYTHON"]) == "<mark>Python</mark> <mark>python</mark>"
+    # 长消息截取第一个命中位置附近的内容
+    snippet = render_snippet("前" * 100 + "关键词" + "后" * 100, ["关键词"])
+    assert snippet.startswith("…前") and snippet.endswith("后…") and "<mark>关键词</mark>" in snippet
+    assert render_snippet("没有命中", ["关键词"]) == "没有命中"
+
+
+def test_search_cjk_and_latin(db):
+    _conversation(db, "u1", "今天天气不错", "明天会下雨吗", "用 Python 写一个爬虫")
+
+    def contents(query):
+        return [r["snippet"] for r in _search(db, "u1", query).items]
+
+    assert contents("天气") == ["今天<mark>天气</mark>不错"]
+    assert contents("天")[0] == "明<mark>天</mark>会下雨吗" and len(contents("天")) == 2
+    assert contents("python 爬虫") == ["用 <mark>Python</mark> 写一个<mark>爬虫</mark>"]
+    assert contents("天 雨") == ["明<mark>天</mark>会下<mark>雨</mark>吗"]
+    assert contents("气天") == []  # 字序不同不匹配
+    assert contents("不错") == ["今天天气<mark>不错</mark>"]  # 位于内容末尾的短关键词
+    assert contents("吗") == ["明天会下雨<mark>吗</mark>"]
+    assert contents("没有") == []
+
+
+def test_short_term_is_answered_from_index(db):
+    _conversation(db, "u1", "今天天气不错", *[f"第{i}条无关的消息" for i in range(20)])
+    statements = []
+    event.listen(
+        db.get_bind(), "before_cursor_execute",
+        lambda conn, cursor, statement, params, *args: statements.append((statement, params))
+    )
+    assert [r["snippet"] for r in _search(db, "u1", "天气").items] == ["今天<mark>天气</mark>不错"]
+    statement, params = statements[-1]
+    assert "LIKE" not in statement.upper() and "天气" in str(params)
+    plan = " | ".join(row[3] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params))
+    assert "VIRTUAL TABLE INDEX" in plan and "SCAN messages " not in plan
+    # 前缀展开在索引词表上按范围查找
+    vocab_statement, vocab_params = statements[0]
+    assert "messages_fts_vocab" in vocab_statement
+    vocab_plan = " | ".join(
+        row[3] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {vocab_statement}", vocab_params)
+    )
+    assert "VIRTUAL TABLE INDEX" in vocab_plan
+
+
+def test_too_common_short_term_is_rejected(db, monkeypatch):
+    _conversation(db, "u1", "天一天二天三天四")
+    monkeypatch.setattr(repositories, "MAX_TERM_EXPANSIONS", 2)
+    with pytest.raises(ValueError, match="过于常见"):
+        _search(db, "u1", "天")
+    assert len(_search(db, "u1", "天一").items) == 1
+
+
+def test_search_is_scoped_to_user(db):
+    _conversation(db, "u1", "共同的关键词")
+    other = _conversation(db, "u2", "共同的关键词")
+    results = _search(db, "u2", "关键词").items
+    assert [(r["conversation_id"], r["conversation_title"]) for r in results] == [(other, "u2的会话")]
+    assert _search(db, "u3", "关键词").items == []
+
+
+def test_index_follows_writes(db, engine):
+    conversation_id = _conversation(db, "u1", "第一条消息", "第二条消息")
+    assert len(_search(db, "u1", "消息").items) == 2
+
+    message = db.query(Message).filter(Message.conversation_id == conversation_id).first()
+    message.content = "已经修改"
+    db.commit()
+    assert len(_search(db, "u1", "消息").items) == 1
+    assert len(_search(db, "u1", "修改").items) == 1
+
+    # 归档时从索引删除，恢复后重新可搜索
+    retention.archive_conversation(db, conversation_id)
+    db.commit()
+    assert _search(db, "u1", "消息").items == []
+    retention.restore_conversation(db, conversation_id)
+    db.commit()
+    assert len(_search(db, "u1", "消息").items) == 1
+
+    # 会话归属变化时同步索引
+    db.execute(text("UPDATE conversations SET user_id = 'u9' WHERE id = :id"), {"id": conversation_id})
+    db.commit()
+    assert _search(db, "u1", "消息").items == []
+    assert len(_search(db, "u9", "消息").items) == 1
+
+    ConversationRepository(db).delete(conversation_id, user_id="u9")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM messages_fts")).scalar() == 0
+
+
+def test_external_writes_keep_index_in_sync(db, engine):
+    """触发器是纯 SQL，不注册任何函数的 sqlite3 连接也能写入并同步索引"""
+    conversation_id = _conversation(db, "u1", "应用写入的消息")
+    conn = sqlite3.connect(engine.url.database)
+    try:
+        conn.execute(
+            "INSERT INTO messages (conversation_id, role, content, thinking_mode, timestamp) "
+            "VALUES (?, 'user', '命令行写入的消息', 0, '2025-01-01')",
+            (conversation_id,)
+        )
+        conn.execute("UPDATE messages SET content = '命令行修改过' WHERE content = '应用写入的消息'")
+        conn.commit()
+    finally:
+        conn.close()
+    assert [r["snippet"] for r in _search(db, "u1", "的消息").items] == ["命令行写入<mark>的消息</mark>"]
+    assert len(_search(db, "u1", "命令行").items) == 2
+
+
+def test_search_pagination(db):
+    _conversation(db, "u1", *[f"第{i}条记录" for i in range(7)])
+    seen, cursor = [], None
+    while True:
+        page = _search(db, "u1", "记录", limit=3, cursor=cursor)
+        seen.extend(r["snippet"] for r in page.items)
+        if not page.has_more:
+            break
+        cursor = encode_cursor(page.items[-1]["timestamp"], page.items[-1]["id"])
+    assert seen == [f"第{i}条<mark>记录</mark>" for i in reversed(range(7))]
+
+
+def test_backfill_indexes_existing_messages(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        run_migrations(engine)
+        run_backfills(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM schema_version WHERE version >= 6"))
+            for name in ("messages_fts_insert", "messages_fts_delete", "messages_fts_update", "conversations_fts_owner"):
+                conn.execute(text(f"DROP TRIGGER {name}"))
+            conn.execute(text("DROP TABLE messages_fts"))
+            conn.execute(text(
+                "INSERT INTO conversations (id, title, user_id, conversation_type, created_at, updated_at) "
+                "VALUES (1, '旧会话', 'u1', 'chat', '2025-01-01', '2025-01-01')"
+            ))
+            for i in range(5):
+                conn.execute(text(
+                    "INSERT INTO messages (conversation_id, role, content, thinking_mode, timestamp) "
+                    "VALUES (1, 'user', :content, 0, '2025-01-01')"
+                ), {"content": f"历史消息{i}"})
+
+        assert run_migrations(engine) == [6, 7, 8, 9]
+        assert run_backfills(engine, batch_size=2) == {6: 5, 7: 0, 9: 0}
+        db = sessionmaker(bind=engine)()
+        try:
+            assert len(_search(db, "u1", "历史", limit=10).items) == 5
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_rebuilds_udf_index(tmp_path):
+    """版本 6 的旧索引触发器调用 cjk_segment，升级后重建为 trigram 索引，外部工具可以直接写入"""
+    db_path = tmp_path / "v6.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    insert = "INSERT INTO messages (conversation_id, role, content, timestamp) VALUES (1, 'user', ?, '2025-01-01')"
+    try:
+        # 迁移写死各自的定义：只执行到版本 6 得到的是当时的索引
+        assert run_migrations(engine, MIGRATIONS[:6]) == [1, 2, 3, 4, 5, 6]
+        with engine.connect() as conn:
+            assert "unicode61" in conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'messages_fts'")).scalar()
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute(
+                "INSERT INTO conversations (id, title, user_id, conversation_type, created_at, updated_at) "
+                "VALUES (1, '旧会话', 'u1', 'chat', '2025-01-01', '2025-01-01')"
+            )
+            with pytest.raises(sqlite3.OperationalError, match="cjk_segment"):
+                conn.execute(insert, ("写入失败",))
+            # 旧版本的应用在连接上注册了该函数
+            conn.create_function("cjk_segment", 1, lambda value: value)
+            conn.execute(insert, ("旧消息",))
+            conn.commit()
+        finally:
+            conn.close()
+
+        assert run_migrations(engine) == [7, 8, 9]
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute(insert, ("新消息",))
+            conn.commit()
+        finally:
+            conn.close()
+        # 旧消息由回填重新编入，新消息已由触发器编入
+        assert run_backfills(engine) == {2: 0, 5: 0, 6: 1, 7: 0, 9: 0}
+        db = sessionmaker(bind=engine)()
+        try:
+            assert [r["snippet"] for r in _search(db, "u1", "消息").items] == ["新<mark>消息</mark>", "旧<mark>消息</mark>"]
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+
+
+def test_search_query_plan_uses_fts_index(db):
+    _conversation(db, "u1", "消息")
+    statements = []
+    event.listen(
+        db.get_bind(), "before_cursor_execute",
+        lambda conn, cursor, statement, params, *args: statements.append((statement, params))
+    )
+    # 作为短语匹配的长关键词和按前缀展开的短关键词
+    for query in ("一条消息", "消息"):
+        _search(db, "u1", query, cursor=encode_cursor(datetime(2026, 1, 1), 10))
+        statement, params = statements[-1]
+        plan = " | ".join(row[3] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params))
+        assert "VIRTUAL TABLE INDEX" in plan
+        assert "TEMP B-TREE" not in plan
+        assert "SCAN messages " not in plan and "SCAN conversations" not in plan
@@ -0,0 +1,115 @@
+"""
+测试SQLite生产配置：连接PRAGMA、读写分离与并发写入
+"""
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.database.connection import Base, RoutingSession, create_sqlite_engine, pin_writer
+from app.infrastructure.database.models import Message
+from app.infrastructure.database.repositories import ConversationRepository, MessageRepository
+
+
+@pytest.fixture
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'chat.db'}"
+    reader = create_sqlite_engine(url)
+    writer = create_sqlite_engine(url, writer=True)
+    Base.metadata.create_all(bind=writer)
+    yield reader, writer
+    reader.dispose()
+    writer.dispose()
+
+
+@pytest.fixture
+def session_factory(engines):
+    reader, writer = engines
+    return sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=reader, writer_bind=writer)
+
+
+def test_pragmas_applied_on_connect(engines):
+    for engine in engines:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+
+
+def test_writes_routed_to_writer(engines, session_factory):
+    reader, writer = engines
+    db = session_factory()
+    try:
+        assert db.get_bind() is reader
+        conversation = ConversationRepository(db).create(title="会话", user_id="u1")
+        assert db.get_bind() is reader  # 提交后恢复读取路由
+
+        db.add(Message(conversation_id=conversation.id, role="user", content="未提交"))
+        db.flush()
+        # 写入后同一事务的读取走写连接，能读到未提交的数据
+        assert db.get_bind() is writer
+        assert len(MessageRepository(db).get_by_conversation(conversation.id)) == 1
+        db.rollback()
+        assert db.get_bind() is reader
+    finally:
+        db.close()
+
+
+def test_pinned_transaction_reads_on_writer(engines, session_factory):
+    reader, writer = engines
+    db = session_factory()
+    try:
+        conversation_id = ConversationRepository(db).create(title="会话", user_id="u1").id
+        pin_writer(db)
+        # 先读后写的事务：写入前的读取也在写连接上
+        assert db.get_bind() is writer
+        used = {db.connection().engine}
+        db.execute(text("SELECT title FROM conversations WHERE id = :id"), {"id": conversation_id})
+        db.execute(text("UPDATE conversations SET title = '改名' WHERE id = :id"), {"id": conversation_id})
+        used.add(db.connection().engine)
+        assert used == {writer}
+        db.commit()
+        assert db.get_bind() is reader
+    finally:
+        db.close()
+
+
+def test_concurrent_chat_streams_without_lock_errors(session_factory):
+    """模拟并发的流式对话：每个请求边流式输出边提交消息、更新会话"""
+    streams, chunks = 16, 10
+    errors = []
+    barrier = threading.Barrier(streams)
+
+    def chat_stream(index):
+        db = session_factory()
+        try:
+            conversations = ConversationRepository(db)
+            messages = MessageRepository(db)
+            conversation = conversations.create(title=f"会话{index}", user_id=f"user-{index}")
+            barrier.wait()
+            messages.create(conversation.id, "user", "你好")
+            for chunk in range(chunks):
+                messages.get_recent_messages(conversation.id)
+                messages.create(conversation.id, "assistant", f"片段{chunk}")
+                conversations.update_timestamp(conversation.id)
+            conversations.update_title(conversation.id, f"标题{index}")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=chat_stream, args=(i,)) for i in range(streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    db = session_factory()
+    try:
+        assert db.query(Message).count() == streams * (chunks + 1)
+    finally:
+        db.close()
@@ -5,30 +5,47 @@ ArXiv Fetcher - ArXiv论文检索工具
 
 主要功能：
 - 基于关键词检索ArXiv论文
-- 支持指定检索数量
+- 支持指定检索数量，大批量检索自动分页
+- 分页采集器：共享限速、后台预取下一页、检查点续采
+- SQLite本地缓存：论文元数据与带有效期的查询结果，支持离线回放
 - 自动解析论文元数据（标题、摘要、作者、发布日期等）
 - 统一的数据结构和JSON输出
 - 完善的错误处理和日志记录
 
 基本使用：
 ```python
-from backend.tools.arxiv_fetcher import ArxivFetcher
+from backend.tools.arxiv_fetcher import ArxivFetcher, ArxivHarvester
 
 # 检索论文
 fetcher = ArxivFetcher()
 papers = fetcher.search("machine learning", max_results=10)
 for paper in papers:
     print(f"{paper.title} - {paper.authors}")
+
+# 大批量采集（逐篇产出，中断后从检查点继续）
+harvester = ArxivHarvester(checkpoint_path=Path("harvest.json"))
+for paper in harvester.harvest("cat:cs.CL", max_results=20000):
+    save(paper)
 ```
 """
 
+from .cache import ARXIV_CACHE_PATH, ArxivCache
 from .fetcher import ArxivFetcher
+from .harvester import ArxivHarvester, EmptyPageError, HarvestCheckpoint
 from .models import ArxivPaper, ArxivSearchResult
+from .rate_limit import ARXIV_RATE_LIMITER, RateLimiter
 
 __version__ = "1.0.0"
 
 __all__ = [
     'ArxivFetcher',
+    'ArxivCache',
+    'ARXIV_CACHE_PATH',
+    'ArxivHarvester',
+    'HarvestCheckpoint',
+    'EmptyPageError',
+    'RateLimiter',
+    'ARXIV_RATE_LIMITER',
     'ArxivPaper',
     'ArxivSearchResult',
 ]
@@ -0,0 +1,185 @@
+"""
+ArXiv本地缓存
+
+SQLite中保存两类数据：
+- papers：按 arxiv_id 保存论文元数据，不同查询命中的同一篇论文只存一份
+- queries：查询结果，按 (检索语句, 排序方式, 排序顺序) 保存有序的 arxiv_id 列表和获取时间
+
+有效期内的重复查询直接从磁盘返回，不发网络请求、不占用ArXiv限速配额；
+过期的结果在离线模式或网络失败时仍可回放。
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .models import ArxivPaper
+
+logger = logging.getLogger(__name__)
+
+# 缓存数据库与RSS缓存放在同一目录
+if os.getenv("DOCKER_ENV") or os.path.exists("/app"):
+    # Docker环境
+    ARXIV_CACHE_PATH = Path("/app/data/arxiv_cache.db")
+else:
+    # 本地开发环境
+    ARXIV_CACHE_PATH = Path(__file__).parent.parent.parent / "data" / "arxiv_cache.db"
+
+QUERY_TTL = 6 * 3600  # 查询结果有效期（秒）
+
+_VERSION_RE = re.compile(r"v\d+$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    cached_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT NOT NULL,
+    sort_by TEXT NOT NULL,
+    sort_order TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    arxiv_ids TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (query, sort_by, sort_order)
+);
+"""
+
+
+def _normalize_query(query: str) -> str:
+    """合并多余空白；不改变大小写（ArXiv的布尔运算符必须大写）"""
+    return " ".join(query.split())
+
+
+class ArxivCache:
+    """ArXiv论文元数据与查询结果的SQLite缓存"""
+
+    def __init__(self, db_path: Path = ARXIV_CACHE_PATH, ttl: float = QUERY_TTL):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite数据库路径
+            ttl: 查询结果有效期（秒）
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get_query(
+        self,
+        query: str,
+        max_results: int,
+        sort_by: str,
+        sort_order: str,
+        allow_stale: bool = False,
+        now: Optional[float] = None
+    ) -> Optional[List[ArxivPaper]]:
+        """
+        读取缓存的查询结果
+
+        之前以更大的 max_results 缓存过同一查询时，返回其前 max_results 篇。
+
+        Args:
+            allow_stale: 是否接受过期的结果（离线回放）
+
+        Returns:
+            论文列表，未命中时返回None
+        """
+        now = time.time() if now is None else now
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT max_results, arxiv_ids, fetched_at FROM queries "
+                "WHERE query = ? AND sort_by = ? AND sort_order = ?",
+                (_normalize_query(query), sort_by, sort_order)
+            ).fetchone()
+            if row is None:
+                return None
+            cached_max, arxiv_ids, fetched_at = row
+            arxiv_ids = json.loads(arxiv_ids)
+            # 之前的结果数少于请求数，且不是因为结果本身就只有这么多
+            if cached_max < max_results and len(arxiv_ids) >= cached_max:
+                return None
+            if not allow_stale and now - fetched_at > self.ttl:
+                return None
+            arxiv_ids = arxiv_ids[:max_results]
+            papers = self._load_papers(conn, arxiv_ids)
+        if len(papers) < len(arxiv_ids):
+            logger.warning(f"查询缓存引用的论文缺失，视为未命中: {query}")
+            return None
+        return papers
+
+    def put_query(
+        self,
+        query: str,
+        max_results: int,
+        sort_by: str,
+        sort_order: str,
+        papers: List[ArxivPaper],
+        now: Optional[float] = None
+    ) -> None:
+        """保存查询结果及其中的论文"""
+        now = time.time() if now is None else now
+        with self._lock, closing(self._connect()) as conn, conn:
+            self._save_papers(conn, papers, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO queries "
+                "(query, sort_by, sort_order, max_results, arxiv_ids, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    _normalize_query(query), sort_by, sort_order, max_results,
+                    json.dumps([p.arxiv_id for p in papers]), now
+                )
+            )
+
+    def get_paper(self, arxiv_id: str) -> Optional[ArxivPaper]:
+        """按 arxiv_id 读取论文，ID不带版本号时返回缓存中最新的版本"""
+        with closing(self._connect()) as conn:
+            papers = self._load_papers(conn, [arxiv_id])
+            if not papers and not _VERSION_RE.search(arxiv_id):
+                versions = [row[0] for row in conn.execute(
+                    "SELECT arxiv_id FROM papers WHERE arxiv_id GLOB ?", (f"{arxiv_id}v[0-9]*",)
+                ) if _VERSION_RE.fullmatch(row[0][len(arxiv_id):])]
+                if versions:
+                    latest = max(versions, key=lambda v: int(v[len(arxiv_id) + 1:]))
+                    papers = self._load_papers(conn, [latest])
+        return papers[0] if papers else None
+
+    def put_papers(self, papers: Iterable[ArxivPaper]) -> None:
+        """保存论文元数据（如分页采集的结果）"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            self._save_papers(conn, papers, time.time())
+
+    @staticmethod
+    def _save_papers(conn: sqlite3.Connection, papers: Iterable[ArxivPaper], now: float) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO papers (arxiv_id, data, cached_at) VALUES (?, ?, ?)",
+            ((p.arxiv_id, json.dumps(p.to_dict(), ensure_ascii=False), now) for p in papers)
+        )
+
+    @staticmethod
+    def _load_papers(conn: sqlite3.Connection, arxiv_ids: List[str]) -> List[ArxivPaper]:
+        """按给定顺序读取论文，缺失的跳过"""
+        found = {}
+        # SQLite单条语句的参数数量有限，分批查询
+        for i in range(0, len(arxiv_ids), 500):
+            batch = arxiv_ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT arxiv_id, data FROM papers WHERE arxiv_id IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            found.update(rows)
+        return [ArxivPaper(**json.loads(found[i])) for i in arxiv_ids if i in found]
@@ -4,31 +4,54 @@ ArXiv论文检索器
 使用ArXiv API检索论文，支持关键词搜索和结果解析。
 """
 import requests
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import logging
 import xml.etree.ElementTree as ET
 from urllib.parse import quote, urlencode
 from datetime import datetime
 
+from .cache import ArxivCache
 from .models import ArxivPaper, ArxivSearchResult
+from .rate_limit import ARXIV_RATE_LIMITER, RateLimiter
+from .streaming import ArxivStreamParser
 
 logger = logging.getLogger(__name__)
 
 # ArXiv API基础URL
 ARXIV_API_BASE = "http://export.arxiv.org/api/query"
 
+# 单次请求的最大结果数，超过时由分页采集器拆分请求
+MAX_SINGLE_REQUEST = 500
+
+# 流式读取响应的块大小（字节）
+CHUNK_SIZE = 64 * 1024
+
 
 class ArxivFetcher:
     """ArXiv论文检索器"""
     
-    def __init__(self, timeout: int = 30):
+    def __init__(
+        self,
+        timeout: int = 30,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ArxivCache] = None,
+        offline: bool = False
+    ):
         """
         初始化检索器
         
         Args:
             timeout: 请求超时时间（秒）
+            rate_limiter: 请求限速器，默认使用进程内共享的ArXiv限速器
+            cache: 本地缓存，提供时重复查询从磁盘返回
+            offline: 离线模式，只从缓存回放（包括过期结果），不发网络请求
         """
+        if offline and cache is None:
+            raise ValueError("离线模式需要提供本地缓存")
         self.timeout = timeout
+        self.rate_limiter = rate_limiter or ARXIV_RATE_LIMITER
+        self.cache = cache
+        self.offline = offline
         self.session = self._create_session()
     
     def _create_session(self) -> requests.Session:
@@ -59,8 +82,9 @@ class ArxivFetcher:
             ArxivSearchResult: 检索结果对象
         
         Raises:
-            requests.RequestException: 网络请求异常
+            requests.RequestException: 网络请求异常（且缓存中没有可回放的结果）
             ValueError: 参数无效
+            LookupError: 离线模式下缓存中没有该查询
         """
         if not query or not query.strip():
             raise ValueError("查询关键词不能为空")
@@ -68,28 +92,26 @@ class ArxivFetcher:
         if max_results <= 0 or max_results > 30000:
             raise ValueError("max_results必须在1-30000之间")
         
-        # 构建查询参数
-        params = {
-            'search_query': query,
-            'start': 0,
-            'max_results': min(max_results, 30000),
-            'sortBy': sort_by,
-            'sortOrder': sort_order
-        }
+        # 有效期内的缓存结果直接返回；离线模式接受过期结果
+        if self.cache:
+            cached = self._from_cache(query, max_results, sort_by, sort_order, allow_stale=self.offline)
+            if cached is not None:
+                return cached
+        if self.offline:
+            raise LookupError(f"离线模式下缓存中没有该查询: {query}")
         
         try:
             logger.info(f"搜索ArXiv论文: query={query}, max_results={max_results}")
             
-            # 发送请求
-            response = self.session.get(
-                ARXIV_API_BASE,
-                params=params,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            
-            # 解析XML响应
-            papers = self._parse_xml_response(response.text)
+            if max_results <= MAX_SINGLE_REQUEST:
+                papers, _ = self.fetch_page(query, 0, max_results, sort_by, sort_order)
+            else:
+                # 大批量请求拆成多页，避免单个超大响应
+                from .harvester import ArxivHarvester
+                harvester = ArxivHarvester(self, page_size=MAX_SINGLE_REQUEST)
+                papers = list(harvester.harvest(
+                    query, max_results, sort_by, sort_order, resume=False
+                ))
             
             # 构建结果对象
             result = ArxivSearchResult(
@@ -100,10 +122,18 @@ class ArxivFetcher:
             )
             
             logger.info(f"成功检索到 {len(papers)} 篇论文")
+            if self.cache:
+                self.cache.put_query(query, max_results, sort_by, sort_order, result.papers)
             return result
             
         except requests.RequestException as e:
             logger.error(f"ArXiv API请求失败: {e}")
+            # 网络失败时回放过期的缓存结果
+            if self.cache:
+                cached = self._from_cache(query, max_results, sort_by, sort_order, allow_stale=True)
+                if cached is not None:
+                    logger.warning(f"使用过期的缓存结果: {query}")
+                    return cached
             raise
         except ET.ParseError as e:
             logger.error(f"XML解析失败: {e}")
@@ -112,6 +142,116 @@ class ArxivFetcher:
             logger.error(f"检索论文时发生未知错误: {e}")
             raise
     
+    def _from_cache(
+        self,
+        query: str,
+        max_results: int,
+        sort_by: str,
+        sort_order: str,
+        allow_stale: bool
+    ) -> Optional[ArxivSearchResult]:
+        """从本地缓存构建检索结果，未命中时返回None"""
+        papers = self.cache.get_query(query, max_results, sort_by, sort_order, allow_stale=allow_stale)
+        if papers is None:
+            return None
+        logger.info(f"命中ArXiv本地缓存: query={query}, 论文数: {len(papers)}")
+        return ArxivSearchResult(
+            query=query,
+            total_results=len(papers),
+            papers=papers,
+            from_cache=True
+        )
+    
+    def fetch_page(
+        self,
+        query: str,
+        start: int,
+        max_results: int,
+        sort_by: str = "relevance",
+        sort_order: str = "descending"
+    ) -> Tuple[List[ArxivPaper], int]:
+        """
+        获取一页检索结果（经过限速器），边下载边流式解析
+        
+        Args:
+            query: ArXiv检索语句
+            start: 起始位置
+            max_results: 本页结果数
+            sort_by: 排序方式
+            sort_order: 排序顺序
+        
+        Returns:
+            (论文列表, ArXiv报告的结果总数)
+        
+        Raises:
+            requests.RequestException: 网络请求异常
+            ET.ParseError: XML解析失败
+        """
+        params = {
+            'search_query': query,
+            'start': start,
+            'max_results': max_results,
+            'sortBy': sort_by,
+            'sortOrder': sort_order
+        }
+        parser = self._request_feed(params)
+        total = parser.total_results
+        return parser.papers, total if total is not None else start + len(parser.papers)
+    
+    def fetch_by_ids(self, arxiv_ids: List[str]) -> List[ArxivPaper]:
+        """
+        按ArXiv ID获取论文，提供缓存时优先读取缓存，只请求缺失的论文
+        
+        Args:
+            arxiv_ids: ArXiv ID列表（如 2301.12345 或 2301.12345v2）
+        
+        Returns:
+            按输入顺序排列的论文列表，不存在的ID被跳过
+        
+        Raises:
+            requests.RequestException: 网络请求异常
+            LookupError: 离线模式下缓存中缺少论文
+        """
+        found = {}
+        if self.cache:
+            for arxiv_id in arxiv_ids:
+                paper = self.cache.get_paper(arxiv_id)
+                if paper:
+                    found[arxiv_id] = paper
+        missing = [i for i in arxiv_ids if i not in found]
+        
+        if missing:
+            if self.offline:
+                raise LookupError(f"离线模式下缓存中没有论文: {', '.join(missing)}")
+            logger.info(f"按ID获取ArXiv论文: {missing}")
+            papers = self._request_feed({'id_list': ','.join(missing), 'max_results': len(missing)}).papers
+            if self.cache:
+                self.cache.put_papers(papers)
+            for paper in papers:
+                # 请求不带版本号时，返回的ID带有最新版本号
+                requested = next((i for i in missing if paper.arxiv_id == i or paper.arxiv_id.startswith(f"{i}v")), None)
+                if requested:
+                    found[requested] = paper
+        
+        return [found[i] for i in arxiv_ids if i in found]
+    
+    def _request_feed(self, params: dict) -> ArxivStreamParser:
+        """发送API请求（经过限速器），边下载边流式解析"""
+        self.rate_limiter.wait()
+        response = self.session.get(
+            ARXIV_API_BASE,
+            params=params,
+            timeout=self.timeout,
+            stream=True
+        )
+        with response:
+            response.raise_for_status()
+            parser = ArxivStreamParser()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                parser.feed(chunk)
+            parser.close()
+        return parser
+    
     def _parse_xml_response(self, xml_content: str) -> List[ArxivPaper]:
         """
         解析ArXiv API返回的XML内容
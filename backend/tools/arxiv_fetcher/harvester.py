@@ -0,0 +1,221 @@
+"""
+ArXiv分页采集器
+
+大批量检索时把请求拆成多页，边下载边产出论文：
+- 所有请求经过共享限速器，满足ArXiv的请求间隔要求
+- 消费当前页时后台预取下一页，限速等待和网络耗时与处理重叠
+- 内存中只保留正在处理和预取的几页，不再一次性持有整个XML
+- 每页处理完后写入检查点，中断后可从上次的位置继续
+"""
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple
+
+import requests
+
+from .fetcher import ArxivFetcher
+from .models import ArxivPaper
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 500  # 每页论文数，ArXiv建议单次请求不超过2000条
+PREFETCH_PAGES = 1  # 后台预取的页数
+MAX_PAGE_RETRIES = 3  # 单页失败（网络错误或意外的空页）时的重试次数
+RETRY_BACKOFF = 5.0  # 重试等待基数（秒），按重试次数翻倍
+
+
+class EmptyPageError(requests.RequestException):
+    """结果总数覆盖该位置，ArXiv却反复返回空页（服务端临时故障，按网络错误处理）"""
+
+
+@dataclass
+class HarvestCheckpoint:
+    """采集检查点"""
+
+    query: str  # 检索语句
+    sort_by: str  # 排序方式
+    sort_order: str  # 排序顺序
+    next_start: int = 0  # 下一页的起始位置
+    total_results: Optional[int] = None  # ArXiv报告的结果总数
+    harvested: int = 0  # 已产出的论文数
+
+    def matches(self, query: str, sort_by: str, sort_order: str) -> bool:
+        return (self.query, self.sort_by, self.sort_order) == (query, sort_by, sort_order)
+
+
+class ArxivHarvester:
+    """ArXiv分页采集器"""
+
+    def __init__(
+        self,
+        fetcher: Optional[ArxivFetcher] = None,
+        page_size: int = PAGE_SIZE,
+        prefetch: int = PREFETCH_PAGES,
+        checkpoint_path: Optional[Path] = None,
+        max_retries: int = MAX_PAGE_RETRIES,
+        retry_backoff: float = RETRY_BACKOFF
+    ):
+        """
+        初始化采集器
+
+        Args:
+            fetcher: ArXiv检索器，默认新建（使用进程内共享的限速器）
+            page_size: 每页论文数
+            prefetch: 后台预取的页数，0表示不预取
+            checkpoint_path: 检查点文件路径，提供时支持中断续采
+            max_retries: 单页失败时的重试次数
+            retry_backoff: 重试等待基数（秒）
+        """
+        if page_size <= 0:
+            raise ValueError("page_size必须大于0")
+        self.fetcher = fetcher or ArxivFetcher()
+        self.page_size = page_size
+        self.prefetch = max(0, prefetch)
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def harvest(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        sort_by: str = "submittedDate",
+        sort_order: str = "ascending",
+        resume: bool = True
+    ) -> Iterator[ArxivPaper]:
+        """
+        分页采集论文，逐篇产出
+
+        默认按提交时间升序排列：新论文追加在结果末尾，翻页过程中已采集的位置不会偏移。
+
+        Args:
+            query: ArXiv检索语句
+            max_results: 最多采集的论文数（从结果开头计），None表示采集全部
+            sort_by: 排序方式（relevance, lastUpdatedDate, submittedDate）
+            sort_order: 排序顺序（ascending, descending）
+            resume: 存在匹配的检查点时是否从检查点继续
+
+        Yields:
+            ArxivPaper: 论文对象
+        """
+        if not query or not query.strip():
+            raise ValueError("查询关键词不能为空")
+
+        checkpoint = self._load_checkpoint(query, sort_by, sort_order) if resume else None
+        if checkpoint:
+            logger.info(f"从检查点继续采集: start={checkpoint.next_start}, 已采集 {checkpoint.harvested} 篇")
+        else:
+            checkpoint = HarvestCheckpoint(query=query, sort_by=sort_by, sort_order=sort_order)
+
+        start = checkpoint.next_start
+        first_size = self.page_size if max_results is None else min(self.page_size, max_results - start)
+        if first_size <= 0:
+            self._clear_checkpoint()
+            return
+        papers, total = self._fetch_page(query, start, first_size, sort_by, sort_order)
+        checkpoint.total_results = total
+        end = total if max_results is None else min(total, max_results)
+        logger.info(f"ArXiv共 {total} 条结果，本次采集 {start}-{end}")
+
+        page_starts = iter(range(start + first_size, end, self.page_size))
+        seen_ids: Set[str] = set()
+        executor = ThreadPoolExecutor(max_workers=max(1, self.prefetch)) if self.prefetch else None
+        pending = deque()
+
+        def submit_next() -> None:
+            page_start = next(page_starts, None)
+            if page_start is not None:
+                size = min(self.page_size, end - page_start)
+                args = (query, page_start, size, sort_by, sort_order)
+                task = executor.submit(self._fetch_page, *args) if executor else args
+                pending.append((page_start, size, task))
+
+        try:
+            for _ in range(max(1, self.prefetch)):
+                submit_next()
+            page_end = start + first_size
+            while True:
+                for paper in papers:
+                    # 翻页期间结果集变化可能导致相邻页重复
+                    if paper.arxiv_id in seen_ids:
+                        continue
+                    seen_ids.add(paper.arxiv_id)
+                    checkpoint.harvested += 1
+                    yield paper
+                checkpoint.next_start = min(page_end, end)
+                self._save_checkpoint(checkpoint)
+                if not pending:
+                    break
+                page_start, size, task = pending.popleft()
+                submit_next()
+                papers, _ = task.result() if executor else self._fetch_page(*task)
+                page_end = page_start + size
+        finally:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        self._clear_checkpoint()
+        logger.info(f"采集完成，共 {checkpoint.harvested} 篇论文")
+
+    def _fetch_page(
+        self,
+        query: str,
+        start: int,
+        size: int,
+        sort_by: str,
+        sort_order: str
+    ) -> Tuple[List[ArxivPaper], int]:
+        """
+        获取单页，网络错误或意外的空页时退避重试
+
+        Raises:
+            requests.RequestException: 重试用尽，抛出最后一次的原始异常（空页为 EmptyPageError），
+                调用方可以像处理单次请求失败一样回退到缓存
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                papers, total = self.fetcher.fetch_page(query, start, size, sort_by, sort_order)
+                # ArXiv偶尔在负载高时返回空页，结果总数仍然覆盖该位置时视为临时故障
+                if papers or start >= total:
+                    return papers, total
+                error = EmptyPageError(f"start={start} 返回空页（共 {total} 条）")
+            except requests.RequestException as e:
+                error = e
+            if attempt < self.max_retries:
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning(f"ArXiv分页请求失败: {error}，{delay:.0f}秒后第{attempt + 1}次重试")
+                time.sleep(delay)
+        logger.error(f"ArXiv分页请求失败（已重试{self.max_retries}次）: {error}")
+        raise error
+
+    def _load_checkpoint(self, query: str, sort_by: str, sort_order: str) -> Optional[HarvestCheckpoint]:
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = HarvestCheckpoint(**json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"检查点读取失败，将从头采集: {e}")
+            return None
+        return checkpoint if checkpoint.matches(query, sort_by, sort_order) else None
+
+    def _save_checkpoint(self, checkpoint: HarvestCheckpoint) -> None:
+        """原子地保存检查点"""
+        if not self.checkpoint_path:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(self.checkpoint_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(checkpoint), f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self) -> None:
+        """采集完成后删除检查点，下次从头开始"""
+        if self.checkpoint_path and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
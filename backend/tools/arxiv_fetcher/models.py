@@ -44,6 +44,7 @@ class ArxivSearchResult:
     total_results: int  # 总结果数
     papers: List[ArxivPaper] = field(default_factory=list)  # 论文列表
     search_time: str = field(default_factory=lambda: datetime.now().isoformat())  # 检索时间
+    from_cache: bool = False  # 是否来自本地缓存
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -52,7 +53,8 @@ class ArxivSearchResult:
             'total_results': self.total_results,
             'papers': [paper.to_dict() for paper in self.papers],
             'search_time': self.search_time,
-            'paper_count': len(self.papers)
+            'paper_count': len(self.papers),
+            'from_cache': self.from_cache
         }
     
     def get_papers(self) -> List[ArxivPaper]:
@@ -0,0 +1,56 @@
+"""
+ArXiv请求限速
+
+ArXiv API 要求连续请求之间至少间隔3秒。限速器按请求预约发送时间，
+多个线程（或多个检索器实例）共享同一个限速器时，请求仍然按间隔依次发出。
+"""
+import threading
+import time
+from typing import Callable
+
+# ArXiv API文档要求的请求间隔（秒）
+ARXIV_REQUEST_INTERVAL = 3.0
+
+
+class RateLimiter:
+    """线程安全的最小间隔限速器"""
+
+    def __init__(
+        self,
+        min_interval: float = ARXIV_REQUEST_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        初始化限速器
+
+        Args:
+            min_interval: 两次请求之间的最小间隔（秒）
+            clock: 单调时钟，测试时可替换
+            sleep: 等待函数，测试时可替换
+        """
+        self.min_interval = min_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> float:
+        """
+        等待到允许发出下一个请求
+
+        Returns:
+            实际等待的秒数
+        """
+        with self._lock:
+            now = self._clock()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.min_interval
+        delay = start_at - now
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+# 进程内所有ArXiv请求共享的限速器
+ARXIV_RATE_LIMITER = RateLimiter()
@@ -0,0 +1,144 @@
+"""
+ArXiv Atom流式解析器
+
+基于 XMLPullParser（ET.iterparse 的增量版本）按块解析响应字节流：
+- 每个 </entry> 闭合时立即组装 ArxivPaper，然后清空并移除该元素，内存只保留当前条目
+- 对条目的子元素只遍历一次，按预编译的完整标签名分派，不再为每个字段调用 find
+- 作者名和分类在大批量结果中大量重复，解析时驻留（sys.intern）以共享字符串
+解析结果与 ArxivFetcher._parse_xml_response 一致。XML不合法时抛出 ET.ParseError。
+"""
+import sys
+from typing import Iterable, List, Optional, Union
+from xml.etree.ElementTree import Element, XMLPullParser
+
+from .models import ArxivPaper
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+ENTRY_TAG = _ATOM + "entry"
+ID_TAG = _ATOM + "id"
+TITLE_TAG = _ATOM + "title"
+SUMMARY_TAG = _ATOM + "summary"
+AUTHOR_TAG = _ATOM + "author"
+NAME_TAG = _ATOM + "name"
+PUBLISHED_TAG = _ATOM + "published"
+UPDATED_TAG = _ATOM + "updated"
+LINK_TAG = _ATOM + "link"
+CATEGORY_TAG = _ATOM + "category"
+COMMENT_TAG = _ATOM + "comment"
+TOTAL_RESULTS_TAG = _OPENSEARCH + "totalResults"
+
+# 只取第一次出现的文本字段：标签 -> (字段名, 是否去除首尾空白)
+_TEXT_FIELDS = {
+    ID_TAG: ("id", True),
+    TITLE_TAG: ("title", True),
+    SUMMARY_TAG: ("summary", True),
+    PUBLISHED_TAG: ("published", False),
+    UPDATED_TAG: ("updated", False),
+    COMMENT_TAG: ("comment", False),
+}
+
+
+def _build_paper(entry: Element) -> Optional[ArxivPaper]:
+    """单次遍历条目的子元素组装论文，没有ID时返回None"""
+    fields = {}
+    authors: List[str] = []
+    categories: List[str] = []
+    primary_category = None
+    pdf_url = None
+    arxiv_url = None
+
+    for child in entry:
+        tag = child.tag
+        text_field = _TEXT_FIELDS.get(tag)
+        if text_field is not None:
+            name, strip = text_field
+            if name not in fields and child.text:
+                fields[name] = child.text.strip() if strip else child.text
+        elif tag == AUTHOR_TAG:
+            name_elem = child.find(NAME_TAG)
+            if name_elem is not None and name_elem.text:
+                authors.append(sys.intern(name_elem.text.strip()))
+        elif tag == LINK_TAG:
+            rel = child.get("rel", "")
+            if rel == "alternate":
+                arxiv_url = child.get("href", "")
+            elif "pdf" in rel or "application/pdf" in child.get("type", ""):
+                pdf_url = child.get("href", "")
+        elif tag == CATEGORY_TAG:
+            term = child.get("term", "")
+            if term:
+                term = sys.intern(term)
+                categories.append(term)
+                scheme = child.get("scheme", "")
+                if scheme.endswith("#primary") or "primary" in scheme.lower():
+                    primary_category = term
+
+    if "id" not in fields:
+        return None
+    arxiv_id = fields["id"].split("/")[-1]
+    return ArxivPaper(
+        arxiv_id=arxiv_id,
+        title=fields.get("title", ""),
+        summary=fields.get("summary", ""),
+        authors=authors,
+        published=fields.get("published"),
+        updated=fields.get("updated"),
+        pdf_url=pdf_url,
+        arxiv_url=arxiv_url or f"http://arxiv.org/abs/{arxiv_id}",
+        primary_category=primary_category or (categories[0] if categories else None),
+        categories=categories,
+        comment=fields.get("comment")
+    )
+
+
+class ArxivStreamParser:
+    """增量解析ArXiv API的Atom响应"""
+
+    def __init__(self):
+        self.papers: List[ArxivPaper] = []
+        self.total_results: Optional[int] = None
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._root: Optional[Element] = None
+
+    def feed(self, chunk: Union[bytes, str]) -> None:
+        """输入一块响应数据，已闭合的条目立即解析为论文"""
+        self._parser.feed(chunk)
+        self._handle_events()
+
+    def close(self) -> None:
+        """输入结束，检查文档完整性"""
+        self._parser.close()
+        self._handle_events()
+
+    def _handle_events(self) -> None:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+            if elem.tag == ENTRY_TAG:
+                paper = _build_paper(elem)
+                if paper:
+                    self.papers.append(paper)
+                # 释放已解析的条目，文档树不随结果数增长
+                elem.clear()
+                if self._root is not None and len(self._root) and self._root[-1] is elem:
+                    self._root.remove(elem)
+            elif elem.tag == TOTAL_RESULTS_TAG and (elem.text or "").strip().isdigit():
+                self.total_results = int(elem.text.strip())
+
+
+def parse_atom_stream(chunks: Iterable[Union[bytes, str]]) -> ArxivStreamParser:
+    """
+    流式解析整个响应
+
+    Returns:
+        解析完成的 ArxivStreamParser，论文在其 papers 属性中
+    """
+    parser = ArxivStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return parser
@@ -0,0 +1,116 @@
+"""
+ArXiv响应解析基准测试
+
+用 tests/arxiv_test_output.json 中记录的论文生成不同条目数的ArXiv Atom响应，
+比较整树解析（ET.fromstring + find）与流式解析的耗时和峰值内存。
+
+使用方法：
+    python backend/tools/benchmark_arxiv_parse.py
+    python backend/tools/benchmark_arxiv_parse.py --entries 500 5000 30000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+from xml.sax.saxutils import escape, quoteattr
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.arxiv_fetcher import ArxivFetcher
+from tools.arxiv_fetcher.streaming import parse_atom_stream
+
+SAMPLE_PATH = Path(__file__).parent.parent / "tests" / "arxiv_test_output.json"
+CHUNK_SIZE = 64 * 1024
+
+
+def _entry_xml(paper: Dict, index: int) -> str:
+    arxiv_id = f"{paper['arxiv_id']}.{index}"
+    authors = "".join(f"<author><name>{escape(name)}</name></author>" for name in paper["authors"])
+    categories = "".join(
+        f'<category term={quoteattr(term)} scheme="http://arxiv.org/schemas/atom"/>'
+        for term in paper["categories"]
+    )
+    return (
+        f"<entry><id>http://arxiv.org/abs/{arxiv_id}</id>"
+        f"<updated>{paper['updated']}</updated><published>{paper['published']}</published>"
+        f"<title>{escape(paper['title'])}</title><summary>{escape(paper['summary'])}</summary>"
+        f"{authors}"
+        f'<link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>'
+        f'<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf"/>'
+        f"{categories}</entry>"
+    )
+
+
+def build_feed(entries: int) -> bytes:
+    """把记录的论文重复扩展为指定条目数的Atom响应"""
+    with open(SAMPLE_PATH, "r", encoding="utf-8") as f:
+        samples = json.load(f)["papers"]
+    body = "".join(_entry_xml(samples[i % len(samples)], i) for i in range(entries))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        f"<title>ArXiv Query</title><opensearch:totalResults>{entries}</opensearch:totalResults>"
+        f"{body}</feed>"
+    ).encode("utf-8")
+
+
+def _measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """返回最快一次的耗时，以及单独一次运行的峰值内存"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": best * 1000, "peak_mb": peak / 1024 / 1024}
+
+
+def run_benchmark(entry_counts: List[int], repeat: int) -> List[Dict]:
+    """
+    运行基准测试
+
+    Returns:
+        每个 (条目数, 解析方式) 的结果列表
+    """
+    fetcher = ArxivFetcher()
+    results = []
+    for entries in entry_counts:
+        feed = build_feed(entries)
+        text = feed.decode("utf-8")
+        chunks = [feed[i:i + CHUNK_SIZE] for i in range(0, len(feed), CHUNK_SIZE)]
+        parsers = [
+            # 旧路径需要先持有完整的响应文本
+            ("tree", lambda: fetcher._parse_xml_response(text)),
+            ("streaming", lambda: parse_atom_stream(chunks))
+        ]
+        for name, func in parsers:
+            results.append({"entries": entries, "parser": name, "size_mb": len(feed) / 1024 / 1024, **_measure(func, repeat)})
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="ArXiv响应解析基准测试")
+    parser.add_argument("--entries", type=int, nargs="+", default=[500, 5000, 30000], help="条目数")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    args = parser.parse_args()
+
+    print(f"{'条目数':>8} {'解析方式':<10} {'响应(MB)':>10} {'耗时(ms)':>10} {'峰值内存(MB)':>14}")
+    for row in run_benchmark(args.entries, args.repeat):
+        print(
+            f"{row['entries']:>8} {row['parser']:<10} {row['size_mb']:>10.1f} "
+            f"{row['ms']:>10.1f} {row['peak_mb']:>14.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
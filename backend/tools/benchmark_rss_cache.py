@@ -0,0 +1,116 @@
+"""
+RSS缓存格式基准测试
+
+比较缩进JSON（旧格式）、紧凑JSON和msgpack在不同文章数下的文件大小、写入和读取耗时。
+
+使用方法：
+    python backend/tools/benchmark_rss_cache.py
+    python backend/tools/benchmark_rss_cache.py --sizes 200 10000 100000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.rss_fetcher.cache_store import load_cache_file, msgpack, save_cache_file
+
+SAMPLE_CACHE_PATH = Path(__file__).parent.parent / "data" / "rss_cache.json"
+
+
+def _sample_articles() -> List[Dict]:
+    """优先使用本地缓存中的真实文章作为样本，没有时生成模拟文章"""
+    if SAMPLE_CACHE_PATH.exists():
+        with open(SAMPLE_CACHE_PATH, "r", encoding="utf-8") as f:
+            articles = json.load(f).get("articles", [])
+        if articles:
+            return articles
+    return [
+        {
+            "title": f"模拟新闻标题{i}",
+            "link": f"https://example.com/news/{i}",
+            "summary_text": "这是一段模拟的新闻摘要，用于测试缓存格式的读写性能。" * 5,
+            "pub_date": "Tue, 03 Jun 2025 09:00:00 +0800",
+            "published_ts": 1748912400,
+            "source": "模拟源",
+            "categories": ["科技"],
+            "sources": [],
+            "token_estimate": 120
+        }
+        for i in range(50)
+    ]
+
+
+def _build_cache(size: int, samples: List[Dict]) -> Dict:
+    articles = []
+    for i in range(size):
+        article = dict(samples[i % len(samples)])
+        article["link"] = f"{article['link']}#{i}"
+        articles.append(article)
+    return {"summary": {"cached_articles": size}, "articles": articles}
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes: List[int], repeat: int) -> List[Dict]:
+    """
+    运行基准测试
+
+    Returns:
+        每个 (文章数, 格式) 的结果列表
+    """
+    samples = _sample_articles()
+    formats = [("json(indent)", ".json", True), ("json", ".json", False)]
+    if msgpack is not None:
+        formats.append(("msgpack", ".msgpack", False))
+    else:
+        print("未安装msgpack，跳过二进制格式")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            cache_data = _build_cache(size, samples)
+            for name, suffix, pretty in formats:
+                path = Path(tmp_dir) / f"rss_cache_{size}{suffix}"
+                write_time = _best_time(lambda: save_cache_file(cache_data, path, pretty=pretty), repeat)
+                read_time = _best_time(lambda: load_cache_file(path), repeat)
+                results.append({
+                    "articles": size,
+                    "format": name,
+                    "size_kb": path.stat().st_size / 1024,
+                    "write_ms": write_time * 1000,
+                    "read_ms": read_time * 1000
+                })
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="RSS缓存格式基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 10000, 100000], help="文章数")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    args = parser.parse_args()
+
+    print(f"{'文章数':>8} {'格式':<14} {'大小(KB)':>10} {'写入(ms)':>10} {'读取(ms)':>10}")
+    for row in run_benchmark(args.sizes, args.repeat):
+        print(
+            f"{row['articles']:>8} {row['format']:<14} {row['size_kb']:>10.1f} "
+            f"{row['write_ms']:>10.1f} {row['read_ms']:>10.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,6 @@ RSS缓存生成任务
 Cron配置示例（每日01:00执行）：
     0 1 * * * cd /path/to/project && python backend/tools/rss_cache_job.py
 """
-import json
 import logging
 import sys
 from datetime import datetime
@@ -20,8 +19,23 @@ from typing import List, Dict, Any
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tools.rss_fetcher import RSSFetcher, FetchConfig
+from tools.rss_fetcher import (
+    RSSFetcher,
+    FetchConfig,
+    FeedHealthTracker,
+    deduplicate_articles,
+    normalize_article,
+    parse_published_ts
+)
 from tools.rss_fetcher.models import RSSArticle
+from tools.rss_fetcher.health import HEALTH_FILE_PATH
+from tools.rss_fetcher.cache_store import (
+    cache_file_name,
+    file_lock,
+    get_cache_format,
+    load_cache_file,
+    save_cache_file
+)
 
 # 配置日志
 logging.basicConfig(
@@ -33,55 +47,39 @@ logger = logging.getLogger(__name__)
 # 配置常量
 # 优先使用环境变量指定的路径，否则使用相对路径
 # Docker环境下使用 /app/data，本地开发使用 backend/data
+# 缓存格式由环境变量 RSS_CACHE_FORMAT 指定（json 或 msgpack），决定文件后缀
 import os
 if os.getenv("DOCKER_ENV") or os.path.exists("/app"):
     # Docker环境
-    CACHE_FILE_PATH = Path("/app/data/rss_cache.json")
+    CACHE_FILE_PATH = Path("/app/data") / cache_file_name(get_cache_format())
 else:
     # 本地开发环境
-    CACHE_FILE_PATH = Path(__file__).parent.parent / "data" / "rss_cache.json"
+    CACHE_FILE_PATH = Path(__file__).parent.parent / "data" / cache_file_name(get_cache_format())
 
 MAX_ARTICLES = 200  # 固定保存200条最新文章
+# 是否在缓存中保留原始HTML描述；默认只保存纯文本的截断摘要（summary_text），缓存更小
+KEEP_RAW_HTML = False
+# 解析进程数，默认0（在抓取线程内流式解析）；源很多且CPU充足时可通过环境变量 RSS_PARSE_PROCESSES 开启
+PARSE_PROCESSES = int(os.getenv("RSS_PARSE_PROCESSES", "0"))
 
 
-def parse_pub_date(pub_date_str: str) -> datetime:
+def get_published_ts(article: RSSArticle) -> int:
     """
-    解析发布日期字符串为datetime对象（统一为naive datetime）
-    
-    Args:
-        pub_date_str: 发布日期字符串（RSS格式）
-        
+    获取文章的发布时间戳（不修改文章）
+
+    解析阶段已预先计算 published_ts，这里只为旧数据兜底解析日期字符串。
+
     Returns:
-        datetime对象（naive，无时区信息），解析失败则返回最旧时间（1970-01-01）
+        UTC时间戳，没有日期的返回0（排序时排到最后）
     """
-    if not pub_date_str:
-        return datetime(1970, 1, 1)
-    
-    try:
-        # 尝试使用email.utils.parsedate_to_datetime解析RFC 2822格式
-        from email.utils import parsedate_to_datetime
-        dt = parsedate_to_datetime(pub_date_str)
-        # 转换为naive datetime（去掉时区信息）
-        if dt.tzinfo is not None:
-            dt = dt.replace(tzinfo=None)
-        return dt
-    except (ValueError, TypeError):
-        try:
-            # 尝试解析ISO格式
-            dt = datetime.fromisoformat(pub_date_str.replace('Z', '+00:00'))
-            # 转换为naive datetime
-            if dt.tzinfo is not None:
-                dt = dt.replace(tzinfo=None)
-            return dt
-        except (ValueError, AttributeError):
-            # 解析失败，返回最旧时间（排序时会被排到最后）
-            logger.warning(f"无法解析发布日期: {pub_date_str}")
-            return datetime(1970, 1, 1)
+    if article.published_ts is None and article.pub_date:
+        return parse_published_ts(article.pub_date) or 0
+    return article.published_ts or 0
 
 
 def sort_articles_by_date(articles: List[RSSArticle]) -> List[RSSArticle]:
     """
-    按发布日期排序文章，最新的在前
+    按发布时间排序文章，最新的在前（统一按UTC比较，不同时区的源也能正确排序）
     
     Args:
         articles: 文章列表
@@ -89,13 +87,10 @@ def sort_articles_by_date(articles: List[RSSArticle]) -> List[RSSArticle]:
     Returns:
         排序后的文章列表
     """
-    def get_sort_key(article: RSSArticle) -> datetime:
-        """获取排序键"""
-        if article.pub_date:
-            return parse_pub_date(article.pub_date)
-        return datetime(1970, 1, 1)  # 没有日期的排到最后
-    
-    return sorted(articles, key=get_sort_key, reverse=True)
+    # 排序前一次性计算时间戳，排序过程中不修改文章
+    keyed = [(get_published_ts(article), index, article) for index, article in enumerate(articles)]
+    keyed.sort(key=lambda item: (-item[0], item[1]))
+    return [article for _, _, article in keyed]
 
 
 def generate_cache() -> Dict[str, Any]:
@@ -111,12 +106,16 @@ def generate_cache() -> Dict[str, Any]:
     config = FetchConfig(
         max_workers=10,
         timeout=10,
-        max_retries=2
+        max_retries=2,
+        parse_processes=PARSE_PROCESSES,
+        keep_raw_html=KEEP_RAW_HTML
     )
     
-    # 获取所有RSS源
-    with RSSFetcher(config) as fetcher:
+    # 获取所有RSS源（跳过隔离中的失效源，并更新各源健康统计）
+    health = FeedHealthTracker(HEALTH_FILE_PATH)
+    with RSSFetcher(config, health=health) as fetcher:
         result = fetcher.fetch_all()
+        health.save()
         all_articles = result.get_all_articles()
         
         logger.info(
@@ -124,14 +123,22 @@ def generate_cache() -> Dict[str, Any]:
             f"共 {len(all_articles)} 篇文章"
         )
         
+        # 合并多个源转载的同一条新闻，避免重复文章占用缓存名额
+        unique_articles = deduplicate_articles(all_articles)
+        logger.info(
+            f"去重完成: {len(all_articles)} 篇文章合并为 {len(unique_articles)} 篇"
+        )
+        
         # 按发布日期排序，最新的在前
-        sorted_articles = sort_articles_by_date(all_articles)
+        sorted_articles = sort_articles_by_date(unique_articles)
         
         # 取最新200条
         latest_articles = sorted_articles[:MAX_ARTICLES]
         
         # 转换为字典格式
-        articles_list = [article.to_dict() for article in latest_articles]
+        articles_list = [
+            article.to_dict(include_description=KEEP_RAW_HTML) for article in latest_articles
+        ]
         
         # 构建缓存数据结构
         cache_data = {
@@ -139,7 +146,9 @@ def generate_cache() -> Dict[str, Any]:
                 "total_sources": result.total_sources,
                 "successful_sources": result.successful_sources,
                 "failed_sources": result.failed_sources,
+                "skipped_sources": result.skipped_sources,
                 "total_articles_fetched": len(all_articles),
+                "unique_articles": len(unique_articles),
                 "cached_articles": len(articles_list),
                 "fetch_time": result.fetch_time,
                 "generated_at": datetime.now().isoformat()
@@ -156,30 +165,73 @@ def generate_cache() -> Dict[str, Any]:
 
 def save_cache(cache_data: Dict[str, Any], cache_path: Path) -> None:
     """
-    保存缓存数据到JSON文件
+    保存缓存数据（先写临时文件再原子替换，读取方不会看到写了一半的文件）
     
     Args:
         cache_data: 缓存数据字典
-        cache_path: 缓存文件路径
+        cache_path: 缓存文件路径，.json 为紧凑JSON，.msgpack 为二进制格式
     """
-    # 确保目录存在
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # 保存到文件
-    with open(cache_path, 'w', encoding='utf-8') as f:
-        json.dump(cache_data, f, ensure_ascii=False, indent=2)
+    save_cache_file(cache_data, cache_path)
     
     logger.info(f"缓存已保存到: {cache_path}")
 
 
+def merge_into_cache(new_articles: List[RSSArticle], cache_path: Path = CACHE_FILE_PATH) -> Dict[str, Any]:
+    """
+    把新抓取的文章增量合并进缓存文件
+
+    供轮询调度器在单个源有更新时调用：与已缓存文章一起去重、按发布时间排序后
+    保留最新 MAX_ARTICLES 条，不需要重新抓取所有源。读-改-写在文件锁内完成，
+    与定时任务的整体写入互不覆盖。
+    
+    Args:
+        new_articles: 新文章列表
+        cache_path: 缓存文件路径
+        
+    Returns:
+        合并后的缓存数据
+    """
+    with file_lock(cache_path):
+        cache_data = {"summary": {}, "articles": []}
+        if cache_path.exists():
+            try:
+                cache_data = load_cache_file(cache_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取已有缓存失败，将只保存新文章: {e}")
+        
+        existing = []
+        for item in cache_data.get("articles", []):
+            article = RSSArticle.from_dict(item)
+            if article.published_ts is None:
+                article.published_ts = get_published_ts(article) or None
+            if not article.summary_text:
+                # 旧版本缓存中的文章没有经过规范化
+                normalize_article(article, KEEP_RAW_HTML)
+            existing.append(article)
+        merged = sort_articles_by_date(deduplicate_articles(new_articles + existing))
+        articles_list = [
+            article.to_dict(include_description=KEEP_RAW_HTML) for article in merged[:MAX_ARTICLES]
+        ]
+        
+        summary = cache_data.get("summary", {})
+        summary.update({
+            "cached_articles": len(articles_list),
+            "generated_at": datetime.now().isoformat()
+        })
+        cache_data = {"summary": summary, "articles": articles_list}
+        save_cache(cache_data, cache_path)
+    return cache_data
+
+
 def main():
     """主函数"""
     try:
         # 生成缓存
         cache_data = generate_cache()
         
-        # 保存缓存
-        save_cache(cache_data, CACHE_FILE_PATH)
+        # 保存缓存（与轮询守护进程的增量合并互斥）
+        with file_lock(CACHE_FILE_PATH):
+            save_cache(cache_data, CACHE_FILE_PATH)
         
         logger.info("RSS缓存任务执行成功")
         return 0
@@ -5,8 +5,12 @@ RSS Fetcher - RSS新闻多线程获取工具
 
 主要功能：
 - 多线程并发获取多个RSS源
-- 自动解析RSS/Atom格式
+- 自动解析RSS/Atom格式（流式增量解析，不合法时退回feedparser）
 - 统一的数据结构和JSON输出
+- HTML摘要转纯文本，附带截断摘要和token估算
+- 多源转载文章的去重与近似重复聚类
+- 按源自适应间隔的轮询调度
+- 源健康统计、延迟自适应超时与失效源隔离
 - 完善的错误处理和日志记录
 
 基本使用：
@@ -29,7 +33,11 @@ with RSSFetcher(config) as fetcher:
 from .fetcher import RSSFetcher
 from .config import FetchConfig, RSS_SOURCES, get_rss_urls, get_rss_sources
 from .models import RSSArticle, RSSFetchResult, RSSAggregatedResult
-from .parser import RSSParser
+from .parser import RSSParser, parse_published_ts
+from .dedup import canonicalize_url, deduplicate_articles
+from .scheduler import RSSPollingScheduler, SourceSchedule
+from .health import FeedHealthTracker, SourceHealth
+from .text import estimate_tokens, html_to_text, normalize_article, truncate_text
 
 __version__ = "1.0.0"
 
@@ -42,5 +50,16 @@ __all__ = [
     'RSSArticle',
     'RSSFetchResult',
     'RSSAggregatedResult',
-    'RSSParser'
+    'RSSParser',
+    'parse_published_ts',
+    'canonicalize_url',
+    'deduplicate_articles',
+    'RSSPollingScheduler',
+    'SourceSchedule',
+    'FeedHealthTracker',
+    'SourceHealth',
+    'estimate_tokens',
+    'html_to_text',
+    'normalize_article',
+    'truncate_text'
 ]
@@ -0,0 +1,129 @@
+"""
+RSS缓存文件读写
+
+- 写入时先写临时文件再 os.replace，读取方不会看到写了一半的文件
+- JSON默认紧凑输出（不缩进）
+- 可选msgpack二进制格式，读取时通过内存映射直接解包，省去文本解析
+- 读-改-写之前用 file_lock 加进程间文件锁，定时任务和轮询守护进程不会互相覆盖对方的更新
+"""
+import json
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 未安装msgpack时只能使用JSON格式
+    msgpack = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 没有 fcntl，只能依靠原子替换
+    fcntl = None
+
+CACHE_FORMATS = ("json", "msgpack")
+DEFAULT_CACHE_FORMAT = "json"
+
+
+def get_cache_format() -> str:
+    """读取环境变量 RSS_CACHE_FORMAT 指定的缓存格式，未安装msgpack时退回JSON"""
+    cache_format = os.getenv("RSS_CACHE_FORMAT", DEFAULT_CACHE_FORMAT).lower()
+    if cache_format not in CACHE_FORMATS:
+        raise ValueError(f"不支持的缓存格式: {cache_format}，可选: {', '.join(CACHE_FORMATS)}")
+    if cache_format == "msgpack" and msgpack is None:
+        return "json"
+    return cache_format
+
+
+def cache_file_name(cache_format: str) -> str:
+    """缓存格式对应的文件名"""
+    return f"rss_cache.{cache_format}"
+
+
+def _format_of(path: Path) -> str:
+    return "msgpack" if path.suffix == ".msgpack" else "json"
+
+
+def save_cache_file(cache_data: Dict[str, Any], path: Path, pretty: bool = False) -> None:
+    """
+    原子地保存缓存数据，格式由文件后缀决定
+
+    Args:
+        cache_data: 缓存数据
+        path: 缓存文件路径（.json 或 .msgpack）
+        pretty: JSON是否缩进（便于人工查看，体积更大）
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if _format_of(path) == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("未安装msgpack，无法写入二进制缓存")
+        payload = msgpack.packb(cache_data, use_bin_type=True)
+    else:
+        payload = json.dumps(
+            cache_data,
+            ensure_ascii=False,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":")
+        ).encode("utf-8")
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    对数据文件加进程间排他锁（锁在旁边的 .lock 文件上，不受原子替换影响）
+
+    同一时间只有一个进程能执行锁内的读-改-写；进程退出时锁自动释放。
+
+    Args:
+        path: 要保护的数据文件路径
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def load_cache_file(path: Path) -> Dict[str, Any]:
+    """
+    读取缓存数据，格式由文件后缀决定
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件内容无法解析
+    """
+    if _format_of(path) == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("未安装msgpack，无法读取二进制缓存")
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"缓存文件为空: {path}")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    return msgpack.unpackb(mm, raw=False)
+                except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError) as e:
+                    raise ValueError(f"缓存文件msgpack解析失败: {e}")
+    with open(path, "rb") as f:
+        try:
+            return json.loads(f.read())
+        except json.JSONDecodeError as e:
+            raise ValueError(f"缓存文件JSON解析失败: {e}")
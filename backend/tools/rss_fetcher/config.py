@@ -16,6 +16,11 @@ class FetchConfig:
     max_retries: int = 2  # 最大重试次数
     retry_delay: float = 1.0  # 重试延迟(秒)
     user_agent: str = "Mozilla/5.0 (RSS Fetcher/1.0)"  # User-Agent
+    streaming: bool = True  # 是否流式解析响应（失败时退回feedparser）
+    max_body_bytes: int = 5 * 1024 * 1024  # 单个RSS响应的最大字节数
+    chunk_size: int = 64 * 1024  # 流式读取的块大小
+    parse_processes: int = 0  # 解析进程数，0表示在抓取线程内解析
+    keep_raw_html: bool = False  # 是否在description中保留原始HTML（默认转为纯文本）
 
 
 # RSS源配置，包含URL和友好名称
@@ -0,0 +1,201 @@
+"""
+RSS文章去重
+
+同一条新闻经常被多个源转载（如FT中文网、BBC中文、中国新闻网），
+这里先按规范化URL合并完全重复的文章，再用MinHash + LSH对标题和摘要做近似重复聚类，
+每个簇只保留一篇代表文章，并在 sources 中记录所有转载来源。
+"""
+import html
+import random
+import re
+import unicodedata
+import zlib
+from dataclasses import replace
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .models import RSSArticle
+
+# 链接中与内容无关的跟踪参数
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "spm", "from", "ref", "source", "fbclid", "gclid", "at_medium", "at_campaign",
+}
+
+SHINGLE_SIZE = 3  # 字符级shingle长度，中文不需要分词
+DESCRIPTION_PREFIX = 120  # 参与相似度计算的摘要长度
+NUM_PERM = 64  # MinHash签名长度
+LSH_BANDS = 16  # LSH分段数，每段 NUM_PERM // LSH_BANDS 行
+DEFAULT_SIMILARITY_THRESHOLD = 0.5  # 判定为近似重复的Jaccard相似度下限
+MIN_TITLE_SIMILARITY = 0.2  # 候选对的标题shingle相似度下限，防止共用摘要模板的不同文章被合并
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)  # 固定种子，保证签名在不同进程间一致
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+_NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+_HTML_TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def canonicalize_url(url: Optional[str]) -> str:
+    """
+    规范化文章链接
+
+    忽略协议差异、www前缀、锚点、跟踪参数、查询参数顺序和末尾斜杠，
+    使同一篇文章的不同链接形式得到相同结果。链接为空时返回空字符串。
+    """
+    if not url or not url.strip():
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+
+def _normalize_text(text: str) -> str:
+    """去掉HTML标签，统一全半角和大小写，去掉标点和空白"""
+    text = html.unescape(_HTML_TAG_PATTERN.sub("", text or ""))
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD_PATTERN.sub("", text)
+
+
+def _char_shingles(text: str, salt: bytes) -> Set[int]:
+    """提取字符shingle（以crc32作为稳定哈希，salt用于区分不同字段）"""
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(salt + text.encode("utf-8"))} if text else set()
+    return {
+        zlib.crc32(salt + text[i:i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def _shingles(title: str, description: str) -> Set[int]:
+    """提取标题和摘要的shingle集合，标题以两种salt各加入一次，相当于权重加倍"""
+    return (
+        _char_shingles(title, b"t1:")
+        | _char_shingles(title, b"t2:")
+        | _char_shingles(description, b"d:")
+    )
+
+
+def _jaccard(a: Set[int], b: Set[int]) -> float:
+    """精确计算两个集合的Jaccard相似度"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _minhash(shingles: Set[int]) -> List[int]:
+    """计算MinHash签名"""
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in shingles)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def _estimated_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """用签名中相等位置的比例估计Jaccard相似度"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+class _UnionFind:
+    """并查集，用于合并重复簇"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def deduplicate_articles(
+    articles: List[RSSArticle],
+    similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+) -> List[RSSArticle]:
+    """
+    合并重复和近似重复的文章
+
+    Args:
+        articles: 文章列表
+        similarity_threshold: 判定为近似重复的Jaccard相似度下限
+
+    Returns:
+        去重后的文章列表（保持各簇首篇文章的原始顺序）。
+        代表文章取簇内摘要最完整的一篇，sources 记录簇内所有来源。
+    """
+    if not articles:
+        return []
+
+    clusters = _UnionFind(len(articles))
+
+    # 1. 完全重复：规范化URL相同
+    first_by_url: Dict[str, int] = {}
+    for idx, article in enumerate(articles):
+        key = canonicalize_url(article.link)
+        if not key:
+            continue  # 没有链接的文章只参与近似重复聚类
+        if key in first_by_url:
+            clusters.union(first_by_url[key], idx)
+        else:
+            first_by_url[key] = idx
+
+    # 2. 近似重复：MinHash + LSH分段找候选，再用签名估计相似度确认
+    rows = NUM_PERM // LSH_BANDS
+    title_shingles: Dict[int, Set[int]] = {}
+    signatures: Dict[int, List[int]] = {}
+    buckets: Dict[tuple, List[int]] = {}
+    for idx, article in enumerate(articles):
+        if clusters.find(idx) != idx:
+            continue  # 已按URL合并，无需再计算签名
+        title = _normalize_text(article.title)
+        description = _normalize_text(article.summary_text or article.description)[:DESCRIPTION_PREFIX]
+        shingles = _shingles(title, description)
+        if not shingles:
+            continue
+        title_shingles[idx] = _char_shingles(title, b"t1:")
+        signature = _minhash(shingles)
+        signatures[idx] = signature
+        for band in range(LSH_BANDS):
+            key = (band, tuple(signature[band * rows:(band + 1) * rows]))
+            for candidate in buckets.setdefault(key, []):
+                if clusters.find(candidate) == clusters.find(idx):
+                    continue
+                if (
+                    _estimated_similarity(signatures[candidate], signature) >= similarity_threshold
+                    and _jaccard(title_shingles[candidate], title_shingles[idx]) >= MIN_TITLE_SIMILARITY
+                ):
+                    clusters.union(candidate, idx)
+            buckets[key].append(idx)
+
+    # 3. 每个簇选出代表文章
+    members: Dict[int, List[int]] = {}
+    for idx in range(len(articles)):
+        members.setdefault(clusters.find(idx), []).append(idx)
+
+    deduplicated = []
+    for root in sorted(members):
+        group = [articles[i] for i in members[root]]
+        representative = max(group, key=lambda a: len(a.description or ""))
+        sources = []
+        for article in group:
+            for name in article.sources or [article.source]:
+                if name and name not in sources:
+                    sources.append(name)
+        deduplicated.append(replace(representative, sources=sources))
+    return deduplicated
@@ -5,12 +5,16 @@ RSS多线程获取器
 """
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set, Tuple
+from xml.etree.ElementTree import ParseError
 import logging
 import time
 
 from .models import RSSFetchResult, RSSAggregatedResult, RSSArticle
 from .parser import RSSParser
+from .streaming import StreamingFeedParser
+from .parse_pool import FeedParsePool
+from .health import FeedHealthTracker
 from .config import FetchConfig, get_rss_sources, get_source_name
 
 logger = logging.getLogger(__name__)
@@ -19,16 +23,27 @@ logger = logging.getLogger(__name__)
 class RSSFetcher:
     """RSS多线程获取器"""
     
-    def __init__(self, config: Optional[FetchConfig] = None):
+    def __init__(
+        self,
+        config: Optional[FetchConfig] = None,
+        health: Optional[FeedHealthTracker] = None
+    ):
         """
         初始化获取器
         
         Args:
             config: 获取配置，如果为None则使用默认配置
+            health: 源健康统计，提供时按源调整超时和重试，并跳过隔离中的源
         """
         self.config = config or FetchConfig()
+        self.health = health
         self.parser = RSSParser()
         self.session = self._create_session()
+        # 启用解析进程池时，抓取线程只下载原始字节，解析在工作进程中并行完成
+        self.parse_pool = (
+            FeedParsePool(self.config.parse_processes)
+            if self.config.parse_processes > 0 else None
+        )
     
     def _create_session(self) -> requests.Session:
         """创建requests会话，配置通用参数"""
@@ -38,40 +53,88 @@ class RSSFetcher:
         })
         return session
     
-    def fetch_single(self, url: str, source_name: Optional[str] = None) -> RSSFetchResult:
+    def fetch_single(
+        self,
+        url: str,
+        source_name: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        seen_links: Optional[Set[str]] = None,
+        since_ts: Optional[int] = None
+    ) -> RSSFetchResult:
         """
         获取单个RSS源
         
         Args:
             url: RSS源URL
             source_name: 来源名称
+            etag: 上次响应的ETag，提供时发起条件请求
+            last_modified: 上次响应的Last-Modified，提供时发起条件请求
+            seen_links: 已见过的文章链接/GUID，流式解析遇到后提前结束
+            since_ts: 上次见到的最新发布时间，流式解析遇到更早的条目后提前结束
             
         Returns:
-            RSSFetchResult对象
+            RSSFetchResult对象，内容未变化时 not_modified 为True且不含文章
         """
         if not source_name:
             source_name = get_source_name(url)
         
         logger.info(f"开始获取: {source_name} ({url})")
         
+        # 条件请求头：内容未变化时服务器返回304，省去下载和解析
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        
+        # 按源的历史延迟决定超时；隔离中的源只做一次短超时探测
+        timeout, max_retries = self.config.timeout, self.config.max_retries
+        if self.health:
+            self.health.get(url, source_name)
+            timeout, max_retries = self.health.request_policy(url, timeout, max_retries)
+        
         # 重试机制
         last_error = None
-        for attempt in range(self.config.max_retries + 1):
+        for attempt in range(max_retries + 1):
             try:
+                started = time.monotonic()
                 response = self.session.get(
                     url,
-                    timeout=self.config.timeout
+                    timeout=timeout,
+                    headers=headers or None,
+                    stream=True
                 )
-                response.raise_for_status()
-                
-                # 解析内容
-                articles = self.parser.parse(response.text, source_name)
+                # 延迟只计成功那次请求收到响应头的耗时，不含之前的重试、退避等待和解析
+                latency = time.monotonic() - started
+                with response:
+                    if response.status_code == 304:
+                        logger.info(f"内容未变化: {source_name}")
+                        self._record_success(url, latency)
+                        return RSSFetchResult(
+                            url=url,
+                            success=True,
+                            not_modified=True,
+                            etag=etag,
+                            last_modified=last_modified
+                        )
+                    response.raise_for_status()
+                    
+                    # 解析内容
+                    articles, ttl, skip_hours = self._parse_response(
+                        response, source_name, seen_links, since_ts
+                    )
                 
                 logger.info(f"成功获取: {source_name}, 文章数: {len(articles)}")
+                self._record_success(url, latency)
                 return RSSFetchResult(
                     url=url,
                     success=True,
-                    articles=articles
+                    articles=articles,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    ttl=ttl,
+                    skip_hours=skip_hours
                 )
                 
             except requests.exceptions.Timeout as e:
@@ -88,17 +151,78 @@ class RSSFetcher:
                 break  # 未知错误不重试
             
             # 等待后重试
-            if attempt < self.config.max_retries:
+            if attempt < max_retries:
                 time.sleep(self.config.retry_delay)
         
         # 所有重试都失败
         logger.error(f"获取失败: {source_name} - {last_error}")
+        if self.health:
+            self.health.record_failure(url, last_error)
         return RSSFetchResult(
             url=url,
             success=False,
             error=last_error
         )
     
+    def _record_success(self, url: str, latency: float) -> None:
+        """记录成功请求的延迟，用于计算源的延迟分位数和自适应超时"""
+        if self.health:
+            self.health.record_success(url, latency)
+    
+    def _parse_response(
+        self,
+        response: requests.Response,
+        source_name: str,
+        seen_links: Optional[Set[str]] = None,
+        since_ts: Optional[int] = None
+    ) -> Tuple[List[RSSArticle], Optional[int], List[int]]:
+        """
+        边下载边解析响应
+
+        优先流式解析，遇到旧条目时停止下载；XML不合法时读完剩余内容交给feedparser。
+        流式解析超过大小限制时保留已解析的条目，feedparser解析超过限制时报错。
+        启用解析进程池时先下载完整响应，再交给进程池解析；增量抓取（提供了
+        seen_links 或 since_ts）仍在线程内流式解析，保留提前结束下载的优化。
+        
+        Returns:
+            (文章列表, ttl, skipHours)
+        """
+        max_bytes = self.config.max_body_bytes
+        chunks = response.iter_content(chunk_size=self.config.chunk_size)
+        body = bytearray()
+        
+        use_pool = self.parse_pool is not None and not seen_links and since_ts is None
+        if self.config.streaming and not use_pool:
+            stream_parser = StreamingFeedParser(
+                source_name, seen_links, since_ts, self.config.keep_raw_html
+            )
+            try:
+                for chunk in chunks:
+                    body.extend(chunk)
+                    if len(body) > max_bytes:
+                        logger.warning(f"{source_name} 响应超过 {max_bytes} 字节，只保留已解析的条目")
+                        return stream_parser.articles, stream_parser.ttl, stream_parser.skip_hours
+                    if not stream_parser.feed(chunk):
+                        logger.info(f"{source_name} 已到达上次获取的位置，提前结束解析")
+                        break
+                stream_parser.close()
+                logger.info(f"成功流式解析 {len(stream_parser.articles)} 篇文章 from {source_name}")
+                return stream_parser.articles, stream_parser.ttl, stream_parser.skip_hours
+            except ParseError as e:
+                logger.info(f"{source_name} 流式解析失败，改用feedparser: {e}")
+        
+        for chunk in chunks:
+            body.extend(chunk)
+            if len(body) > max_bytes:
+                raise ValueError(f"RSS响应超过大小限制 ({max_bytes} 字节)")
+        content = bytes(body)
+        if use_pool:
+            return self.parse_pool.parse(
+                content, source_name, seen_links, since_ts, self.config.keep_raw_html
+            )
+        ttl, skip_hours = self.parser.parse_hints(content.decode('utf-8', errors='ignore'))
+        return self.parser.parse(content, source_name, self.config.keep_raw_html), ttl, skip_hours
+    
     def fetch_all(self, sources: Optional[List[Dict[str, str]]] = None) -> RSSAggregatedResult:
         """
         并发获取多个RSS源
@@ -113,6 +237,15 @@ class RSSFetcher:
         if sources is None:
             sources = get_rss_sources()
         
+        # 跳过隔离期内的源，隔离到期的源由 fetch_single 做探测
+        skipped = 0
+        if self.health:
+            active = [s for s in sources if self.health.should_fetch(s['url'])]
+            skipped = len(sources) - len(active)
+            if skipped:
+                logger.info(f"跳过 {skipped} 个隔离中的RSS源")
+            sources = active
+        
         logger.info(f"开始并发获取 {len(sources)} 个RSS源")
         
         results: List[RSSFetchResult] = []
@@ -148,11 +281,12 @@ class RSSFetcher:
         logger.info(f"获取完成: 成功 {successful}/{len(sources)}, 共 {total_articles} 篇文章")
         
         return RSSAggregatedResult(
-            total_sources=len(sources),
+            total_sources=len(sources) + skipped,
             successful_sources=successful,
             failed_sources=failed,
             total_articles=total_articles,
-            results=results
+            results=results,
+            skipped_sources=skipped
         )
     
     def fetch_urls(self, urls: List[str]) -> RSSAggregatedResult:
@@ -173,6 +307,9 @@ class RSSFetcher:
         if self.session:
             self.session.close()
             logger.info("RSS获取器已关闭")
+        if self.parse_pool:
+            self.parse_pool.close()
+            self.parse_pool = None
     
     def __enter__(self):
         """上下文管理器入口"""
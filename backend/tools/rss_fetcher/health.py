@@ -0,0 +1,225 @@
+"""
+RSS源健康统计与隔离
+
+持久化记录每个源的成功率、延迟分位数和最近错误：
+- 连续失败达到阈值的源进入隔离期，隔离期内跳过获取，到期后只做一次不重试的探测请求，
+  探测成功即解除隔离，失败则隔离期翻倍
+- 根据源的历史延迟设置请求超时，健康源不会被默认的长超时拖慢，
+  整个任务的耗时由健康源决定，而不是被失效源的超时和重试拖长
+- 定时任务和轮询守护进程共用同一个状态文件：保存时在文件锁内读取磁盘上的状态，
+  只用本进程更新过的源覆盖，其余源采用磁盘上的最新状态
+"""
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .cache_store import file_lock, load_cache_file, save_cache_file
+
+logger = logging.getLogger(__name__)
+
+# 健康状态文件与RSS缓存放在同一目录
+if os.getenv("DOCKER_ENV") or os.path.exists("/app"):
+    # Docker环境
+    HEALTH_FILE_PATH = Path("/app/data/rss_health.json")
+else:
+    # 本地开发环境
+    HEALTH_FILE_PATH = Path(__file__).parent.parent.parent / "data" / "rss_health.json"
+
+LATENCY_WINDOW = 50  # 计算延迟分位数时保留的最近成功请求数
+QUARANTINE_AFTER = 3  # 连续失败多少次后隔离
+QUARANTINE_BASE = 3600  # 首次隔离时长（秒）
+QUARANTINE_MAX = 24 * 3600  # 最长隔离时长（秒）
+PROBE_TIMEOUT = 5  # 隔离期探测请求的超时（秒）
+MIN_TIMEOUT = 3  # 延迟自适应超时的下限（秒）
+TIMEOUT_FACTOR = 3  # 超时取p95延迟的倍数
+MIN_LATENCY_SAMPLES = 5  # 样本数不足时使用默认超时
+
+
+def _percentile(values: List[float], percent: float) -> Optional[float]:
+    """最近邻法计算分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class SourceHealth:
+    """单个RSS源的健康状态"""
+
+    url: str  # RSS源URL
+    name: str  # 来源名称
+    attempts: int = 0  # 请求次数（每次获取计一次，不含重试）
+    successes: int = 0  # 成功次数
+    consecutive_failures: int = 0  # 连续失败次数
+    latencies: List[float] = field(default_factory=list)  # 最近成功请求的耗时（秒）
+    last_error: Optional[str] = None  # 最近一次错误
+    last_success_at: Optional[float] = None  # 最近成功时间
+    last_failure_at: Optional[float] = None  # 最近失败时间
+    quarantined_until: Optional[float] = None  # 隔离到期时间，None表示未隔离
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        return self.successes / self.attempts if self.attempts else None
+
+    @property
+    def p50_latency(self) -> Optional[float]:
+        return _percentile(self.latencies, 50)
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        return _percentile(self.latencies, 95)
+
+    def is_quarantined(self) -> bool:
+        return self.quarantined_until is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为接口返回的字典（不含原始延迟样本）"""
+        data = asdict(self)
+        data.pop("latencies")
+        data.update({
+            "success_rate": round(self.success_rate, 3) if self.success_rate is not None else None,
+            "p50_latency": round(self.p50_latency, 3) if self.p50_latency is not None else None,
+            "p95_latency": round(self.p95_latency, 3) if self.p95_latency is not None else None,
+            "quarantined": self.is_quarantined()
+        })
+        return data
+
+
+class FeedHealthTracker:
+    """线程安全的RSS源健康统计"""
+
+    def __init__(self, state_path: Optional[Path] = None):
+        """
+        初始化健康统计
+
+        Args:
+            state_path: 状态文件路径，提供时从文件恢复并在 save() 时写回
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self._lock = threading.Lock()
+        self._sources: Dict[str, SourceHealth] = self._load()
+        self._dirty: Set[str] = set()  # 上次保存后本进程更新过的源
+
+    def _load(self) -> Dict[str, SourceHealth]:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            data = load_cache_file(self.state_path)
+            known = {f.name for f in fields(SourceHealth)}
+            return {
+                url: SourceHealth(**{k: v for k, v in item.items() if k in known})
+                for url, item in data.get("sources", {}).items()
+            }
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"RSS源健康状态读取失败，将重新统计: {e}")
+            return {}
+
+    def save(self) -> None:
+        """
+        与磁盘上的状态合并后原子地保存
+
+        本进程更新过的源覆盖磁盘上的记录，其余源刷新为磁盘上的状态（可能由其他进程写入）。
+        """
+        if not self.state_path:
+            return
+        with file_lock(self.state_path):
+            on_disk = self._load()
+            with self._lock:
+                for url, stored in on_disk.items():
+                    if url in self._dirty:
+                        continue
+                    current = self._sources.get(url)
+                    if current is None:
+                        self._sources[url] = stored
+                    else:
+                        # 原地更新，其他线程持有的对象仍然有效
+                        for f in fields(SourceHealth):
+                            setattr(current, f.name, getattr(stored, f.name))
+                self._dirty.clear()
+                data = {"sources": {url: asdict(health) for url, health in self._sources.items()}}
+            save_cache_file(data, self.state_path)
+
+    def get(self, url: str, name: Optional[str] = None) -> SourceHealth:
+        """获取源的健康状态，不存在时创建"""
+        with self._lock:
+            health = self._sources.get(url)
+            if health is None:
+                health = self._sources[url] = SourceHealth(url=url, name=name or url)
+            elif name:
+                health.name = name
+            return health
+
+    def should_fetch(self, url: str, now: Optional[float] = None) -> bool:
+        """隔离期内的源跳过获取，隔离到期后允许一次探测"""
+        health = self.get(url)
+        now = time.time() if now is None else now
+        return health.quarantined_until is None or now >= health.quarantined_until
+
+    def request_policy(self, url: str, default_timeout: float, default_retries: int):
+        """
+        计算本次请求的超时和重试次数
+
+        Returns:
+            (超时秒数, 重试次数)：隔离中的源只做一次短超时探测；
+            样本足够的源按 p95 延迟设置超时，但不超过默认超时
+        """
+        health = self.get(url)
+        if health.is_quarantined():
+            return min(PROBE_TIMEOUT, default_timeout), 0
+        if len(health.latencies) >= MIN_LATENCY_SAMPLES:
+            timeout = max(MIN_TIMEOUT, health.p95_latency * TIMEOUT_FACTOR)
+            return min(timeout, default_timeout), default_retries
+        return default_timeout, default_retries
+
+    def record_success(self, url: str, latency: float, now: Optional[float] = None) -> None:
+        """记录一次成功获取，隔离中的源解除隔离"""
+        health = self.get(url)
+        now = time.time() if now is None else now
+        with self._lock:
+            self._dirty.add(url)
+            health.attempts += 1
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.latencies = (health.latencies + [round(latency, 3)])[-LATENCY_WINDOW:]
+            health.last_success_at = now
+            if health.quarantined_until is not None:
+                logger.info(f"{health.name} 探测成功，解除隔离")
+                health.quarantined_until = None
+
+    def record_failure(self, url: str, error: str, now: Optional[float] = None) -> None:
+        """记录一次失败获取，连续失败达到阈值时隔离，隔离期随失败次数翻倍"""
+        health = self.get(url)
+        now = time.time() if now is None else now
+        with self._lock:
+            self._dirty.add(url)
+            health.attempts += 1
+            health.consecutive_failures += 1
+            health.last_error = error
+            health.last_failure_at = now
+            if health.consecutive_failures >= QUARANTINE_AFTER:
+                exponent = health.consecutive_failures - QUARANTINE_AFTER
+                duration = min(QUARANTINE_BASE * 2 ** min(exponent, 10), QUARANTINE_MAX)
+                health.quarantined_until = now + duration
+                logger.warning(
+                    f"{health.name} 连续失败 {health.consecutive_failures} 次，"
+                    f"隔离 {duration / 3600:.1f} 小时"
+                )
+
+    def snapshot(self, sources: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, Any]]:
+        """
+        导出所有源的健康状态
+
+        Args:
+            sources: 配置的RSS源列表，提供时按该顺序输出，尚无记录的源也会列出
+        """
+        if sources is not None:
+            return [self.get(s["url"], s["name"]).to_dict() for s in sources]
+        with self._lock:
+            return [health.to_dict() for health in self._sources.values()]
@@ -3,7 +3,7 @@ RSS数据模型定义
 
 定义RSS文章和获取结果的数据结构，使用dataclass提供类型安全和便捷的数据操作。
 """
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
@@ -14,15 +14,46 @@ class RSSArticle:
     
     title: str  # 文章标题
     link: str  # 文章链接
-    description: str  # 文章描述/摘要
+    description: str = ""  # 文章描述（默认为纯文本，保留原始HTML时为HTML）
     pub_date: Optional[str] = None  # 发布日期
     author: Optional[str] = None  # 作者
     source: Optional[str] = None  # 来源（RSS源名称）
     categories: List[str] = field(default_factory=list)  # 分类标签
+    published_ts: Optional[int] = None  # 发布时间的UTC时间戳（秒），解析时预先计算
+    sources: List[str] = field(default_factory=list)  # 去重合并后的所有来源（未去重时为空）
+    summary_text: str = ""  # 纯文本摘要（截断），发送给大模型和文本筛选时使用
+    token_estimate: int = 0  # 标题加摘要的token估算
     
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        return asdict(self)
+    def to_dict(self, include_description: bool = True) -> Dict[str, Any]:
+        """
+        转换为字典格式
+        
+        Args:
+            include_description: 是否包含完整描述，为False时只保留截断的 summary_text
+        """
+        data = asdict(self)
+        if not include_description:
+            data.pop('description')
+        return data
+    
+    def to_tuple(self) -> tuple:
+        """转换为按字段顺序排列的元组（跨进程传递时比dataclass更紧凑）"""
+        return (
+            self.title, self.link, self.description, self.pub_date, self.author,
+            self.source, self.categories, self.published_ts, self.sources,
+            self.summary_text, self.token_estimate
+        )
+    
+    @classmethod
+    def from_tuple(cls, row: tuple) -> "RSSArticle":
+        """从 to_tuple 的结果还原"""
+        return cls(*row)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RSSArticle":
+        """从 to_dict 的结果还原，忽略旧版本或其他版本缓存中多出的字段"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
 
 
 @dataclass
@@ -34,12 +65,18 @@ class RSSFetchResult:
     articles: List[RSSArticle] = field(default_factory=list)  # 文章列表
     error: Optional[str] = None  # 错误信息
     fetch_time: str = field(default_factory=lambda: datetime.now().isoformat())  # 获取时间
+    not_modified: bool = False  # 条件请求返回304，内容未变化
+    etag: Optional[str] = None  # 响应的ETag，用于下次条件请求
+    last_modified: Optional[str] = None  # 响应的Last-Modified，用于下次条件请求
+    ttl: Optional[int] = None  # 源声明的<ttl>（分钟）
+    skip_hours: List[int] = field(default_factory=list)  # 源声明的<skipHours>（UTC小时）
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
             'url': self.url,
             'success': self.success,
+            'not_modified': self.not_modified,
             'articles': [article.to_dict() for article in self.articles],
             'error': self.error,
             'fetch_time': self.fetch_time,
@@ -56,6 +93,7 @@ class RSSAggregatedResult:
     failed_sources: int  # 失败的源数量
     total_articles: int  # 总文章数
     results: List[RSSFetchResult] = field(default_factory=list)  # 各源结果
+    skipped_sources: int = 0  # 处于隔离期而跳过的源数量
     fetch_time: str = field(default_factory=lambda: datetime.now().isoformat())  # 汇总时间
     
     def to_dict(self) -> Dict[str, Any]:
@@ -65,6 +103,7 @@ class RSSAggregatedResult:
                 'total_sources': self.total_sources,
                 'successful_sources': self.successful_sources,
                 'failed_sources': self.failed_sources,
+                'skipped_sources': self.skipped_sources,
                 'total_articles': self.total_articles,
                 'fetch_time': self.fetch_time
             },
@@ -78,3 +117,8 @@ class RSSAggregatedResult:
             if result.success:
                 all_articles.extend(result.articles)
         return all_articles
+    
+    def get_unique_articles(self) -> List[RSSArticle]:
+        """获取去重后的文章（合并多个源转载的同一条新闻）"""
+        from .dedup import deduplicate_articles
+        return deduplicate_articles(self.get_all_articles())
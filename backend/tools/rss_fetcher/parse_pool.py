@@ -0,0 +1,88 @@
+"""
+RSS多进程解析
+
+feedparser和XML解析都是纯Python的CPU密集操作，多个抓取线程并发解析时会被GIL串行化。
+启用解析进程池后，抓取线程只负责下载原始字节，解析交给工作进程完成；
+进程间只传递原始字节和紧凑的元组，不序列化dataclass对象。
+
+工作进程用 forkserver（不支持时用 spawn）启动，不从多线程的抓取进程直接 fork，
+避免子进程继承其他线程持有的锁而死锁。
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Set, Tuple
+from xml.etree.ElementTree import ParseError
+
+from .models import RSSArticle
+from .parser import RSSParser
+from .streaming import parse_feed_stream
+
+logger = logging.getLogger(__name__)
+
+
+def parse_feed_bytes(
+    content: bytes,
+    source_name: Optional[str] = None,
+    seen_links: Optional[Set[str]] = None,
+    since_ts: Optional[int] = None,
+    keep_raw_html: bool = False
+) -> Tuple[List[tuple], Optional[int], List[int]]:
+    """
+    在工作进程中解析RSS原始字节
+
+    先流式解析，XML不合法时退回feedparser。
+
+    Returns:
+        (文章元组列表, ttl, skipHours)，元组格式见 RSSArticle.to_tuple
+    """
+    try:
+        parser = parse_feed_stream([content], source_name, seen_links, since_ts, keep_raw_html)
+        return [a.to_tuple() for a in parser.articles], parser.ttl, parser.skip_hours
+    except ParseError:
+        articles = RSSParser.parse(content, source_name, keep_raw_html)
+        ttl, skip_hours = RSSParser.parse_hints(content.decode("utf-8", errors="ignore"))
+        return [a.to_tuple() for a in articles], ttl, skip_hours
+
+
+class FeedParsePool:
+    """RSS解析进程池"""
+
+    def __init__(self, processes: int):
+        """
+        初始化进程池
+
+        Args:
+            processes: 工作进程数
+        """
+        self.processes = processes
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+        logger.info(f"RSS解析进程池已启动，进程数: {processes}")
+
+    def parse(
+        self,
+        content: bytes,
+        source_name: Optional[str] = None,
+        seen_links: Optional[Set[str]] = None,
+        since_ts: Optional[int] = None,
+        keep_raw_html: bool = False
+    ) -> Tuple[List[RSSArticle], Optional[int], List[int]]:
+        """
+        在进程池中解析，阻塞等待结果（供抓取线程调用）
+
+        Returns:
+            (文章列表, ttl, skipHours)
+        """
+        future = self._executor.submit(
+            parse_feed_bytes, content, source_name, seen_links, since_ts, keep_raw_html
+        )
+        rows, ttl, skip_hours = future.result()
+        return [RSSArticle.from_tuple(row) for row in rows], ttl, skip_hours
+
+    def close(self) -> None:
+        """关闭进程池"""
+        self._executor.shutdown(wait=True)
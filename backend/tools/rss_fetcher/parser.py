@@ -3,27 +3,71 @@ RSS解析器
 
 负责解析RSS/Atom XML格式内容，提取文章信息。
 """
+import calendar
+import re
 import feedparser
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Optional, Tuple, Union
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 import logging
 
 from .models import RSSArticle
+from .text import normalize_article
 
 logger = logging.getLogger(__name__)
 
+# feedparser不解析<skipHours>，<ttl>也只在部分版本中暴露，直接从XML中提取
+_TTL_PATTERN = re.compile(r"<ttl>\s*(\d+)\s*</ttl>", re.IGNORECASE)
+_SKIP_HOURS_PATTERN = re.compile(r"<skipHours>(.*?)</skipHours>", re.IGNORECASE | re.DOTALL)
+_HOUR_PATTERN = re.compile(r"<hour>\s*(\d{1,2})\s*</hour>", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def parse_published_ts(date_str: Optional[str]) -> Optional[int]:
+    """
+    把发布日期字符串解析为UTC时间戳（秒）
+
+    依次尝试RFC 2822（RSS）和ISO 8601（Atom）格式，带时区的按时区换算到UTC，
+    不带时区的按UTC处理。同一个源的日期字符串大量重复，结果做了缓存。
+
+    Args:
+        date_str: 发布日期字符串
+
+    Returns:
+        UTC时间戳，解析失败返回None
+    """
+    if not date_str:
+        return None
+    try:
+        dt = parsedate_to_datetime(date_str)
+    except (ValueError, TypeError):
+        try:
+            dt = datetime.fromisoformat(date_str.strip().replace('Z', '+00:00'))
+        except ValueError:
+            logger.warning(f"无法解析发布日期: {date_str}")
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
 
 class RSSParser:
     """RSS/Atom解析器"""
     
     @staticmethod
-    def parse(content: str, source_name: Optional[str] = None) -> List[RSSArticle]:
+    def parse(
+        content: Union[str, bytes],
+        source_name: Optional[str] = None,
+        keep_raw_html: bool = False
+    ) -> List[RSSArticle]:
         """
         解析RSS/Atom内容
         
         Args:
-            content: RSS XML字符串
+            content: RSS XML字符串或原始字节（字节时由feedparser自行识别编码）
             source_name: 来源名称
+            keep_raw_html: 是否在 description 中保留原始HTML
             
         Returns:
             解析出的文章列表
@@ -37,7 +81,7 @@ class RSSParser:
             
             articles = []
             for entry in feed.entries:
-                article = RSSParser._parse_entry(entry, source_name)
+                article = RSSParser._parse_entry(entry, source_name, keep_raw_html)
                 if article:
                     articles.append(article)
             
@@ -49,13 +93,39 @@ class RSSParser:
             return []
     
     @staticmethod
-    def _parse_entry(entry, source_name: Optional[str] = None) -> Optional[RSSArticle]:
+    def parse_hints(content: str) -> Tuple[Optional[int], List[int]]:
+        """
+        提取频道级的轮询提示
+
+        Args:
+            content: RSS XML字符串
+
+        Returns:
+            (ttl分钟数或None, skipHours中的UTC小时列表)
+        """
+        ttl_match = _TTL_PATTERN.search(content)
+        ttl = int(ttl_match.group(1)) if ttl_match else None
+        skip_hours = []
+        skip_match = _SKIP_HOURS_PATTERN.search(content)
+        if skip_match:
+            skip_hours = sorted({
+                int(hour) % 24 for hour in _HOUR_PATTERN.findall(skip_match.group(1))
+            })
+        return ttl, skip_hours
+    
+    @staticmethod
+    def _parse_entry(
+        entry,
+        source_name: Optional[str] = None,
+        keep_raw_html: bool = False
+    ) -> Optional[RSSArticle]:
         """
         解析单个RSS条目
         
         Args:
             entry: feedparser解析的entry对象
             source_name: 来源名称
+            keep_raw_html: 是否在 description 中保留原始HTML
             
         Returns:
             RSSArticle对象或None
@@ -81,12 +151,18 @@ class RSSParser:
                 description = entry.content[0].get('value', '')
             description = description.strip()
             
-            # 提取发布日期
+            # 提取发布日期，并预先换算为UTC时间戳供排序和时间窗口筛选使用
             pub_date = None
             if 'published' in entry:
                 pub_date = entry.published
             elif 'updated' in entry:
                 pub_date = entry.updated
+            # feedparser已把日期解析为UTC的struct_time，优先使用
+            parsed_date = entry.get('published_parsed') or entry.get('updated_parsed')
+            if parsed_date:
+                published_ts = calendar.timegm(parsed_date)
+            else:
+                published_ts = parse_published_ts(pub_date)
             
             # 提取作者
             author = None
@@ -100,15 +176,17 @@ class RSSParser:
             if 'tags' in entry:
                 categories = [tag.get('term', '') for tag in entry.tags if tag.get('term')]
             
-            return RSSArticle(
+            # 规范化：HTML转纯文本，生成截断摘要和token估算
+            return normalize_article(RSSArticle(
                 title=title,
                 link=link,
                 description=description,
                 pub_date=pub_date,
+                published_ts=published_ts,
                 author=author,
                 source=source_name,
                 categories=categories
-            )
+            ), keep_raw_html)
             
         except Exception as e:
             logger.error(f"解析RSS条目失败: {str(e)}")
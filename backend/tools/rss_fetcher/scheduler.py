@@ -0,0 +1,260 @@
+"""
+RSS源自适应轮询调度
+
+每个RSS源有独立的轮询间隔：
+- 根据源最近文章的发布时间估计更新频率，更新快的源轮询更勤，长期不更新的源逐渐放慢
+- 遵守源声明的 <ttl>（最小轮询间隔）和 <skipHours>（不轮询的UTC小时）
+- 使用ETag/Last-Modified条件请求，内容未变化时不重复下载解析
+- 获取失败时按指数退避延后下次轮询
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config import get_rss_sources
+from .fetcher import RSSFetcher
+from .models import RSSArticle, RSSFetchResult
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 5 * 60  # 最短轮询间隔（秒）
+MAX_INTERVAL = 24 * 3600  # 最长轮询间隔（秒）
+DEFAULT_INTERVAL = 3600  # 新源的初始轮询间隔（秒）
+POLL_FRACTION = 0.5  # 轮询间隔取估计发文间隔的比例，保证大多数文章在发布后半个间隔内被抓到
+RATE_WINDOW = 20  # 估计发文间隔时使用的最新文章数
+IDLE_GROWTH = 1.5  # 内容未变化时间隔的增长倍数
+MAX_BACKOFF_EXPONENT = 6  # 失败退避的最大指数
+MAX_SEEN_LINKS = 200  # 每个源记住的最近文章链接数
+
+
+@dataclass
+class SourceSchedule:
+    """单个RSS源的轮询状态"""
+
+    name: str  # 来源名称
+    url: str  # RSS源URL
+    interval: float = DEFAULT_INTERVAL  # 当前轮询间隔（秒）
+    next_poll_at: float = 0.0  # 下次轮询时间（时间戳），0表示立即轮询
+    last_poll_at: Optional[float] = None  # 上次轮询时间
+    consecutive_failures: int = 0  # 连续失败次数
+    etag: Optional[str] = None  # 上次响应的ETag
+    last_modified: Optional[str] = None  # 上次响应的Last-Modified
+    ttl: Optional[int] = None  # 源声明的ttl（分钟）
+    skip_hours: List[int] = field(default_factory=list)  # 源声明的skipHours（UTC小时）
+    seen_links: List[str] = field(default_factory=list)  # 最近获取到的文章链接，用于识别新文章
+    recent_timestamps: List[int] = field(default_factory=list)  # 最近文章的发布时间，用于估计发文频率
+
+
+class RSSPollingScheduler:
+    """按源自适应间隔轮询RSS的调度器"""
+
+    def __init__(
+        self,
+        fetcher: Optional[RSSFetcher] = None,
+        sources: Optional[List[Dict[str, str]]] = None,
+        state_path: Optional[Path] = None,
+        on_update: Optional[Callable[[str, List[RSSArticle]], None]] = None,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL
+    ):
+        """
+        初始化调度器
+
+        Args:
+            fetcher: RSS获取器，为None时创建默认获取器
+            sources: RSS源列表，为None时使用配置文件中的默认源
+            state_path: 轮询状态文件路径，提供时在重启后恢复各源的间隔和条件请求头
+            on_update: 发现新文章时的回调，参数为 (来源名称, 新文章列表)
+            min_interval: 最短轮询间隔（秒）
+            max_interval: 最长轮询间隔（秒）
+        """
+        self.fetcher = fetcher or RSSFetcher()
+        self.state_path = Path(state_path) if state_path else None
+        self.on_update = on_update
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+
+        saved = self._load_state()
+        self.schedules: Dict[str, SourceSchedule] = {}
+        for source in sources if sources is not None else get_rss_sources():
+            schedule = saved.get(source["url"]) or SourceSchedule(name=source["name"], url=source["url"])
+            schedule.name = source["name"]
+            self.schedules[source["url"]] = schedule
+
+    def _load_state(self) -> Dict[str, SourceSchedule]:
+        """从状态文件加载各源的轮询状态"""
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            known = {f.name for f in fields(SourceSchedule)}
+            return {
+                url: SourceSchedule(**{k: v for k, v in item.items() if k in known})
+                for url, item in data.items()
+            }
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"轮询状态文件读取失败，将重新开始调度: {e}")
+            return {}
+
+    def save_state(self) -> None:
+        """原子地保存轮询状态（获取器带有源健康统计时一并保存）"""
+        health = getattr(self.fetcher, "health", None)
+        if health:
+            health.save()
+        if not self.state_path:
+            return
+        with self._lock:
+            data = {url: asdict(schedule) for url, schedule in self.schedules.items()}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def due_sources(self, now: Optional[float] = None) -> List[SourceSchedule]:
+        """返回到期需要轮询的源；隔离中的源不轮询，下次轮询推迟到隔离到期"""
+        now = time.time() if now is None else now
+        health = getattr(self.fetcher, "health", None)
+        due = []
+        with self._lock:
+            for schedule in self.schedules.values():
+                if schedule.next_poll_at > now:
+                    continue
+                if health and not health.should_fetch(schedule.url, now):
+                    schedule.next_poll_at = health.get(schedule.url).quarantined_until
+                    continue
+                due.append(schedule)
+        return due
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """距离最近一个源到期还有多少秒"""
+        now = time.time() if now is None else now
+        if not self.schedules:
+            return self.max_interval
+        return max(0.0, min(s.next_poll_at for s in self.schedules.values()) - now)
+
+    def poll(self, schedule: SourceSchedule, now: Optional[float] = None) -> RSSFetchResult:
+        """
+        轮询单个源并更新它的调度状态
+
+        Returns:
+            获取结果
+        """
+        result = self.fetcher.fetch_single(
+            schedule.url,
+            schedule.name,
+            etag=schedule.etag,
+            last_modified=schedule.last_modified,
+            seen_links=set(schedule.seen_links),
+            since_ts=schedule.recent_timestamps[0] if schedule.recent_timestamps else None
+        )
+        now = time.time() if now is None else now
+
+        new_articles: List[RSSArticle] = []
+        with self._lock:
+            schedule.last_poll_at = now
+            if not result.success:
+                schedule.consecutive_failures += 1
+                delay = min(
+                    schedule.interval * 2 ** min(schedule.consecutive_failures, MAX_BACKOFF_EXPONENT),
+                    self.max_interval
+                )
+                logger.warning(
+                    f"{schedule.name} 第{schedule.consecutive_failures}次连续失败，"
+                    f"{delay / 60:.0f}分钟后重试"
+                )
+            else:
+                schedule.consecutive_failures = 0
+                if result.not_modified:
+                    schedule.interval = self._clamp(schedule.interval * IDLE_GROWTH, schedule)
+                else:
+                    schedule.etag = result.etag
+                    schedule.last_modified = result.last_modified
+                    schedule.ttl = result.ttl
+                    schedule.skip_hours = result.skip_hours
+                    # 流式解析在遇到旧条目后会提前结束，结果里只有新文章；
+                    # feedparser兜底时返回整个源，这里统一按链接过滤
+                    seen = set(schedule.seen_links)
+                    new_articles = [a for a in result.articles if a.link not in seen]
+                    schedule.seen_links = ([a.link for a in new_articles] + schedule.seen_links)[:MAX_SEEN_LINKS]
+                    schedule.recent_timestamps = sorted(
+                        {a.published_ts for a in new_articles if a.published_ts and a.published_ts <= now}
+                        | set(schedule.recent_timestamps),
+                        reverse=True
+                    )[:RATE_WINDOW]
+                    schedule.interval = self._clamp(
+                        self._estimate_interval(schedule, bool(new_articles), now),
+                        schedule
+                    )
+                delay = schedule.interval
+            schedule.next_poll_at = self._skip_hours(now + delay, schedule.skip_hours)
+
+        logger.info(
+            f"{schedule.name} 新文章 {len(new_articles)} 篇，"
+            f"下次轮询间隔 {(schedule.next_poll_at - now) / 60:.0f} 分钟"
+        )
+        if new_articles and self.on_update:
+            self.on_update(schedule.name, new_articles)
+        return result
+
+    def run_pending(self, now: Optional[float] = None) -> List[RSSFetchResult]:
+        """并发轮询所有到期的源，并保存调度状态"""
+        due = self.due_sources(now)
+        if not due:
+            return []
+        with ThreadPoolExecutor(max_workers=self.fetcher.config.max_workers) as executor:
+            results = list(executor.map(lambda s: self.poll(s, now), due))
+        self.save_state()
+        return results
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        """持续调度，直到 stop_event 被设置"""
+        stop_event = stop_event or threading.Event()
+        logger.info(f"RSS轮询调度启动，共 {len(self.schedules)} 个源")
+        while not stop_event.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"RSS轮询调度异常: {e}", exc_info=True)
+            stop_event.wait(max(1.0, self.seconds_until_next()))
+
+    def _estimate_interval(self, schedule: SourceSchedule, has_new: bool, now: float) -> float:
+        """
+        根据最近文章的发布时间估计下次轮询间隔
+
+        用最新 RATE_WINDOW 篇文章覆盖的时间跨度（截止到现在）除以文章数，
+        得到平均发文间隔；源长时间不更新时跨度变大，间隔随之变长。
+        没有可用的发布时间时，退化为有新文章则缩短、没有则放长。
+        """
+        timestamps = schedule.recent_timestamps
+        if len(timestamps) >= 2:
+            mean_gap = (now - timestamps[-1]) / len(timestamps)
+            return mean_gap * POLL_FRACTION
+        if has_new:
+            return schedule.interval / IDLE_GROWTH
+        return schedule.interval * IDLE_GROWTH
+
+    def _clamp(self, interval: float, schedule: SourceSchedule) -> float:
+        """把间隔限制在允许范围内，且不短于源声明的ttl"""
+        lower = self.min_interval
+        if schedule.ttl:
+            lower = max(lower, schedule.ttl * 60)
+        return min(max(interval, lower), self.max_interval)
+
+    @staticmethod
+    def _skip_hours(timestamp: float, skip_hours: List[int]) -> float:
+        """如果轮询时间落在skipHours内，顺延到第一个不跳过的整点"""
+        if not skip_hours or len(skip_hours) >= 24:
+            return timestamp
+        skip = set(skip_hours)
+        while time.gmtime(timestamp).tm_hour in skip:
+            timestamp = (int(timestamp) // 3600 + 1) * 3600
+        return timestamp
@@ -0,0 +1,184 @@
+"""
+RSS/Atom流式解析器
+
+基于 XMLPullParser 按块增量解析响应字节流，不需要先缓冲整个响应、也不构建完整的文档树：
+每解析完一个条目就生成文章并释放对应的XML元素，遇到已见过或早于上次发布时间的条目时提前结束。
+XML不合法（如未声明的HTML实体、expat不支持的编码）时抛出 xml.etree.ElementTree.ParseError，
+由调用方退回 feedparser 解析。
+"""
+from typing import Dict, Iterable, List, Optional, Set
+from xml.etree.ElementTree import Element, XMLPullParser
+
+from .models import RSSArticle
+from .parser import parse_published_ts
+from .text import normalize_article
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+EARLY_STOP_AFTER = 3  # 连续遇到多少个旧条目后停止解析（容忍少量乱序）
+
+# 各字段可能对应的标签（本地名），按优先级排列
+_DESCRIPTION_TAGS = ("description", "summary", "encoded", "content")
+_DATE_TAGS = ("pubDate", "published", "date", "updated")
+_AUTHOR_TAGS = ("author", "creator", "name")
+
+
+def _split_tag(tag: str):
+    """把 '{namespace}local' 拆成 (namespace, local)"""
+    if tag.startswith("{"):
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+
+class StreamingFeedParser:
+    """增量解析RSS 2.0 / Atom 的条目"""
+
+    def __init__(
+        self,
+        source_name: Optional[str] = None,
+        seen_links: Optional[Set[str]] = None,
+        since_ts: Optional[int] = None,
+        keep_raw_html: bool = False
+    ):
+        """
+        初始化解析器
+
+        Args:
+            source_name: 来源名称
+            seen_links: 已见过的文章链接/GUID，遇到时视为旧条目
+            since_ts: 上次见到的最新发布时间，不晚于它的条目视为旧条目
+            keep_raw_html: 是否在 description 中保留原始HTML
+        """
+        self.source_name = source_name
+        self.seen_links = seen_links or set()
+        self.since_ts = since_ts
+        self.keep_raw_html = keep_raw_html
+        self.articles: List[RSSArticle] = []
+        self.ttl: Optional[int] = None
+        self.skip_hours: List[int] = []
+        self.stopped_early = False
+
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._depth_in_item = 0
+        self._in_skip_hours = False
+        self._fields: Dict[str, str] = {}
+        self._categories: List[str] = []
+        self._consecutive_old = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        输入一块响应数据
+
+        Returns:
+            是否需要继续输入（提前结束时返回False）
+        """
+        self._parser.feed(chunk)
+        self._handle_events()
+        return not self.stopped_early
+
+    def close(self) -> None:
+        """输入结束，检查文档完整性"""
+        if not self.stopped_early:
+            self._parser.close()
+            self._handle_events()
+
+    def _handle_events(self) -> None:
+        for event, elem in self._parser.read_events():
+            if self.stopped_early:
+                return
+            namespace, local = _split_tag(elem.tag)
+            is_item = local == "item" or (local == "entry" and namespace == ATOM_NS)
+            if event == "start":
+                if is_item:
+                    self._depth_in_item += 1
+                    self._fields = {}
+                    self._categories = []
+                elif local == "skipHours":
+                    self._in_skip_hours = True
+                continue
+
+            if is_item and self._depth_in_item:
+                self._depth_in_item -= 1
+                self._finish_item()
+                elem.clear()
+            elif self._depth_in_item:
+                self._collect_field(local, elem)
+            elif local == "ttl" and elem.text and elem.text.strip().isdigit():
+                self.ttl = int(elem.text.strip())
+            elif local == "hour" and self._in_skip_hours and elem.text and elem.text.strip().isdigit():
+                self.skip_hours = sorted(set(self.skip_hours) | {int(elem.text.strip()) % 24})
+            elif local == "skipHours":
+                self._in_skip_hours = False
+
+    def _collect_field(self, local: str, elem: Element) -> None:
+        """记录条目内的子元素，同一字段只取第一次出现的值"""
+        text = (elem.text or "").strip()
+        if local == "link":
+            # Atom的链接在href属性中，只取正文链接
+            href = elem.get("href")
+            if href is not None:
+                if elem.get("rel", "alternate") == "alternate":
+                    self._fields.setdefault("link", href.strip())
+            elif text:
+                self._fields.setdefault("link", text)
+        elif local == "category":
+            term = elem.get("term") or text
+            if term:
+                self._categories.append(term)
+        elif text:
+            self._fields.setdefault(local, text)
+
+    def _finish_item(self) -> None:
+        """把收集到的字段组装为文章，并判断是否可以提前结束"""
+        fields = self._fields
+        title = fields.get("title", "")
+        link = fields.get("link", "")
+        guid = fields.get("guid") or fields.get("id")
+        pub_date = next((fields[tag] for tag in _DATE_TAGS if tag in fields), None)
+        published_ts = parse_published_ts(pub_date)
+
+        is_old = (
+            link in self.seen_links
+            or (guid is not None and guid in self.seen_links)
+            or (self.since_ts is not None and published_ts is not None and published_ts <= self.since_ts)
+        )
+        if is_old:
+            self._consecutive_old += 1
+            if self._consecutive_old >= EARLY_STOP_AFTER:
+                self.stopped_early = True
+            return
+        self._consecutive_old = 0
+
+        if not title or not link:
+            return
+        self.articles.append(normalize_article(RSSArticle(
+            title=title,
+            link=link,
+            description=next((fields[tag] for tag in _DESCRIPTION_TAGS if tag in fields), ""),
+            pub_date=pub_date,
+            author=next((fields[tag] for tag in _AUTHOR_TAGS if tag in fields), None),
+            source=self.source_name,
+            categories=self._categories,
+            published_ts=published_ts
+        ), self.keep_raw_html))
+
+
+def parse_feed_stream(
+    chunks: Iterable[bytes],
+    source_name: Optional[str] = None,
+    seen_links: Optional[Set[str]] = None,
+    since_ts: Optional[int] = None,
+    keep_raw_html: bool = False
+) -> StreamingFeedParser:
+    """
+    流式解析整个字节流（便于测试和离线使用）
+
+    Returns:
+        解析完成的 StreamingFeedParser，文章在其 articles 属性中
+    """
+    parser = StreamingFeedParser(source_name, seen_links, since_ts, keep_raw_html)
+    for chunk in chunks:
+        if not parser.feed(chunk):
+            break
+    parser.close()
+    return parser
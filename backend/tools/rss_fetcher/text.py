@@ -0,0 +1,84 @@
+"""
+RSS文章文本规范化
+
+很多源（如少数派、TechCrunch）的摘要是整段HTML，原样保存会让缓存文件变大、
+工具结果里的token变多，每次子串筛选也要扫描大量标签。
+这里在解析阶段把HTML转为纯文本、折叠空白，并生成截断的摘要和token估算。
+"""
+import html
+import re
+
+from .models import RSSArticle
+
+SUMMARY_MAX_CHARS = 300  # summary_text 的最大字符数
+
+# script/style/注释的内容对阅读无意义，整体删除
+_INVISIBLE_PATTERN = re.compile(
+    r"<(script|style)\b[^>]*>.*?</\1\s*>|<!--.*?-->",
+    re.IGNORECASE | re.DOTALL
+)
+# 块级标签和换行标签转为空格，避免相邻段落的文字粘连
+_BLOCK_TAG_PATTERN = re.compile(
+    r"<\s*(br|/?p|/?div|/?li|/?h[1-6]|/?tr|/?td|/?blockquote|/?section|/?article)\b[^>]*>",
+    re.IGNORECASE
+)
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def html_to_text(content: str) -> str:
+    """
+    把HTML片段转换为纯文本
+
+    基于正则的快速转换：删除脚本和样式，去掉标签，解码实体，折叠空白。
+    不追求还原排版，只保留供阅读和检索的文字。
+    """
+    if not content:
+        return ""
+    if "<" in content:
+        content = _INVISIBLE_PATTERN.sub(" ", content)
+        content = _BLOCK_TAG_PATTERN.sub(" ", content)
+        content = _TAG_PATTERN.sub("", content)
+    if "&" in content:
+        content = html.unescape(content)
+    return _WHITESPACE_PATTERN.sub(" ", content).strip()
+
+
+def truncate_text(text: str, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """截断文本，超出时以省略号结尾"""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rstrip() + "…"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的token数
+
+    中文字符按每字1个token计算，其余字符按每4个字符1个token计算，
+    不依赖具体模型的分词器，用于批次打包和限流即可。
+    """
+    if not text:
+        return 0
+    cjk_chars = sum(1 for ch in text if "\u4e00" <= ch <= "\u9fff")
+    return cjk_chars + (len(text) - cjk_chars + 3) // 4
+
+
+def normalize_article(article: RSSArticle, keep_raw_html: bool = False) -> RSSArticle:
+    """
+    规范化文章的标题和摘要（原地修改）
+
+    Args:
+        article: 文章
+        keep_raw_html: 是否在 description 中保留原始HTML，默认替换为纯文本
+
+    Returns:
+        同一篇文章，填充了 summary_text 和 token_estimate
+    """
+    article.title = html_to_text(article.title)
+    text = html_to_text(article.description)
+    if not keep_raw_html:
+        article.description = text
+    article.summary_text = truncate_text(text)
+    article.token_estimate = estimate_tokens(article.title) + estimate_tokens(article.summary_text)
+    return article
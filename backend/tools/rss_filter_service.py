@@ -2,12 +2,19 @@
 RSS新闻智能筛选服务
 
 使用大模型根据用户需求筛选RSS文章，基于文章的description进行智能判断。
-支持多线程并发处理和进度条显示。
+支持多线程并发处理和进度条显示，以及基于asyncio的流式筛选（按token预算分批、令牌桶限流、自适应并发）。
+评分结果按 (规范化查询, 文章链接) 持久化缓存，重复或重叠的查询只对未评分的文章调用大模型。
 """
+import asyncio
 import json
+import logging
+import os
+import re
 import sys
+import time
+import unicodedata
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
@@ -15,11 +22,84 @@ import threading
 
 # 添加路径以导入智谱服务
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from zhipu_service import get_zhipu_response_sync
+from zhipu_service import iter_zhipu_response_sync
 
 # 添加rss_fetcher路径
 sys.path.insert(0, str(Path(__file__).parent))
-from rss_fetcher import RSSFetcher, RSSArticle
+from rss_fetcher import RSSFetcher, RSSArticle, estimate_tokens, html_to_text, truncate_text
+
+# 评分缓存文件路径（与RSS缓存放在同一目录）
+# Docker环境下使用 /app/data，本地开发使用 backend/data
+if os.getenv("DOCKER_ENV") or os.path.exists("/app"):
+    SCORE_CACHE_PATH = Path("/app/data/rss_filter_scores.json")
+else:
+    SCORE_CACHE_PATH = Path(__file__).parent.parent / "data" / "rss_filter_scores.json"
+
+SCORE_CACHE_TTL = 7 * 24 * 3600  # 评分缓存有效期（秒）
+SCORE_CACHE_MAX_QUERIES = 500  # 最多缓存的查询数量，超出后淘汰最久未使用的查询
+
+# 词法预筛选时忽略的查询套话
+QUERY_STOPWORDS = {
+    "关于", "相关", "有关", "最新", "新闻", "消息", "资讯", "动态", "进展", "发展",
+    "the", "and", "for", "about", "news", "latest", "with", "of", "in", "on",
+}
+
+_ASCII_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9.+#-]*")
+_CJK_RUN_PATTERN = re.compile(r"[\u4e00-\u9fff]+")
+
+# 异步流式筛选配置
+DEFAULT_BATCH_TOKEN_BUDGET = 4000  # 每批次prompt的估算token上限
+MAX_ARTICLES_PER_BATCH = 40  # 每批次最多文章数（控制index范围和输出长度）
+DEFAULT_REQUESTS_PER_MINUTE = 120  # 默认请求速率上限
+DEFAULT_TARGET_LATENCY = 20.0  # 单批次期望耗时（秒），超过则降低并发
+RATE_LIMIT_BACKOFF = 5.0  # 遇到限流后暂停发送请求的时间（秒）
+# 限流判断只认明确的限流短语和错误码，避免错误信息中的普通词或数字（如"并发处理失败"、"1302 tokens"）触发退避
+RATE_LIMIT_MARKERS = ("rate limit", "too many requests", "并发数过高", "频率过高", "请求过于频繁")
+_RATE_LIMIT_CODE_PATTERN = re.compile(
+    r"(?:error code|status(?: code)?|http)\s*:?\s*429\b|['\"]code['\"]\s*:\s*['\"]?(?:1302|1303)\b",
+    re.IGNORECASE
+)
+
+# 筛选结果输出格式
+# lines: 逐行输出 "序号|评分|原因"，输出被截断时已完成的行依然有效
+# json:  使用供应商的JSON模式（response_format）输出完整JSON对象
+OUTPUT_FORMATS = ("lines", "json")
+NO_MATCH_MARKER = "NONE"
+
+LINE_OUTPUT_INSTRUCTIONS = f"""请逐行输出相关文章，每行一篇，格式为：序号|评分|原因
+例如：
+0|8|文章讨论了AI技术在教育领域的应用
+3|6|涉及大模型的商业落地
+
+注意：
+- 如果没有相关文章，只输出一行：{NO_MATCH_MARKER}
+- 不要输出表头、代码块或其他文字
+- 相关原因要简洁明确，不要包含竖线"""
+
+JSON_OUTPUT_INSTRUCTIONS = """请以JSON格式返回结果，格式如下：
+{
+  "matched_articles": [
+    {
+      "index": 0,
+      "relevance_score": 8,
+      "relevance_reason": "文章讨论了AI技术在教育领域的应用"
+    },
+    ...
+  ]
+}
+
+注意：
+- 如果没有相关文章，返回空列表
+- 只返回JSON，不要有其他文字
+- 相关原因要简洁明确"""
+
+_LINE_MATCH_PATTERN = re.compile(
+    r"^\s*(?:[-*]\s*)?\[?(\d+)\]?\s*[|｜]\s*(\d+(?:\.\d+)?)\s*(?:[|｜]\s*(.*?))?\s*$"
+)
+_JSON_OBJECT_PATTERN = re.compile(r"\{[^{}]*\}")
+_EMPTY_JSON_RESULT_PATTERN = re.compile(r'"matched_articles"\s*:\s*\[\s*\]')
+
+FILTER_SYSTEM_PROMPT = "你是一个专业的新闻筛选助手。你需要根据用户需求，从给定的新闻列表中筛选出相关的文章，并给出相关度评分和理由。"
 
 
 @dataclass
@@ -58,20 +138,437 @@ class FilterResult:
         }
 
 
+def normalize_query(user_query: str) -> str:
+    """
+    规范化用户查询，作为评分缓存键的一部分
+
+    统一全角/半角、大小写和空白，使措辞相同的查询命中同一缓存。
+    """
+    normalized = unicodedata.normalize("NFKC", user_query or "").lower()
+    return " ".join(normalized.split())
+
+
+def extract_query_terms(text: str) -> Set[str]:
+    """
+    提取用于词法匹配的词项
+
+    英文/数字按单词切分，中文按相邻两字（bigram）切分，
+    无需分词器即可对中英文混合文本做粗粒度匹配。
+    """
+    normalized = normalize_query(text)
+    terms = set(_ASCII_WORD_PATTERN.findall(normalized))
+    for run in _CJK_RUN_PATTERN.findall(normalized):
+        if len(run) == 1:
+            terms.add(run)
+        else:
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+class RelevanceScoreCache:
+    """
+    相关度评分持久化缓存
+
+    以 (规范化查询, 文章链接) 为键保存大模型评分。未被大模型选中的文章也会记录，
+    并附带当时的相关度阈值：只要新的阈值不低于记录时的阈值，就可以直接判定为不相关。
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[Path] = None,
+        ttl: int = SCORE_CACHE_TTL,
+        max_queries: int = SCORE_CACHE_MAX_QUERIES
+    ):
+        """
+        初始化评分缓存
+
+        Args:
+            cache_path: 缓存文件路径，为None时使用默认路径
+            ttl: 评分有效期（秒）
+            max_queries: 最多缓存的查询数量
+        """
+        self.cache_path = Path(cache_path) if cache_path else SCORE_CACHE_PATH
+        self.ttl = ttl
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Dict]] = None
+        self._dirty = False
+
+    def _ensure_loaded(self) -> Dict[str, Dict]:
+        """延迟加载缓存文件（调用方需持有锁）"""
+        if self._data is None:
+            self._data = {}
+            if self.cache_path.exists():
+                try:
+                    with open(self.cache_path, 'r', encoding='utf-8') as f:
+                        self._data = json.load(f).get("queries", {})
+                except (OSError, ValueError) as e:
+                    logging.warning(f"评分缓存加载失败，将重新建立: {e}")
+        return self._data
+
+    def lookup(
+        self,
+        user_query: str,
+        links: List[str],
+        min_relevance: int
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        查询已缓存的评分
+
+        Args:
+            user_query: 用户需求
+            links: 文章链接列表
+            min_relevance: 当前的相关度阈值
+
+        Returns:
+            {link: 评分记录或None}，仅包含能够确定结论的链接；
+            值为None表示已确认不相关，值为字典表示相关（含 score 和 reason）
+        """
+        now = time.time()
+        resolved: Dict[str, Optional[Dict]] = {}
+        with self._lock:
+            entry = self._ensure_loaded().get(normalize_query(user_query))
+            if not entry:
+                return resolved
+            scores = entry.get("scores", {})
+            for link in links:
+                record = scores.get(link)
+                if not record or now - record.get("ts", 0) > self.ttl:
+                    continue
+                score = record.get("score")
+                if score is not None:
+                    resolved[link] = record if score >= min_relevance else None
+                elif min_relevance >= record.get("threshold", 10):
+                    resolved[link] = None
+            if resolved:
+                entry["last_used"] = now
+        return resolved
+
+    def record(self, user_query: str, records: Dict[str, Dict]) -> None:
+        """
+        记录一批评分
+
+        Args:
+            user_query: 用户需求
+            records: {link: {"score": int或None, "reason": str, "threshold": int}}
+        """
+        if not records:
+            return
+        now = time.time()
+        with self._lock:
+            data = self._ensure_loaded()
+            entry = data.setdefault(normalize_query(user_query), {"scores": {}})
+            entry["last_used"] = now
+            for link, record in records.items():
+                entry["scores"][link] = {**record, "ts": now}
+            self._dirty = True
+
+    def save(self) -> None:
+        """淘汰过期条目并写回缓存文件"""
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return
+            now = time.time()
+            for key in list(self._data):
+                scores = self._data[key].get("scores", {})
+                for link in [l for l, r in scores.items() if now - r.get("ts", 0) > self.ttl]:
+                    del scores[link]
+                if not scores:
+                    del self._data[key]
+            if len(self._data) > self.max_queries:
+                by_usage = sorted(self._data, key=lambda k: self._data[k].get("last_used", 0))
+                for key in by_usage[:len(self._data) - self.max_queries]:
+                    del self._data[key]
+
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"queries": self._data}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+
+
+class FilterResponseParser:
+    """
+    大模型筛选结果的增量解析器
+
+    可逐块喂入流式输出，每遇到完整的一行就立即解析出结果。优先识别
+    "序号|评分|原因" 行；整段都不符合行格式时，退回到逐个提取JSON对象，
+    即使外层JSON被截断或格式错误，也能恢复其中完整的条目。
+    缺少评分或评分不在1-10之间的条目不计入结果，其序号记在 invalid_indexes 中。
+    """
+
+    def __init__(self, batch_size: int):
+        """
+        初始化解析器
+
+        Args:
+            batch_size: 批次内文章数量，用于校验序号范围
+        """
+        self.batch_size = batch_size
+        self.is_recognized = False  # 是否识别出有效输出（包括明确的"无匹配"）
+        self.invalid_count = 0  # 评分缺失或无效的条目数
+        self.invalid_indexes: Set[int] = set()  # 评分缺失或无效的条目序号
+        self._buffer = ""
+        self._text_parts: List[str] = []
+        self._seen_indexes: Set[int] = set()
+        self._matches: List[Tuple[int, int, Optional[str]]] = []
+
+    def feed(self, chunk: str) -> List[Tuple[int, int, Optional[str]]]:
+        """
+        喂入一段输出
+
+        Returns:
+            本次新解析出的 (序号, 评分, 原因) 列表
+        """
+        self._text_parts.append(chunk)
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        new_matches = []
+        for line in lines:
+            new_matches.extend(self._parse_line(line))
+        return new_matches
+
+    def close(self) -> List[Tuple[int, int, Optional[str]]]:
+        """
+        结束解析，处理剩余内容
+
+        Returns:
+            全部解析结果
+        """
+        if self._buffer:
+            self._parse_line(self._buffer)
+            self._buffer = ""
+        if not self._matches:
+            self._recover_json("".join(self._text_parts))
+        return list(self._matches)
+
+    def _parse_line(self, line: str) -> List[Tuple[int, int, Optional[str]]]:
+        """解析单行输出"""
+        if line.strip().strip("`").upper() == NO_MATCH_MARKER:
+            self.is_recognized = True
+            return []
+        match = _LINE_MATCH_PATTERN.match(line)
+        if not match:
+            return []
+        self.is_recognized = True
+        reason = match.group(3) or None
+        added = self._add(int(match.group(1)), float(match.group(2)), reason)
+        return [added] if added else []
+
+    def _recover_json(self, text: str) -> None:
+        """从文本中逐个提取JSON条目（兼容markdown代码块和被截断的输出）"""
+        if _EMPTY_JSON_RESULT_PATTERN.search(text):
+            self.is_recognized = True
+        for raw_object in _JSON_OBJECT_PATTERN.findall(text):
+            try:
+                item = json.loads(raw_object)
+                index = int(item["index"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            self.is_recognized = True
+            try:
+                score = float(item["relevance_score"])
+            except (ValueError, KeyError, TypeError):
+                score = None
+            self._add(index, score, item.get("relevance_reason"))
+
+    def _add(
+        self,
+        index: int,
+        score: Optional[float],
+        reason: Optional[str]
+    ) -> Optional[Tuple[int, int, Optional[str]]]:
+        """校验并记录一条结果，序号越界或重复时忽略，评分缺失或无效时记入 invalid_indexes"""
+        if not 0 <= index < self.batch_size or index in self._seen_indexes:
+            return None
+        self._seen_indexes.add(index)
+        rounded = int(round(score)) if score is not None else 0
+        if not 1 <= rounded <= 10:
+            self.invalid_count += 1
+            self.invalid_indexes.add(index)
+            return None
+        result = (index, rounded, reason)
+        self._matches.append(result)
+        return result
+
+
+def is_rate_limited(response: str) -> bool:
+    """判断大模型返回的错误是否为限流（HTTP 429或智谱的并发/频率错误码）"""
+    if not response.startswith("[ERROR]"):
+        return False
+    lowered = response.lower()
+    return any(marker in lowered for marker in RATE_LIMIT_MARKERS) or bool(_RATE_LIMIT_CODE_PATTERN.search(response))
+
+
+class TokenBucket:
+    """
+    令牌桶限流器
+
+    以固定速率补充令牌，容量决定允许的突发量。内部只用线程锁和计时，
+    不绑定事件循环，可在多个协程/事件循环之间共享。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（最大突发量）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """按流逝时间补充令牌（调用方需持有锁）"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """
+        尝试取出令牌
+
+        Returns:
+            0表示已取出；否则为还需等待的秒数
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """等待直到取出指定数量的令牌"""
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """清空令牌并透支一段时间，使后续请求至少暂停指定秒数（用于响应限流）"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    自适应并发限制器（AIMD）
+
+    批次成功且耗时低于目标时并发上限加1；耗时过长时减1；遇到限流时减半。
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        max_limit: int,
+        min_limit: int = 1,
+        target_latency: float = DEFAULT_TARGET_LATENCY
+    ):
+        """
+        初始化并发限制器
+
+        Args:
+            initial_limit: 初始并发上限
+            max_limit: 并发上限的最大值
+            min_limit: 并发上限的最小值
+            target_latency: 期望的单次请求耗时（秒）
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial_limit, max_limit))
+        self.target_latency = target_latency
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """等待空闲的并发槽位"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, latency: float, throttled: bool = False) -> None:
+        """
+        释放并发槽位，并根据本次请求的表现调整并发上限
+
+        Args:
+            latency: 本次请求耗时（秒）
+            throttled: 本次请求是否被限流
+        """
+        async with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit // 2)
+            elif latency > self.target_latency:
+                self.limit = max(self.min_limit, self.limit - 1)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1)
+            self._condition.notify_all()
+
+
 class RSSFilterService:
     """RSS新闻智能筛选服务（支持多线程和进度条）"""
     
-    def __init__(self, batch_size: int = 10, max_workers: int = 5):
+    def __init__(
+        self,
+        batch_size: int = 10,
+        max_workers: int = 5,
+        score_cache: Optional[RelevanceScoreCache] = None,
+        use_score_cache: bool = True,
+        lexical_prefilter: bool = False,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: Optional[int] = None,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+        max_retries: int = 2,
+        output_format: str = "lines"
+    ):
         """
         初始化筛选服务
         
         Args:
             batch_size: 每批次发送给大模型的文章数量
-            max_workers: 最大并发线程数
+            max_workers: 最大并发线程数（异步筛选时为并发上限）
+            score_cache: 评分缓存实例，为None时使用默认路径的缓存
+            use_score_cache: 是否启用评分缓存
+            lexical_prefilter: 是否在调用大模型前做词法预筛选（默认关闭：只命中同义词或译名的文章，
+                如"AI"与"人工智能"、"LLM"与"大模型"，会在大模型看到之前被丢弃）
+            requests_per_minute: 异步筛选的请求速率上限
+            tokens_per_minute: 异步筛选的token速率上限，为None时不限制
+            target_latency: 异步筛选期望的单批次耗时（秒）
+            max_retries: 遇到限流或输出无法解析时的最大重试次数
+            output_format: 大模型输出格式，"lines"（逐行，默认）或 "json"（JSON模式）
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format必须是 {OUTPUT_FORMATS} 之一")
+        
         self.batch_size = batch_size
+        self.output_format = output_format
         self.max_workers = max_workers
+        self.score_cache = (score_cache or RelevanceScoreCache()) if use_score_cache else None
+        self.lexical_prefilter = lexical_prefilter
+        self.target_latency = target_latency
+        self.max_retries = max_retries
         self._lock = threading.Lock()  # 线程锁，保护共享资源
+        
+        # 限流器在服务实例内共享，多个并发的筛选请求共同遵守供应商的速率限制
+        self._request_bucket = TokenBucket(
+            rate=requests_per_minute / 60,
+            capacity=max(1, max_workers)
+        )
+        self._token_bucket = (
+            TokenBucket(rate=tokens_per_minute / 60, capacity=tokens_per_minute)
+            if tokens_per_minute else None
+        )
+        # 记录上一次异步筛选收敛到的并发上限，下次从这里开始
+        self._concurrency_hint = max_workers
     
     def filter_articles(
         self, 
@@ -92,14 +589,25 @@ class RSSFilterService:
         Returns:
             FilterResult 筛选结果
         """
+        # 按链接去重，同一篇文章只评分一次
+        unique_articles = self._dedupe_by_link(articles)
+        
+        # 命中评分缓存的文章直接得出结论，只有未评分的文章才需要调用大模型
+        filtered_articles, pending_articles = self._resolve_cached(
+            user_query, unique_articles, min_relevance
+        )
+        
+        # 词法预筛选：与查询没有任何词项重叠的文章不值得花费大模型调用
+        if self.lexical_prefilter:
+            pending_articles = self._lexical_prefilter(user_query, pending_articles)
+        
         # 分批准备任务
         batches = []
-        for i in range(0, len(articles), self.batch_size):
-            batch = articles[i:i + self.batch_size]
+        for i in range(0, len(pending_articles), self.batch_size):
+            batch = pending_articles[i:i + self.batch_size]
             batches.append((user_query, batch, min_relevance))
         
         total_batches = len(batches)
-        filtered_articles = []
         
         # 使用线程池并发处理
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
@@ -121,9 +629,11 @@ class RSSFilterService:
             # 收集结果
             for future in as_completed(future_to_batch):
                 try:
-                    batch_results = future.result()
-                    with self._lock:
-                        filtered_articles.extend(batch_results)
+                    scored, batch_results = future.result()
+                    if batch_results is not None:
+                        self._record_scores(user_query, scored, batch_results, min_relevance)
+                        with self._lock:
+                            filtered_articles.extend(batch_results)
                     
                     if show_progress:
                         pbar.update(1)
@@ -137,6 +647,9 @@ class RSSFilterService:
             if show_progress:
                 pbar.close()
         
+        if self.score_cache:
+            self.score_cache.save()
+        
         # 按相关度排序
         filtered_articles.sort(key=lambda x: x.relevance_score or 0, reverse=True)
         
@@ -147,7 +660,260 @@ class RSSFilterService:
             filtered_articles=filtered_articles
         )
     
-    def _filter_batch_wrapper(self, batch_data: tuple) -> List[FilteredArticle]:
+    async def filter_articles_stream(
+        self,
+        user_query: str,
+        articles: List[RSSArticle],
+        min_relevance: int = 6,
+        token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET
+    ) -> AsyncIterator[FilteredArticle]:
+        """
+        根据用户需求异步筛选文章，逐批产出匹配结果
+        
+        命中评分缓存的文章最先产出；其余文章按token预算打包成批次，
+        每个批次完成后立即产出其中的匹配文章（批内按相关度排序）。
+        
+        Args:
+            user_query: 用户的需求描述
+            articles: 待筛选的文章列表
+            min_relevance: 最低相关度阈值（1-10），默认6
+            token_budget: 每批次prompt的估算token上限
+        
+        Yields:
+            FilteredArticle 匹配的文章
+        """
+        unique_articles = self._dedupe_by_link(articles)
+        cached_matches, pending_articles = self._resolve_cached(
+            user_query, unique_articles, min_relevance
+        )
+        for article in sorted(cached_matches, key=lambda x: x.relevance_score or 0, reverse=True):
+            yield article
+        
+        if self.lexical_prefilter:
+            pending_articles = self._lexical_prefilter(user_query, pending_articles)
+        
+        batches = self._pack_batches_by_tokens(user_query, pending_articles, min_relevance, token_budget)
+        if not batches:
+            return
+        
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=self._concurrency_hint,
+            max_limit=self.max_workers,
+            target_latency=self.target_latency
+        )
+        tasks = [
+            asyncio.create_task(
+                self._filter_batch_async(user_query, batch, min_relevance, batch_tokens, limiter)
+            )
+            for batch, batch_tokens in batches
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                scored, batch_results = await next_done
+                if batch_results is None:
+                    continue
+                self._record_scores(user_query, scored, batch_results, min_relevance)
+                for article in sorted(batch_results, key=lambda x: x.relevance_score or 0, reverse=True):
+                    yield article
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的批次
+            for task in tasks:
+                task.cancel()
+            self._concurrency_hint = limiter.limit
+            if self.score_cache:
+                self.score_cache.save()
+    
+    def _pack_batches_by_tokens(
+        self,
+        user_query: str,
+        articles: List[RSSArticle],
+        min_relevance: int,
+        token_budget: int
+    ) -> List[Tuple[List[RSSArticle], int]]:
+        """
+        按token预算将文章打包成批次
+        
+        Returns:
+            [(文章批次, 估算token数)]，每个批次至少包含一篇文章
+        """
+        base_tokens = estimate_tokens(FILTER_SYSTEM_PROMPT) + estimate_tokens(
+            self._build_filter_prompt(user_query, [], min_relevance)
+        )
+        batches = []
+        current: List[RSSArticle] = []
+        current_tokens = base_tokens
+        for article in articles:
+            article_tokens = estimate_tokens(
+                json.dumps(self._article_info(len(current), article), ensure_ascii=False, indent=2)
+            )
+            is_full = (
+                current_tokens + article_tokens > token_budget
+                or len(current) >= MAX_ARTICLES_PER_BATCH
+            )
+            if current and is_full:
+                batches.append((current, current_tokens))
+                current, current_tokens = [], base_tokens
+            current.append(article)
+            current_tokens += article_tokens
+        if current:
+            batches.append((current, current_tokens))
+        return batches
+    
+    async def _filter_batch_async(
+        self,
+        user_query: str,
+        articles: List[RSSArticle],
+        min_relevance: int,
+        estimated_tokens: int,
+        limiter: AdaptiveConcurrencyLimiter
+    ) -> Tuple[List[RSSArticle], Optional[List[FilteredArticle]]]:
+        """
+        异步筛选一个批次（限流、自适应并发、限流重试）
+        
+        Returns:
+            (得到有效评分的文章, 筛选后的文章列表)，批次失败时为 (文章批次, None)
+        """
+        conversations = self._build_batch_conversations(user_query, articles, min_relevance)
+        
+        for attempt in range(self.max_retries + 1):
+            await self._request_bucket.acquire()
+            if self._token_bucket:
+                await self._token_bucket.acquire(estimated_tokens)
+            
+            await limiter.acquire()
+            started_at = time.monotonic()
+            parser = FilterResponseParser(len(articles))
+            try:
+                response = await asyncio.to_thread(self._request_llm, conversations, parser)
+            except Exception as e:
+                response = f"[ERROR] {str(e)}"
+            throttled = is_rate_limited(response)
+            await limiter.release(time.monotonic() - started_at, throttled=throttled)
+            
+            if throttled:
+                logging.warning(f"筛选批次被限流（第{attempt + 1}次），并发上限降为 {limiter.limit}")
+                self._request_bucket.pause(RATE_LIMIT_BACKOFF * (2 ** attempt))
+                continue
+            if response.startswith("[ERROR]"):
+                logging.warning(f"批次筛选失败: {response}")
+                return articles, None
+            filtered = self._finish_parse(parser, response, articles)
+            if filtered is None:
+                # 输出无法识别时重新请求，而不是把结果当作"全部不相关"
+                logging.warning(f"筛选结果无法解析（第{attempt + 1}次），重新请求")
+                continue
+            return self._scored_articles(parser, articles), filtered
+        
+        return articles, None
+    
+    @staticmethod
+    def _dedupe_by_link(articles: List[RSSArticle]) -> List[RSSArticle]:
+        """按链接去重，保留首次出现的文章"""
+        seen = set()
+        unique_articles = []
+        for article in articles:
+            if article.link in seen:
+                continue
+            seen.add(article.link)
+            unique_articles.append(article)
+        return unique_articles
+    
+    def _resolve_cached(
+        self,
+        user_query: str,
+        articles: List[RSSArticle],
+        min_relevance: int
+    ) -> Tuple[List[FilteredArticle], List[RSSArticle]]:
+        """
+        使用评分缓存解析文章
+        
+        Returns:
+            (缓存中已判定相关的文章, 仍需大模型评分的文章)
+        """
+        if not self.score_cache:
+            return [], list(articles)
+        
+        cached = self.score_cache.lookup(
+            user_query, [a.link for a in articles], min_relevance
+        )
+        matched = []
+        pending = []
+        for article in articles:
+            if article.link not in cached:
+                pending.append(article)
+            elif cached[article.link] is not None:
+                record = cached[article.link]
+                matched.append(self._to_filtered_article(
+                    article, record.get("score"), record.get("reason")
+                ))
+        return matched, pending
+    
+    @staticmethod
+    def _lexical_prefilter(user_query: str, articles: List[RSSArticle]) -> List[RSSArticle]:
+        """
+        词法预筛选，丢弃与查询没有任何词项重叠的文章
+        
+        查询中提取不到有效词项时（例如全是套话）不做筛选，避免误伤召回。
+        """
+        query_terms = extract_query_terms(user_query) - QUERY_STOPWORDS
+        if not query_terms:
+            return articles
+        
+        kept = []
+        for article in articles:
+            text = f"{article.title} {RSSFilterService._summary(article)} {' '.join(article.categories)}"
+            if query_terms & extract_query_terms(text):
+                kept.append(article)
+        return kept
+    
+    def _record_scores(
+        self,
+        user_query: str,
+        batch: List[RSSArticle],
+        batch_results: List[FilteredArticle],
+        min_relevance: int
+    ) -> None:
+        """
+        将一个成功批次的评分写入缓存（未被选中的文章记为低于阈值）
+        
+        batch 只包含得到有效评分的文章，评分无效而被跳过的文章不写入缓存，下次仍会重新评分。
+        """
+        if not self.score_cache:
+            return
+        
+        matched = {a.link: a for a in batch_results}
+        records = {}
+        for article in batch:
+            hit = matched.get(article.link)
+            if hit is not None and hit.relevance_score is not None:
+                records[article.link] = {
+                    "score": hit.relevance_score,
+                    "reason": hit.relevance_reason,
+                }
+            else:
+                records[article.link] = {"score": None, "threshold": min_relevance}
+        self.score_cache.record(user_query, records)
+    
+    @staticmethod
+    def _to_filtered_article(
+        article: RSSArticle,
+        relevance_score: Optional[int],
+        relevance_reason: Optional[str]
+    ) -> FilteredArticle:
+        """将原始文章和评分组装为筛选结果"""
+        return FilteredArticle(
+            title=article.title,
+            link=article.link,
+            description=article.description,
+            source=article.source or "未知来源",
+            pub_date=article.pub_date,
+            relevance_score=relevance_score,
+            relevance_reason=relevance_reason
+        )
+    
+    def _filter_batch_wrapper(
+        self, batch_data: tuple
+    ) -> Tuple[List[RSSArticle], Optional[List[FilteredArticle]]]:
         """
         批次处理包装器（用于线程池）
         
@@ -155,7 +921,7 @@ class RSSFilterService:
             batch_data: (user_query, articles, min_relevance) 元组
         
         Returns:
-            筛选后的文章列表
+            (得到有效评分的文章, 筛选后的文章列表)，批次失败时为 (文章批次, None)
         """
         user_query, articles, min_relevance = batch_data
         return self._filter_batch(user_query, articles, min_relevance)
@@ -165,7 +931,7 @@ class RSSFilterService:
         user_query: str, 
         articles: List[RSSArticle],
         min_relevance: int
-    ) -> List[FilteredArticle]:
+    ) -> Tuple[List[RSSArticle], Optional[List[FilteredArticle]]]:
         """
         批量筛选文章（使用大模型）
         
@@ -175,44 +941,91 @@ class RSSFilterService:
             min_relevance: 最低相关度阈值
         
         Returns:
-            筛选后的文章列表
+            (得到有效评分的文章, 筛选后的文章列表)；调用失败或结果无法解析时为 (文章批次, None)，
+            以免把失败的批次当作"全部不相关"写入评分缓存
+        """
+        conversations = self._build_batch_conversations(user_query, articles, min_relevance)
+        
+        for attempt in range(self.max_retries + 1):
+            parser = FilterResponseParser(len(articles))
+            try:
+                response = self._request_llm(conversations, parser)
+            except Exception as e:
+                print(f"批次筛选失败: {str(e)}")
+                return articles, None
+            if response.startswith("[ERROR]"):
+                print(f"批次筛选失败: {response}")
+                return articles, None
+            
+            # 解析大模型返回的结果，无法识别时重新请求
+            filtered = self._finish_parse(parser, response, articles)
+            if filtered is not None:
+                return self._scored_articles(parser, articles), filtered
+        
+        return articles, None
+    
+    def _request_llm(self, conversations: List[Dict[str, str]], parser: FilterResponseParser) -> str:
+        """
+        流式调用大模型，边接收边把输出块喂给解析器；JSON模式下要求供应商直接输出JSON对象
+        
+        Returns:
+            完整的回复文本
+        """
+        response_format = {"type": "json_object"} if self.output_format == "json" else None
+        parts = []
+        for chunk in iter_zhipu_response_sync(conversations, thinking="disabled", response_format=response_format):
+            parts.append(chunk)
+            parser.feed(chunk)
+        return "".join(parts)
+    
+    @staticmethod
+    def _summary(article: RSSArticle) -> str:
+        """文章的纯文本摘要（旧缓存中的文章没有 summary_text 时现场生成）"""
+        return article.summary_text or truncate_text(html_to_text(article.description))
+    
+    @staticmethod
+    def _article_info(index: int, article: RSSArticle) -> Dict:
+        """构建单篇文章发送给大模型的信息"""
+        return {
+            "index": index,
+            "title": article.title,
+            "description": RSSFilterService._summary(article),  # 截断后的纯文本摘要
+            "source": article.source or "未知来源"
+        }
+    
+    def _build_batch_conversations(
+        self,
+        user_query: str,
+        articles: List[RSSArticle],
+        min_relevance: int
+    ) -> List[Dict[str, str]]:
+        """
+        构建一个批次的大模型对话消息
+        
+        Args:
+            user_query: 用户需求
+            articles: 文章批次
+            min_relevance: 最低相关度阈值
+        
+        Returns:
+            对话消息列表
         """
         # 构建文章列表供大模型分析
-        articles_info = []
-        for idx, article in enumerate(articles):
-            articles_info.append({
-                "index": idx,
-                "title": article.title,
-                "description": article.description[:300] if article.description else "",  # 限制长度
-                "source": article.source or "未知来源"
-            })
+        articles_info = [self._article_info(idx, article) for idx, article in enumerate(articles)]
         
         # 构建prompt
         prompt = self._build_filter_prompt(user_query, articles_info, min_relevance)
         
-        # 调用大模型
-        conversations = [
+        return [
             {
                 "role": "system",
-                "content": "你是一个专业的新闻筛选助手。你需要根据用户需求，从给定的新闻列表中筛选出相关的文章，并给出相关度评分和理由。"
+                "content": FILTER_SYSTEM_PROMPT
             },
             {
                 "role": "user",
                 "content": prompt
             }
         ]
-        
-        try:
-            response = get_zhipu_response_sync(conversations, thinking="disabled")
-            
-            # 解析大模型返回的结果
-            filtered = self._parse_filter_response(response, articles)
-            
-            return filtered
-            
-        except Exception as e:
-            print(f"批次筛选失败: {str(e)}")
-            return []
     
     def _build_filter_prompt(
         self, 
@@ -232,6 +1045,9 @@ class RSSFilterService:
             完整的prompt
         """
         articles_text = json.dumps(articles_info, ensure_ascii=False, indent=2)
+        output_instructions = (
+            JSON_OUTPUT_INSTRUCTIONS if self.output_format == "json" else LINE_OUTPUT_INSTRUCTIONS
+        )
         
         prompt = f"""用户需求：{user_query}
 
@@ -247,22 +1063,7 @@ class RSSFilterService:
 4. 只保留相关度 >= {min_relevance} 分的文章
 5. 简要说明每篇文章的相关原因（20字以内）
 
-请以JSON格式返回结果，格式如下：
-{{
-  "matched_articles": [
-    {{
-      "index": 0,
-      "relevance_score": 8,
-      "relevance_reason": "文章讨论了AI技术在教育领域的应用"
-    }},
-    ...
-  ]
-}}
-
-注意：
-- 如果没有相关文章，返回空列表
-- 只返回JSON，不要有其他文字
-- 相关原因要简洁明确"""
+{output_instructions}"""
         
         return prompt
     
@@ -270,86 +1071,60 @@ class RSSFilterService:
         self, 
         response: str, 
         original_articles: List[RSSArticle]
-    ) -> List[FilteredArticle]:
+    ) -> Optional[List[FilteredArticle]]:
         """
         解析大模型的筛选结果
         
+        同时兼容逐行格式和JSON格式；输出被截断或部分行格式错误时，
+        仍保留能够识别的结果，而不是丢弃整个批次。
+        
         Args:
-            response: 大模型返回的JSON字符串
+            response: 大模型返回的文本
             original_articles: 原始文章列表
         
         Returns:
-            筛选后的文章列表
+            筛选后的文章列表，完全无法识别时返回None
         """
-        try:
-            # 提取JSON部分（去除可能的markdown代码块）
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-            
-            # 解析JSON
-            result = json.loads(response)
-            matched = result.get("matched_articles", [])
-            
-            filtered_articles = []
-            for match in matched:
-                idx = match.get("index")
-                if idx is not None and 0 <= idx < len(original_articles):
-                    article = original_articles[idx]
-                    filtered_articles.append(FilteredArticle(
-                        title=article.title,
-                        link=article.link,
-                        description=article.description,
-                        source=article.source or "未知来源",
-                        pub_date=article.pub_date,
-                        relevance_score=match.get("relevance_score"),
-                        relevance_reason=match.get("relevance_reason")
-                    ))
-            
-            return filtered_articles
-            
-        except json.JSONDecodeError as e:
-            # 尝试更宽松的JSON解析
-            try:
-                # 尝试找到JSON对象
-                start_idx = response.find('{')
-                end_idx = response.rfind('}') + 1
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = response[start_idx:end_idx]
-                    result = json.loads(json_str)
-                    matched = result.get("matched_articles", [])
-                    
-                    filtered_articles = []
-                    for match in matched:
-                        idx = match.get("index")
-                        if idx is not None and 0 <= idx < len(original_articles):
-                            article = original_articles[idx]
-                            filtered_articles.append(FilteredArticle(
-                                title=article.title,
-                                link=article.link,
-                                description=article.description,
-                                source=article.source or "未知来源",
-                                pub_date=article.pub_date,
-                                relevance_score=match.get("relevance_score"),
-                                relevance_reason=match.get("relevance_reason")
-                            ))
-                    return filtered_articles
-            except:
-                pass
-            
-            # 如果还是失败，记录错误但不打印（避免干扰进度条）
-            import logging
-            logging.debug(f"JSON解析失败: {str(e)}, 响应: {response[:200]}")
-            return []
-        except Exception as e:
-            import logging
-            logging.debug(f"结果解析失败: {str(e)}")
-            return []
+        parser = FilterResponseParser(len(original_articles))
+        parser.feed(response)
+        return self._finish_parse(parser, response, original_articles)
+    
+    def _finish_parse(
+        self,
+        parser: FilterResponseParser,
+        response: str,
+        original_articles: List[RSSArticle]
+    ) -> Optional[List[FilteredArticle]]:
+        """
+        结束增量解析并转换结果
+        
+        评分缺失或无效的条目跳过，保留其余有效结果（被跳过的文章见 _scored_articles）
+        
+        Returns:
+            筛选后的文章列表；完全无法识别时返回None
+        """
+        matches = parser.close()
+        
+        if not parser.is_recognized:
+            # 记录错误但不打印（避免干扰进度条）
+            logging.debug(f"筛选结果无法解析, 响应: {response[:200]}")
+            return None
+        if parser.invalid_count:
+            logging.debug(
+                f"筛选结果中有 {parser.invalid_count} 条评分无效，已跳过序号 "
+                f"{sorted(parser.invalid_indexes)}, 响应: {response[:200]}"
+            )
+        
+        return [
+            self._to_filtered_article(original_articles[idx], score, reason)
+            for idx, score, reason in matches
+        ]
+
+
+    @staticmethod
+    def _scored_articles(parser: FilterResponseParser, articles: List[RSSArticle]) -> List[RSSArticle]:
+        """批次中得到有效评分的文章（去掉评分无效而被跳过的文章）"""
+        return [article for i, article in enumerate(articles) if i not in parser.invalid_indexes]
 
 
 def filter_rss_by_query(
@@ -433,7 +1208,9 @@ def filter_rss_from_file(
                     pub_date=article_data.get('pub_date'),
                     author=article_data.get('author'),
                     source=article_data.get('source'),
-                    categories=article_data.get('categories', [])
+                    categories=article_data.get('categories', []),
+                    published_ts=article_data.get('published_ts'),
+                    summary_text=article_data.get('summary_text', '')
                 ))
     
     total_batches = (len(articles) + batch_size - 1) // batch_size
@@ -0,0 +1,79 @@
+"""
+RSS轮询调度守护进程
+
+按源自适应间隔持续轮询RSS源，有新文章时增量合并进JSON缓存，
+使更新快的源（如V2EX、中国新闻网）保持新鲜，更新慢的源不做无用的重复抓取。
+每日的全量缓存任务（rss_cache_job.py）仍保留，用于重建缓存。
+
+使用方法：
+    python backend/tools/rss_scheduler.py
+"""
+import logging
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+from typing import List
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.rss_cache_job import CACHE_FILE_PATH, merge_into_cache
+from tools.rss_fetcher import FeedHealthTracker, RSSFetcher, RSSPollingScheduler
+from tools.rss_fetcher.health import HEALTH_FILE_PATH
+from tools.rss_fetcher.models import RSSArticle
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 轮询状态文件与缓存文件放在同一目录
+if os.getenv("DOCKER_ENV") or os.path.exists("/app"):
+    # Docker环境
+    STATE_FILE_PATH = Path("/app/data/rss_schedule.json")
+else:
+    # 本地开发环境
+    STATE_FILE_PATH = Path(__file__).parent.parent / "data" / "rss_schedule.json"
+
+# 多个源可能同时有更新，串行化对缓存文件的读改写
+_cache_lock = threading.Lock()
+
+
+def on_update(source_name: str, new_articles: List[RSSArticle]) -> None:
+    """源有新文章时增量更新缓存"""
+    with _cache_lock:
+        cache_data = merge_into_cache(new_articles, CACHE_FILE_PATH)
+    logger.info(
+        f"{source_name} 新增 {len(new_articles)} 篇文章，"
+        f"缓存现有 {len(cache_data['articles'])} 篇"
+    )
+
+
+def main():
+    """主函数"""
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"收到信号 {signum}，停止调度")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    with RSSFetcher(health=FeedHealthTracker(HEALTH_FILE_PATH)) as fetcher:
+        scheduler = RSSPollingScheduler(
+            fetcher=fetcher,
+            state_path=STATE_FILE_PATH,
+            on_update=on_update
+        )
+        scheduler.run_forever(stop_event)
+        scheduler.save_state()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@
 基于 test_zhipu_api.py 改造为异步流式生成器，支持 SSE
 """
 import os
-from typing import AsyncGenerator, List, Dict
+from typing import AsyncGenerator, Iterator, List, Dict, Optional
 from zhipuai import ZhipuAI
 from dotenv import load_dotenv
 
@@ -72,9 +72,52 @@ async def get_zhipu_stream_response(
         yield {"type": "error", "content": str(e)}
 
 
+def iter_zhipu_response_sync(
+    conversations: List[Dict[str, str]], 
+    thinking: str = "disabled",
+    response_format: Optional[Dict[str, str]] = None
+) -> Iterator[str]:
+    """
+    逐块获取智谱AI的回复内容（同步生成器，调用方可以边接收边解析）
+    
+    参数:
+        conversations: 会话历史
+        thinking: thinking模式
+        response_format: 结构化输出格式，如 {"type": "json_object"}（可选）
+    
+    生成:
+        回复内容的文本块；请求失败时抛出SDK的异常
+    """
+    extra_body = {
+        "thinking": {
+            "type": thinking
+        }
+    }
+    # 当前SDK的create()没有response_format参数，通过extra_body透传
+    if response_format:
+        extra_body["response_format"] = response_format
+    
+    response = zhipu_client.chat.completions.create(
+        model="glm-4-flash",
+        messages=conversations,
+        stream=True,
+        extra_body=extra_body,
+    )
+    
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        
+        delta = chunk.choices[0].delta
+        
+        if hasattr(delta, 'content') and delta.content:
+            yield delta.content
+
+
 def get_zhipu_response_sync(
     conversations: List[Dict[str, str]], 
-    thinking: str = "disabled"
+    thinking: str = "disabled",
+    response_format: Optional[Dict[str, str]] = None
 ) -> str:
     """
     获取智谱AI的完整响应（同步版本，用于非流式场景）
@@ -82,34 +125,13 @@ def get_zhipu_response_sync(
     参数:
         conversations: 会话历史
         thinking: thinking模式
+        response_format: 结构化输出格式，如 {"type": "json_object"}（可选）
     
     返回:
         完整的AI回复内容
     """
     try:
-        response = zhipu_client.chat.completions.create(
-            model="glm-4-flash",
-            messages=conversations,
-            stream=True,
-            extra_body={
-                "thinking": {
-                    "type": thinking
-                }
-            },
-        )
-        
-        full_content = ""
-        for chunk in response:
-            if not chunk.choices:
-                continue
-            
-            delta = chunk.choices[0].delta
-            
-            if hasattr(delta, 'content') and delta.content:
-                full_content += delta.content
-        
-        return full_content
-        
+        return "".join(iter_zhipu_response_sync(conversations, thinking, response_format))
     except Exception as e:
         return f"[ERROR] {str(e)}"
 
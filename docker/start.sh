@@ -1,12 +1,12 @@
 #!/bin/bash
-# 启动脚本：同时启动uvicorn和cron服务
+# 启动脚本：同时启动uvicorn、cron服务和RSS轮询调度
 
 set -e
 
 # 确保日志目录存在
 mkdir -p /app/logs
-touch /app/logs/rss_cache.log
-chmod 666 /app/logs/rss_cache.log
+touch /app/logs/rss_cache.log /app/logs/rss_scheduler.log
+chmod 666 /app/logs/rss_cache.log /app/logs/rss_scheduler.log
 
 # 启动cron服务（后台运行）
 echo "启动cron服务..."
@@ -25,6 +25,10 @@ else
     echo "✗ Cron服务启动失败"
 fi
 
+# 启动RSS轮询调度（后台运行，按源自适应间隔增量更新缓存）
+echo "启动RSS轮询调度..."
+python3 /app/tools/rss_scheduler.py >> /app/logs/rss_scheduler.log 2>&1 &
+
 # 启动uvicorn应用（前台运行，保持容器运行）
 echo "启动uvicorn应用..."
 exec uvicorn app.main:app --host 0.0.0.0 --port 8000
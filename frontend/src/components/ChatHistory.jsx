@@ -12,6 +12,7 @@ import {
   removeConversation,
   setCurrentConversation,
   setMessages,
+  setOlderMessagesCursor,
   setLoading,
 } from '../store/store';
 import {
@@ -56,8 +57,10 @@ const ChatHistory = () => {
       }
       
       dispatch(setCurrentConversation(convId));
-      const messages = await getConversationMessages(convId);
+      // 只加载最新的一页，更早的消息在消息区按需加载
+      const { messages, olderCursor } = await getConversationMessages(convId);
       dispatch(setMessages(messages));
+      dispatch(setOlderMessagesCursor(olderCursor));
       
       // 重新加载会话列表以获取最新信息（标题、更新时间等）
       const updatedConvs = await getConversations('chat');
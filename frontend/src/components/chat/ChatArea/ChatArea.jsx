@@ -2,7 +2,7 @@
  * Chat 页面主聊天界面组件 - 使用 CSS Modules 和主题系统
  * 展示消息列表、处理流式响应、管理交互
  */
-import React, { useEffect, useRef } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
 import { MessageCircle, Loader } from 'lucide-react';
 import { motion } from 'framer-motion';
@@ -17,17 +17,29 @@ import {
   endStreaming,
   addToast,
   setMessages,
+  prependMessages,
+  setOlderMessagesCursor,
 } from '../../../store/store';
-import { sendMessageStream, generateConversationTitle } from '../../../services/api';
+import { sendMessageStream, generateConversationTitle, getConversationMessages } from '../../../services/api';
 import styles from './ChatArea.module.css';
 
 const ChatArea = () => {
   const dispatch = useDispatch();
   const theme = useTheme();
-  const { currentConversationId, messages, isStreaming, isLoading, thinkingEnabled, modelProvider } = useSelector(
-    state => state.chat
-  );
+  const {
+    currentConversationId,
+    messages,
+    olderMessagesCursor,
+    isStreaming,
+    isLoading,
+    thinkingEnabled,
+    modelProvider,
+  } = useSelector(state => state.chat);
   const messagesEndRef = useRef(null);
+  const skipScrollRef = useRef(false); // 插入更早的消息时不滚动到底部
+  const conversationIdRef = useRef(currentConversationId);
+  conversationIdRef.current = currentConversationId;
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   // 自动滚动到底部
   const scrollToBottom = () => {
@@ -35,9 +47,38 @@ const ChatArea = () => {
   };
 
   useEffect(() => {
+    if (skipScrollRef.current) {
+      skipScrollRef.current = false;
+      return;
+    }
     scrollToBottom();
   }, [messages]);
 
+  // 加载更早的一页消息
+  const handleLoadOlder = async () => {
+    if (!olderMessagesCursor || isLoadingOlder) return;
+    const conversationId = currentConversationId;
+    setIsLoadingOlder(true);
+    try {
+      const { messages: older, olderCursor } = await getConversationMessages(conversationId, olderMessagesCursor);
+      // 加载期间切换了会话，丢弃结果
+      if (conversationIdRef.current !== conversationId) return;
+      skipScrollRef.current = true;
+      dispatch(prependMessages(older));
+      dispatch(setOlderMessagesCursor(olderCursor));
+    } catch (error) {
+      dispatch(
+        addToast({
+          type: 'error',
+          message: `加载更早的消息失败: ${error.message || error}`,
+          duration: 3000,
+        })
+      );
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
   // 发送消息
   const handleSendMessage = async (message) => {
     if (!currentConversationId) {
@@ -223,6 +264,20 @@ const ChatArea = () => {
           ) : (
             // 消息列表
             <>
+              {olderMessagesCursor && (
+                <div className={styles.loadOlder}>
+                  <button
+                    type="button"
+                    className={styles.loadOlderButton}
+                    onClick={handleLoadOlder}
+                    disabled={isLoadingOlder}
+                  >
+                    {isLoadingOlder && <Loader className={styles.loader} size={14} />}
+                    {isLoadingOlder ? '加载中...' : '加载更早的消息'}
+                  </button>
+                </div>
+              )}
+
               {messages.map((message, index) => (
                 <ChatBubble
                   key={index}
@@ -25,6 +25,8 @@ import {
   endStreaming,
   addToast,
   setMessages,
+  prependMessages,
+  setOlderMessagesCursor,
   setConversations,
   setCurrentConversation,
   setModelProvider,
@@ -46,6 +48,17 @@ import AgentModelSelector from '../components/AgentModelSelector';
 import { AGENT_DEFAULT_MODEL, AGENT_MODELS } from '../config/models';
 import QuickActions from '../components/QuickActions.jsx';
 
+// 把接口返回的消息转换为统一的格式
+const toAgentMessage = (msg) => ({
+  role: msg.role,
+  content: msg.content || '',
+  thinking: msg.thinking || '',
+  toolCalls: msg.toolCalls || [], // 保留工具调用信息
+  timestamp: msg.timestamp || new Date().toISOString(),
+  isStreaming: false,
+  isThinking: false,
+});
+
 // --- 组件：背景动态流体 ---
 // 使用纯CSS动画模拟流动的空气感背景
 const AmbientBackground = () => (
@@ -70,6 +83,7 @@ export default function Agent() {
   const { 
     currentConversationId, 
     messages, 
+    olderMessagesCursor,
     isStreaming, 
     conversations,
     modelProvider,
@@ -109,6 +123,10 @@ export default function Agent() {
   const messagesEndRef = useRef(null);
   const skipNextLoadRef = useRef(false);
   const justFinishedStreamingRef = useRef(false); // 标记是否刚刚完成流式输出
+  const skipScrollRef = useRef(false); // 插入更早的消息时不滚动到底部
+  const conversationIdRef = useRef(currentConversationId);
+  conversationIdRef.current = currentConversationId;
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   // 自动滚动到底部
   const scrollToBottom = () => {
@@ -116,9 +134,33 @@ export default function Agent() {
   };
 
   useEffect(() => {
+    if (skipScrollRef.current) {
+      skipScrollRef.current = false;
+      return;
+    }
     scrollToBottom();
   }, [messages]);
 
+  // 加载更早的一页消息
+  const handleLoadOlder = async () => {
+    if (!olderMessagesCursor || isLoadingOlder) return;
+    const conversationId = currentConversationId;
+    setIsLoadingOlder(true);
+    try {
+      const { messages: older, olderCursor } = await getConversationMessages(conversationId, olderMessagesCursor);
+      // 加载期间切换了会话，丢弃结果
+      if (conversationIdRef.current !== conversationId) return;
+      skipScrollRef.current = true;
+      dispatch(prependMessages(older.map(toAgentMessage)));
+      dispatch(setOlderMessagesCursor(olderCursor));
+    } catch (error) {
+      console.error('加载更早的消息失败:', error);
+      dispatch(addToast({ type: 'error', message: '加载更早的消息失败', duration: 3000 }));
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
   // 加载会话列表
   useEffect(() => {
     const loadConversations = async () => {
@@ -192,19 +234,12 @@ export default function Agent() {
             return;
           }
           
-          const msgs = await getConversationMessages(currentConversationId);
+          // 只加载最新的一页，更早的消息点击“加载更早的消息”按需加载
+          const { messages: msgs, olderCursor } = await getConversationMessages(currentConversationId);
           console.log('✅ [Agent] 消息加载完成:', msgs.length, '条消息');
           // 转换消息格式，确保格式统一
-          const formattedMessages = msgs.map(msg => ({
-            role: msg.role,
-            content: msg.content || '',
-            thinking: msg.thinking || '',
-            toolCalls: msg.toolCalls || [], // 保留工具调用信息
-            timestamp: msg.timestamp || new Date().toISOString(),
-            isStreaming: false,
-            isThinking: false,
-          }));
-          dispatch(setMessages(formattedMessages));
+          dispatch(setMessages(msgs.map(toAgentMessage)));
+          dispatch(setOlderMessagesCursor(olderCursor));
         } catch (error) {
           console.error('加载消息失败:', error);
           // 如果加载失败，清空状态
@@ -541,7 +576,20 @@ export default function Agent() {
                   </p>
                 </div>
               ) : (
-                messages.map((msg, idx) => {
+                <>
+                {olderMessagesCursor && (
+                  <div className="flex justify-center">
+                    <button
+                      type="button"
+                      onClick={handleLoadOlder}
+                      disabled={isLoadingOlder}
+                      className="px-4 py-1.5 rounded-full text-xs text-slate-500 bg-white/60 border border-white/60 backdrop-blur-md shadow-sm hover:text-slate-700 hover:bg-white/80 transition-colors disabled:opacity-60"
+                    >
+                      {isLoadingOlder ? '加载中...' : '加载更早的消息'}
+                    </button>
+                  </div>
+                )}
+                {messages.map((msg, idx) => {
                   const msgKey = msg.id || `${msg.role}-${idx}-${msg.timestamp || Date.now()}`;
                   
                   // 调试日志：记录每条消息的工具调用信息
@@ -626,7 +674,8 @@ export default function Agent() {
                       </div>
                     </div>
                   );
-                })
+                })}
+                </>
               )}
               <div ref={messagesEndRef} />
             </div>
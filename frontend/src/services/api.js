@@ -48,11 +48,40 @@ export const deleteConversation = async (conversationId) => {
 };
 
 /**
- * 获取对话的消息历史
+ * 分页获取对话消息（按时间顺序）
+ * 不带游标时返回最新的一页；before 加载更早的消息，after 加载更新的消息
  */
-export const getConversationMessages = async (conversationId) => {
-  const response = await apiClient.get(`/conversations/${conversationId}/messages`);
-  return response.data.messages;
+export const getConversationMessagesPage = async (conversationId, { before, after, limit } = {}) => {
+  const params = {};
+  if (before) params.before = before;
+  if (after) params.after = after;
+  if (limit) params.limit = limit;
+  const response = await apiClient.get(`/conversations/${conversationId}/messages`, { params });
+  return response.data;
+};
+
+/**
+ * 全文搜索历史消息（从新到旧）
+ * 返回的 snippet 已转义 HTML，命中位置用 <mark> 标记
+ */
+export const searchMessages = async (query, { cursor, limit } = {}) => {
+  const params = { q: query };
+  if (cursor) params.cursor = cursor;
+  if (limit) params.limit = limit;
+  const response = await apiClient.get('/search/messages', { params });
+  return response.data;
+};
+
+/**
+ * 获取对话的一页消息（不带 before 时为最新的一页）
+ * 返回该页消息和加载更早消息的游标，没有更早的消息时 olderCursor 为 null
+ */
+export const getConversationMessages = async (conversationId, before = null) => {
+  const page = await getConversationMessagesPage(conversationId, { before });
+  return {
+    messages: page.messages,
+    olderCursor: page.has_more ? page.before_cursor : null,
+  };
 };
 
 /**
@@ -13,6 +13,7 @@ const chatSlice = createSlice({
     conversations: [],                    // 会话列表
     currentConversationId: null,          // 当前会话 ID
     messages: [],                         // 当前会话的消息列表
+    olderMessagesCursor: null,            // 加载更早消息的游标（null 表示已加载到最早的消息）
     isStreaming: false,                   // 是否正在接收流式响应
     thinkingEnabled: false,               // thinking 模式开关
     modelProvider: CHAT_DEFAULT_MODEL,   // 模型标识符（默认从配置文件读取）
@@ -43,6 +44,7 @@ const chatSlice = createSlice({
       if (state.currentConversationId === action.payload) {
         state.currentConversationId = null;
         state.messages = [];
+        state.olderMessagesCursor = null;
       }
     },
     
@@ -50,6 +52,7 @@ const chatSlice = createSlice({
     setCurrentConversation: (state, action) => {
       state.currentConversationId = action.payload;
       state.messages = [];
+      state.olderMessagesCursor = null;
       state.streamingContent = '';
     },
     
@@ -58,6 +61,16 @@ const chatSlice = createSlice({
       state.messages = action.payload;
     },
     
+    // 在列表开头插入更早的一页消息
+    prependMessages: (state, action) => {
+      state.messages = [...action.payload, ...state.messages];
+    },
+    
+    // 设置加载更早消息的游标
+    setOlderMessagesCursor: (state, action) => {
+      state.olderMessagesCursor = action.payload;
+    },
+    
     // 添加用户消息
     addUserMessage: (state, action) => {
       state.messages.push({
@@ -295,6 +308,8 @@ export const {
   removeConversation,
   setCurrentConversation,
   setMessages,
+  prependMessages,
+  setOlderMessagesCursor,
   addUserMessage,
   startStreaming,
   appendStreamingThinking,